@@ -664,7 +664,7 @@ const InputSection: React.FC<InputSectionProps> = ({ nodeId, visible = true }) =
                 chunk_count: 'number'
               },
               embeddingGenerator: {
-                embeddings: 'array',
+                embeddings: 'object',
                 embedding_count: 'number',
                 dimensions: 'number',
                 chunks: 'array'
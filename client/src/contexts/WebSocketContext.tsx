@@ -60,6 +60,8 @@ export interface NodeStatus {
   timestamp?: number;
   // Per-workflow scoping (n8n pattern)
   workflow_id?: string;
+  // Server node status table version of this status (newer wins)
+  version?: number;
   // Waiting state data
   message?: string;
   waiter_id?: string;
@@ -456,10 +458,76 @@ export const WebSocketProvider: React.FC<{ children: React.ReactNode }> = ({ chi
   // without recreating the WebSocket connection (n8n pattern)
   const currentWorkflowIdRef = useRef<string | undefined>(currentWorkflowId);
 
+  // Highest node status version seen per workflow - lets subscribe fetch only deltas
+  const nodeStatusCursorsRef = useRef<Record<string, number>>({});
+  // Epoch of the server's node status table; versions restart with it
+  const nodeStatusEpochRef = useRef<string | undefined>(undefined);
+
+  // A new epoch means the server restarted: versions from before it compare
+  // against a counter that began again at 0, so forget cursors and versions
+  const adoptNodeStatusEpoch = useCallback((epoch: string | undefined) => {
+    if (!epoch || epoch === nodeStatusEpochRef.current) return;
+    const hadEpoch = nodeStatusEpochRef.current !== undefined;
+    nodeStatusEpochRef.current = epoch;
+    nodeStatusCursorsRef.current = {};
+    if (!hadEpoch) return;
+    setAllNodeStatuses(prev => {
+      const next: Record<string, Record<string, NodeStatus>> = {};
+      for (const [wfId, nodes] of Object.entries(prev)) {
+        next[wfId] = {};
+        for (const [nodeId, { version: _, ...rest }] of Object.entries<any>(nodes)) {
+          next[wfId][nodeId] = rest;
+        }
+      }
+      return next;
+    });
+  }, []);
+
+  const noteNodeStatusVersion = useCallback((workflowId: string | null | undefined, version: number | undefined) => {
+    if (!workflowId || typeof version !== 'number') return;
+    const cursors = nodeStatusCursorsRef.current;
+    if (!(cursors[workflowId] >= version)) cursors[workflowId] = version;
+  }, []);
+
+  // Apply a node status snapshot (full or delta) from subscribe / get_node_snapshot
+  const applyNodeSnapshot = useCallback((snapshot: any) => {
+    adoptNodeStatusEpoch(snapshot.epoch);
+    const wfId = snapshot.workflow_id || 'unknown';
+    const nodes: Record<string, NodeStatus> = {};
+    for (const [nodeId, entry] of Object.entries<any>(snapshot.nodes || {})) {
+      const { output, ...rest } = entry;
+      const nodeStatus: NodeStatus = { ...rest, ...(rest.data || {}), workflow_id: wfId };
+      // Large outputs arrive as references; components fetch them with getNodeOutput
+      if (output !== undefined && !output?.__ref__) nodeStatus.output = output;
+      nodes[nodeId] = nodeStatus;
+    }
+    setAllNodeStatuses(prev => {
+      const current = snapshot.full ? {} : { ...(prev[wfId] || {}) };
+      for (const nodeId of snapshot.removed || []) delete current[nodeId];
+      return { ...prev, [wfId]: { ...current, ...nodes } };
+    });
+    noteNodeStatusVersion(snapshot.workflow_id, snapshot.version);
+  }, [adoptNodeStatusEpoch, noteNodeStatusVersion]);
+
+  // Receive node updates for the current workflow only; the reply carries its
+  // node statuses (only the changes since our cursor when we have one)
+  const subscribeToWorkflow = useCallback((ws: WebSocket | null, workflowId: string | undefined) => {
+    if (!ws || ws.readyState !== WebSocket.OPEN || !workflowId) return;
+    const cursor = nodeStatusCursorsRef.current[workflowId];
+    ws.send(JSON.stringify({
+      type: 'subscribe',
+      request_id: generateRequestId(),
+      workflow_ids: [workflowId],
+      since: cursor !== undefined ? { [workflowId]: cursor } : undefined,
+      epoch: nodeStatusEpochRef.current
+    }));
+  }, []);
+
   // Keep the ref in sync with the state and clear node statuses on workflow switch (n8n pattern)
   useEffect(() => {
     const previousWorkflowId = currentWorkflowIdRef.current;
     currentWorkflowIdRef.current = currentWorkflowId;
+    subscribeToWorkflow(wsRef.current, currentWorkflowId);
 
     // No need to clear node statuses - they are now stored per-workflow (n8n pattern)
     // Each workflow's statuses are isolated in allNodeStatuses[workflow_id]
@@ -522,12 +590,11 @@ export const WebSocketProvider: React.FC<{ children: React.ReactNode }> = ({ chi
         fetchDeploymentStatus();
       }
     }
-  }, [currentWorkflowId]);
+  }, [currentWorkflowId, subscribeToWorkflow]);
 
-  // Handle incoming messages
-  const handleMessage = useCallback((event: MessageEvent) => {
+  // Handle one server message (broadcasts can arrive several per frame in a 'batch')
+  const processMessage = useCallback((message: any) => {
     try {
-      const message = JSON.parse(event.data);
       const { type, data, node_id, name, value, output, variables: varsUpdate, request_id } = message;
 
       // Handle request/response pattern - resolve pending requests
@@ -551,17 +618,9 @@ export const WebSocketProvider: React.FC<{ children: React.ReactNode }> = ({ chi
             if (data.google) setGoogleStatus(data.google);
             if (data.telegram) setTelegramStatus(data.telegram);
             if (data.api_keys) setApiKeyStatuses(data.api_keys);
-            // Node statuses from initial_status - group by workflow_id (n8n pattern)
-            if (data.nodes) {
-              const groupedStatuses: Record<string, Record<string, NodeStatus>> = {};
-              for (const [nodeId, status] of Object.entries(data.nodes)) {
-                const nodeStatus = status as NodeStatus;
-                const wfId = nodeStatus?.workflow_id || 'unknown';
-                if (!groupedStatuses[wfId]) groupedStatuses[wfId] = {};
-                groupedStatuses[wfId][nodeId] = nodeStatus;
-              }
-              setAllNodeStatuses(prev => ({ ...prev, ...groupedStatuses }));
-            }
+            // Node statuses are not part of initial_status - they come with the
+            // subscribe reply as a per-workflow snapshot
+            adoptNodeStatusEpoch(data.node_status_epoch);
             if (data.node_parameters) setNodeParameters(data.node_parameters);
             // Variables from initial_status - group by workflow_id (n8n pattern)
             if (data.variables) {
@@ -587,6 +646,13 @@ export const WebSocketProvider: React.FC<{ children: React.ReactNode }> = ({ chi
           }
           break;
 
+        case 'subscribe_result':
+          // Node status snapshots of the newly subscribed workflows
+          if (message.success) {
+            for (const snapshot of message.snapshots || []) applyNodeSnapshot(snapshot);
+          }
+          break;
+
         case 'api_key_status':
           if (message.provider) {
             setApiKeyStatuses(prev => ({
@@ -697,13 +763,18 @@ export const WebSocketProvider: React.FC<{ children: React.ReactNode }> = ({ chi
             // Flatten the structure: merge inner data with outer data for easier access
             const flattenedData = { ...data, ...innerData, workflow_id: statusWorkflowId };
 
-            setAllNodeStatuses((prev: Record<string, Record<string, NodeStatus>>) => ({
-              ...prev,
-              [statusWorkflowId]: {
-                ...(prev[statusWorkflowId] || {}),
-                [node_id]: flattenedData
-              }
-            }));
+            setAllNodeStatuses((prev: Record<string, Record<string, NodeStatus>>) => {
+              // A frame queued before a snapshot can arrive after it - keep the newer
+              if ((prev[statusWorkflowId]?.[node_id]?.version ?? -1) >= (data?.version ?? 0)) return prev;
+              return {
+                ...prev,
+                [statusWorkflowId]: {
+                  ...(prev[statusWorkflowId] || {}),
+                  [node_id]: flattenedData
+                }
+              };
+            });
+            noteNodeStatusVersion(message.workflow_id, data?.version);
           }
           break;
 
@@ -711,17 +782,22 @@ export const WebSocketProvider: React.FC<{ children: React.ReactNode }> = ({ chi
           // Per-workflow node output storage (n8n pattern)
           if (node_id) {
             const outputWorkflowId = message.workflow_id || 'unknown';
-            setAllNodeStatuses((prev: Record<string, Record<string, NodeStatus>>) => ({
-              ...prev,
-              [outputWorkflowId]: {
-                ...(prev[outputWorkflowId] || {}),
-                [node_id]: {
-                  ...(prev[outputWorkflowId]?.[node_id] || {}),
-                  output,
-                  workflow_id: outputWorkflowId
+            setAllNodeStatuses((prev: Record<string, Record<string, NodeStatus>>) => {
+              if ((prev[outputWorkflowId]?.[node_id]?.version ?? -1) >= (message.version ?? 0)) return prev;
+              return {
+                ...prev,
+                [outputWorkflowId]: {
+                  ...(prev[outputWorkflowId] || {}),
+                  [node_id]: {
+                    ...(prev[outputWorkflowId]?.[node_id] || {}),
+                    output,
+                    workflow_id: outputWorkflowId,
+                    version: message.version
+                  }
                 }
-              }
-            }));
+              };
+            });
+            noteNodeStatusVersion(message.workflow_id, message.version);
           }
           break;
 
@@ -746,6 +822,7 @@ export const WebSocketProvider: React.FC<{ children: React.ReactNode }> = ({ chi
               }
               return newStatuses;
             });
+            noteNodeStatusVersion(clearWorkflowId, message.version);
           }
           break;
 
@@ -1041,10 +1118,26 @@ export const WebSocketProvider: React.FC<{ children: React.ReactNode }> = ({ chi
         default:
           break;
       }
+    } catch (error) {
+      console.error('[WebSocket] Failed to handle message:', error);
+    }
+  }, [adoptNodeStatusEpoch, applyNodeSnapshot, noteNodeStatusVersion]);  // Stable deps - uses ref for currentWorkflowId to avoid reconnecting WebSocket
+
+  // Handle incoming frames
+  const handleMessage = useCallback((event: MessageEvent) => {
+    let message: any;
+    try {
+      message = JSON.parse(event.data);
     } catch (error) {
       console.error('[WebSocket] Failed to parse message:', error);
+      return;
+    }
+    if (message.type === 'batch' && Array.isArray(message.messages)) {
+      for (const inner of message.messages) processMessage(inner);
+      return;
     }
-  }, []);  // Empty deps - uses ref for currentWorkflowId to avoid reconnecting WebSocket
+    processMessage(message);
+  }, [processMessage]);
 
   // Connect to WebSocket
   const connect = useCallback(() => {
@@ -1060,6 +1153,7 @@ export const WebSocketProvider: React.FC<{ children: React.ReactNode }> = ({ chi
       ws.onopen = async () => {
         setIsConnected(true);
         setReconnecting(false);
+        subscribeToWorkflow(ws, currentWorkflowIdRef.current);
 
         // Start ping interval
         pingIntervalRef.current = setInterval(() => {
@@ -1244,7 +1338,7 @@ export const WebSocketProvider: React.FC<{ children: React.ReactNode }> = ({ chi
       setReconnecting(true);
       reconnectTimeoutRef.current = setTimeout(connect, 3000);
     }
-  }, [handleMessage]);
+  }, [handleMessage, subscribeToWorkflow]);
 
   // Request current status
   const requestStatus = useCallback(() => {
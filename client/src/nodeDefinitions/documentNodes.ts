@@ -85,6 +85,14 @@ export const documentNodes: Record<string, INodeTypeDescription> = {
         default: 'a[href$=".pdf"]',
         description: 'CSS selector for extracting links'
       },
+      {
+        displayName: 'Max Concurrency',
+        name: 'maxConcurrency',
+        type: 'number',
+        default: 4,
+        typeOptions: { minValue: 1, maxValue: 32 },
+        description: 'Pages fetched in parallel in date/page mode'
+      },
       {
         displayName: 'Headers (JSON)',
         name: 'headers',
@@ -159,6 +167,13 @@ export const documentNodes: Record<string, INodeTypeDescription> = {
         default: true,
         description: 'Skip files that already exist'
       },
+      {
+        displayName: 'Revalidate',
+        name: 'revalidate',
+        type: 'boolean',
+        default: false,
+        description: 'Re-request existing files with ETag/If-Modified-Since and replace them only if changed'
+      },
       {
         displayName: 'Timeout (seconds)',
         name: 'timeout',
@@ -210,6 +225,28 @@ export const documentNodes: Record<string, INodeTypeDescription> = {
         type: 'string',
         default: '*.pdf',
         description: 'Glob pattern for files in inputDir'
+      },
+      {
+        displayName: 'Workers',
+        name: 'workers',
+        type: 'number',
+        default: 1,
+        typeOptions: { minValue: 1, maxValue: 32 },
+        description: 'Parse files in parallel worker processes (1 = one file at a time in a thread)'
+      },
+      {
+        displayName: 'Skip Unchanged Files',
+        name: 'skipUnchanged',
+        type: 'boolean',
+        default: false,
+        description: 'Skip files whose modification time or content hash is unchanged since the last run'
+      },
+      {
+        displayName: 'Streaming',
+        name: 'streaming',
+        type: 'boolean',
+        default: false,
+        description: 'Spool documents to disk as they finish; Text Chunker reads them one at a time'
       }
     ]
   },
@@ -389,6 +426,23 @@ export const documentNodes: Record<string, INodeTypeDescription> = {
         typeOptions: { minValue: 1, maxValue: 100 },
         displayOptions: { show: { operation: ['query'] } },
         description: 'Number of results to return for queries'
+      },
+      {
+        displayName: 'Batch Size',
+        name: 'batchSize',
+        type: 'number',
+        default: 256,
+        typeOptions: { minValue: 1, maxValue: 5000 },
+        displayOptions: { show: { operation: ['store'] } },
+        description: 'Vectors per upsert request (Pinecone is capped at 100)'
+      },
+      {
+        displayName: 'Concurrency',
+        name: 'concurrency',
+        type: 'number',
+        default: 4,
+        typeOptions: { minValue: 1, maxValue: 32 },
+        description: 'Upsert batches (or Pinecone queries) sent in parallel'
       }
     ]
   }
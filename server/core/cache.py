@@ -338,6 +338,28 @@ class CacheService:
             logger.error(f"Stream read failed: {streams.keys()}", error=str(e))
             return None
 
+    async def stream_last_id(self, stream: str) -> Optional[str]:
+        """Get the ID of the newest message in a stream.
+
+        Used as the starting cursor for XREAD so that messages added between
+        this call and the first read are not missed (unlike '$').
+
+        Args:
+            stream: Stream name
+
+        Returns:
+            Newest message ID, '0-0' if the stream is empty or missing,
+            None if streams are unavailable
+        """
+        try:
+            if self.use_redis and self.redis and self._streams_available:
+                entries = await self.redis.xrevrange(stream, count=1)
+                return entries[0][0] if entries else '0-0'
+            return None
+        except Exception as e:
+            logger.error(f"Stream last id failed: {stream}", error=str(e))
+            return None
+
     async def stream_create_group(
         self,
         stream: str,
@@ -24,6 +24,7 @@ class CleanupService:
     - Expired cache entries
     - Old console logs (keeps configurable count)
     - Old cache entries by age
+    - Raw usage metrics and hourly usage rollups past retention
     - Forces garbage collection
     """
 
@@ -101,7 +102,18 @@ class CleanupService:
             logger.warning("Failed to cleanup old cache", error=str(e))
             results['old_cache'] = 0
 
-        # 4. Force garbage collection
+        # 4. Usage history past retention (rollups keep the totals)
+        try:
+            pruned = await self.database.prune_usage_history(
+                raw_days=self.settings.cleanup_usage_raw_days,
+                hourly_days=self.settings.cleanup_usage_hourly_days
+            )
+            results['usage_history'] = sum(pruned.values())
+        except Exception as e:
+            logger.warning("Failed to prune usage history", error=str(e))
+            results['usage_history'] = 0
+
+        # 5. Force garbage collection
         gc.collect()
 
         # Only log if something was cleaned up
@@ -119,5 +131,10 @@ class CleanupService:
         results['old_cache'] = await self.database.cleanup_old_cache(
             max_age_hours=self.settings.cleanup_cache_max_age_hours
         )
+        pruned = await self.database.prune_usage_history(
+            raw_days=self.settings.cleanup_usage_raw_days,
+            hourly_days=self.settings.cleanup_usage_hourly_days
+        )
+        results['usage_history'] = sum(pruned.values())
         gc.collect()
         return results
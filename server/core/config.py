@@ -46,6 +46,16 @@ class Settings(BaseSettings):
 
     # Execution Engine
     dlq_enabled: bool = Field(default=False, env="DLQ_ENABLED")
+    memo_cache_max_entries: int = Field(default=1000, env="MEMO_CACHE_MAX_ENTRIES", ge=1)
+    output_cache_max_mb: int = Field(default=256, env="OUTPUT_CACHE_MAX_MB", ge=1)
+    output_cache_max_sessions: int = Field(default=1000, env="OUTPUT_CACHE_MAX_SESSIONS", ge=1)
+    output_cache_ttl: int = Field(default=3600, env="OUTPUT_CACHE_TTL", ge=0)
+
+    # Embedding Service (process-wide model pool, micro-batching, vector cache)
+    embedding_pool_max_models: int = Field(default=2, env="EMBEDDING_POOL_MAX_MODELS", ge=1)
+    embedding_cache_max_entries: int = Field(default=50000, env="EMBEDDING_CACHE_MAX_ENTRIES", ge=0)
+    embedding_batch_window_ms: float = Field(default=5.0, env="EMBEDDING_BATCH_WINDOW_MS", ge=0)
+    embedding_max_batch_size: int = Field(default=64, env="EMBEDDING_MAX_BATCH_SIZE", ge=1)
 
     # Temporal Configuration
     temporal_enabled: bool = Field(default=False, env="TEMPORAL_ENABLED")
@@ -125,6 +135,9 @@ class Settings(BaseSettings):
     cleanup_interval: int = Field(default=3600, env="CLEANUP_INTERVAL", ge=60)
     cleanup_logs_max_count: int = Field(default=1000, env="CLEANUP_LOGS_MAX_COUNT", ge=100)
     cleanup_cache_max_age_hours: int = Field(default=24, env="CLEANUP_CACHE_MAX_AGE_HOURS", ge=1)
+    # Raw token/API usage metrics; summaries read hourly/daily rollups
+    cleanup_usage_raw_days: int = Field(default=30, env="CLEANUP_USAGE_RAW_DAYS", ge=1)
+    cleanup_usage_hourly_days: int = Field(default=90, env="CLEANUP_USAGE_HOURLY_DAYS", ge=1)
 
     # Feature Toggles
     ws_logging_enabled: bool = Field(default=True, env="WS_LOGGING_ENABLED")
@@ -1,18 +1,19 @@
 """Modern async database service with SQLModel and SQLAlchemy 2.0."""
 
-from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
 from sqlmodel import SQLModel, select
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import text, func
+from sqlalchemy import and_, delete, func, or_, text
 from contextlib import asynccontextmanager
 
 from core.config import Settings
 from models.database import (
     NodeParameter, Workflow, Execution, APIKey, APIKeyValidation, NodeOutput,
-    ConversationMessage, ToolSchema, UserSkill, ChatMessage, UserSettings,
+    ConversationMessage, ToolSchema, UserSkill, ChatMessage, UserSettings, DeploymentSettings,
     TokenUsageMetric, CompactionEvent, SessionTokenState, ProviderDefaults,
+    APIUsageMetric, TokenUsageRollup, APIUsageRollup,
     AgentTeam, TeamMember, TeamTask, AgentMessage, GoogleConnection,
     ProxyProviderConfig, ProxyRoutingRule
 )
@@ -21,6 +22,66 @@ from core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Usage rollups: every metric is added to its hourly and its daily bucket
+ROLLUP_GRANULARITIES = ("hour", "day")
+_ROLLUP_STEP = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+_TOKEN_ROLLUP_KEYS = ("granularity", "bucket_start", "provider", "model")
+_TOKEN_ROLLUP_SUMS = ("input_tokens", "output_tokens", "total_tokens", "input_cost",
+                      "output_cost", "cache_cost", "total_cost", "execution_count")
+_API_ROLLUP_KEYS = ("granularity", "bucket_start", "service", "operation")
+_API_ROLLUP_SUMS = ("resource_count", "cost", "execution_count")
+# Rows per multi-row upsert (stays under SQLite's bound parameter limit)
+_ROLLUP_CHUNK = 200
+
+
+def _as_utc(ts: datetime) -> datetime:
+    """Timestamps read back from SQLite are naive UTC."""
+    return ts.astimezone(timezone.utc) if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _bucket_start(ts: Optional[datetime], granularity: str) -> datetime:
+    ts = _as_utc(ts or datetime.now(timezone.utc)).replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if granularity == "day" else ts
+
+
+def _bucket_ceil(ts: datetime, granularity: str) -> datetime:
+    start = _bucket_start(ts, granularity)
+    return start if start == _as_utc(ts) else start + _ROLLUP_STEP[granularity]
+
+
+def _rollup_window(table, start: Optional[datetime], end: Optional[datetime],
+                   hourly_floor: Optional[datetime]):
+    """Condition selecting the rollup rows that sum up usage in [start, end).
+
+    Whole days come from daily rows and the partial days at either edge from
+    hourly rows, so the rows read grow with the number of days in the range,
+    not with the number of metrics. Edges older than the oldest hourly row
+    (pruned by retention) widen to whole days.
+    """
+    if start is None and end is None:
+        return table.granularity == "day"
+
+    s = _bucket_start(start, "hour") if start else None
+    e = _bucket_ceil(end, "hour") if end else None
+    if s is not None and (hourly_floor is None or s < hourly_floor):
+        s = _bucket_start(s, "day")
+    if e is not None and (hourly_floor is None or e < hourly_floor):
+        e = _bucket_ceil(e, "day")
+
+    d0 = _bucket_ceil(s, "day") if s else None
+    d1 = _bucket_start(e, "day") if e else None
+    if d0 is not None and d1 is not None and d0 >= d1:
+        return and_(table.granularity == "hour", table.bucket_start >= s, table.bucket_start < e)
+
+    parts = [and_(table.granularity == "day",
+                  *([table.bucket_start >= d0] if d0 else []),
+                  *([table.bucket_start < d1] if d1 else []))]
+    if s is not None and s < d0:
+        parts.append(and_(table.granularity == "hour", table.bucket_start >= s, table.bucket_start < d0))
+    if e is not None and d1 < e:
+        parts.append(and_(table.granularity == "hour", table.bucket_start >= d1, table.bucket_start < e))
+    return or_(*parts)
+
 
 class Database:
     """Async database service with SQLModel."""
@@ -29,6 +90,8 @@ class Database:
         self.settings = settings
         self.engine = None
         self.async_session = None
+        # Bumped on every save/delete so cached prepared parameters can detect changes
+        self._param_versions: Dict[str, int] = {}
 
     async def startup(self):
         """Initialize database connection and create tables."""
@@ -62,6 +125,7 @@ class Database:
 
             # Add missing columns to existing tables (simple migration)
             await self._migrate_user_settings()
+            await self._backfill_usage_rollups()
 
             logger.info("Database initialized successfully")
 
@@ -183,6 +247,17 @@ class Database:
                 ))
                 logger.info("Ensured api_usage_metrics table exists")
 
+                # Composite indexes for time-range usage queries (create_all
+                # only adds indexes when it creates the table)
+                await conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_token_usage_metrics_provider_model_created "
+                    "ON token_usage_metrics(provider, model, created_at)"
+                ))
+                await conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_api_usage_metrics_service_operation_timestamp "
+                    "ON api_usage_metrics(service, operation, timestamp)"
+                ))
+
                 # Migrate gmail_connections to google_connections
                 # Check if old table exists and new table doesn't
                 result = await conn.execute(text(
@@ -204,6 +279,53 @@ class Database:
         except Exception as e:
             logger.warning(f"Migration check failed (table may not exist yet): {e}")
 
+    async def _backfill_usage_rollups(self):
+        """Build usage rollups from raw metrics written before rollups existed.
+
+        Runs only while a rollup table is empty; afterwards rollups are kept
+        up to date as metrics are written.
+        """
+        try:
+            async with self.get_session() as session:
+                if not (await session.execute(select(func.count()).select_from(TokenUsageRollup))).scalar():
+                    result = await session.execute(text("""
+                        SELECT strftime('%Y-%m-%d %H:00:00', COALESCE(created_at, '1970-01-01')) AS hour,
+                               provider, model,
+                               SUM(input_tokens), SUM(output_tokens), SUM(total_tokens),
+                               SUM(input_cost), SUM(output_cost), SUM(cache_cost), SUM(total_cost),
+                               COUNT(*)
+                        FROM token_usage_metrics GROUP BY hour, provider, model
+                    """))
+                    totals: Dict[Tuple, Dict[str, float]] = {}
+                    for row in result.all():
+                        hour = datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S")
+                        self._add_to_rollup(totals, hour, (row[1] or "", row[2] or ""),
+                                            dict(zip(_TOKEN_ROLLUP_SUMS, row[3:])))
+                    await self._upsert_rollups(session, TokenUsageRollup, _TOKEN_ROLLUP_KEYS,
+                                               _TOKEN_ROLLUP_SUMS, totals)
+                    if totals:
+                        logger.info("Backfilled token usage rollups", buckets=len(totals))
+
+                if not (await session.execute(select(func.count()).select_from(APIUsageRollup))).scalar():
+                    result = await session.execute(text("""
+                        SELECT strftime('%Y-%m-%d %H:00:00', COALESCE(timestamp, '1970-01-01')) AS hour,
+                               service, operation, SUM(resource_count), SUM(cost), COUNT(*)
+                        FROM api_usage_metrics GROUP BY hour, service, operation
+                    """))
+                    totals = {}
+                    for row in result.all():
+                        hour = datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S")
+                        self._add_to_rollup(totals, hour, (row[1] or "", row[2] or ""),
+                                            dict(zip(_API_ROLLUP_SUMS, row[3:])))
+                    await self._upsert_rollups(session, APIUsageRollup, _API_ROLLUP_KEYS,
+                                               _API_ROLLUP_SUMS, totals)
+                    if totals:
+                        logger.info("Backfilled API usage rollups", buckets=len(totals))
+
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Usage rollup backfill failed: {e}")
+
     async def shutdown(self):
         """Close database connections."""
         if self.engine:
@@ -229,6 +351,15 @@ class Database:
     # Node Parameters
     # ============================================================================
 
+    def node_parameters_version(self, node_id: str) -> int:
+        """Change counter for a node's parameters (process-local)."""
+        return self._param_versions.get(node_id, 0)
+
+    def _bump_parameters_version(self, node_id: str) -> None:
+        # Called once the write is committed: a reader that loads the old
+        # row concurrently caches it under the previous version
+        self._param_versions[node_id] = self._param_versions.get(node_id, 0) + 1
+
     async def save_node_parameters(self, node_id: str, parameters: Dict[str, Any]) -> bool:
         """Save or update node parameters."""
         try:
@@ -248,7 +379,8 @@ class Database:
                     session.add(existing)
 
                 await session.commit()
-                return True
+            self._bump_parameters_version(node_id)
+            return True
 
         except Exception as e:
             logger.error("Failed to save node parameters", node_id=node_id, error=str(e))
@@ -279,8 +411,8 @@ class Database:
                 if parameter:
                     await session.delete(parameter)
                     await session.commit()
-
-                return True
+            self._bump_parameters_version(node_id)
+            return True
 
         except Exception as e:
             logger.error("Failed to delete node parameters", node_id=node_id, error=str(e))
@@ -313,7 +445,7 @@ class Database:
                     session.add(existing)
 
                 await session.commit()
-                return True
+            return True
 
         except Exception as e:
             logger.error("Failed to save workflow", workflow_id=workflow_id, error=str(e))
@@ -594,6 +726,44 @@ class Database:
             traceback.print_exc()
             return False
 
+    async def save_node_outputs(self, outputs: List[Tuple[str, str, str, Dict[str, Any]]]) -> bool:
+        """Save or update many node outputs in one session and one commit.
+
+        Args:
+            outputs: (node_id, session_id, output_name, data) tuples
+        """
+        if not outputs:
+            return True
+        try:
+            async with self.get_session() as session:
+                # One SELECT for every row that may already exist
+                stmt = select(NodeOutput).where(
+                    NodeOutput.node_id.in_({o[0] for o in outputs}),
+                    NodeOutput.session_id.in_({o[1] for o in outputs})
+                )
+                result = await session.execute(stmt)
+                existing = {(r.node_id, r.session_id, r.output_name): r for r in result.scalars().all()}
+
+                for node_id, session_id, output_name, data in outputs:
+                    row = existing.get((node_id, session_id, output_name))
+                    if row:
+                        row.data = data
+                    else:
+                        session.add(NodeOutput(
+                            node_id=node_id,
+                            session_id=session_id,
+                            output_name=output_name,
+                            data=data
+                        ))
+
+                await session.commit()
+                logger.debug("[DB] Node outputs saved", count=len(outputs))
+                return True
+
+        except Exception as e:
+            logger.error("Failed to save node outputs", count=len(outputs), error=str(e))
+            return False
+
     async def get_node_output(self, node_id: str, session_id: str = "default",
                               output_name: str = "output_0") -> Optional[Dict[str, Any]]:
         """Get node output data."""
@@ -1625,6 +1795,42 @@ class Database:
             logger.error("Failed to save user settings", user_id=user_id, error=str(e))
             return False
 
+    # ============================================================================
+    # Deployment Settings
+    # ============================================================================
+
+    async def get_deployment_settings(self, scope: str = "default") -> Optional[Dict[str, Any]]:
+        """Get stored deployment settings. Returns None if never saved."""
+        try:
+            async with self.get_session() as session:
+                stmt = select(DeploymentSettings).where(DeploymentSettings.scope == scope)
+                result = await session.execute(stmt)
+                record = result.scalar_one_or_none()
+                return dict(record.settings or {}) if record else None
+        except Exception as e:
+            logger.error("Failed to get deployment settings", scope=scope, error=str(e))
+            return None
+
+    async def save_deployment_settings(self, settings: Dict[str, Any], scope: str = "default") -> bool:
+        """Save or replace deployment settings."""
+        try:
+            async with self.get_session() as session:
+                stmt = select(DeploymentSettings).where(DeploymentSettings.scope == scope)
+                result = await session.execute(stmt)
+                existing = result.scalar_one_or_none()
+
+                if existing:
+                    existing.settings = dict(settings)
+                else:
+                    session.add(DeploymentSettings(scope=scope, settings=dict(settings)))
+
+                await session.commit()
+                return True
+
+        except Exception as e:
+            logger.error("Failed to save deployment settings", scope=scope, error=str(e))
+            return False
+
     # ============================================================================
     # Provider Defaults
     # ============================================================================
@@ -1696,38 +1902,138 @@ class Database:
     # Token Usage Metrics
     # ============================================================================
 
+    @staticmethod
+    def _token_metric_row(metric: Dict[str, Any]) -> TokenUsageMetric:
+        return TokenUsageMetric(
+            session_id=metric.get("session_id", "default"),
+            node_id=metric.get("node_id", ""),
+            workflow_id=metric.get("workflow_id"),
+            provider=metric.get("provider", ""),
+            model=metric.get("model", ""),
+            input_tokens=metric.get("input_tokens", 0),
+            output_tokens=metric.get("output_tokens", 0),
+            total_tokens=metric.get("total_tokens", 0),
+            cache_creation_tokens=metric.get("cache_creation_tokens", 0),
+            cache_read_tokens=metric.get("cache_read_tokens", 0),
+            reasoning_tokens=metric.get("reasoning_tokens", 0),
+            iteration=metric.get("iteration", 1),
+            execution_id=metric.get("execution_id"),
+            created_at=metric.get("created_at") or datetime.now(timezone.utc),
+            # Cost fields
+            input_cost=metric.get("input_cost", 0.0),
+            output_cost=metric.get("output_cost", 0.0),
+            cache_cost=metric.get("cache_cost", 0.0),
+            total_cost=metric.get("total_cost", 0.0)
+        )
+
+    @staticmethod
+    def _add_to_rollup(totals: Dict[Tuple, Dict[str, float]], ts: Optional[datetime],
+                       key: Tuple, sums: Dict[str, float]) -> None:
+        """Add ``sums`` to the hourly and daily buckets of ``ts`` in ``totals``."""
+        for granularity in ROLLUP_GRANULARITIES:
+            bucket = totals.setdefault((granularity, _bucket_start(ts, granularity), *key), {})
+            for field, value in sums.items():
+                bucket[field] = bucket.get(field, 0) + (value or 0)
+
+    @staticmethod
+    async def _upsert_rollups(session, model, keys: Tuple[str, ...], sums: Tuple[str, ...],
+                              totals: Dict[Tuple, Dict[str, float]]) -> None:
+        """Add bucket totals to the rollup table (insert or increment)."""
+        if not totals:
+            return
+        from sqlalchemy.dialects.sqlite import insert
+
+        table = model.__table__
+        values = [{**dict(zip(keys, key)), **bucket} for key, bucket in totals.items()]
+        for i in range(0, len(values), _ROLLUP_CHUNK):
+            stmt = insert(table).values(values[i:i + _ROLLUP_CHUNK])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(keys),
+                set_={field: table.c[field] + stmt.excluded[field] for field in sums},
+            )
+            await session.execute(stmt)
+
+    async def _add_token_rollups(self, session, rows: List[TokenUsageMetric]) -> None:
+        totals: Dict[Tuple, Dict[str, float]] = {}
+        for row in rows:
+            self._add_to_rollup(totals, row.created_at, (row.provider or "", row.model or ""), {
+                "input_tokens": row.input_tokens, "output_tokens": row.output_tokens,
+                "total_tokens": row.total_tokens, "input_cost": row.input_cost,
+                "output_cost": row.output_cost, "cache_cost": row.cache_cost,
+                "total_cost": row.total_cost, "execution_count": 1,
+            })
+        await self._upsert_rollups(session, TokenUsageRollup, _TOKEN_ROLLUP_KEYS, _TOKEN_ROLLUP_SUMS, totals)
+
+    async def _add_api_rollups(self, session, rows: List[APIUsageMetric]) -> None:
+        totals: Dict[Tuple, Dict[str, float]] = {}
+        for row in rows:
+            self._add_to_rollup(totals, row.timestamp, (row.service or "", row.operation or ""), {
+                "resource_count": row.resource_count, "cost": row.cost, "execution_count": 1,
+            })
+        await self._upsert_rollups(session, APIUsageRollup, _API_ROLLUP_KEYS, _API_ROLLUP_SUMS, totals)
+
+    async def _hourly_floor(self, session, model) -> Optional[datetime]:
+        """Oldest hourly bucket still stored (older ones were pruned)."""
+        result = await session.execute(
+            select(func.min(model.bucket_start)).where(model.granularity == "hour"))
+        floor = result.scalar()
+        return _as_utc(floor) if floor else None
+
     async def save_token_metric(self, metric: Dict[str, Any]) -> bool:
         """Save a token usage metric record."""
         try:
             async with self.get_session() as session:
-                entry = TokenUsageMetric(
-                    session_id=metric.get("session_id", "default"),
-                    node_id=metric.get("node_id", ""),
-                    workflow_id=metric.get("workflow_id"),
-                    provider=metric.get("provider", ""),
-                    model=metric.get("model", ""),
-                    input_tokens=metric.get("input_tokens", 0),
-                    output_tokens=metric.get("output_tokens", 0),
-                    total_tokens=metric.get("total_tokens", 0),
-                    cache_creation_tokens=metric.get("cache_creation_tokens", 0),
-                    cache_read_tokens=metric.get("cache_read_tokens", 0),
-                    reasoning_tokens=metric.get("reasoning_tokens", 0),
-                    iteration=metric.get("iteration", 1),
-                    execution_id=metric.get("execution_id"),
-                    created_at=datetime.now(timezone.utc),
-                    # Cost fields
-                    input_cost=metric.get("input_cost", 0.0),
-                    output_cost=metric.get("output_cost", 0.0),
-                    cache_cost=metric.get("cache_cost", 0.0),
-                    total_cost=metric.get("total_cost", 0.0)
-                )
-                session.add(entry)
+                row = self._token_metric_row(metric)
+                session.add(row)
+                await self._add_token_rollups(session, [row])
                 await session.commit()
                 return True
         except Exception as e:
             logger.error("Failed to save token metric", error=str(e))
             return False
 
+    async def save_token_usage(
+        self, metrics: List[Dict[str, Any]], states: Dict[str, Dict[str, Any]]
+    ) -> bool:
+        """Insert token metrics and upsert session token states in one commit.
+
+        Args:
+            metrics: Metric dicts as accepted by save_token_metric
+            states: session_id -> full session token state
+        """
+        if not metrics and not states:
+            return True
+        try:
+            async with self.get_session() as session:
+                rows = [self._token_metric_row(m) for m in metrics]
+                session.add_all(rows)
+                await self._add_token_rollups(session, rows)
+
+                if states:
+                    stmt = select(SessionTokenState).where(SessionTokenState.session_id.in_(states))
+                    result = await session.execute(stmt)
+                    existing = {r.session_id: r for r in result.scalars().all()}
+                    now = datetime.now(timezone.utc)
+                    for session_id, values in states.items():
+                        row = existing.get(session_id)
+                        if row is None:
+                            row = SessionTokenState(session_id=session_id)
+                            session.add(row)
+                        for key, value in values.items():
+                            if key in ("id", "session_id") or not hasattr(row, key):
+                                continue
+                            if key == "last_compaction_at" and isinstance(value, str):
+                                value = datetime.fromisoformat(value)
+                            setattr(row, key, value)
+                        row.updated_at = now
+
+                await session.commit()
+                logger.debug("[DB] Token usage saved", metrics=len(metrics), sessions=len(states))
+                return True
+        except Exception as e:
+            logger.error("Failed to save token usage", metrics=len(metrics), sessions=len(states), error=str(e))
+            return False
+
     async def get_session_token_metrics(
         self, session_id: str, limit: int = 100
     ) -> List[Dict[str, Any]]:
@@ -1765,9 +2071,14 @@ class Database:
             logger.error("Failed to get token metrics", session_id=session_id, error=str(e))
             return []
 
-    async def get_provider_usage_summary(self) -> List[Dict[str, Any]]:
+    async def get_provider_usage_summary(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
         """Get aggregated token usage and cost by provider.
 
+        Reads the hourly/daily rollups, optionally limited to [start, end)
+        at hour resolution (day resolution beyond the hourly retention).
+
         Returns a list of provider summaries with:
         - provider: Provider name (openai, anthropic, etc.)
         - total_input_tokens: Sum of input tokens
@@ -1781,24 +2092,27 @@ class Database:
         """
         try:
             async with self.get_session() as session:
-                from sqlalchemy import func
+                hourly_floor = None
+                if start is not None or end is not None:
+                    hourly_floor = await self._hourly_floor(session, TokenUsageRollup)
 
                 # First get per-model breakdown
                 model_stmt = (
                     select(
-                        TokenUsageMetric.provider,
-                        TokenUsageMetric.model,
-                        func.sum(TokenUsageMetric.input_tokens).label("input_tokens"),
-                        func.sum(TokenUsageMetric.output_tokens).label("output_tokens"),
-                        func.sum(TokenUsageMetric.total_tokens).label("total_tokens"),
-                        func.sum(TokenUsageMetric.input_cost).label("input_cost"),
-                        func.sum(TokenUsageMetric.output_cost).label("output_cost"),
-                        func.sum(TokenUsageMetric.cache_cost).label("cache_cost"),
-                        func.sum(TokenUsageMetric.total_cost).label("total_cost"),
-                        func.count().label("execution_count")
+                        TokenUsageRollup.provider,
+                        TokenUsageRollup.model,
+                        func.sum(TokenUsageRollup.input_tokens).label("input_tokens"),
+                        func.sum(TokenUsageRollup.output_tokens).label("output_tokens"),
+                        func.sum(TokenUsageRollup.total_tokens).label("total_tokens"),
+                        func.sum(TokenUsageRollup.input_cost).label("input_cost"),
+                        func.sum(TokenUsageRollup.output_cost).label("output_cost"),
+                        func.sum(TokenUsageRollup.cache_cost).label("cache_cost"),
+                        func.sum(TokenUsageRollup.total_cost).label("total_cost"),
+                        func.sum(TokenUsageRollup.execution_count).label("execution_count")
                     )
-                    .group_by(TokenUsageMetric.provider, TokenUsageMetric.model)
-                    .order_by(TokenUsageMetric.provider, TokenUsageMetric.model)
+                    .where(_rollup_window(TokenUsageRollup, start, end, hourly_floor))
+                    .group_by(TokenUsageRollup.provider, TokenUsageRollup.model)
+                    .order_by(TokenUsageRollup.provider, TokenUsageRollup.model)
                 )
                 result = await session.execute(model_stmt)
                 rows = result.all()
@@ -1867,8 +2181,6 @@ class Database:
             metric: Dict with session_id, node_id, service, operation, endpoint, resource_count, cost
         """
         try:
-            from models.database import APIUsageMetric
-
             async with self.get_session() as session:
                 entry = APIUsageMetric(
                     session_id=metric.get("session_id", "default"),
@@ -1881,17 +2193,24 @@ class Database:
                     cost=metric.get("cost", 0.0)
                 )
                 session.add(entry)
+                await self._add_api_rollups(session, [entry])
                 await session.commit()
                 return True
         except Exception as e:
             logger.error("Failed to save API usage metric", error=str(e))
             return False
 
-    async def get_api_usage_summary(self, service: str = None) -> List[Dict[str, Any]]:
+    async def get_api_usage_summary(
+        self, service: str = None, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
         """Get aggregated API usage and cost by service.
 
+        Reads the hourly/daily rollups like get_provider_usage_summary.
+
         Args:
             service: Optional service name to filter (e.g., 'twitter')
+            start: Optional inclusive range start
+            end: Optional exclusive range end
 
         Returns a list of service summaries with:
         - service: Service name (twitter, google_maps, etc.)
@@ -1901,23 +2220,26 @@ class Database:
         - operations: Breakdown by operation (list of dicts)
         """
         try:
-            from models.database import APIUsageMetric
-            from sqlalchemy import func
-
             async with self.get_session() as session:
+                hourly_floor = None
+                if start is not None or end is not None:
+                    hourly_floor = await self._hourly_floor(session, APIUsageRollup)
+
                 # Build query with optional service filter
                 query = select(
-                    APIUsageMetric.service,
-                    APIUsageMetric.operation,
-                    func.sum(APIUsageMetric.resource_count).label("resource_count"),
-                    func.sum(APIUsageMetric.cost).label("cost"),
-                    func.count().label("execution_count")
-                ).group_by(APIUsageMetric.service, APIUsageMetric.operation)
+                    APIUsageRollup.service,
+                    APIUsageRollup.operation,
+                    func.sum(APIUsageRollup.resource_count).label("resource_count"),
+                    func.sum(APIUsageRollup.cost).label("cost"),
+                    func.sum(APIUsageRollup.execution_count).label("execution_count")
+                ).where(
+                    _rollup_window(APIUsageRollup, start, end, hourly_floor)
+                ).group_by(APIUsageRollup.service, APIUsageRollup.operation)
 
                 if service:
-                    query = query.where(APIUsageMetric.service == service)
+                    query = query.where(APIUsageRollup.service == service)
 
-                query = query.order_by(APIUsageMetric.service, APIUsageMetric.operation)
+                query = query.order_by(APIUsageRollup.service, APIUsageRollup.operation)
                 result = await session.execute(query)
                 rows = result.all()
 
@@ -1956,6 +2278,35 @@ class Database:
             logger.error("Failed to get API usage summary", error=str(e))
             return []
 
+    async def prune_usage_history(self, raw_days: int = 30, hourly_days: int = 90) -> Dict[str, int]:
+        """Delete raw usage metrics and hourly rollups past their retention.
+
+        Raw rows are already counted in the rollups, so summaries do not
+        change; daily rollups are kept indefinitely. Returns rows deleted.
+        """
+        now = datetime.now(timezone.utc)
+        raw_cutoff = now - timedelta(days=raw_days)
+        hourly_cutoff = _bucket_start(now - timedelta(days=hourly_days), "day")
+        deleted = {}
+        try:
+            async with self.get_session() as session:
+                for name, stmt in (
+                    ("token_metrics", delete(TokenUsageMetric).where(TokenUsageMetric.created_at < raw_cutoff)),
+                    ("api_metrics", delete(APIUsageMetric).where(APIUsageMetric.timestamp < raw_cutoff)),
+                    ("token_hourly", delete(TokenUsageRollup).where(
+                        TokenUsageRollup.granularity == "hour", TokenUsageRollup.bucket_start < hourly_cutoff)),
+                    ("api_hourly", delete(APIUsageRollup).where(
+                        APIUsageRollup.granularity == "hour", APIUsageRollup.bucket_start < hourly_cutoff)),
+                ):
+                    deleted[name] = (await session.execute(stmt)).rowcount or 0
+                await session.commit()
+        except Exception as e:
+            logger.error("Failed to prune usage history", error=str(e))
+            return {}
+        if any(deleted.values()):
+            logger.info("Pruned usage history", **deleted)
+        return deleted
+
     # ============================================================================
     # Session Token State
     # ============================================================================
@@ -2015,7 +2366,10 @@ class Database:
                     "last_compaction_at": state.last_compaction_at.isoformat() if state.last_compaction_at else None,
                     "compaction_count": state.compaction_count,
                     "custom_threshold": state.custom_threshold,
-                    "compaction_enabled": state.compaction_enabled
+                    "compaction_enabled": state.compaction_enabled,
+                    "cumulative_input_cost": state.cumulative_input_cost,
+                    "cumulative_output_cost": state.cumulative_output_cost,
+                    "cumulative_total_cost": state.cumulative_total_cost
                 }
         except Exception as e:
             logger.error("Failed to get session token state", error=str(e))
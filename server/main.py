@@ -39,7 +39,7 @@ _startup_log("Importing settings + logging...")
 from core.config import Settings
 from core.logging import configure_logging, get_logger, setup_websocket_logging, shutdown_websocket_logging
 _startup_log("Importing routers...")
-from routers import workflow, database, maps, nodejs_compat, android, websocket, webhook, auth, twitter, google
+from routers import workflow, database, maps, nodejs_compat, android, websocket, webhook, auth, twitter, google, embeddings
 _startup_log("All imports complete")
 
 # Initialize settings and logging
@@ -150,6 +150,10 @@ async def lifespan(app: FastAPI):
     logger.info("Compaction service initialized")
     _startup_log("Compaction service ready")
 
+    # Process-wide embedding model pool (embeddingGenerator, long-term memory)
+    from services.embeddings import init_embedding_service
+    init_embedding_service(settings)
+
     # Initialize model registry service
     from services.model_registry import get_model_registry
     model_registry = get_model_registry()
@@ -322,6 +326,22 @@ async def lifespan(app: FastAPI):
     from services.process_service import shutdown_process_service
     await shutdown_process_service()
 
+    # Stop documentParser worker processes
+    from services.document_parsing import shutdown_parse_pool
+    await asyncio.to_thread(shutdown_parse_pool)
+
+    # Finish embedding micro-batches still queued or running
+    from services.embeddings import close_embedding_service
+    await close_embedding_service()
+
+    # Close pooled scraper/downloader HTTP clients
+    from services.http_pool import close_http_clients
+    await close_http_clients()
+
+    # Close cached vector DB clients
+    from services.vector_stores import close_vector_stores
+    await asyncio.to_thread(close_vector_stores)
+
     # Stop cleanup service
     if cleanup_service is not None:
         await cleanup_service.stop()
@@ -332,6 +352,9 @@ async def lifespan(app: FastAPI):
         logger.info("Execution recovery sweeper stopped")
 
     shutdown_scheduler()  # Stop APScheduler
+    # Commit buffered node outputs and token usage before the database closes
+    await container.workflow_service().flush_node_outputs()
+    await container.compaction_service().close()
     await container.cache().shutdown()
     await container.database().shutdown()
     logger.info("Services shutdown complete")
@@ -397,6 +420,7 @@ app.include_router(websocket.router)
 app.include_router(webhook.router)
 app.include_router(twitter.router)  # Twitter/X OAuth routes
 app.include_router(google.router)  # Google Workspace OAuth routes (Gmail, Calendar, Drive, Sheets, Tasks, Contacts)
+app.include_router(embeddings.router)  # Embedding pool stats
 
 
 @app.get("/health")
@@ -404,6 +428,7 @@ async def health_check():
     """Detailed health check with resource monitoring."""
     from services import event_waiter
     from services.execution import get_recovery_sweeper
+    from services.status_broadcaster import get_status_broadcaster
     from core.health import get_health_status
 
     sweeper = get_recovery_sweeper()
@@ -445,6 +470,7 @@ async def health_check():
         "features": health["features"],
         "redis_enabled": settings.redis_enabled,
         "event_waiter_mode": event_waiter.get_backend_mode(),
+        "event_ingress": get_status_broadcaster().get_event_stats(),
         "execution_engine": {
             "enabled": settings.redis_enabled,
             "recovery_sweeper": sweeper is not None and sweeper._running,
@@ -3,7 +3,7 @@
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from sqlmodel import SQLModel, Field, Column, DateTime, JSON
-from sqlalchemy import func
+from sqlalchemy import Index, UniqueConstraint, func
 
 
 class NodeParameter(SQLModel, table=True):
@@ -297,6 +297,24 @@ class ProviderDefaults(SQLModel, table=True):
     )
 
 
+class DeploymentSettings(SQLModel, table=True):
+    """Deployment settings (run queue, event buffers, executor options).
+
+    One row per scope; the deployment manager reads the "default" row on
+    each deploy.
+    """
+
+    __tablename__ = "deployment_settings"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    scope: str = Field(default="default", unique=True, index=True, max_length=255)
+    settings: Dict[str, Any] = Field(sa_column=Column(JSON))
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), onupdate=func.now())
+    )
+
+
 # =============================================================================
 # Token Tracking and Memory Compaction
 # =============================================================================
@@ -306,6 +324,9 @@ class TokenUsageMetric(SQLModel, table=True):
     """Token usage per agent execution."""
 
     __tablename__ = "token_usage_metrics"
+    __table_args__ = (
+        Index("ix_token_usage_metrics_provider_model_created", "provider", "model", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     session_id: str = Field(index=True, max_length=255)
@@ -379,6 +400,9 @@ class APIUsageMetric(SQLModel, table=True):
     """API service usage for cost tracking (Twitter, Google Maps, etc.)."""
 
     __tablename__ = "api_usage_metrics"
+    __table_args__ = (
+        Index("ix_api_usage_metrics_service_operation_timestamp", "service", "operation", "timestamp"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     timestamp: datetime = Field(
@@ -401,6 +425,53 @@ class APIUsageMetric(SQLModel, table=True):
     cost: float = Field(default=0.0)
 
 
+class TokenUsageRollup(SQLModel, table=True):
+    """Token usage and cost per provider/model, summed per hour or day.
+
+    Maintained as TokenUsageMetric rows are written; usage summaries read
+    these instead of scanning the raw metrics.
+    """
+
+    __tablename__ = "token_usage_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket_start", "provider", "model",
+                         name="uq_token_usage_rollups_bucket"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    granularity: str = Field(max_length=8)  # hour, day
+    bucket_start: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    provider: str = Field(max_length=50)
+    model: str = Field(max_length=100)
+    input_tokens: int = Field(default=0)
+    output_tokens: int = Field(default=0)
+    total_tokens: int = Field(default=0)
+    input_cost: float = Field(default=0.0)
+    output_cost: float = Field(default=0.0)
+    cache_cost: float = Field(default=0.0)
+    total_cost: float = Field(default=0.0)
+    execution_count: int = Field(default=0)
+
+
+class APIUsageRollup(SQLModel, table=True):
+    """API usage and cost per service/operation, summed per hour or day."""
+
+    __tablename__ = "api_usage_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket_start", "service", "operation",
+                         name="uq_api_usage_rollups_bucket"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    granularity: str = Field(max_length=8)  # hour, day
+    bucket_start: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    service: str = Field(max_length=50)
+    operation: str = Field(max_length=100)
+    resource_count: int = Field(default=0)
+    cost: float = Field(default=0.0)
+    execution_count: int = Field(default=0)
+
+
 # =============================================================================
 # Agent Teams - Claude SDK Agent Teams Pattern
 # =============================================================================
@@ -0,0 +1,13 @@
+"""Embedding service routes."""
+
+from fastapi import APIRouter
+
+from services.embeddings import get_embedding_service
+
+router = APIRouter(prefix="/api/embeddings", tags=["embeddings"])
+
+
+@router.get("/stats")
+async def embedding_stats():
+    """Model pool, throughput (embeddings/sec) and vector cache hit rate."""
+    return {"success": True, "stats": get_embedding_service().stats()}
@@ -13,6 +13,7 @@ Handles WebSocket connections from frontend clients for ALL operations:
 import time
 import asyncio
 import weakref
+from collections import OrderedDict
 from typing import Dict, Any, Callable, Awaitable, Optional, Set
 from datetime import datetime
 
@@ -108,6 +109,41 @@ async def handle_get_node_status(data: Dict[str, Any], websocket: WebSocket) ->
     return {"type": "error", "message": "node_id required"}
 
 
+async def handle_subscribe(data: Dict[str, Any], websocket: WebSocket) -> Dict[str, Any]:
+    """Subscribe this connection to workflow ids and topics.
+
+    Omitted fields mean "all". Updates sent before subscribing were filtered,
+    so the reply carries a node snapshot per subscribed workflow. ``since``
+    maps workflow_id -> last version the client saw; those workflows get
+    only the changes after it, unless ``epoch`` (the node status table's,
+    from ``initial_status``) is stale.
+    """
+    broadcaster = get_status_broadcaster()
+    workflow_ids = data.get("workflow_ids")
+    topics = data.get("topics")
+    since = data.get("since") or {}
+    epoch = data.get("epoch")
+    if not broadcaster.subscribe(websocket, workflow_ids=workflow_ids, topics=topics):
+        return {"success": False, "error": "Not connected to status broadcasts"}
+    return {
+        "success": True,
+        "workflow_ids": workflow_ids,
+        "topics": topics,
+        "snapshots": [
+            broadcaster.get_node_snapshot(workflow_id, since.get(workflow_id), epoch)
+            for workflow_id in workflow_ids or []
+        ],
+    }
+
+
+async def handle_get_node_snapshot(data: Dict[str, Any], websocket: WebSocket) -> Dict[str, Any]:
+    """Node statuses of one workflow, or only the changes after version ``since``."""
+    broadcaster = get_status_broadcaster()
+    snapshot = broadcaster.get_node_snapshot(data.get("workflow_id"), data.get("since"),
+                                             data.get("epoch"))
+    return {"success": True, **snapshot}
+
+
 async def handle_get_variable(data: Dict[str, Any], websocket: WebSocket) -> Dict[str, Any]:
     """Get variable value."""
     broadcaster = get_status_broadcaster()
@@ -253,6 +289,8 @@ async def handle_execute_node(data: Dict[str, Any], websocket: WebSocket) -> Dic
         session_id=data.get("session_id", "default"),
         workflow_id=workflow_id,
         outputs=data.get("outputs", {}),  # Upstream node outputs for data flow
+        # Cross-run memo for deployed runs executing through Temporal
+        memo=workflow_service.node_memo(node_type) if data.get("memoize") else None,
     )
 
     if result.get("success"):
@@ -522,12 +560,8 @@ async def handle_clear_node_output(data: Dict[str, Any], websocket: WebSocket) -
     broadcaster = get_status_broadcaster()
     node_id = data["node_id"]
 
-    # Clear from memory - find keys ending with _{node_id}
-    memory_cleared = 0
-    keys_to_delete = [key for key in workflow_service.node_outputs.keys() if key.endswith(f"_{node_id}")]
-    for key in keys_to_delete:
-        del workflow_service.node_outputs[key]
-        memory_cleared += 1
+    # Clear from memory (every session holding an output of this node)
+    memory_cleared = workflow_service.discard_node_outputs(node_id)
 
     # Clear from database (persisted storage)
     db_cleared = await database.delete_node_output(node_id)
@@ -551,6 +585,7 @@ async def handle_execute_workflow(data: Dict[str, Any], websocket: WebSocket) ->
         nodes: List of workflow nodes with {id, type, data}
         edges: List of edges with {id, source, target}
         session_id: Optional session identifier
+        memoize: Optional, reuse deterministic node results across runs
 
     Returns:
         Workflow execution result with all node outputs
@@ -585,6 +620,7 @@ async def handle_execute_workflow(data: Dict[str, Any], websocket: WebSocket) ->
         session_id=session_id,
         status_callback=status_callback,
         workflow_id=workflow_id,
+        memoize=data.get("memoize"),
     )
 
     # Broadcast workflow completed status
@@ -604,6 +640,7 @@ async def handle_execute_workflow(data: Dict[str, Any], websocket: WebSocket) ->
         "total_nodes": result.get("total_nodes", 0),
         "completed_nodes": result.get("completed_nodes", 0),
         "execution_time": result.get("execution_time", 0),
+        "memo": result.get("memo"),
         "timestamp": time.time()
     }
 
@@ -905,20 +942,27 @@ async def handle_update_deployment_settings(data: Dict[str, Any], websocket: Web
 
     Expects any of:
         delay_between_runs: float - Seconds to wait between iterations
-        stop_on_error: bool - Stop deployment when a node fails
         max_iterations: int - Max iterations (0 = unlimited)
+        and the keys of DEFAULT_DEPLOYMENT_SETTINGS (stop_on_error,
+        max_concurrent_runs, use_parallel_executor, memoize_nodes,
+        run_queue_depth, run_queue_overflow, event_buffer_size,
+        event_buffer_overflow, ordered_runs). Deployments pick them up on
+        their next deploy.
 
     Returns:
         Updated settings and current deployment state
     """
+    from services.deployment import validate_deployment_settings
+
     workflow_service = container.workflow_service()
     broadcaster = get_status_broadcaster()
 
-    settings_to_update = {}
+    try:
+        settings_to_update = validate_deployment_settings(data)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
     if "delay_between_runs" in data:
         settings_to_update["delay_between_runs"] = data["delay_between_runs"]
-    if "stop_on_error" in data:
-        settings_to_update["stop_on_error"] = data["stop_on_error"]
     if "max_iterations" in data:
         settings_to_update["max_iterations"] = data["max_iterations"]
 
@@ -2656,6 +2700,13 @@ async def handle_save_user_settings(data: Dict[str, Any], websocket: WebSocket)
             from services.process_service import get_process_service
             get_process_service().max_processes = int(settings_data["max_processes"])
 
+        # Compaction thresholds read the ratio from a cached copy
+        if "compaction_ratio" in settings_data:
+            from services.compaction import get_compaction_service
+            svc = get_compaction_service()
+            if svc:
+                svc.reset_compaction_ratio()
+
         # Fetch the saved settings to return
         settings = await database.get_user_settings(user_id)
         return {"settings": settings}
@@ -2828,12 +2879,17 @@ async def handle_get_node_allowlist(data: Dict[str, Any], websocket: WebSocket)
     return get_node_allowlist_service().get_config()
 
 
+def _usage_range(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Optional ISO-8601 ``start``/``end`` of a usage summary request."""
+    return {key: datetime.fromisoformat(data[key]) if data.get(key) else None for key in ("start", "end")}
+
+
 @ws_handler()
 async def handle_get_api_usage_summary(data: Dict[str, Any], websocket: WebSocket) -> Dict[str, Any]:
-    """Get aggregated API usage and cost by service (Twitter, etc.)."""
+    """Get aggregated API usage and cost by service (Twitter, etc.), optionally within start/end."""
     database = container.database()
     service = data.get('service')  # Optional filter by service
-    services = await database.get_api_usage_summary(service)
+    services = await database.get_api_usage_summary(service, **_usage_range(data))
     return {"success": True, "services": services}
 
 
@@ -2871,9 +2927,14 @@ async def handle_configure_compaction(data: Dict[str, Any], websocket: WebSocket
 
 @ws_handler()
 async def handle_get_provider_usage_summary(data: Dict[str, Any], websocket: WebSocket) -> Dict[str, Any]:
-    """Get aggregated token usage and cost by provider for Credentials Modal."""
+    """Get aggregated token usage and cost by provider for Credentials Modal, optionally within start/end."""
     database = container.database()
-    providers = await database.get_provider_usage_summary()
+    # Include token metrics still queued for the next batch write
+    from services.compaction import get_compaction_service
+    svc = get_compaction_service()
+    if svc:
+        await svc.flush_usage()
+    providers = await database.get_provider_usage_summary(**_usage_range(data))
     return {"success": True, "providers": providers}
 
 
@@ -3052,6 +3113,8 @@ MESSAGE_HANDLERS: Dict[str, MessageHandler] = {
     "get_android_status": handle_get_android_status,
     "get_node_status": handle_get_node_status,
     "get_variable": handle_get_variable,
+    "subscribe": handle_subscribe,
+    "get_node_snapshot": handle_get_node_snapshot,
 
     # Node parameters
     "get_node_parameters": handle_get_node_parameters,
@@ -3407,6 +3470,10 @@ async def websocket_status_endpoint(websocket: WebSocket):
         await broadcaster.disconnect(websocket)
 
 
+# Graphs kept per internal connection; must match ws_client.GRAPH_CACHE_SIZE
+INTERNAL_GRAPH_CACHE_SIZE = 256
+
+
 @router.websocket("/ws/internal")
 async def websocket_internal_endpoint(websocket: WebSocket):
     """Internal WebSocket endpoint for Temporal workers.
@@ -3414,6 +3481,11 @@ async def websocket_internal_endpoint(websocket: WebSocket):
     This endpoint bypasses authentication and is intended for internal
     service-to-service communication (e.g., Temporal activity -> MachinaOs).
 
+    The connection is multiplexed: a worker keeps one open and matches
+    responses to requests by request_id. ``register_graph`` stores a workflow
+    graph for this connection; later messages pass its ``graph_id`` instead
+    of ``nodes``/``edges``.
+
     Security: Should only be exposed on localhost/internal network.
     """
     get_status_broadcaster()
@@ -3427,6 +3499,9 @@ async def websocket_internal_endpoint(websocket: WebSocket):
     # Track handler tasks for this WebSocket
     handler_tasks: Set[asyncio.Task] = set()
 
+    # Workflow graphs registered by this worker, referenced by graph_id
+    graphs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
     async def receive_loop():
         """Receives messages and puts them in queue."""
         try:
@@ -3454,6 +3529,34 @@ async def websocket_internal_endpoint(websocket: WebSocket):
             msg_type = data.get("type", "")
             request_id = data.get("request_id")
 
+            if msg_type == "register_graph":
+                graphs[data["graph_id"]] = {"nodes": data.get("nodes", []), "edges": data.get("edges", [])}
+                graphs.move_to_end(data["graph_id"])
+                while len(graphs) > INTERNAL_GRAPH_CACHE_SIZE:
+                    graphs.popitem(last=False)
+                await _safe_send(websocket, {
+                    "type": "register_graph_result",
+                    "request_id": request_id,
+                    "success": True,
+                    "graph_id": data["graph_id"],
+                })
+                continue
+
+            graph_id = data.get("graph_id")
+            if graph_id:
+                graph = graphs.get(graph_id)
+                if graph is None:
+                    await _safe_send(websocket, {
+                        "type": f"{msg_type}_result",
+                        "request_id": request_id,
+                        "success": False,
+                        "code": "UNKNOWN_GRAPH",
+                        "error": f"Unknown graph: {graph_id}",
+                    })
+                    continue
+                graphs.move_to_end(graph_id)
+                data = {**data, **graph}
+
             handler = MESSAGE_HANDLERS.get(msg_type)
 
             if handler:
@@ -3503,6 +3606,8 @@ async def websocket_info():
     return {
         "endpoint": "/ws/status",
         "connected_clients": broadcaster.connection_count,
+        "broadcast": broadcaster.get_broadcast_stats(),
+        "node_statuses": broadcaster.get_node_table_stats(),
         "current_status": broadcaster.get_status(),
         "supported_message_types": list(MESSAGE_HANDLERS.keys())
     }
@@ -35,6 +35,18 @@ logger = logging.getLogger(__name__)
 
 WHATSAPP_RPC_URL = os.getenv("WHATSAPP_RPC_URL", "ws://localhost:9400/ws/rpc")
 
+# RPC events published as custom events (UI broadcast + trigger nodes)
+CUSTOM_EVENTS = {
+    "event.message_sent": "whatsapp_message_sent",
+    # includes newsletter messages with newsletter_meta field
+    "event.message_received": "whatsapp_message_received",
+    "event.newsletter_join": "whatsapp_newsletter_join",
+    "event.newsletter_leave": "whatsapp_newsletter_leave",
+    "event.newsletter_mute_change": "whatsapp_newsletter_mute_change",
+    "event.newsletter_live_update": "whatsapp_newsletter_live_update",
+    "event.history_sync_complete": "whatsapp_history_sync_complete",
+}
+
 
 def extract_phone_from_jid(jid: str | None) -> str | None:
     """Extract phone number from WhatsApp JID.
@@ -59,11 +71,21 @@ def extract_phone_from_jid(jid: str | None) -> str | None:
 
 # Inline RPC Client with async event handling
 class RPCClient:
+    """JSON-RPC client for the Go service.
+
+    The receive loop only resolves responses and hands events off: custom
+    events are published to the broadcaster's event bus at once, status
+    events and the custom handler run on a separate event task, so RPC
+    responses never wait behind event handling.
+    """
+
     def __init__(self, url: str):
         self.url, self.ws, self.req_id = url, None, 0
         self.pending: dict[int, asyncio.Future] = {}
         self._connected, self._task = False, None
         self._event_handler = None
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._event_task: Optional[asyncio.Task] = None
 
     @property
     def connected(self):
@@ -92,22 +114,26 @@ class RPCClient:
         self._connected = True
         logger.info("[WhatsApp RPC] WebSocket connected, starting receive loop")
         self._task = asyncio.create_task(self._recv())
+        self._event_task = asyncio.create_task(self._process_events())
 
     async def close(self):
         self._connected = False
         if self._task: self._task.cancel()
+        if self._event_task: self._event_task.cancel()
         if self.ws: await self.ws.close()
 
     async def _recv(self):
         try:
             logger.info("[WhatsApp RPC] Receive loop started")
             async for msg in self.ws:
+                received_at = time.perf_counter()
                 data = json.loads(msg)
                 logger.debug(f"[WhatsApp RPC] Received: {data.get('method', data.get('id', 'unknown'))}")
                 if data.get("id") in self.pending:
                     self.pending[data["id"]].set_result(data)
                 elif "method" in data and "id" not in data:
-                    await self._handle_event(data)
+                    self._publish_event(data, received_at)
+                    self._events.put_nowait(data)
         except ConnectionClosed as e:
             logger.warning(f"[WhatsApp RPC] Connection closed: {e}")
             self._connected = False
@@ -115,6 +141,23 @@ class RPCClient:
             logger.error(f"[WhatsApp RPC] Receive loop error: {e}")
             self._connected = False
 
+    def _publish_event(self, data: dict, received_at: float):
+        """Publish a custom event to triggers and the frontend, without waiting."""
+        event_type = CUSTOM_EVENTS.get(data.get("method", ""))
+        if event_type is None:
+            return
+        try:
+            from services.status_broadcaster import get_status_broadcaster
+            get_status_broadcaster().publish_event(event_type, data.get("params", {}), received_at)
+        except Exception as e:
+            logger.error(f"[WhatsApp RPC] Event publish error: {e}")
+
+    async def _process_events(self):
+        """Handle events in arrival order, off the receive loop."""
+        while True:
+            data = await self._events.get()
+            await self._handle_event(data)
+
     async def _handle_event(self, data: dict):
         """Handle async events from Go service and broadcast to frontend.
 
@@ -127,6 +170,8 @@ class RPCClient:
         - event.qr_code: {code: string, filename: string}
         - event.message_sent: {message_id, to, type, timestamp}
         - event.message_received: {message_id, sender, chat_id, ...}
+
+        Events in CUSTOM_EVENTS were already published by the receive loop.
         """
         method = data.get("method", "")
         params = data.get("params", {})
@@ -218,30 +263,6 @@ class RPCClient:
                     qr=qr_image
                 )
 
-            elif method == "event.message_sent":
-                # Message sent - broadcast as custom event
-                await broadcaster.send_custom_event("whatsapp_message_sent", params)
-
-            elif method == "event.message_received":
-                # Message received - broadcast as custom event for trigger nodes
-                # (includes newsletter messages with newsletter_meta field)
-                await broadcaster.send_custom_event("whatsapp_message_received", params)
-
-            elif method == "event.newsletter_join":
-                await broadcaster.send_custom_event("whatsapp_newsletter_join", params)
-
-            elif method == "event.newsletter_leave":
-                await broadcaster.send_custom_event("whatsapp_newsletter_leave", params)
-
-            elif method == "event.newsletter_mute_change":
-                await broadcaster.send_custom_event("whatsapp_newsletter_mute_change", params)
-
-            elif method == "event.newsletter_live_update":
-                await broadcaster.send_custom_event("whatsapp_newsletter_live_update", params)
-
-            elif method == "event.history_sync_complete":
-                await broadcaster.send_custom_event("whatsapp_history_sync_complete", params)
-
             # Forward to custom handler if set
             if self._event_handler:
                 await self._event_handler(method, params)
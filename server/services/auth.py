@@ -38,6 +38,8 @@ class AuthService:
         self._models_cache: Dict[str, List[str]] = {}
         # Memory-only cache for OAuth tokens
         self._oauth_cache: Dict[str, Dict[str, Any]] = {}
+        # Bumped when API keys/models change (invalidates deployment parameter snapshots)
+        self.credentials_version = 0
 
     def hash_api_key(self, api_key: str) -> str:
         """Create hash for API key identification."""
@@ -77,6 +79,8 @@ class AuthService:
             # Cache decrypted key in memory only (for quick access)
             self._memory_cache[cache_key] = api_key
             self._models_cache[cache_key] = models
+            # After the write, so a snapshot built from the old key is invalidated
+            self.credentials_version += 1
 
             logger.info(f"Stored and cached API key for {provider}")
             return True
@@ -165,6 +169,7 @@ class AuthService:
 
             # Remove from encrypted database
             await self.credentials_db.delete_api_key(provider, session_id)
+            self.credentials_version += 1
 
             logger.info(f"Removed API key for {provider}")
             return True
@@ -195,6 +200,7 @@ class AuthService:
         self._memory_cache.clear()
         self._models_cache.clear()
         self._oauth_cache.clear()
+        self.credentials_version += 1
         logger.debug("Cleared all credential memory caches")
 
     # --- OAuth Token Methods ---
@@ -6,6 +6,10 @@ Others: Client-side summarization fallback
 
 Threshold strategy: per-session custom_threshold > model-aware threshold > global default.
 Model-aware threshold = 50% of model's context window (e.g., 100K for a 200K model).
+
+Session token state lives in a TokenUsageAccumulator: tracking an LLM call
+updates it in memory and queues the metric row; both reach the database in
+batches (see services/token_usage.py).
 """
 
 from pydantic import BaseModel
@@ -14,6 +18,7 @@ from typing import Dict, Any, Optional, TYPE_CHECKING
 
 from core.logging import get_logger
 from services.pricing import get_pricing_service
+from services.token_usage import TokenUsageAccumulator
 
 if TYPE_CHECKING:
     from core.database import Database
@@ -71,13 +76,24 @@ class CompactionService:
             threshold=settings.compaction_threshold
         )
         self._ai_service = None
+        self._usage = TokenUsageAccumulator(database)
+        self._compaction_ratio: Optional[float] = None
 
     def set_ai_service(self, ai_service) -> None:
         """Wire AI service for generating compaction summaries."""
         self._ai_service = ai_service
 
     async def _get_compaction_ratio(self) -> float:
-        """Get compaction ratio from user settings, falling back to default."""
+        """Get compaction ratio from user settings, falling back to default.
+
+        Read once and cached; reset_compaction_ratio() drops the cached value
+        when the user settings change.
+        """
+        if self._compaction_ratio is None:
+            self._compaction_ratio = await self._load_compaction_ratio()
+        return self._compaction_ratio
+
+    async def _load_compaction_ratio(self) -> float:
         try:
             settings = await self._db.get_user_settings("default")
             if settings and "compaction_ratio" in settings:
@@ -88,6 +104,10 @@ class CompactionService:
             pass
         return DEFAULT_CONTEXT_THRESHOLD_RATIO
 
+    def reset_compaction_ratio(self) -> None:
+        """Re-read the compaction ratio from user settings on next use."""
+        self._compaction_ratio = None
+
     def get_model_threshold(self, model: str, provider: str, ratio: float = DEFAULT_CONTEXT_THRESHOLD_RATIO) -> int:
         """Compute compaction threshold based on model's context window.
 
@@ -148,9 +168,8 @@ class CompactionService:
             reasoning_tokens=usage.get("reasoning_tokens", 0)
         )
 
-        # Save token metric with cost fields
-        await self._db.save_token_metric({
-            "session_id": session_id,
+        # Queue the metric and update cumulative state in memory (written behind)
+        state = await self._usage.add(session_id, {
             "node_id": node_id,
             "provider": provider,
             "model": model,
@@ -159,21 +178,16 @@ class CompactionService:
             "output_cost": cost["output_cost"],
             "cache_cost": cost["cache_cost"],
             "total_cost": cost["total_cost"]
+        }, {
+            "cumulative_input_tokens": usage.get("input_tokens", 0),
+            "cumulative_output_tokens": usage.get("output_tokens", 0),
+            "cumulative_total": usage.get("total_tokens", 0),
+            "cumulative_input_cost": cost["input_cost"],
+            "cumulative_output_cost": cost["output_cost"],
+            "cumulative_total_cost": cost["total_cost"]
         })
-
-        state = await self._db.get_or_create_session_token_state(session_id)
-        new_total = state["cumulative_total"] + usage.get("total_tokens", 0)
-        new_total_cost = state.get("cumulative_total_cost", 0.0) + cost["total_cost"]
-
-        # Update cumulative state with cost
-        await self._db.update_session_token_state(session_id, {
-            "cumulative_input_tokens": state["cumulative_input_tokens"] + usage.get("input_tokens", 0),
-            "cumulative_output_tokens": state["cumulative_output_tokens"] + usage.get("output_tokens", 0),
-            "cumulative_total": new_total,
-            "cumulative_input_cost": state.get("cumulative_input_cost", 0.0) + cost["input_cost"],
-            "cumulative_output_cost": state.get("cumulative_output_cost", 0.0) + cost["output_cost"],
-            "cumulative_total_cost": new_total_cost
-        })
+        new_total = state["cumulative_total"]
+        new_total_cost = state["cumulative_total_cost"]
 
         # Priority: per-session custom > model-aware (with user ratio) > global default
         custom = state.get("custom_threshold")
@@ -199,13 +213,13 @@ class CompactionService:
 
     async def record(self, session_id: str, node_id: str, provider: str, model: str, tokens_before: int, tokens_after: int, summary: Optional[str] = None) -> None:
         """Record compaction event after native API handles it."""
-        state = await self._db.get_or_create_session_token_state(session_id)
+        state = await self._usage.get_state(session_id)
         await self._db.save_compaction_event({
             "session_id": session_id, "node_id": node_id, "trigger_reason": "native",
             "tokens_before": tokens_before, "tokens_after": tokens_after,
             "summary_model": model, "summary_provider": provider, "success": True, "summary_content": summary
         })
-        await self._db.update_session_token_state(session_id, {
+        await self._usage.update(session_id, {
             "cumulative_total": tokens_after,
             "last_compaction_at": datetime.now(timezone.utc),
             "compaction_count": state["compaction_count"] + 1
@@ -217,7 +231,7 @@ class CompactionService:
         When model/provider are provided, the threshold reflects the model's
         context window.  Otherwise falls back to the global default.
         """
-        state = await self._db.get_or_create_session_token_state(session_id)
+        state = await self._usage.get_state(session_id)
         custom = state.get("custom_threshold")
         if custom:
             threshold = custom
@@ -248,7 +262,17 @@ class CompactionService:
             updates["custom_threshold"] = threshold
         if enabled is not None:
             updates["compaction_enabled"] = enabled
-        return await self._db.update_session_token_state(session_id, updates) if updates else True
+        if updates:
+            await self._usage.update(session_id, updates)
+        return True
+
+    async def flush_usage(self) -> None:
+        """Write queued token metrics and session states now."""
+        await self._usage.flush()
+
+    async def close(self) -> None:
+        """Write everything still queued (call on shutdown)."""
+        await self._usage.close()
 
     async def compact_context(
         self,
@@ -270,7 +294,7 @@ class CompactionService:
         if not memory_content or len(memory_content.strip()) < 100:
             return {"success": False, "error": "Memory content too short"}
 
-        state = await self._db.get_or_create_session_token_state(session_id)
+        state = await self._usage.get_state(session_id)
         tokens_before = state["cumulative_total"]
 
         try:
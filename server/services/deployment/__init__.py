@@ -1,12 +1,19 @@
 """Deployment module - Event-driven workflow deployment."""
 
-from .state import DeploymentState, TriggerInfo
+from .plan import RunPlan, compile_run_plan, compile_run_plans
+from .state import DeploymentState, ParameterSnapshot, TriggerInfo
 from .triggers import TriggerManager
-from .manager import DeploymentManager
+from .manager import DEFAULT_DEPLOYMENT_SETTINGS, DeploymentManager, validate_deployment_settings
 
 __all__ = [
     "DeploymentState",
+    "ParameterSnapshot",
+    "RunPlan",
+    "compile_run_plan",
+    "compile_run_plans",
     "TriggerInfo",
     "TriggerManager",
     "DeploymentManager",
+    "DEFAULT_DEPLOYMENT_SETTINGS",
+    "validate_deployment_settings",
 ]
@@ -0,0 +1,335 @@
+"""Run Admission - bounded per-workflow queue in front of deployment runs.
+
+Trigger events are submitted here instead of spawning a run directly. A
+workflow runs at most ``concurrency`` runs at once; further events wait in a
+FIFO queue of up to ``max_depth`` runs. When the queue is full the overflow
+policy decides:
+
+- ``drop_oldest``: evict the longest-waiting run to admit the new one
+- ``reject``: refuse the new run
+- ``spill``: persist the run (Redis stream, else the cache's SQLite/memory
+  backend) and admit it once the in-memory queue has drained
+
+Runs may carry an ordering key (a trigger's conversation, e.g. one WhatsApp
+chat). Runs with the same key start one at a time in arrival order; runs with
+different keys share the ``concurrency`` slots freely. A run whose key is
+busy is parked behind it (counted in the queue depth) and takes over the
+slot of the key's previous run when that finishes.
+
+Queue depth, admission counters and wait times are reported by ``metrics()``.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional, Set, TYPE_CHECKING
+
+from core.logging import get_logger
+
+if TYPE_CHECKING:
+    from core.cache import CacheService
+
+logger = get_logger(__name__)
+
+OVERFLOW_POLICIES = ("drop_oldest", "reject", "spill")
+
+# submit() outcomes
+STARTED = "started"
+QUEUED = "queued"
+SPILLED = "spilled"
+REJECTED = "rejected"
+
+
+@dataclass
+class QueuedRun:
+    """A trigger event waiting for a run slot."""
+    trigger_node_id: str
+    trigger_data: Dict[str, Any]
+    enqueued_at: float = field(default_factory=time.time)
+    ordering_key: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trigger_node_id": self.trigger_node_id,
+            "trigger_data": self.trigger_data,
+            "enqueued_at": self.enqueued_at,
+            "ordering_key": self.ordering_key,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QueuedRun":
+        return cls(data["trigger_node_id"], data.get("trigger_data") or {},
+                   data.get("enqueued_at") or time.time(), data.get("ordering_key"))
+
+
+class RunSpillStore:
+    """Overflow storage for one workflow's queued runs, oldest first.
+
+    Uses a Redis stream when streams are available, otherwise a list under
+    one cache key (SQLite or memory backend of CacheService).
+    """
+
+    def __init__(self, cache: "CacheService", key: str, maxlen: int = 100_000, ttl: int = 86400):
+        self.cache = cache
+        self.key = key
+        self.maxlen = maxlen
+        self.ttl = ttl
+        self._lock = asyncio.Lock()
+
+    @property
+    def _use_stream(self) -> bool:
+        return self.cache.is_streams_available()
+
+    async def push(self, run: QueuedRun) -> bool:
+        if self._use_stream:
+            return await self.cache.stream_add(self.key, run.to_dict(), maxlen=self.maxlen) is not None
+        async with self._lock:
+            runs = await self.cache.get(self.key) or []
+            if len(runs) >= self.maxlen:
+                return False
+            runs.append(run.to_dict())
+            return await self.cache.set(self.key, runs, ttl=self.ttl)
+
+    async def pop(self) -> Optional[QueuedRun]:
+        if self._use_stream:
+            result = await self.cache.stream_read({self.key: "0"}, count=1)
+            if not result or not result[0][1]:
+                return None
+            msg_id, fields = result[0][1][0]
+            await self.cache.stream_delete(self.key, msg_id)
+            return QueuedRun.from_dict({k: json.loads(v) for k, v in fields.items()})
+        async with self._lock:
+            runs = await self.cache.get(self.key) or []
+            if not runs:
+                return None
+            run = runs.pop(0)
+            await self.cache.set(self.key, runs, ttl=self.ttl)
+            return QueuedRun.from_dict(run)
+
+    async def clear(self) -> None:
+        await self.cache.delete(self.key)
+
+
+class RunAdmissionQueue:
+    """Bounded admission queue of one deployed workflow.
+
+    ``start_run`` launches a run and returns its task; the queue admits the
+    next waiting run when a task finishes.
+    """
+
+    def __init__(
+        self,
+        workflow_id: str,
+        start_run: Callable[[QueuedRun], asyncio.Task],
+        concurrency: int = 100,
+        max_depth: int = 1000,
+        overflow: str = "drop_oldest",
+        spill: Optional[RunSpillStore] = None,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            logger.warning("Unknown run queue overflow policy, using drop_oldest", overflow=overflow)
+            overflow = "drop_oldest"
+        if overflow == "spill" and spill is None:
+            logger.warning("Run queue spill needs a cache service, rejecting overflow instead",
+                           workflow_id=workflow_id)
+            overflow = "reject"
+
+        self.workflow_id = workflow_id
+        self.concurrency = max(1, concurrency)
+        self.max_depth = max(0, max_depth)
+        self.overflow = overflow
+        self._start_run = start_run
+        self._spill = spill
+
+        self._queue: Deque[QueuedRun] = deque()
+        self._active_keys: Set[str] = set()
+        self._parked: Dict[str, Deque[QueuedRun]] = {}  # busy key -> its waiting runs
+        self._parked_count = 0
+        self._running = 0
+        self._spilled = 0
+        self._closed = False
+        self._filling: Optional[asyncio.Task] = None
+
+        self._counts = {"started": 0, "queued": 0, "dropped": 0, "rejected": 0, "spilled": 0,
+                        "failed_to_start": 0}
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Runs waiting in memory."""
+        return len(self._queue) + self._parked_count
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    async def submit(self, trigger_node_id: str, trigger_data: Dict[str, Any],
+                     ordering_key: Optional[str] = None) -> str:
+        """Admit a trigger event. Returns STARTED, QUEUED, SPILLED or REJECTED.
+
+        Runs sharing ``ordering_key`` start one at a time, in submit order.
+        """
+        if self._closed:
+            return REJECTED
+        run = QueuedRun(trigger_node_id, trigger_data, ordering_key=ordering_key)
+
+        if (self._running < self.concurrency and not self._queue and not self._spilled
+                and ordering_key not in self._active_keys):
+            return STARTED if self._start(run) else REJECTED
+
+        if self.depth < self.max_depth and not self._spilled:
+            self._enqueue(run)
+            return QUEUED
+
+        if self.overflow == "drop_oldest" and self.depth:
+            dropped = self._drop_oldest()
+            self._counts["dropped"] += 1
+            logger.warning("Run queue full, dropped oldest run", workflow_id=self.workflow_id,
+                           trigger_node_id=dropped.trigger_node_id, depth=self.depth + 1)
+            self._enqueue(run)
+            return QUEUED
+
+        if self.overflow == "spill" and await self._spill.push(run):
+            self._spilled += 1
+            self._counts["spilled"] += 1
+            return SPILLED
+
+        self._counts["rejected"] += 1
+        logger.warning("Run queue full, rejected run", workflow_id=self.workflow_id,
+                       trigger_node_id=trigger_node_id, depth=self.depth, overflow=self.overflow)
+        return REJECTED
+
+    def _enqueue(self, run: QueuedRun) -> None:
+        self._counts["queued"] += 1
+        if run.ordering_key in self._active_keys:
+            self._park(run)
+        else:
+            self._queue.append(run)
+
+    def _park(self, run: QueuedRun) -> None:
+        self._parked.setdefault(run.ordering_key, deque()).append(run)
+        self._parked_count += 1
+
+    def _unpark(self, key: str) -> Optional[QueuedRun]:
+        parked = self._parked.get(key)
+        if not parked:
+            return None
+        run = parked.popleft()
+        if not parked:
+            del self._parked[key]
+        self._parked_count -= 1
+        return run
+
+    def _drop_oldest(self) -> QueuedRun:
+        """Remove the longest-waiting run, queued or parked."""
+        oldest_key = min(self._parked, key=lambda k: self._parked[k][0].enqueued_at, default=None)
+        if self._queue and (oldest_key is None
+                            or self._queue[0].enqueued_at <= self._parked[oldest_key][0].enqueued_at):
+            return self._queue.popleft()
+        return self._unpark(oldest_key)
+
+    def _admit(self, run: QueuedRun) -> None:
+        """Start a run taken from the queue or spill, unless its key is busy."""
+        if run.ordering_key in self._active_keys:
+            self._park(run)
+        else:
+            self._start(run)
+
+    def _start(self, run: QueuedRun) -> bool:
+        """Launch a run in a free slot. Returns False if ``start_run`` raised."""
+        if self._launch(run):
+            return True
+        # Nothing was taken: hand the slot (and the key) to the next run
+        self._release(run.ordering_key)
+        return False
+
+    def _launch(self, run: QueuedRun) -> bool:
+        """Call ``start_run`` and take a slot for the run; False if it raised."""
+        try:
+            task = self._start_run(run)
+        except Exception as e:
+            self._counts["failed_to_start"] += 1
+            logger.error("Failed to start run", workflow_id=self.workflow_id,
+                         trigger_node_id=run.trigger_node_id, error=str(e))
+            return False
+
+        wait = max(0.0, time.time() - run.enqueued_at)
+        self._waits += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        self._counts["started"] += 1
+
+        self._running += 1
+        if run.ordering_key is not None:
+            self._active_keys.add(run.ordering_key)
+        task.add_done_callback(lambda _task: self._on_run_done(run))
+        return True
+
+    def _on_run_done(self, run: QueuedRun) -> None:
+        self._running -= 1
+        key = run.ordering_key
+        if key is not None:
+            self._active_keys.discard(key)
+        self._release(key)
+
+    def _release(self, key: Optional[str]) -> None:
+        """A slot held (or about to be taken) by ``key`` is free again."""
+        if self._closed:
+            return
+        if key is not None:
+            # The key's next run takes over the slot, ahead of the queue;
+            # runs that fail to start pass it on to the one after them
+            while (successor := self._unpark(key)) is not None and not self._launch(successor):
+                pass
+        if self._filling is None or self._filling.done():
+            self._filling = asyncio.ensure_future(self._fill())
+
+    async def _fill(self) -> None:
+        """Start waiting runs while slots are free, memory queue before spill."""
+        while not self._closed and self._running < self.concurrency:
+            if self._queue:
+                self._admit(self._queue.popleft())
+            elif self._spilled:
+                run = await self._spill.pop()
+                if run is None:
+                    self._spilled = 0
+                    break
+                self._spilled -= 1
+                if not self._closed:
+                    self._admit(run)
+            else:
+                break
+
+    async def close(self) -> int:
+        """Stop admitting and discard waiting runs. Returns how many were discarded."""
+        self._closed = True
+        discarded = self.depth + self._spilled
+        self._queue.clear()
+        self._parked.clear()
+        self._parked_count = 0
+        if self._filling is not None and not self._filling.done():
+            self._filling.cancel()
+        if self._spill is not None and self._spilled:
+            await self._spill.clear()
+        self._spilled = 0
+        return discarded
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, admission counters and wait times (seconds)."""
+        return {
+            "depth": self.depth,
+            "parked": self._parked_count,
+            "ordering_keys_running": len(self._active_keys),
+            "spilled_pending": self._spilled,
+            "running": self._running,
+            "concurrency": self.concurrency,
+            "max_depth": self.max_depth,
+            "overflow": self.overflow,
+            **self._counts,
+            "wait_avg": self._wait_total / self._waits if self._waits else 0.0,
+            "wait_max": self._wait_max,
+        }
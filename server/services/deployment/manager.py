@@ -13,9 +13,11 @@ from datetime import datetime
 from typing import Dict, Any, List, Optional, Callable, TYPE_CHECKING
 
 from core.logging import get_logger
-from constants import WORKFLOW_TRIGGER_TYPES, POLLING_TRIGGER_TYPES
+from constants import POLLING_TRIGGER_TYPES
 from services import event_waiter
-from .state import DeploymentState, TriggerInfo
+from .admission import OVERFLOW_POLICIES, QueuedRun, RunAdmissionQueue, RunSpillStore, STARTED
+from .plan import compile_run_plan, compile_run_plans
+from .state import DeploymentState, ParameterSnapshot, TriggerInfo
 from .triggers import TriggerManager
 
 if TYPE_CHECKING:
@@ -23,6 +25,48 @@ if TYPE_CHECKING:
 
 logger = get_logger(__name__)
 
+# Settable with update_deployment_settings; persisted in the database and
+# read on each deploy, so changes apply from the next deploy on
+DEFAULT_DEPLOYMENT_SETTINGS: Dict[str, Any] = {
+    "stop_on_error": False,
+    "max_concurrent_runs": 100,
+    "use_parallel_executor": True,
+    # Reuse deterministic node results across runs (Temporal activities
+    # pass it to the server's execute_node handler, which checks the memo)
+    "memoize_nodes": False,
+    "run_queue_depth": 1000,
+    "run_queue_overflow": "drop_oldest",  # drop_oldest | reject | spill
+    "event_buffer_size": event_waiter.SUBSCRIPTION_BUFFER,
+    "event_buffer_overflow": "drop_oldest",  # drop_oldest | drop_newest | block
+    "ordered_runs": True,  # One run at a time per conversation (chat, session, thread)
+}
+
+
+def validate_deployment_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """The known deployment settings in ``settings``, type-checked.
+
+    Raises:
+        ValueError: a value has the wrong type or names an unknown policy
+    """
+    valid: Dict[str, Any] = {}
+    for key, default in DEFAULT_DEPLOYMENT_SETTINGS.items():
+        if key not in settings:
+            continue
+        value = settings[key]
+        if isinstance(default, bool):
+            if not isinstance(value, bool):
+                raise ValueError(f"{key} must be a boolean")
+        elif isinstance(default, int):
+            if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                raise ValueError(f"{key} must be a non-negative integer")
+        valid[key] = value
+    if valid.get("run_queue_overflow", "drop_oldest") not in OVERFLOW_POLICIES:
+        raise ValueError(f"run_queue_overflow must be one of {', '.join(OVERFLOW_POLICIES)}")
+    if valid.get("event_buffer_overflow", "drop_oldest") not in event_waiter.SUBSCRIPTION_OVERFLOW_POLICIES:
+        raise ValueError("event_buffer_overflow must be one of "
+                         f"{', '.join(event_waiter.SUBSCRIPTION_OVERFLOW_POLICIES)}")
+    return valid
+
 
 class DeploymentManager:
     """Manages event-driven workflow deployment.
@@ -39,10 +83,12 @@ class DeploymentManager:
         execute_workflow_fn: Callable,
         store_output_fn: Callable,
         broadcaster: Any,
+        release_outputs_fn: Optional[Callable] = None,
     ):
         self.database = database
         self._execute_workflow = execute_workflow_fn
         self._store_output = store_output_fn
+        self._release_outputs = release_outputs_fn
         self._broadcaster = broadcaster
 
         # Per-workflow deployment state (n8n pattern)
@@ -50,15 +96,12 @@ class DeploymentManager:
         self._trigger_managers: Dict[str, TriggerManager] = {}
         self._active_runs: Dict[str, Dict[str, asyncio.Task]] = {}  # workflow_id -> {run_id: task}
         self._run_counters: Dict[str, int] = {}
+        self._run_queues: Dict[str, RunAdmissionQueue] = {}
         self._status_callbacks: Dict[str, Callable] = {}
         self._cron_iterations: Dict[str, int] = {}  # node_id -> iteration count
         self._main_loop: Optional[asyncio.AbstractEventLoop] = None
 
-        self._settings = {
-            "stop_on_error": False,
-            "max_concurrent_runs": 100,
-            "use_parallel_executor": True
-        }
+        self._settings = dict(DEFAULT_DEPLOYMENT_SETTINGS)
 
     @property
     def is_running(self) -> bool:
@@ -74,6 +117,16 @@ class DeploymentManager:
         """Get list of deployed workflow IDs."""
         return [wid for wid, state in self._deployments.items() if state.is_running]
 
+    def get_param_snapshot(self, workflow_id: Optional[str]) -> Optional[ParameterSnapshot]:
+        """Prepared-parameter snapshot of a running deployment (None if not deployed)."""
+        state = self._deployments.get(workflow_id) if workflow_id else None
+        return state.params if state is not None and state.is_running else None
+
+    def get_run_queue_metrics(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Admission queue depth, counters and wait times of a deployed workflow."""
+        run_queue = self._run_queues.get(workflow_id)
+        return run_queue.metrics() if run_queue else None
+
     # =========================================================================
     # DEPLOYMENT LIFECYCLE
     # =========================================================================
@@ -128,8 +181,8 @@ class DeploymentManager:
         # Load settings
         await self._load_settings()
 
-        # Create state for this workflow
-        self._deployments[workflow_id] = DeploymentState(
+        # Create state for this workflow (with an empty parameter snapshot)
+        state = self._deployments[workflow_id] = DeploymentState(
             deployment_id=deployment_id,
             workflow_id=workflow_id,
             is_running=True,
@@ -139,19 +192,26 @@ class DeploymentManager:
             settings=self._settings.copy()
         )
 
+        self._run_queues[workflow_id] = self._create_run_queue(workflow_id)
+
         logger.info("Deployment starting", deployment_id=deployment_id, workflow_id=workflow_id, nodes=len(nodes))
 
         triggers_setup = []
 
         try:
+            cron_nodes = TriggerManager.find_cron_nodes(nodes)
+            start_nodes, event_triggers = TriggerManager.find_trigger_nodes(nodes, edges)
+
+            # Compile each trigger's run plan before any trigger can fire
+            state.run_plans.update(compile_run_plans(
+                [n['id'] for n in (*cron_nodes, *start_nodes, *event_triggers)], nodes, edges
+            ))
+
             # Setup cron triggers
-            for cron_node in TriggerManager.find_cron_nodes(nodes):
+            for cron_node in cron_nodes:
                 info = await self._setup_cron_trigger(cron_node, workflow_id)
                 triggers_setup.append(info.to_dict())
 
-            # Find start and event triggers
-            start_nodes, event_triggers = TriggerManager.find_trigger_nodes(nodes, edges)
-
             # Fire start nodes immediately
             for node in start_nodes:
                 info = await self._fire_start_trigger(node, workflow_id)
@@ -211,7 +271,10 @@ class DeploymentManager:
         if trigger_manager:
             trigger_manager.set_running(False)
 
-        # Cancel active runs for this workflow
+        # Stop admitting queued runs, then cancel active runs for this workflow
+        run_queue = self._run_queues.pop(workflow_id, None)
+        queued_count = await run_queue.close() if run_queue else 0
+
         workflow_runs = self._active_runs.get(workflow_id, {})
         listener_nodes = trigger_manager.get_listener_node_ids() if trigger_manager else []
 
@@ -246,6 +309,9 @@ class DeploymentManager:
         for node in state.nodes:
             waiter_count += event_waiter.cancel_for_node(node['id'])
 
+        # A later deploy baselines instead of replaying mail received meanwhile
+        await self._delete_poll_cursors(state.nodes)
+
         # Clear cron iteration counters for this workflow's cron nodes
         for node_id in cron_node_ids:
             self._cron_iterations.pop(node_id, None)
@@ -262,6 +328,7 @@ class DeploymentManager:
             "deployment_id": deployment_id,
             "workflow_id": workflow_id,
             "runs_cancelled": run_count,
+            "queued_runs_discarded": queued_count,
             "listeners_cancelled": listener_count,
             "crons_cancelled": cron_count,
             "waiters_cancelled": waiter_count,
@@ -289,7 +356,8 @@ class DeploymentManager:
                 "active_runs": len(execution_runs),
                 "active_listeners": len(workflow_runs) - len(execution_runs),
                 "run_counter": self._run_counters.get(workflow_id, 0),
-                "deployed_at": state.deployed_at
+                "deployed_at": state.deployed_at,
+                "run_queue": self.get_run_queue_metrics(workflow_id),
             }
 
         # Global status (backward compatibility)
@@ -300,6 +368,7 @@ class DeploymentManager:
         total_runs = 0
         total_listeners = 0
         total_run_counter = 0
+        total_queued = 0
         deployed_workflows = []
 
         for wid, state in self._deployments.items():
@@ -310,12 +379,15 @@ class DeploymentManager:
                 total_runs += len(execution_runs)
                 total_listeners += len(workflow_runs) - len(execution_runs)
                 total_run_counter += self._run_counters.get(wid, 0)
+                run_queue = self._run_queues.get(wid)
+                total_queued += run_queue.depth if run_queue else 0
 
         return {
             "deployed": True,
             "deployed_workflows": deployed_workflows,
             "active_runs": total_runs,
             "active_listeners": total_listeners,
+            "queued_runs": total_queued,
             "run_counter": total_run_counter
         }
 
@@ -404,6 +476,7 @@ class DeploymentManager:
         node_id = node['id']
         node_type = node.get('type', '')
         params = await self.database.get_node_parameters(node_id) or {}
+        ordered = self._settings.get("ordered_runs", True)
 
         async def on_event(event_data: Dict):
             trigger_data = {
@@ -412,7 +485,9 @@ class DeploymentManager:
                 'trigger_type': node_type,
                 'event_data': event_data
             }
-            await self._spawn_run(node_id, trigger_data, wait=True, workflow_id=workflow_id)
+            key = event_waiter.ordering_key(node_type, event_data) if ordered else None
+            await self._spawn_run(node_id, trigger_data, workflow_id=workflow_id,
+                                  ordering_key=f"{node_id}:{key}" if key else None)
 
         trigger_manager = self._trigger_managers.get(workflow_id)
         if not trigger_manager:
@@ -432,7 +507,9 @@ class DeploymentManager:
 
         await trigger_manager.setup_event_trigger(
             node_id, node_type, params, on_event, self._broadcaster,
-            workflow_id=workflow_id
+            workflow_id=workflow_id,
+            buffer_size=self._settings.get("event_buffer_size", event_waiter.SUBSCRIPTION_BUFFER),
+            overflow=self._settings.get("event_buffer_overflow", "drop_oldest"),
         )
         return TriggerInfo(node_id, node_type)
 
@@ -440,14 +517,36 @@ class DeploymentManager:
     # EXECUTION RUNS
     # =========================================================================
 
+    def _create_run_queue(self, workflow_id: str) -> RunAdmissionQueue:
+        """Admission queue for a workflow from the current deployment settings."""
+        overflow = self._settings.get("run_queue_overflow", "drop_oldest")
+        spill = None
+        cache = event_waiter.get_cache_service()
+        if overflow == "spill" and cache is not None:
+            spill = RunSpillStore(cache, f"deployment:run_spill:{workflow_id}")
+
+        return RunAdmissionQueue(
+            workflow_id,
+            start_run=lambda run: self._start_run(workflow_id, run),
+            concurrency=self._settings.get("max_concurrent_runs", 100),
+            max_depth=self._settings.get("run_queue_depth", 1000),
+            overflow=overflow,
+            spill=spill,
+        )
+
     async def _spawn_run(
         self,
         trigger_node_id: str,
         trigger_data: Dict[str, Any],
-        wait: bool = False,
-        workflow_id: Optional[str] = None
-    ) -> Optional[asyncio.Task]:
-        """Spawn a new execution run for a specific workflow."""
+        workflow_id: Optional[str] = None,
+        ordering_key: Optional[str] = None
+    ) -> Optional[str]:
+        """Submit a trigger event to the workflow's admission queue.
+
+        Runs with the same ``ordering_key`` run one after another.
+        Returns the admission outcome (started, queued, spilled, rejected),
+        or None if the workflow is not deployed.
+        """
         if not workflow_id:
             # Backward compatibility: find workflow for this trigger node
             for wid, state in self._deployments.items():
@@ -458,31 +557,42 @@ class DeploymentManager:
         if not workflow_id or not self.is_workflow_deployed(workflow_id):
             return None
 
-        state = self._deployments[workflow_id]
-
-        # Check concurrent limit for this workflow
-        workflow_runs = self._active_runs.get(workflow_id, {})
-        active_count = sum(1 for k in workflow_runs if k.startswith("run_"))
-        max_concurrent = self._settings.get("max_concurrent_runs", 100)
-        if active_count >= max_concurrent:
-            logger.warning("Max concurrent runs reached", workflow_id=workflow_id, active=active_count)
+        run_queue = self._run_queues.get(workflow_id)
+        if run_queue is None:
             return None
 
+        outcome = await run_queue.submit(trigger_node_id, trigger_data, ordering_key=ordering_key)
+        if outcome != STARTED:
+            await self._notify("run_queued", {
+                "workflow_id": workflow_id,
+                "trigger_node_id": trigger_node_id,
+                "admission": outcome,
+                "queue_depth": run_queue.depth,
+            }, workflow_id)
+        return outcome
+
+    def _start_run(self, workflow_id: str, run: QueuedRun) -> asyncio.Task:
+        """Launch an admitted run as a task tracked in _active_runs."""
+        state = self._deployments[workflow_id]
+        trigger_node_id = run.trigger_node_id
+
         # Generate run ID
         self._run_counters[workflow_id] = self._run_counters.get(workflow_id, 0) + 1
         run_id = f"run_{state.deployment_id}_{self._run_counters[workflow_id]}"
-
-        await self._notify("run_started", {
-            "run_id": run_id,
-            "workflow_id": workflow_id,
-            "trigger_node_id": trigger_node_id,
-            "active_runs": active_count + 1
-        }, workflow_id)
+        workflow_runs = self._active_runs.setdefault(workflow_id, {})
+        active_count = sum(1 for k in workflow_runs if k.startswith("run_"))
 
         async def execute():
             try:
+                await self._notify("run_started", {
+                    "run_id": run_id,
+                    "workflow_id": workflow_id,
+                    "trigger_node_id": trigger_node_id,
+                    "active_runs": active_count + 1,
+                    "queue_wait": round(time.time() - run.enqueued_at, 3),
+                }, workflow_id)
                 result = await self._execute_from_trigger(
-                    run_id, trigger_node_id, trigger_data, workflow_id
+                    run_id, trigger_node_id, run.trigger_data, workflow_id
                 )
                 await self._notify("run_completed", {
                     "run_id": run_id,
@@ -500,17 +610,7 @@ class DeploymentManager:
                     self._active_runs[workflow_id].pop(run_id, None)
 
         task = asyncio.create_task(execute())
-        if workflow_id not in self._active_runs:
-            self._active_runs[workflow_id] = {}
-        self._active_runs[workflow_id][run_id] = task
-
-        if wait:
-            try:
-                await task
-            except (asyncio.CancelledError, Exception):
-                pass
-            return None
-
+        workflow_runs[run_id] = task
         return task
 
     async def _execute_from_trigger(
@@ -528,147 +628,53 @@ class DeploymentManager:
         start_time = time.time()
         run_session_id = f"{state.session_id}_{run_id}"
 
-        # Store trigger output
-        trigger_output = trigger_data.get('event_data', trigger_data)
-        await self._store_output(run_session_id, trigger_node_id, "output_0", trigger_output)
-
-        # Get downstream nodes
-        downstream = self._get_downstream_nodes(
-            trigger_node_id,
-            state.nodes,
-            state.edges
-        )
-
-        if not downstream:
-            return {
-                "success": True,
-                "run_id": run_id,
-                "workflow_id": workflow_id,
-                "nodes_executed": [trigger_node_id],
-                "execution_time": time.time() - start_time,
-                "message": "No downstream nodes"
-            }
+        try:
+            # Store trigger output
+            trigger_output = trigger_data.get('event_data', trigger_data)
+            await self._store_output(run_session_id, trigger_node_id, "output_0", trigger_output)
+
+            # Instantiate the trigger's precompiled run plan
+            plan = state.run_plans.get(trigger_node_id)
+            if plan is None:
+                plan = compile_run_plan(trigger_node_id, state.nodes, state.edges)
+                state.run_plans[trigger_node_id] = plan
+
+            if plan.is_empty:
+                return {
+                    "success": True,
+                    "run_id": run_id,
+                    "workflow_id": workflow_id,
+                    "nodes_executed": [trigger_node_id],
+                    "execution_time": time.time() - start_time,
+                    "message": "No downstream nodes"
+                }
 
-        # Build filtered graph
-        run_filter = {trigger_node_id} | {n['id'] for n in downstream}
-        logger.debug(f"[Run] run_filter has {len(run_filter)} nodes")
+            run_nodes, run_edges = plan.instantiate(trigger_output)
 
-        filtered_nodes = []
-        for node in state.nodes:
-            if node['id'] not in run_filter:
-                continue
-            node_copy = node.copy()
-            node_type = node.get('type', '')
-            if node['id'] == trigger_node_id:
-                node_copy['_pre_executed'] = True
-                node_copy['_trigger_output'] = trigger_output
-            elif node_type in WORKFLOW_TRIGGER_TYPES:
-                # Non-firing triggers: pre-execute to prevent blocking as event waiters
-                node_copy['_pre_executed'] = True
-                node_copy['_trigger_output'] = {'not_triggered': True}
-                logger.debug(f"[Run] Marking non-firing trigger as pre-executed: {node['id']} ({node_type})")
-            filtered_nodes.append(node_copy)
-
-        filtered_edges = [
-            e for e in state.edges
-            if e.get('source') in run_filter and e.get('target') in run_filter
-        ]
-        logger.debug(f"[Run] filtered_edges: {len(filtered_edges)} edges")
-
-        # Execute filtered graph with deployment's workflow_id for scoped status
-        # Use Temporal for proper parallel branch execution
-        status_callback = self._status_callbacks.get(workflow_id)
-        result = await self._execute_workflow(
-            nodes=filtered_nodes,
-            edges=filtered_edges,
-            session_id=run_session_id,
-            status_callback=status_callback,
-            skip_clear_outputs=True,
-            workflow_id=workflow_id,  # Pass deployment's workflow_id for status scoping
-            use_temporal=True,  # Force Temporal for parallel node execution
-        )
+            # Execute filtered graph with deployment's workflow_id for scoped status
+            # Use Temporal for proper parallel branch execution
+            status_callback = self._status_callbacks.get(workflow_id)
+            result = await self._execute_workflow(
+                nodes=run_nodes,
+                edges=run_edges,
+                session_id=run_session_id,
+                status_callback=status_callback,
+                skip_clear_outputs=True,
+                workflow_id=workflow_id,  # Pass deployment's workflow_id for status scoping
+                use_temporal=True,  # Force Temporal for parallel node execution
+                memoize=self._settings.get("memoize_nodes", False),
+                graph=plan.graph,
+            )
+        finally:
+            # The run's session is never read again from memory: commit and drop it
+            if self._release_outputs is not None:
+                await self._release_outputs(run_session_id)
 
         result["run_id"] = run_id
         result["workflow_id"] = workflow_id
         result["trigger_node_id"] = trigger_node_id
         return result
 
-    def _get_downstream_nodes(
-        self,
-        node_id: str,
-        nodes: List[Dict],
-        edges: List[Dict]
-    ) -> List[Dict]:
-        """Get all downstream nodes from a trigger."""
-        downstream_ids = set()
-        node_types = {n['id']: n.get('type', '') for n in nodes}
-        nodes_with_inputs = {e.get('target') for e in edges if e.get('target')}
-
-        def collect(current_id: str):
-            for edge in edges:
-                if edge.get('source') != current_id:
-                    continue
-                target_id = edge.get('target')
-                if not target_id or target_id in downstream_ids:
-                    continue
-
-                target_type = node_types.get(target_id, '')
-                is_trigger = target_type in WORKFLOW_TRIGGER_TYPES
-
-                # Stop at trigger nodes — they are independent event listeners,
-                # not regular execution nodes. Each trigger spawns its own
-                # execution run when its event fires (n8n pattern).
-                if is_trigger:
-                    continue
-
-                downstream_ids.add(target_id)
-                collect(target_id)
-
-        collect(node_id)
-
-        # Include config nodes connected to downstream nodes
-        for edge in edges:
-            target = edge.get('target')
-            source = edge.get('source')
-            handle = edge.get('targetHandle', '')
-
-            is_config = handle and handle.startswith('input-') and handle != 'input-main'
-            if is_config and target in downstream_ids and source not in downstream_ids:
-                # Never include trigger nodes as config dependencies -
-                # they are event listeners, not configuration providers
-                source_type = node_types.get(source, '')
-                if source_type in WORKFLOW_TRIGGER_TYPES:
-                    continue
-                downstream_ids.add(source)
-
-        # Include sub-nodes connected to toolkit nodes (n8n Sub-Node pattern)
-        # Android service nodes connect to androidTool's input-main, not config handles
-        # These need to be included so the toolkit can discover its connected services
-        toolkit_node_ids = {n['id'] for n in nodes if n.get('type') == 'androidTool' and n['id'] in downstream_ids}
-        for edge in edges:
-            target = edge.get('target')
-            source = edge.get('source')
-            # Include nodes that connect to toolkit nodes
-            if target in toolkit_node_ids and source not in downstream_ids:
-                downstream_ids.add(source)
-                logger.debug(f"[Deployment] Including sub-node {source} connected to toolkit {target}")
-
-        # Include tool nodes connected to AI Agent nodes (for capability discovery)
-        # When a child agent is included, we need its connected tools so the parent
-        # can discover what capabilities the child has
-        from constants import AI_AGENT_TYPES
-        agent_node_ids = {n['id'] for n in nodes if n.get('type') in AI_AGENT_TYPES and n['id'] in downstream_ids}
-        for edge in edges:
-            target = edge.get('target')
-            source = edge.get('source')
-            target_handle = edge.get('targetHandle', '')
-            # Include tool nodes connected to agent's input-tools handle
-            if target in agent_node_ids and target_handle == 'input-tools' and source not in downstream_ids:
-                downstream_ids.add(source)
-                logger.debug(f"[Deployment] Including tool node {source} connected to agent {target}")
-
-        return [n for n in nodes if n['id'] in downstream_ids]
-
     # =========================================================================
     # HELPERS
     # =========================================================================
@@ -696,17 +702,22 @@ class DeploymentManager:
                                       params: Dict[str, Any]) -> Callable:
         """Create Gmail API polling coroutine for deployment mode.
 
-        Polls Gmail API at configured intervals for new emails matching the filter.
-        Establishes a baseline of existing emails to avoid triggering on old messages.
+        Syncs incrementally from a historyId cursor (``GmailHistorySync``):
+        each cycle lists only messages added since the last one and fetches
+        the matching ones in batches. The cursor is persisted per node, so a
+        restarted deployment resumes instead of re-baselining; a fresh or
+        expired cursor, or one taken for another query, label or account,
+        baselines at the current mailbox state so existing emails do not
+        trigger. ``cancel`` deletes it.
         """
         async def poll(queue: asyncio.Queue, is_running_fn: Callable):
             from services.handlers.gmail import (
-                _get_gmail_service, _poll_gmail_ids,
-                _fetch_email_details, _mark_email_as_read
+                GMAIL_FETCH_CONCURRENCY, GmailHistorySync, gmail_cursor_key,
+                _get_gmail_services, _mark_emails_as_read
             )
 
-            # Authenticate with Gmail API
-            service = await _get_gmail_service(params, {})
+            # One service per concurrent batch request
+            services = await _get_gmail_services(params, {}, GMAIL_FETCH_CONCURRENCY)
 
             poll_interval = max(10, min(3600, params.get('poll_interval', 60)))
             filter_query = params.get('filter_query', 'is:unread')
@@ -722,14 +733,16 @@ class DeploymentManager:
                        node_id=node_id, query=query,
                        poll_interval=poll_interval)
 
-            # Establish baseline (avoid triggering on existing emails)
-            seen_ids: set = set()
+            sync = GmailHistorySync(services, query, label_filter,
+                                    cache=event_waiter.get_cache_service(),
+                                    cursor_key=gmail_cursor_key(node_id))
             try:
-                baseline = await _poll_gmail_ids(service, query)
-                seen_ids.update(baseline)
-                logger.info("Gmail poller baseline established",
-                           node_id=node_id, count=len(seen_ids))
+                resumed = await sync.start()
+                logger.info("Gmail poller cursor ready",
+                           node_id=node_id, history_id=sync.history_id,
+                           resumed=resumed)
             except Exception as e:
+                # poll() retries the baseline on the next cycle
                 logger.warning("Gmail poller baseline failed",
                               node_id=node_id, error=str(e))
 
@@ -742,24 +755,20 @@ class DeploymentManager:
 
                 poll_count += 1
                 try:
-                    current_ids = await _poll_gmail_ids(service, query)
-                    new_ids = current_ids - seen_ids
+                    emails = await sync.poll()
                     logger.debug("Gmail poll cycle",
                                 node_id=node_id, cycle=poll_count,
-                                current=len(current_ids),
-                                seen=len(seen_ids),
-                                new=len(new_ids))
-
-                    for msg_id in new_ids:
-                        seen_ids.add(msg_id)
-                        email_data = await _fetch_email_details(service, msg_id)
+                                history_id=sync.history_id,
+                                new=len(emails))
 
-                        if mark_as_read:
-                            try:
-                                await _mark_email_as_read(service, msg_id)
-                            except Exception:
-                                pass
+                    if mark_as_read and emails:
+                        try:
+                            await _mark_emails_as_read(
+                                services[0], [e['message_id'] for e in emails])
+                        except Exception:
+                            pass
 
+                    for email_data in emails:
                         await queue.put(email_data)
                         logger.info("Gmail poller: new email queued",
                                    node_id=node_id,
@@ -773,6 +782,19 @@ class DeploymentManager:
 
         return poll
 
+    async def _delete_poll_cursors(self, nodes: List[Dict]) -> None:
+        """Drop the persisted cursors of a workflow's polling triggers."""
+        gmail_nodes = [node['id'] for node in nodes if node.get('type') == 'gmailReceive']
+        cache = event_waiter.get_cache_service()
+        if not gmail_nodes or cache is None:
+            return
+        from services.handlers.gmail import gmail_cursor_key
+        for node_id in gmail_nodes:
+            try:
+                await cache.delete(gmail_cursor_key(node_id))
+            except Exception as e:
+                logger.warning("Failed to delete Gmail cursor", node_id=node_id, error=str(e))
+
     def _create_email_poll_coroutine(self, node_id: str,
                                       params: Dict[str, Any]) -> Callable:
         """Create Himalaya email polling coroutine for deployment mode."""
@@ -812,17 +834,15 @@ class DeploymentManager:
         return poll
 
     async def _load_settings(self):
-        """Load deployment settings from database."""
+        """Load deployment settings from database (defaults for unset keys)."""
+        settings = dict(DEFAULT_DEPLOYMENT_SETTINGS)
         try:
             db_settings = await self.database.get_deployment_settings()
             if db_settings:
-                self._settings.update({
-                    "stop_on_error": db_settings.get("stop_on_error", False),
-                    "max_concurrent_runs": db_settings.get("max_concurrent_runs", 100),
-                    "use_parallel_executor": db_settings.get("use_parallel_executor", True)
-                })
-        except Exception:
-            pass
+                settings.update(validate_deployment_settings(db_settings))
+        except Exception as e:
+            logger.warning("Failed to load deployment settings, using defaults", error=str(e))
+        self._settings = settings
 
     async def _notify(self, event: str, data: Dict[str, Any], workflow_id: Optional[str] = None):
         """Send status notification for a specific workflow."""
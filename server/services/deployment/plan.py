@@ -0,0 +1,175 @@
+"""Run Plans - per-trigger execution plans compiled once at deploy time.
+
+A deployed workflow is a fixed template, so the subgraph a trigger fires is
+fixed too: the nodes reachable from it, the config / toolkit / tool nodes
+attached to those, the edges between them and the compiled WorkflowGraph.
+RunPlan holds that structure; each event only instantiates per-run state
+(the firing trigger's output and fresh dependency counters).
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Any, Iterable, List, Set, Tuple
+
+from core.logging import get_logger
+from constants import WORKFLOW_TRIGGER_TYPES, AI_AGENT_TYPES
+from services.execution.graph import WorkflowGraph
+from services.parameter_resolver import index_nodes_by_key
+
+logger = get_logger(__name__)
+
+# Marker output of triggers that are part of a run but did not fire
+NOT_TRIGGERED = {'not_triggered': True}
+
+
+@dataclass(frozen=True)
+class RunPlan:
+    """Immutable execution plan of one trigger in a deployment.
+
+    ``nodes`` are run-ready copies in workflow order: non-firing triggers are
+    already marked pre-executed, only the firing trigger (at
+    ``trigger_index``) is replaced per run. ``graph`` is the compiled template
+    the executor forks for each run; it carries the template key index of
+    ``nodes``, which only depends on ids and labels and so serves every run.
+    """
+    trigger_node_id: str
+    downstream_ids: Tuple[str, ...]
+    nodes: Tuple[Dict[str, Any], ...]
+    edges: Tuple[Dict[str, Any], ...]
+    trigger_index: int
+    graph: WorkflowGraph
+
+    @property
+    def is_empty(self) -> bool:
+        """True when the trigger has nothing downstream to run."""
+        return not self.downstream_ids
+
+    def instantiate(self, trigger_output: Any) -> Tuple[List[Dict], List[Dict]]:
+        """Nodes and edges of one run fired with trigger_output."""
+        nodes = list(self.nodes)
+        trigger = dict(nodes[self.trigger_index])
+        trigger['_pre_executed'] = True
+        trigger['_trigger_output'] = trigger_output
+        nodes[self.trigger_index] = trigger
+        return nodes, list(self.edges)
+
+
+def downstream_node_ids(trigger_node_id: str, nodes: List[Dict], edges: List[Dict],
+                        out_edges: Dict[str, List[Dict]] = None) -> Set[str]:
+    """Ids of the nodes a trigger run executes (the trigger itself excluded).
+
+    Walks out-edges from the trigger, stopping at other triggers (they are
+    independent event listeners that spawn their own runs), then adds the
+    config nodes, toolkit sub-nodes and agent tool nodes attached to what was
+    reached. ``out_edges`` is a source -> edges index; pass it when compiling
+    several triggers of the same workflow.
+    """
+    node_types = {n['id']: n.get('type', '') for n in nodes}
+    if out_edges is None:
+        out_edges = _index_out_edges(edges)
+
+    downstream_ids: Set[str] = set()
+    stack = [trigger_node_id]
+    while stack:
+        for edge in out_edges.get(stack.pop(), ()):
+            target_id = edge.get('target')
+            if not target_id or target_id in downstream_ids:
+                continue
+            if node_types.get(target_id, '') in WORKFLOW_TRIGGER_TYPES:
+                continue
+            downstream_ids.add(target_id)
+            stack.append(target_id)
+
+    # Include config nodes connected to downstream nodes
+    for edge in edges:
+        target = edge.get('target')
+        source = edge.get('source')
+        handle = edge.get('targetHandle', '')
+
+        is_config = handle and handle.startswith('input-') and handle != 'input-main'
+        if is_config and target in downstream_ids and source not in downstream_ids:
+            # Never include trigger nodes as config dependencies
+            if node_types.get(source, '') in WORKFLOW_TRIGGER_TYPES:
+                continue
+            downstream_ids.add(source)
+
+    # Include sub-nodes connected to toolkit nodes (n8n Sub-Node pattern)
+    toolkit_node_ids = {nid for nid in downstream_ids if node_types.get(nid) == 'androidTool'}
+    for edge in edges:
+        source = edge.get('source')
+        if edge.get('target') in toolkit_node_ids and source not in downstream_ids:
+            downstream_ids.add(source)
+
+    # Include tool nodes connected to AI Agent nodes (for capability discovery)
+    agent_node_ids = {nid for nid in downstream_ids if node_types.get(nid) in AI_AGENT_TYPES}
+    for edge in edges:
+        source = edge.get('source')
+        if (edge.get('target') in agent_node_ids and edge.get('targetHandle', '') == 'input-tools'
+                and source not in downstream_ids):
+            downstream_ids.add(source)
+
+    return downstream_ids
+
+
+def compile_run_plan(trigger_node_id: str, nodes: List[Dict], edges: List[Dict],
+                     out_edges: Dict[str, List[Dict]] = None) -> RunPlan:
+    """Compile the RunPlan of one trigger."""
+    downstream_ids = downstream_node_ids(trigger_node_id, nodes, edges, out_edges)
+    run_filter = downstream_ids | {trigger_node_id}
+
+    plan_nodes = []
+    trigger_index = -1
+    for node in nodes:
+        node_id = node['id']
+        if node_id not in run_filter:
+            continue
+        node_copy = node.copy()
+        if node_id == trigger_node_id:
+            trigger_index = len(plan_nodes)
+        elif node.get('type', '') in WORKFLOW_TRIGGER_TYPES:
+            # Non-firing triggers: pre-execute to prevent blocking as event waiters
+            node_copy['_pre_executed'] = True
+            node_copy['_trigger_output'] = dict(NOT_TRIGGERED)
+        plan_nodes.append(node_copy)
+
+    if trigger_index < 0:
+        raise ValueError(f"Trigger node {trigger_node_id} is not in the workflow")
+
+    plan_edges = [
+        e for e in edges
+        if e.get('source') in run_filter and e.get('target') in run_filter
+    ]
+
+    graph = WorkflowGraph(plan_nodes, plan_edges)
+    graph.key_index = index_nodes_by_key(plan_nodes)
+
+    return RunPlan(
+        trigger_node_id=trigger_node_id,
+        downstream_ids=tuple(n['id'] for n in plan_nodes if n['id'] in downstream_ids),
+        nodes=tuple(plan_nodes),
+        edges=tuple(plan_edges),
+        trigger_index=trigger_index,
+        graph=graph,
+    )
+
+
+def compile_run_plans(trigger_node_ids: Iterable[str], nodes: List[Dict],
+                      edges: List[Dict]) -> Dict[str, RunPlan]:
+    """Compile the RunPlans of several triggers sharing one edge index."""
+    out_edges = _index_out_edges(edges)
+    plans = {
+        trigger_id: compile_run_plan(trigger_id, nodes, edges, out_edges)
+        for trigger_id in trigger_node_ids
+    }
+    logger.debug("Compiled run plans", triggers=len(plans),
+                 nodes={tid[:8]: len(p.nodes) for tid, p in plans.items()})
+    return plans
+
+
+def _index_out_edges(edges: List[Dict]) -> Dict[str, List[Dict]]:
+    out_edges: Dict[str, List[Dict]] = defaultdict(list)
+    for edge in edges:
+        source = edge.get('source')
+        if source:
+            out_edges[source].append(edge)
+    return out_edges
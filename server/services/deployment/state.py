@@ -1,8 +1,55 @@
 """Deployment State - Immutable state snapshot for event-driven deployment."""
 
+import copy
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+
+from .plan import RunPlan
+
+# (node parameters version, credentials version) a snapshot entry was built at
+SnapshotVersions = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class _PreparedParams:
+    run_params: Mapping[str, Any]
+    prepared: Mapping[str, Any]
+    versions: SnapshotVersions
+
+
+class ParameterSnapshot:
+    """Prepared (DB-merged, validated, credential-injected) parameters per node.
+
+    Filled on a node's first run in the deployment and reused while the run
+    parameters and both versions are unchanged, so trigger-driven runs skip
+    the parameter and credential lookups.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _PreparedParams] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, node_id: str, run_params: Dict[str, Any],
+            versions: SnapshotVersions) -> Optional[Dict[str, Any]]:
+        """A deep copy of the prepared parameters, or None if stale/missing.
+
+        Handlers may mutate nested values (lists, dicts) of their parameters,
+        so nothing in the returned dict is shared with the snapshot.
+        """
+        entry = self._entries.get(node_id)
+        if entry is None or entry.versions != versions or entry.run_params != run_params:
+            return None
+        return copy.deepcopy(dict(entry.prepared))
+
+    def put(self, node_id: str, run_params: Dict[str, Any], prepared: Dict[str, Any],
+            versions: SnapshotVersions) -> None:
+        self._entries[node_id] = _PreparedParams(
+            MappingProxyType(copy.deepcopy(run_params)), MappingProxyType(copy.deepcopy(prepared)), versions
+        )
 
 
 @dataclass
@@ -16,6 +63,8 @@ class DeploymentState:
     session_id: str
     settings: Dict[str, Any] = field(default_factory=dict)
     deployed_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    params: ParameterSnapshot = field(default_factory=ParameterSnapshot)
+    run_plans: Dict[str, RunPlan] = field(default_factory=dict)  # trigger node id -> plan
 
     def to_dict(self) -> Dict[str, Any]:
         return {
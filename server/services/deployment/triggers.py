@@ -85,9 +85,16 @@ class TriggerManager:
                                    parameters: Dict[str, Any],
                                    on_event: Callable[[Dict], Any],
                                    broadcaster: Any,
-                                   workflow_id: Optional[str] = None) -> None:
+                                   workflow_id: Optional[str] = None,
+                                   buffer_size: int = event_waiter.SUBSCRIPTION_BUFFER,
+                                   overflow: str = "drop_oldest") -> None:
         """Setup an event-based trigger with queue-based sequential processing.
 
+        The trigger holds one event_waiter subscription for its lifetime;
+        events arriving while one is processed wait in its buffer. Events are
+        handed to on_event in arrival order; for deployments on_event only
+        admits the run, so runs of different conversations overlap.
+
         Args:
             node_id: The trigger node ID
             node_type: Type of trigger (whatsappReceive, webhookTrigger, etc.)
@@ -95,93 +102,61 @@ class TriggerManager:
             on_event: Callback when event is received
             broadcaster: Status broadcaster for real-time updates
             workflow_id: Workflow ID for scoped status updates (n8n pattern)
+            buffer_size: Unprocessed events kept before the overflow policy applies
+            overflow: Subscription overflow policy (drop_oldest | drop_newest | block)
         """
-        event_queue: asyncio.Queue = asyncio.Queue()
-        is_executing = False
-
-        async def collector():
-            """Continuously collect events into queue."""
-            while self._is_running:
-                try:
-                    waiter = await event_waiter.register(node_type, node_id, parameters)
-                    config = event_waiter.get_trigger_config(node_type)
-
-                    if config and not is_executing:
-                        queue_size = event_queue.qsize()
-                        msg = f"Waiting for {config.display_name}..."
-                        if queue_size > 0:
-                            msg = f"Waiting... ({queue_size} queued)"
-                        await broadcaster.update_node_status(node_id, "waiting", {
-                            "message": msg,
-                            "event_type": config.event_type,
-                            "waiter_id": waiter.id,
-                            "queue_size": queue_size
-                        }, workflow_id=workflow_id)
-
-                    event_data = await event_waiter.wait_for_event(waiter)
-                    if self._is_running:
-                        await event_queue.put(event_data)
-
-                except asyncio.CancelledError:
-                    break
-                except Exception as e:
-                    logger.error("Trigger collector error", node_id=node_id, error=str(e))
-                    if self._is_running:
-                        await asyncio.sleep(1)
+        try:
+            subscription = await event_waiter.subscribe(
+                node_type, node_id, parameters, max_buffer=buffer_size, overflow=overflow
+            )
+        except ValueError as e:
+            logger.error("Trigger subscription failed", node_id=node_id, error=str(e))
+            return
+        config = event_waiter.get_trigger_config(node_type)
+        name = config.display_name if config else node_type
 
         async def processor():
-            """Process events from queue sequentially."""
-            nonlocal is_executing
-            while self._is_running:
-                try:
+            """Process subscribed events sequentially."""
+            try:
+                await broadcaster.update_node_status(node_id, "waiting", {
+                    "message": f"Waiting for {name}...",
+                    "event_type": subscription.event_type,
+                    "waiter_id": subscription.id,
+                    "queue_size": 0
+                }, workflow_id=workflow_id)
+
+                async for event_data in subscription:
+                    if not self._is_running:
+                        break
                     try:
-                        event_data = await asyncio.wait_for(event_queue.get(), timeout=1.0)
-                    except asyncio.TimeoutError:
-                        continue
+                        # Clear waiting indicator during execution
+                        await broadcaster.update_node_status(node_id, "idle", {
+                            "message": "Graph executing...",
+                            "is_processing": True
+                        }, workflow_id=workflow_id)
 
-                    is_executing = True
-                    config = event_waiter.get_trigger_config(node_type)
+                        try:
+                            await on_event(event_data)
+                        except Exception as e:
+                            logger.error("Trigger execution error", node_id=node_id, error=str(e))
 
-                    # Clear waiting indicator during execution
-                    await broadcaster.update_node_status(node_id, "idle", {
-                        "message": "Graph executing...",
-                        "is_processing": True
-                    }, workflow_id=workflow_id)
+                        # Return to waiting state
+                        queue_size = subscription.pending
+                        msg = f"Waiting for {name}..." if queue_size == 0 else f"Processing next... ({queue_size} queued)"
+                        await broadcaster.update_node_status(node_id, "waiting", {
+                            "message": msg,
+                            "queue_size": queue_size,
+                            "is_processing": False
+                        }, workflow_id=workflow_id)
 
-                    try:
-                        await on_event(event_data)
                     except Exception as e:
-                        logger.error("Trigger execution error", node_id=node_id, error=str(e))
-
-                    is_executing = False
-
-                    # Return to waiting state
-                    queue_size = event_queue.qsize()
-                    name = config.display_name if config else node_type
-                    msg = f"Waiting for {name}..." if queue_size == 0 else f"Processing next... ({queue_size} queued)"
-                    await broadcaster.update_node_status(node_id, "waiting", {
-                        "message": msg,
-                        "queue_size": queue_size,
-                        "is_processing": False
-                    }, workflow_id=workflow_id)
-
-                except asyncio.CancelledError:
-                    break
-                except Exception as e:
-                    logger.error("Trigger processor error", node_id=node_id, error=str(e))
-                    is_executing = False
-
-        async def combined():
-            collector_task = asyncio.create_task(collector())
-            processor_task = asyncio.create_task(processor())
-            try:
-                await asyncio.gather(collector_task, processor_task)
+                        logger.error("Trigger processor error", node_id=node_id, error=str(e))
             except asyncio.CancelledError:
-                collector_task.cancel()
-                processor_task.cancel()
-                await asyncio.gather(collector_task, processor_task, return_exceptions=True)
+                pass
+            finally:
+                event_waiter.cancel(subscription.id)
 
-        task = asyncio.create_task(combined())
+        task = asyncio.create_task(processor())
         self._active_listeners[node_id] = task
 
     async def setup_polling_trigger(self, node_id: str, node_type: str,
@@ -0,0 +1,253 @@
+"""Document parsing backends for the documentParser node.
+
+Kept free of server imports (core, handlers) so it can be loaded cheaply in
+ProcessPoolExecutor workers. Each worker keeps its own warm parser state
+(the marker model dict is built once per process, not once per file).
+
+Also holds the two pieces of state documentParser keeps between runs:
+
+- ParseManifest: per-node record of (mtime, size, sha256) for parsed files,
+  used to skip files that have not changed since the last run.
+- Document spools: JSONL files that streaming mode writes each parsed
+  document to as it finishes; textChunker reads them back one at a time.
+  Spools are per session (deployed runs each have their own) and are
+  deleted by ``release_spools`` when the session's outputs are released.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+SPOOL_KEY = "__spool__"
+
+# Per-process parser state, e.g. {"marker": PdfConverter}
+_PARSER_STATE: Dict[str, Any] = {}
+_state_lock = threading.Lock()
+
+
+def _marker_converter():
+    with _state_lock:
+        converter = _PARSER_STATE.get("marker")
+        if converter is None:
+            from marker.converters.pdf import PdfConverter
+            from marker.models import create_model_dict
+            converter = _PARSER_STATE["marker"] = PdfConverter(artifact_dict=create_model_dict())
+        return converter
+
+
+def parse_file(path: str, parser: str) -> str:
+    """Parse one file to text. Runs in a thread or a pool worker."""
+    path = Path(path)
+    if parser == 'pypdf':
+        from pypdf import PdfReader
+        return "\n\n".join(p.extract_text() or '' for p in PdfReader(str(path)).pages)
+    elif parser == 'marker':
+        result = _marker_converter()(str(path))
+        return result.markdown if hasattr(result, 'markdown') else str(result)
+    elif parser == 'unstructured':
+        from unstructured.partition.auto import partition
+        return "\n\n".join(str(el) for el in partition(str(path)))
+    elif parser == 'beautifulsoup':
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(path.read_text(errors='ignore'), 'html.parser')
+        for s in soup(["script", "style"]):
+            s.decompose()
+        return soup.get_text(separator='\n')
+    raise ValueError(f"Unknown parser: {parser}")
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_and_fingerprint(path: str, parser: str, fingerprint: bool = True) -> Dict[str, Any]:
+    """Parse a file and (optionally) fingerprint it in the same worker call."""
+    if not fingerprint:
+        return {"content": parse_file(path, parser)}
+    stat = os.stat(path)
+    content = parse_file(path, parser)
+    return {"content": content, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+            "sha256": file_sha256(path)}
+
+
+# =============================================================================
+# Process pool
+# =============================================================================
+
+# Size of the shared pool; a run's ``workers`` is clamped to it
+PARSE_POOL_WORKERS = os.cpu_count() or 1
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def clamp_workers(workers: int) -> int:
+    """A run's requested parallelism, bounded to 1..PARSE_POOL_WORKERS."""
+    return max(1, min(workers, PARSE_POOL_WORKERS))
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """The one shared worker pool of PARSE_POOL_WORKERS processes.
+
+    Runs share it and bound their own parallelism (documentParser's
+    ``workers``) by how many parses they keep queued. Workers are spawned
+    (not forked) so they start without the server's event loop and threads,
+    and stay alive between runs to keep parsers warm.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PARSE_POOL_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_parse_pool() -> None:
+    """Stop the pool, cancelling queued parses (server shutdown only)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# =============================================================================
+# Skip-if-unchanged manifest
+# =============================================================================
+
+# Manifest path -> lock serializing its read-merge-write in save()
+_manifest_locks: Dict[Path, threading.Lock] = {}
+_manifest_locks_lock = threading.Lock()
+
+
+def _manifest_lock(path: Path) -> threading.Lock:
+    with _manifest_locks_lock:
+        return _manifest_locks.setdefault(path, threading.Lock())
+
+
+class ParseManifest:
+    """JSON record of files a documentParser node has already parsed.
+
+    Two runs of a node can share a manifest, so ``save`` merges this run's
+    changes into the file as it is on disk instead of overwriting it.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries = self._load()
+        # Entries recorded or refreshed by this run
+        self._changed: Dict[str, Dict[str, Any]] = {}
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def is_unchanged(self, path: str, parser: str) -> bool:
+        """mtime+size match, or the content hash matches (file was touched/copied)."""
+        entry = self.entries.get(path)
+        if entry is None or entry.get("parser") != parser:
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"] and stat.st_size == entry["size"]:
+            return True
+        if stat.st_size != entry["size"] or file_sha256(path) != entry["sha256"]:
+            return False
+        entry["mtime_ns"] = stat.st_mtime_ns
+        self._changed[path] = entry
+        return True
+
+    def record(self, path: str, parser: str, fingerprint: Dict[str, Any]) -> None:
+        self.entries[path] = self._changed[path] = {
+            "parser": parser, "mtime_ns": fingerprint["mtime_ns"],
+            "size": fingerprint["size"], "sha256": fingerprint["sha256"]}
+
+    def save(self) -> None:
+        """Merge this run's entries into the stored manifest and replace it atomically."""
+        if not self._changed:
+            return
+        with _manifest_lock(self.path):
+            entries = self._load()
+            entries.update(self._changed)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(entries))
+            tmp.replace(self.path)
+        self.entries = entries
+        self._changed = {}
+
+
+# =============================================================================
+# Document spools (streaming mode)
+# =============================================================================
+
+def is_spool(value: Any) -> bool:
+    return isinstance(value, dict) and SPOOL_KEY in value
+
+
+# session_id -> spool files written for it
+_spools: Dict[str, List[Path]] = {}
+_spools_lock = threading.Lock()
+
+
+def spool_path(state_dir: Path, session_id: str, node_id: str) -> Path:
+    """Spool file for one node in one session; registered for ``release_spools``."""
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id or "default")
+    path = state_dir / "spools" / safe / f"{node_id}.documents.jsonl"
+    with _spools_lock:
+        paths = _spools.setdefault(session_id, [])
+        if path not in paths:
+            paths.append(path)
+    return path
+
+
+def release_spools(session_id: str) -> int:
+    """Delete a session's spool files. Returns how many were removed."""
+    with _spools_lock:
+        paths = _spools.pop(session_id, [])
+    removed = 0
+    for path in paths:
+        try:
+            path.unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+        try:
+            path.parent.rmdir()
+        except OSError:
+            pass  # Other spools still there
+    return removed
+
+
+def spool_ref(path: Path, count: int, sha256: str) -> Dict[str, Any]:
+    """Output value standing in for ``documents`` in streaming mode.
+
+    ``sha256`` covers the spool's contents, so values derived from the
+    reference (memo keys) change when the documents do.
+    """
+    return {SPOOL_KEY: "jsonl", "path": str(path), "count": count, "sha256": sha256}
+
+
+def iter_documents(documents: Any) -> Iterator[Any]:
+    """Yield documents from a list or, one line at a time, from a spool."""
+    if not is_spool(documents):
+        yield from documents
+        return
+    with open(documents["path"], encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
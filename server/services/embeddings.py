@@ -0,0 +1,367 @@
+"""Process-wide embedding service.
+
+Embedding models are expensive to load (HuggingFace models pull weights into
+memory) and cheap to reuse, so one EmbeddingService per process owns them:
+
+- Model pool: a bounded LRU of loaded embedders keyed by (provider, model,
+  api key). Evicted models are dropped and reloaded on next use.
+- Micro-batching: concurrent ``embed()`` calls for the same model are queued
+  for ``batch_window_ms`` and sent through a single ``embed_documents`` call,
+  so chunks from different workflows share one forward pass.
+- Vector cache: a bounded LRU keyed by the SHA-256 of (provider, model, text)
+  holding each vector as a raw float32 buffer. Unchanged chunks are never
+  re-embedded, and duplicate texts within a batch are embedded once.
+
+``embed_vectors()`` returns the compact payload from ``services.vectors``
+that embeddingGenerator emits; ``embed()`` returns plain float lists.
+
+``stats()`` reports throughput and cache hit rate for /api/embeddings/stats.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from core.logging import get_logger
+from services.vectors import row_to_floats, pack_rows, vector_rows
+
+if TYPE_CHECKING:
+    from core.config import Settings
+
+logger = get_logger(__name__)
+
+DEFAULT_MODEL = "BAAI/bge-small-en-v1.5"
+
+ModelKey = Tuple[str, str, str]
+
+
+def _create_embedder(provider: str, model: str, api_key: str = "") -> Any:
+    """Instantiate a LangChain embedder for a provider."""
+    if provider == 'huggingface':
+        try:
+            from langchain_huggingface import HuggingFaceEmbeddings
+        except ImportError:
+            raise ImportError("HuggingFace embeddings not available. Install with: pip install langchain-huggingface sentence-transformers")
+        return HuggingFaceEmbeddings(model_name=model)
+    if provider == 'openai':
+        from langchain_openai import OpenAIEmbeddings
+        return OpenAIEmbeddings(model=model, api_key=api_key)
+    if provider == 'ollama':
+        from langchain_ollama import OllamaEmbeddings
+        return OllamaEmbeddings(model=model)
+    raise ValueError(f"Unknown provider: {provider}")
+
+
+def content_hash(provider: str, model: str, text: str) -> str:
+    """Cache key for one text embedded by one model."""
+    return hashlib.sha256(f"{provider}\x00{model}\x00{text}".encode()).hexdigest()
+
+
+@dataclass
+class _PooledModel:
+    """A loaded embedder plus its pending micro-batch."""
+    embedder: Any
+    # Serializes forward passes (sync callers and the batch flusher share it)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    pending: List[Tuple[List[str], asyncio.Future]] = field(default_factory=list)
+    pending_texts: int = 0
+    flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+class EmbeddingService:
+    """Shared embedding model pool with micro-batching and a vector cache."""
+
+    def __init__(
+        self,
+        max_models: int = 2,
+        cache_max_entries: int = 50_000,
+        batch_window_ms: float = 5.0,
+        max_batch_size: int = 64,
+    ):
+        self.max_models = max_models
+        self.cache_max_entries = cache_max_entries
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+
+        self._models: "OrderedDict[ModelKey, _PooledModel]" = OrderedDict()
+        self._vectors: "OrderedDict[str, bytes]" = OrderedDict()
+        self._models_lock = threading.Lock()
+        # Guards _vectors and _stats: embed_sync and _forward run in worker threads
+        self._cache_lock = threading.Lock()
+        # Batch tasks in flight (the loop only keeps weak references to tasks)
+        self._batches: Set[asyncio.Task] = set()
+        self._started = time.monotonic()
+        self._stats = {
+            "requests": 0,
+            "texts": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "embedded": 0,
+            "forward_passes": 0,
+            "forward_seconds": 0.0,
+            "models_loaded": 0,
+            "models_evicted": 0,
+        }
+
+    # =========================================================================
+    # Model pool
+    # =========================================================================
+
+    def _get_model(self, provider: str, model: str, api_key: str = "") -> _PooledModel:
+        """Return the pooled embedder, loading it (and evicting the LRU) if needed."""
+        key = (provider, model, api_key)
+        with self._models_lock:
+            pooled = self._models.get(key)
+            if pooled is not None:
+                self._models.move_to_end(key)
+                return pooled
+
+        embedder = _create_embedder(provider, model, api_key)
+
+        with self._models_lock:
+            pooled = self._models.get(key)
+            if pooled is None:
+                pooled = self._models[key] = _PooledModel(embedder)
+                self._count("models_loaded")
+                logger.info("[Embeddings] Loaded model", provider=provider, model=model)
+                while len(self._models) > self.max_models:
+                    (old_provider, old_model, _), _old = self._models.popitem(last=False)
+                    self._count("models_evicted")
+                    logger.info("[Embeddings] Evicted model", provider=old_provider, model=old_model)
+            self._models.move_to_end(key)
+            return pooled
+
+    def get_embedder(self, provider: str = 'huggingface', model: str = DEFAULT_MODEL,
+                     api_key: str = "") -> "PooledEmbeddings":
+        """LangChain ``Embeddings`` view over this service (for vector stores).
+
+        Loads the model up front so a missing provider package raises here.
+        """
+        self._get_model(provider, model, api_key)
+        return PooledEmbeddings(self, provider, model, api_key)
+
+    # =========================================================================
+    # Vector cache
+    # =========================================================================
+
+    def _cache_lookup(self, keys: List[str]) -> Dict[int, bytes]:
+        found = {}
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                vector = self._vectors.get(key)
+                if vector is not None:
+                    self._vectors.move_to_end(key)
+                    found[i] = vector
+        return found
+
+    def _cache_store(self, keys: List[str], rows: List[bytes]) -> None:
+        with self._cache_lock:
+            for key, row in zip(keys, rows):
+                self._vectors[key] = row
+                self._vectors.move_to_end(key)
+            while len(self._vectors) > self.cache_max_entries:
+                self._vectors.popitem(last=False)
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._cache_lock:
+            self._stats[name] += amount
+
+    def _forward(self, pooled: _PooledModel, texts: List[str]) -> List[bytes]:
+        """Run one ``embed_documents`` call, deduplicating repeated texts."""
+        unique = list(dict.fromkeys(texts))
+        with pooled.lock:
+            start = time.perf_counter()
+            vectors = pooled.embedder.embed_documents(unique)
+            elapsed = time.perf_counter() - start
+        with self._cache_lock:
+            self._stats["forward_passes"] += 1
+            self._stats["forward_seconds"] += elapsed
+            self._stats["embedded"] += len(unique)
+        by_text = dict(zip(unique, vector_rows(vectors)))
+        return [by_text[t] for t in texts]
+
+    def _split_cached(self, provider: str, model: str, texts: List[str]):
+        keys = [content_hash(provider, model, t) for t in texts]
+        cached = self._cache_lookup(keys)
+        with self._cache_lock:
+            self._stats["requests"] += 1
+            self._stats["texts"] += len(texts)
+            self._stats["cache_hits"] += len(cached)
+            self._stats["cache_misses"] += len(texts) - len(cached)
+        missing = [i for i in range(len(texts)) if i not in cached]
+        return keys, cached, missing
+
+    # =========================================================================
+    # Embedding
+    # =========================================================================
+
+    async def embed(self, texts: List[str], provider: str = 'huggingface',
+                    model: str = DEFAULT_MODEL, api_key: str = "") -> List[List[float]]:
+        """Embed texts, serving cached vectors and batching the rest."""
+        rows = await self._embed_rows(texts, provider, model, api_key)
+        return [row_to_floats(row) for row in rows]
+
+    async def embed_vectors(self, texts: List[str], provider: str = 'huggingface',
+                            model: str = DEFAULT_MODEL, api_key: str = "") -> Dict[str, Any]:
+        """Like ``embed`` but returns a packed float32 payload (``services.vectors``)."""
+        rows = await self._embed_rows(texts, provider, model, api_key)
+        return pack_rows(rows, len(rows[0]) // 4 if rows else 0)
+
+    async def _embed_rows(self, texts: List[str], provider: str, model: str,
+                          api_key: str) -> List[bytes]:
+        if not texts:
+            return []
+        keys, cached, missing = self._split_cached(provider, model, texts)
+        if not missing:
+            return [cached[i] for i in range(len(texts))]
+
+        pooled = await asyncio.to_thread(self._get_model, provider, model, api_key)
+        future = asyncio.get_running_loop().create_future()
+        pooled.pending.append(([texts[i] for i in missing], future))
+        pooled.pending_texts += len(missing)
+        if pooled.pending_texts >= self.max_batch_size:
+            self._flush(pooled)
+        elif pooled.flush_handle is None:
+            pooled.flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_window, self._flush, pooled
+            )
+
+        rows = await future
+        self._cache_store([keys[i] for i in missing], rows)
+        cached.update(zip(missing, rows))
+        return [cached[i] for i in range(len(texts))]
+
+    def _flush(self, pooled: _PooledModel) -> None:
+        """Send every pending request for a model through one forward pass."""
+        if pooled.flush_handle is not None:
+            pooled.flush_handle.cancel()
+            pooled.flush_handle = None
+        batch, pooled.pending, pooled.pending_texts = pooled.pending, [], 0
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(pooled, batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, pooled: _PooledModel,
+                         batch: List[Tuple[List[str], asyncio.Future]]) -> None:
+        texts = [t for request_texts, _ in batch for t in request_texts]
+        try:
+            rows = await asyncio.to_thread(self._forward, pooled, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        offset = 0
+        for request_texts, future in batch:
+            if not future.done():
+                future.set_result(rows[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+
+    async def close(self) -> None:
+        """Run queued micro-batches now and wait for every batch in flight (call on shutdown)."""
+        with self._models_lock:
+            models = list(self._models.values())
+        for pooled in models:
+            self._flush(pooled)
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+
+    def embed_sync(self, texts: List[str], provider: str = 'huggingface',
+                   model: str = DEFAULT_MODEL, api_key: str = "") -> List[List[float]]:
+        """Blocking variant for sync callers; uses the cache but not batching."""
+        if not texts:
+            return []
+        keys, cached, missing = self._split_cached(provider, model, texts)
+        if missing:
+            pooled = self._get_model(provider, model, api_key)
+            rows = self._forward(pooled, [texts[i] for i in missing])
+            self._cache_store([keys[i] for i in missing], rows)
+            cached.update(zip(missing, rows))
+        return [row_to_floats(cached[i]) for i in range(len(texts))]
+
+    # =========================================================================
+    # Stats
+    # =========================================================================
+
+    def stats(self) -> Dict[str, Any]:
+        """Throughput, cache and pool counters."""
+        with self._cache_lock:
+            s = dict(self._stats)
+            cached_vectors = len(self._vectors)
+            cache_bytes = sum(len(row) for row in self._vectors.values())
+        lookups = s["cache_hits"] + s["cache_misses"]
+        uptime = time.monotonic() - self._started
+        return {
+            **s,
+            "forward_seconds": round(s["forward_seconds"], 3),
+            "embeddings_per_sec": round(s["embedded"] / s["forward_seconds"], 1) if s["forward_seconds"] else 0.0,
+            "texts_per_sec": round(s["texts"] / uptime, 2) if uptime else 0.0,
+            "cache_hit_rate": round(s["cache_hits"] / lookups, 4) if lookups else 0.0,
+            "avg_batch_size": round(s["embedded"] / s["forward_passes"], 1) if s["forward_passes"] else 0.0,
+            "cached_vectors": cached_vectors,
+            "cache_bytes": cache_bytes,
+            "loaded_models": [{"provider": p, "model": m} for p, m, _ in self._models],
+        }
+
+
+try:
+    from langchain_core.embeddings import Embeddings as _EmbeddingsBase
+except ImportError:  # pragma: no cover - langchain is a core dependency
+    _EmbeddingsBase = object
+
+
+class PooledEmbeddings(_EmbeddingsBase):
+    """LangChain ``Embeddings`` adapter that routes through EmbeddingService."""
+
+    def __init__(self, service: EmbeddingService, provider: str, model: str, api_key: str = ""):
+        self.service = service
+        self.provider = provider
+        self.model = model
+        self.api_key = api_key
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.service.embed_sync(texts, self.provider, self.model, self.api_key)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.service.embed(texts, self.provider, self.model, self.api_key)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+_service: Optional[EmbeddingService] = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Get the process-wide EmbeddingService (created with defaults on first use)."""
+    global _service
+    if _service is None:
+        _service = EmbeddingService()
+    return _service
+
+
+def init_embedding_service(settings: "Settings") -> EmbeddingService:
+    """Create the process-wide EmbeddingService from settings."""
+    global _service
+    _service = EmbeddingService(
+        max_models=settings.embedding_pool_max_models,
+        cache_max_entries=settings.embedding_cache_max_entries,
+        batch_window_ms=settings.embedding_batch_window_ms,
+        max_batch_size=settings.embedding_max_batch_size,
+    )
+    logger.info("[Embeddings] Initialized", max_models=settings.embedding_pool_max_models)
+    return _service
+
+
+async def close_embedding_service() -> None:
+    """Finish the process-wide service's pending batches, if it was created."""
+    if _service is not None:
+        await _service.close()
@@ -0,0 +1,162 @@
+"""Event Bus - in-process fan-out of ingress events to independent consumers.
+
+Ingress sources (WhatsApp RPC events, webhooks, task completions) publish an
+event once. ``publish()`` never awaits a consumer: each subscriber has its
+own queue and worker task, so a slow consumer only delays itself. Subscribers
+are offered events in subscription order. An unbounded subscriber never loses
+an event; a bounded one (``max_queue``) drops its oldest unprocessed event
+when full, which suits best-effort consumers such as the UI broadcast.
+
+Events carry the monotonic time they were received (``received_at``, from
+``time.perf_counter``) so consumers can measure end-to-end latency;
+``LatencyHistogram`` records such latencies in fixed buckets.
+"""
+
+import asyncio
+import bisect
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bounds of the latency buckets, in milliseconds (the last bucket is open)
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class BusEvent(NamedTuple):
+    event_type: str
+    data: Any
+    received_at: float  # time.perf_counter() at ingress
+
+
+class LatencyHistogram:
+    """Counts of latencies per bucket, with approximate percentiles."""
+
+    def __init__(self, bounds_ms=LATENCY_BUCKETS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        ms = max(0.0, seconds * 1000)
+        self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (ms) of the bucket holding the q-th percentile; max for the open bucket."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return self.bounds_ms[i] if i < len(self.bounds_ms) else self.max
+        return self.max
+
+    def reset(self) -> None:
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={b:g}ms" for b in self.bounds_ms] + [f">{self.bounds_ms[-1]:g}ms"]
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max,
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+Handler = Callable[[BusEvent], Awaitable[Any]]
+
+
+class _Subscriber:
+    """One consumer: its queue and the worker task draining it."""
+
+    def __init__(self, name: str, handler: Handler, max_queue: Optional[int]):
+        self.name = name
+        self.handler = handler
+        self.max_queue = max_queue
+        self.queue: Deque[BusEvent] = deque()
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def offer(self, event: BusEvent) -> None:
+        if self.max_queue is not None and len(self.queue) >= self.max_queue:
+            self.queue.popleft()
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("[EventBus] Subscriber queue full, dropping oldest events",
+                               subscriber=self.name, dropped=self.dropped)
+        self.queue.append(event)
+        self._ready.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            while not self.queue:
+                self._ready.clear()
+                await self._ready.wait()
+            event = self.queue.popleft()
+            try:
+                await self.handler(event)
+                self.delivered += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error("[EventBus] Subscriber failed", subscriber=self.name,
+                             event_type=event.event_type, error=str(e))
+            # Handlers that never suspend must not starve the other subscribers
+            await asyncio.sleep(0)
+
+    async def close(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+
+class EventBus:
+    """Publish once, deliver to every subscriber through its own queue."""
+
+    def __init__(self):
+        self._subscribers: List[_Subscriber] = []
+
+    def subscribe(self, name: str, handler: Handler, max_queue: Optional[int] = None) -> None:
+        """Add a consumer. With ``max_queue`` it drops its oldest events when behind."""
+        self._subscribers.append(_Subscriber(name, handler, max_queue))
+
+    def publish(self, event_type: str, data: Any, received_at: Optional[float] = None) -> None:
+        """Queue an event for every subscriber. Must be called on the event loop."""
+        event = BusEvent(event_type, data, time.perf_counter() if received_at is None else received_at)
+        for subscriber in self._subscribers:
+            subscriber.offer(event)
+
+    async def close(self) -> None:
+        """Stop the workers; unprocessed events are discarded."""
+        for subscriber in self._subscribers:
+            await subscriber.close()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            s.name: {"pending": len(s.queue), "max_queue": s.max_queue, "delivered": s.delivered,
+                     "dropped": s.dropped, "errors": s.errors}
+            for s in self._subscribers
+        }
@@ -4,17 +4,25 @@ Supports any trigger type (WhatsApp, Email, Webhook, MQTT, etc.)
 Uses Redis Streams when available for persistence, falls back to asyncio.Future.
 
 Architecture:
-- Redis mode: Events stored in Redis Streams, waiters poll streams with blocking XREAD
+- Redis mode: Events stored in Redis Streams. One dispatcher task per event-type
+  stream reads each message once (blocking XREAD), decodes it once and resolves
+  the matching in-process asyncio.Future waiters
 - Memory mode: Events dispatched to in-memory asyncio.Future waiters
+
+register() returns a one-shot Waiter (resolved by the first matching event).
+subscribe() returns a long-lived Subscription that buffers every matching
+event; deployed triggers hold one for their whole lifetime.
 """
 import asyncio
 import json
 import uuid
 import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, Callable, List, TYPE_CHECKING
+from typing import Deque, Dict, Any, Optional, Callable, List, NamedTuple, Tuple, TYPE_CHECKING
 
 from core.logging import get_logger
+from services.event_bus import LatencyHistogram
 
 if TYPE_CHECKING:
     from core.cache import CacheService
@@ -80,6 +88,8 @@ class TriggerConfig:
     node_type: str
     event_type: str  # Event to wait for (e.g., 'whatsapp_message_received')
     display_name: str
+    # Event fields naming the conversation; deployed runs with equal values run in order
+    ordering_fields: Tuple[str, ...] = ()
 
 
 # Registry of supported trigger types (event-based triggers only)
@@ -93,7 +103,8 @@ TRIGGER_REGISTRY: Dict[str, TriggerConfig] = {
     'whatsappReceive': TriggerConfig(
         node_type='whatsappReceive',
         event_type='whatsapp_message_received',
-        display_name='WhatsApp Message'
+        display_name='WhatsApp Message',
+        ordering_fields=('chat_id',)
     ),
     'webhookTrigger': TriggerConfig(
         node_type='webhookTrigger',
@@ -103,7 +114,8 @@ TRIGGER_REGISTRY: Dict[str, TriggerConfig] = {
     'chatTrigger': TriggerConfig(
         node_type='chatTrigger',
         event_type='chat_message_received',
-        display_name='Chat Message'
+        display_name='Chat Message',
+        ordering_fields=('session_id',)
     ),
     'taskTrigger': TriggerConfig(
         node_type='taskTrigger',
@@ -118,12 +130,14 @@ TRIGGER_REGISTRY: Dict[str, TriggerConfig] = {
     'gmailReceive': TriggerConfig(
         node_type='gmailReceive',
         event_type='gmail_email_received',
-        display_name='Gmail Email'
+        display_name='Gmail Email',
+        ordering_fields=('thread_id',)
     ),
     'telegramReceive': TriggerConfig(
         node_type='telegramReceive',
         event_type='telegram_message_received',
-        display_name='Telegram Message'
+        display_name='Telegram Message',
+        ordering_fields=('chat_id',)
     ),
     'emailReceive': TriggerConfig(
         node_type='emailReceive',
@@ -160,10 +174,39 @@ def get_trigger_config(node_type: str) -> Optional[TriggerConfig]:
     return TRIGGER_REGISTRY.get(node_type)
 
 
+def ordering_key(node_type: str, data: Dict) -> Optional[str]:
+    """Conversation key of an event (e.g. a WhatsApp chat_id), None if it has none."""
+    config = TRIGGER_REGISTRY.get(node_type)
+    if config is None or not config.ordering_fields:
+        return None
+    values = [data.get(f) for f in config.ordering_fields]
+    if all(v is None or v == '' for v in values):
+        return None
+    return ":".join("" if v is None else str(v) for v in values)
+
+
 # =============================================================================
 # FILTER BUILDERS - One per trigger type
 # =============================================================================
 
+def _whatsapp_sender_phone(m: Dict) -> str:
+    """Resolved sender phone of a WhatsApp message event.
+
+    Uses sender_phone directly - Go RPC already resolves LIDs to phone numbers!
+    For group messages, prefer group_info.sender_phone, fall back to root sender_phone.
+    """
+    if m.get('is_group', False):
+        sender_phone = m.get('group_info', {}).get('sender_phone', '') or m.get('sender_phone', '')
+    else:
+        sender_phone = m.get('sender_phone', '')
+
+    # Fallback: extract phone from sender JID if sender_phone not available
+    if not sender_phone:
+        sender = m.get('sender', '')
+        sender_phone = sender.split('@')[0] if '@' in sender else sender
+    return sender_phone
+
+
 def build_whatsapp_filter(params: Dict) -> Callable[[Dict], bool]:
     """Build filter function for WhatsApp messages.
 
@@ -202,19 +245,7 @@ def build_whatsapp_filter(params: Dict) -> Callable[[Dict], bool]:
     def matches(m: Dict) -> bool:
         msg_chat_id = m.get('chat_id', '')
         is_group = m.get('is_group', False)
-        group_info = m.get('group_info', {})
-
-        # Use sender_phone directly - Go RPC already resolves LIDs to phone numbers!
-        # For group messages, prefer group_info.sender_phone, fall back to root sender_phone
-        if is_group:
-            sender_phone = group_info.get('sender_phone', '') or m.get('sender_phone', '')
-        else:
-            sender_phone = m.get('sender_phone', '')
-
-        # Fallback: extract phone from sender JID if sender_phone not available
-        if not sender_phone:
-            sender = m.get('sender', '')
-            sender_phone = sender.split('@')[0] if '@' in sender else sender
+        sender_phone = _whatsapp_sender_phone(m)
 
         # Message type filter (schema field: message_type)
         if msg_type != 'all' and m.get('message_type') != msg_type:
@@ -434,6 +465,26 @@ def build_gmail_filter(params: Dict) -> Callable[[Dict], bool]:
     return matches
 
 
+def _telegram_sender_filter(params: Dict) -> str:
+    """Effective Telegram senderFilter, reconstructed from legacy params if absent."""
+    # New-style senderFilter (takes precedence)
+    sender_filter = params.get('senderFilter', '')
+    if sender_filter:
+        return sender_filter
+
+    # Legacy fallback: reconstruct from old params if senderFilter absent
+    chat_type_filter = params.get('chatTypeFilter', 'all')
+    if params.get('chat_id', ''):
+        return 'specific_chat'
+    if params.get('from_user', ''):
+        return 'specific_user'
+    if params.get('keywords', ''):
+        return 'keywords'
+    if chat_type_filter != 'all':
+        return chat_type_filter
+    return 'all'
+
+
 def build_telegram_filter(params: Dict) -> Callable[[Dict], bool]:
     """Build filter function for Telegram messages.
 
@@ -465,27 +516,7 @@ def build_telegram_filter(params: Dict) -> Callable[[Dict], bool]:
     Returns:
         Filter function that checks if event matches criteria
     """
-    # New-style senderFilter (takes precedence)
-    sender_filter = params.get('senderFilter', '')
-
-    # Legacy fallback: reconstruct from old params if senderFilter absent
-    if not sender_filter:
-        chat_type_filter = params.get('chatTypeFilter', 'all')
-        old_chat_id = params.get('chat_id', '')
-        old_from_user = params.get('from_user', '')
-        old_keywords = params.get('keywords', '')
-
-        if old_chat_id:
-            sender_filter = 'specific_chat'
-        elif old_from_user:
-            sender_filter = 'specific_user'
-        elif old_keywords:
-            sender_filter = 'keywords'
-        elif chat_type_filter != 'all':
-            sender_filter = chat_type_filter
-        else:
-            sender_filter = 'all'
-
+    sender_filter = _telegram_sender_filter(params)
     content_type_filter = params.get('contentTypeFilter', 'all')
     chat_id_filter = params.get('chat_id', '')
     from_user_filter = params.get('from_user', '')
@@ -587,6 +618,92 @@ def build_filter(node_type: str, params: Dict) -> Callable[[Dict], bool]:
     return lambda x: True
 
 
+# =============================================================================
+# INDEX KEYS - Cheap pre-filter so dispatch only runs plausible filters
+# =============================================================================
+# A waiter's index keys name message fields its filter requires. A waiter is a
+# dispatch candidate only if the message satisfies at least one of its keys;
+# waiters without keys are candidates for every event. Keys must never exclude
+# a message the filter would accept - the filter still makes the final call.
+
+
+class IndexKey(NamedTuple):
+    """Message field value a waiter's filter requires.
+
+    exact: message field == value
+    substring: value occurs in the message field (contact phone, keyword)
+    """
+    field: str
+    value: str
+    substring: bool = False
+
+
+def _keyword_keys(keywords: List[str]) -> List[IndexKey]:
+    return [IndexKey('text', kw, substring=True) for kw in keywords]
+
+
+def build_whatsapp_index_keys(params: Dict) -> List[IndexKey]:
+    """Index keys mirroring build_whatsapp_filter's chat/sender/keyword checks."""
+    sender_filter = params.get('filter', 'all')
+
+    if sender_filter == 'contact':
+        contact_phone = params.get('contactPhone', '')
+        return [IndexKey('sender', contact_phone, substring=True)] if contact_phone else []
+    if sender_filter == 'group':
+        return [IndexKey('chat', params.get('group_id') or params.get('groupId', ''))]
+    if sender_filter == 'channel':
+        channel_jid = params.get('channel_jid', '')
+        return [IndexKey('chat', channel_jid)] if channel_jid else []
+    if sender_filter == 'keywords':
+        return _keyword_keys([k.strip().lower() for k in params.get('keywords', '').split(',') if k.strip()])
+    return []
+
+
+def build_telegram_index_keys(params: Dict) -> List[IndexKey]:
+    """Index keys mirroring build_telegram_filter's chat/sender/keyword checks."""
+    sender_filter = _telegram_sender_filter(params)
+
+    if sender_filter == 'specific_chat':
+        chat_id = params.get('chat_id', '')
+        return [IndexKey('chat', str(chat_id))] if chat_id else []
+    if sender_filter == 'specific_user':
+        from_user = params.get('from_user', '')
+        return [IndexKey('from', str(from_user))] if from_user else []
+    if sender_filter in ('private', 'group', 'supergroup', 'channel'):
+        return [IndexKey('chat_type', sender_filter)]
+    if sender_filter == 'keywords':
+        return _keyword_keys([k.strip().lower() for k in params.get('keywords', '').split(',') if k.strip()])
+    return []
+
+
+# Registry of index key builders per trigger type (unlisted types are unindexed)
+INDEX_KEY_BUILDERS: Dict[str, Callable[[Dict], List[IndexKey]]] = {
+    'whatsappReceive': build_whatsapp_index_keys,
+    'telegramReceive': build_telegram_index_keys,
+}
+
+# Message field extractors per event type, matching the fields named by IndexKey
+INDEX_FIELDS: Dict[str, Dict[str, Callable[[Dict], str]]] = {
+    'whatsapp_message_received': {
+        'chat': lambda m: m.get('chat_id', ''),
+        'sender': _whatsapp_sender_phone,
+        'text': lambda m: (m.get('text') or '').lower(),
+    },
+    'telegram_message_received': {
+        'chat': lambda m: str(m.get('chat_id', '')),
+        'from': lambda m: str(m.get('from_id', '')),
+        'chat_type': lambda m: m.get('chat_type', ''),
+        'text': lambda m: (m.get('text') or '').lower(),
+    },
+}
+
+
+def build_index_keys(node_type: str, params: Dict) -> List[IndexKey]:
+    """Build index keys for the given trigger type and parameters."""
+    builder = INDEX_KEY_BUILDERS.get(node_type)
+    return builder(params) if builder else []
+
+
 # =============================================================================
 # WAITER DATA STRUCTURES
 # =============================================================================
@@ -595,8 +712,8 @@ def build_filter(node_type: str, params: Dict) -> Callable[[Dict], bool]:
 class Waiter:
     """Single event waiter.
 
-    In memory mode: uses asyncio.Future
-    In Redis mode: uses stream polling with stored metadata
+    Both modes resolve an asyncio.Future. In Redis mode the future is
+    resolved by the event type's stream dispatcher instead of dispatch().
     """
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     node_id: str = ""
@@ -604,21 +721,209 @@ class Waiter:
     event_type: str = ""
     params: Dict = field(default_factory=dict)  # Store params for Redis mode filter rebuild
     filter_fn: Callable[[Dict], bool] = field(default_factory=lambda: lambda x: True)
-    future: Optional[asyncio.Future] = None  # Only used in memory mode
+    index_keys: List[IndexKey] = field(default_factory=list)  # Empty = candidate for every event
+    future: Optional[asyncio.Future] = None
     cancelled: bool = False
     created_at: float = field(default_factory=time.time)
+    # Redis mode: stream messages up to this id predate the waiter and skip it
+    since_id: str = "0-0"
+
+
+class EventBucket:
+    """Waiters for one event type, indexed by their IndexKeys.
+
+    candidates() returns the wildcard waiters plus, per indexed field, the
+    waiters whose exact key equals the message value or whose substring key
+    occurs in it. Substring keys are found either by looking up every window
+    of the message value with a registered key length, or by testing each
+    registered key with ``in`` - whichever is fewer operations.
+    """
+
+    def __init__(self, event_type: str):
+        self.fields = INDEX_FIELDS.get(event_type, {})
+        self.waiters: Dict[str, Waiter] = {}
+        self.wildcard: Dict[str, Waiter] = {}
+        # field -> value -> {waiter_id -> Waiter}
+        self.exact: Dict[str, Dict[str, Dict[str, Waiter]]] = {}
+        self.substring: Dict[str, Dict[str, Dict[str, Waiter]]] = {}
+        # field -> {substring key length -> number of keys}
+        self.key_lengths: Dict[str, Dict[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.waiters)
+
+    def add(self, waiter: Waiter) -> None:
+        self.waiters[waiter.id] = waiter
+        if not waiter.index_keys or any(k.field not in self.fields for k in waiter.index_keys):
+            self.wildcard[waiter.id] = waiter
+            return
+        for key in waiter.index_keys:
+            index = (self.substring if key.substring else self.exact).setdefault(key.field, {})
+            bucket = index.setdefault(key.value, {})
+            if not bucket and key.substring:
+                lengths = self.key_lengths.setdefault(key.field, {})
+                lengths[len(key.value)] = lengths.get(len(key.value), 0) + 1
+            bucket[waiter.id] = waiter
+
+    def remove(self, waiter: Waiter) -> None:
+        if self.waiters.pop(waiter.id, None) is None:
+            return
+        if self.wildcard.pop(waiter.id, None) is not None:
+            return
+        for key in waiter.index_keys:
+            indexes = self.substring if key.substring else self.exact
+            index = indexes.get(key.field, {})
+            bucket = index.get(key.value)
+            if bucket is None or bucket.pop(waiter.id, None) is None or bucket:
+                continue
+            del index[key.value]
+            if not index:
+                del indexes[key.field]
+            if key.substring:
+                lengths = self.key_lengths[key.field]
+                lengths[len(key.value)] -= 1
+                if not lengths[len(key.value)]:
+                    del lengths[len(key.value)]
+                if not lengths:
+                    del self.key_lengths[key.field]
+
+    def candidates(self, data: Dict) -> Dict[str, Waiter]:
+        """Waiters whose filters could accept data."""
+        if not self.exact and not self.substring:
+            return self.wildcard
+        found = dict(self.wildcard)
+
+        for field_name, index in self.exact.items():
+            bucket = index.get(str(self.fields[field_name](data)))
+            if bucket:
+                found.update(bucket)
+
+        for field_name, index in self.substring.items():
+            value = str(self.fields[field_name](data))
+            lengths = self.key_lengths[field_name]
+            if len(index) <= len(value) * len(lengths):
+                for key, bucket in index.items():
+                    if key in value:
+                        found.update(bucket)
+                continue
+            for length in lengths:
+                for window in {value[i:i + length] for i in range(len(value) - length + 1)}:
+                    bucket = index.get(window)
+                    if bucket:
+                        found.update(bucket)
+        return found
+
+
+SUBSCRIPTION_OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+SUBSCRIPTION_BUFFER = 10_000
+
+
+@dataclass(eq=False)
+class Subscription(Waiter):
+    """Long-lived waiter that buffers every matching event until consumed.
+
+    Iterate with ``async for event in subscription``; iteration ends once
+    the subscription is closed (close(), cancel(), cancel_for_node()) and
+    its buffer is drained. Events matching between two reads wait in the
+    buffer instead of being missed.
+
+    With ``max_buffer`` events unconsumed, the overflow policy applies:
+    - drop_oldest: discard the oldest buffered event
+    - drop_newest: discard the incoming event
+    - block: in Redis mode the stream dispatcher waits for room, so events
+      stay in the stream; memory-mode dispatch() cannot wait and discards
+      the incoming event as drop_newest does
+    """
+    max_buffer: int = SUBSCRIPTION_BUFFER
+    overflow: str = "drop_oldest"
+    buffer: Deque[Dict] = field(default_factory=deque)
+    delivered: int = 0
+    dropped: int = 0
+    _ready: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    _room: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def pending(self) -> int:
+        """Buffered events not consumed yet."""
+        return len(self.buffer)
+
+    @property
+    def full(self) -> bool:
+        return len(self.buffer) >= self.max_buffer
+
+    def offer(self, data: Dict) -> bool:
+        """Buffer a matching event. Returns False if it was discarded."""
+        if self.cancelled:
+            return False
+        if self.full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"[EventWaiter] Subscription {self.id} buffer full, dropping events",
+                               node_id=self.node_id, overflow=self.overflow, dropped=self.dropped)
+            if self.overflow != "drop_oldest":
+                return False
+            self.buffer.popleft()
+        self.buffer.append(data)
+        self._ready.set()
+        return True
+
+    async def wait_for_room(self) -> None:
+        while self.full and not self.cancelled:
+            self._room.clear()
+            await self._room.wait()
+
+    def close(self) -> None:
+        self.cancelled = True
+        self._ready.set()
+        self._room.set()
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Dict:
+        while not self.buffer:
+            if self.cancelled:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        event = self.buffer.popleft()
+        self.delivered += 1
+        self._room.set()
+        return event
 
 
 # Module-level waiter storage (used in both modes for tracking)
 _waiters: Dict[str, Waiter] = {}
+# Index: event_type -> EventBucket, so dispatch only visits plausible waiters
+_event_index: Dict[str, EventBucket] = {}
 
 # Redis stream names
 EVENTS_STREAM_PREFIX = "events:"
 WAITERS_KEY_PREFIX = "waiters:"
-# NOTE: Each waiter uses its own consumer group to ensure ALL waiters receive ALL messages.
-# Redis consumer groups deliver each message to only ONE consumer in the group.
-# For trigger nodes, we want broadcast semantics where every waiter evaluates every event.
-CONSUMER_GROUP_PREFIX = "waiter_group_"  # Each waiter gets: waiter_group_{waiter_id}
+# NOTE: Streams are read with plain XREAD (no consumer groups): every process
+# sees every message, and within a process one dispatcher per stream fans each
+# message out to all local waiters (broadcast semantics).
+DISPATCHER_BLOCK_MS = 2000  # Below the Redis client's 5s socket timeout
+DISPATCHER_BATCH = 100
+# Seconds a trigger's last event id is kept: the trigger's next waiter,
+# registered within it, starts right after that event, so a one-shot trigger
+# re-registering after each event still gets what arrived in between
+TRIGGER_RESUME_WINDOW = 60.0
+
+# Redis mode: event_type -> running stream dispatcher task
+_dispatchers: Dict[str, asyncio.Task] = {}
+# Redis mode: (event_type, node_id) -> (id of the message that resolved the
+# trigger's last waiter, monotonic resolve time)
+_trigger_positions: Dict[Tuple[str, str], Tuple[str, float]] = {}
+# Subscriptions by id (also in _waiters); the dispatcher checks the
+# "block" ones for room before each message
+_subscriptions: Dict[str, Subscription] = {}
+
+# Ingress latency: receipt -> waiter resolution. In Redis mode the receipt
+# time of a stream message waits here (by message id) for the dispatcher.
+INGRESS_TRACKED = 10_000
+_ingress_times: Dict[str, float] = {}
+_ingress_latency = LatencyHistogram()
 
 
 def _get_stream_name(event_type: str) -> str:
@@ -626,6 +931,28 @@ def _get_stream_name(event_type: str) -> str:
     return f"{EVENTS_STREAM_PREFIX}{event_type}"
 
 
+def _add_waiter(waiter: Waiter) -> None:
+    _waiters[waiter.id] = waiter
+    if isinstance(waiter, Subscription):
+        _subscriptions[waiter.id] = waiter
+    bucket = _event_index.get(waiter.event_type)
+    if bucket is None:
+        bucket = _event_index[waiter.event_type] = EventBucket(waiter.event_type)
+    bucket.add(waiter)
+
+
+def _remove_waiter(waiter_id: str) -> Optional[Waiter]:
+    waiter = _waiters.pop(waiter_id, None)
+    _subscriptions.pop(waiter_id, None)
+    if waiter:
+        bucket = _event_index.get(waiter.event_type)
+        if bucket is not None:
+            bucket.remove(waiter)
+            if not bucket:
+                del _event_index[waiter.event_type]
+    return waiter
+
+
 # =============================================================================
 # WAITER REGISTRATION
 # =============================================================================
@@ -652,47 +979,89 @@ async def register(node_type: str, node_id: str, params: Dict) -> Waiter:
         event_type=config.event_type,
         params=params,
         filter_fn=build_filter(node_type, params),
+        index_keys=build_index_keys(node_type, params),
+    )
+
+    try:
+        loop = asyncio.get_running_loop()
+        waiter.future = loop.create_future()
+    except RuntimeError:
+        waiter.future = asyncio.get_event_loop().create_future()
+
+    await _activate(waiter)
+    return waiter
+
+
+async def subscribe(node_type: str, node_id: str, params: Dict,
+                    max_buffer: int = SUBSCRIPTION_BUFFER,
+                    overflow: str = "drop_oldest") -> Subscription:
+    """Register a long-lived subscription for a trigger node.
+
+    Args:
+        node_type: Type of trigger node (e.g., 'whatsappReceive')
+        node_id: ID of the node subscribing
+        params: Node parameters for building filter
+        max_buffer: Unconsumed events kept before the overflow policy applies
+        overflow: drop_oldest | drop_newest | block
+
+    Returns:
+        Subscription to iterate with ``async for``
+    """
+    config = get_trigger_config(node_type)
+    if not config:
+        raise ValueError(f"Unknown trigger type: {node_type}")
+    if overflow not in SUBSCRIPTION_OVERFLOW_POLICIES:
+        logger.warning(f"[EventWaiter] Unknown subscription overflow policy {overflow!r}, using drop_oldest")
+        overflow = "drop_oldest"
+
+    subscription = Subscription(
+        node_id=node_id,
+        node_type=node_type,
+        event_type=config.event_type,
+        params=params,
+        filter_fn=build_filter(node_type, params),
+        index_keys=build_index_keys(node_type, params),
+        max_buffer=max(1, max_buffer),
+        overflow=overflow,
     )
+    await _activate(subscription)
+    return subscription
+
 
+async def _activate(waiter: Waiter) -> None:
+    """Index a new waiter (and record it in Redis in Redis mode)."""
+    node_type = waiter.node_type
     if is_redis_mode():
         # Redis mode: store waiter metadata in Redis
         cache = get_cache_service()
         waiter_key = f"{WAITERS_KEY_PREFIX}{waiter.id}"
 
-        # Each waiter gets its own consumer group for broadcast semantics
-        # This ensures ALL waiters receive ALL messages (not load-balanced)
-        consumer_group = f"{CONSUMER_GROUP_PREFIX}{waiter.id}"
-
         waiter_data = {
             "id": waiter.id,
-            "node_id": node_id,
+            "node_id": waiter.node_id,
             "node_type": node_type,
-            "event_type": config.event_type,
-            "params": json.dumps(params),
+            "event_type": waiter.event_type,
+            "params": json.dumps(waiter.params),
             "created_at": waiter.created_at,
-            "consumer_group": consumer_group,  # Store for cleanup
         }
         await cache.set(waiter_key, waiter_data, ttl=86400)  # 24 hour TTL
 
-        # Create unique consumer group for this waiter
-        # start_id='$' means only new messages from this point forward
-        stream_name = _get_stream_name(config.event_type)
-        await cache.stream_create_group(stream_name, consumer_group, start_id='$')
+        position = _trigger_positions.pop((waiter.event_type, waiter.node_id), None)
+        if position is not None and time.monotonic() - position[1] <= TRIGGER_RESUME_WINDOW:
+            # Same trigger re-registering after its event: nothing between is lost
+            waiter.since_id = position[0]
+        else:
+            # New trigger: only events from now on, not what is already on the stream
+            waiter.since_id = await cache.stream_last_id(_get_stream_name(waiter.event_type)) or '0-0'
+        _add_waiter(waiter)
+        # Events added to the stream from here on reach this waiter
+        await _ensure_dispatcher(waiter.event_type)
 
         logger.debug(f"[EventWaiter] Registered {node_type} waiter {waiter.id} (Redis)")
     else:
-        # Memory mode: create asyncio.Future
-        try:
-            loop = asyncio.get_running_loop()
-            waiter.future = loop.create_future()
-        except RuntimeError:
-            waiter.future = asyncio.get_event_loop().create_future()
-
+        _add_waiter(waiter)
         logger.debug(f"[EventWaiter] Registered {node_type} waiter {waiter.id}")
 
-    _waiters[waiter.id] = waiter
-    return waiter
-
 
 async def wait_for_event(waiter: Waiter, timeout: Optional[float] = None) -> Dict:
     """Wait for an event matching the waiter's filter.
@@ -730,77 +1099,113 @@ async def _wait_memory(waiter: Waiter, timeout: Optional[float]) -> Dict:
 
 
 async def _wait_redis(waiter: Waiter, timeout: Optional[float]) -> Dict:
-    """Wait using Redis Streams polling.
+    """Wait for the event type's stream dispatcher to resolve the waiter (Redis mode)."""
+    await _ensure_dispatcher(waiter.event_type)
+    return await _wait_memory(waiter, timeout)
 
-    Polls the event stream with blocking XREAD, checking each message against the filter.
-    Each waiter has its own consumer group for broadcast semantics.
-    """
-    cache = get_cache_service()
-    stream_name = _get_stream_name(waiter.event_type)
 
-    # Use waiter-specific consumer group for broadcast (all waiters see all messages)
-    consumer_group = f"{CONSUMER_GROUP_PREFIX}{waiter.id}"
-    consumer_name = f"consumer_{waiter.id}"
+# =============================================================================
+# REDIS STREAM DISPATCHERS
+# =============================================================================
 
-    # Start reading from now (new messages only)
-    block_ms = 5000  # 5 second blocks to allow cancellation checks
+def _stream_id(msg_id: str) -> Tuple[int, int]:
+    """Sortable form of a stream message id ('<ms>-<seq>')."""
+    ms, _, seq = msg_id.partition('-')
+    return int(ms), int(seq or 0)
 
-    start_time = time.time()
 
-    while not waiter.cancelled:
-        # Check timeout
-        if timeout and (time.time() - start_time) > timeout:
-            raise asyncio.TimeoutError(f"Waiter {waiter.id} timed out after {timeout}s")
+async def _ensure_dispatcher(event_type: str) -> None:
+    """Start the stream dispatcher for event_type if it is not running.
 
-        # Read from stream with blocking using waiter's own consumer group
-        try:
-            result = await cache.stream_read_group(
-                consumer_group,  # Each waiter has its own group
-                consumer_name,
-                {stream_name: '>'},  # '>' = new messages for this consumer
-                count=10,
-                block=block_ms
-            )
-
-            if not result:
-                # No messages, continue polling
+    It starts at the oldest ``since_id`` of the event type's waiters, which
+    each skip the messages that predate them.
+    """
+    task = _dispatchers.get(event_type)
+    if task and not task.done():
+        return
+    bucket = _event_index.get(event_type)
+    if not bucket:
+        return
+
+    last_id = min((w.since_id for w in bucket.waiters.values()), key=_stream_id)
+    _dispatchers[event_type] = asyncio.create_task(
+        _run_dispatcher(event_type, last_id), name=f"event_dispatcher:{event_type}"
+    )
+    logger.debug(f"[EventWaiter] Started dispatcher for {_get_stream_name(event_type)} at {last_id}")
+
+
+async def _run_dispatcher(event_type: str, last_id: str) -> None:
+    """Read an event-type stream once and fan messages out to local waiters.
+
+    Exits when the event type has no waiters left, without consuming the
+    messages it had not fanned out yet; register() starts a new dispatcher
+    on demand.
+    """
+    cache = get_cache_service()
+    stream_name = _get_stream_name(event_type)
+
+    try:
+        while _event_index.get(event_type):
+            try:
+                result = await cache.redis.xread(
+                    {stream_name: last_id}, count=DISPATCHER_BATCH, block=DISPATCHER_BLOCK_MS
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[EventWaiter] Stream read failed for {stream_name}: {e}")
+                await asyncio.sleep(1)
                 continue
 
-            # Process messages
-            for stream_data in result:
-                stream, messages = stream_data
+            for _stream, messages in result or []:
                 for msg_id, fields in messages:
-                    # Deserialize event data
-                    event_data = {}
-                    for k, v in fields.items():
-                        try:
-                            event_data[k] = json.loads(v)
-                        except (json.JSONDecodeError, TypeError):
-                            event_data[k] = v
-
-                    # Check filter
-                    if waiter.filter_fn(event_data):
-                        # Match found - acknowledge and return
-                        await cache.stream_ack(stream_name, consumer_group, msg_id)
-                        _cleanup_waiter(waiter.id)
-                        logger.info(f"[EventWaiter] Waiter {waiter.id} matched event {msg_id}")
-                        return event_data
-                    else:
-                        # No match - acknowledge but continue waiting
-                        await cache.stream_ack(stream_name, consumer_group, msg_id)
-
-        except asyncio.CancelledError:
-            _cleanup_waiter(waiter.id)
-            raise
-
-    # Waiter was cancelled via cancel() flag
-    _cleanup_waiter(waiter.id)
-    raise asyncio.CancelledError(f"Waiter {waiter.id} cancelled")
+                    await _wait_for_room(event_type)
+                    if not _event_index.get(event_type):
+                        break  # Left for the next dispatcher
+                    last_id = msg_id
+                    resolved = _resolve_waiters(event_type, _decode_fields(fields), msg_id)
+                    received_at = _ingress_times.pop(msg_id, None)
+                    if resolved:
+                        _record_ingress(received_at)
+    finally:
+        if _dispatchers.get(event_type) is asyncio.current_task():
+            del _dispatchers[event_type]
+
+
+async def _wait_for_room(event_type: str) -> None:
+    """Hold the dispatcher while a "block" subscription to event_type is full.
+
+    Unread messages stay in the stream meanwhile.
+    """
+    for subscription in list(_subscriptions.values()):
+        if subscription.event_type == event_type and subscription.overflow == "block":
+            await subscription.wait_for_room()
+
+
+def _record_ingress(received_at: Optional[float]) -> None:
+    if received_at is not None:
+        _ingress_latency.record(time.perf_counter() - received_at)
+
+
+def get_ingress_latency() -> Dict[str, Any]:
+    """Latency histogram from event receipt to waiter resolution (events passing received_at)."""
+    return _ingress_latency.snapshot()
+
+
+def _decode_fields(fields: Dict) -> Dict:
+    """Decode stream message fields (stream_add JSON-encodes every value)."""
+    event_data = {}
+    for k, v in fields.items():
+        try:
+            event_data[k] = json.loads(v)
+        except (json.JSONDecodeError, TypeError):
+            event_data[k] = v
+    return event_data
 
 
 def _cleanup_waiter(waiter_id: str) -> None:
     """Remove waiter from storage."""
-    _waiters.pop(waiter_id, None)
+    _remove_waiter(waiter_id)
 
     # Also remove from Redis if in Redis mode
     if is_redis_mode():
@@ -813,12 +1218,14 @@ def _cleanup_waiter(waiter_id: str) -> None:
 # EVENT DISPATCH
 # =============================================================================
 
-async def dispatch_async(event_type: str, data: Dict) -> int:
+async def dispatch_async(event_type: str, data: Dict, received_at: Optional[float] = None) -> int:
     """Dispatch event asynchronously (for Redis mode).
 
     Args:
         event_type: Type of event (e.g., 'whatsapp_message_received')
         data: Event data
+        received_at: time.perf_counter() at ingress; if given, the time until
+            a waiter resolves goes into the ingress latency histogram
 
     Returns:
         1 if event was added to stream, 0 otherwise
@@ -831,11 +1238,19 @@ async def dispatch_async(event_type: str, data: Dict) -> int:
         msg_id = await cache.stream_add(stream_name, data)
         if msg_id:
             logger.debug(f"[EventWaiter] Added event to stream {stream_name}: {msg_id}")
+            if received_at is not None and _event_index.get(event_type):
+                # Resolved by this process's dispatcher, which records the latency
+                _ingress_times[msg_id] = received_at
+                if len(_ingress_times) > INGRESS_TRACKED:
+                    del _ingress_times[next(iter(_ingress_times))]
             return 1
         return 0
     else:
         # Fall back to sync dispatch for memory mode
-        return dispatch(event_type, data)
+        resolved = dispatch(event_type, data)
+        if resolved:
+            _record_ingress(received_at)
+        return resolved
 
 
 def dispatch(event_type: str, data: Dict) -> int:
@@ -865,25 +1280,43 @@ def dispatch(event_type: str, data: Dict) -> int:
                 asyncio.run_coroutine_threadsafe(dispatch_async(event_type, data), _main_loop)
             else:
                 logger.warning(f"[EventWaiter] No event loop available for dispatch of {event_type}")
-        return 0  # Actual resolution happens in _wait_redis
+        return 0  # Actual resolution happens in the stream dispatcher
 
-    resolved = 0
-    to_remove = []
+    return _resolve_waiters(event_type, data)
+
+
+def _resolve_waiters(event_type: str, data: Dict, msg_id: Optional[str] = None) -> int:
+    """Resolve every waiter for event_type whose filter matches data.
 
-    matching_waiters = [(wid, w) for wid, w in _waiters.items()
-                        if w.event_type == event_type and w.future and not w.future.done()]
+    msg_id is the stream message id in Redis mode; waiters registered after
+    that message (``since_id``) are skipped.
+    """
+    bucket = _event_index.get(event_type)
+    candidates = bucket.candidates(data) if bucket else {}
+    matching_waiters = [(wid, w) for wid, w in candidates.items()
+                        if isinstance(w, Subscription) or (w.future and not w.future.done())]
+    if msg_id is not None:
+        msg_key = _stream_id(msg_id)
+        matching_waiters = [(wid, w) for wid, w in matching_waiters if msg_key > _stream_id(w.since_id)]
 
     if not matching_waiters:
         logger.debug(f"[EventWaiter] No active waiters for {event_type} (total waiters: {len(_waiters)})")
-    else:
-        logger.info(f"[EventWaiter] Dispatching {event_type} to {len(matching_waiters)} waiter(s)",
-                    event_type=event_type, from_id=data.get('from_id'), text=str(data.get('text', ''))[:50])
+        return 0
+
+    logger.info(f"[EventWaiter] Dispatching {event_type} to {len(matching_waiters)} waiter(s)",
+                event_type=event_type, from_id=data.get('from_id'), text=str(data.get('text', ''))[:50])
 
+    resolved = 0
     for wid, w in matching_waiters:
         try:
             if w.filter_fn(data):
+                if isinstance(w, Subscription):
+                    resolved += w.offer(data)
+                    continue
                 w.future.set_result(data)
-                to_remove.append(wid)
+                _cleanup_waiter(wid)
+                if msg_id is not None:
+                    _record_trigger_position(w, msg_id)
                 resolved += 1
                 logger.info(f"[EventWaiter] Resolved {w.node_type} waiter {wid}")
             else:
@@ -891,22 +1324,30 @@ def dispatch(event_type: str, data: Dict) -> int:
         except Exception as e:
             logger.error(f"[EventWaiter] Filter error for waiter {wid}: {e}")
 
-    for wid in to_remove:
-        _waiters.pop(wid, None)
-
     return resolved
 
 
+def _record_trigger_position(waiter: Waiter, msg_id: str) -> None:
+    """Remember the event that resolved a waiter for its trigger's next one."""
+    now = time.monotonic()
+    for key, (_, at) in list(_trigger_positions.items()):
+        if now - at > TRIGGER_RESUME_WINDOW:
+            del _trigger_positions[key]
+    _trigger_positions[(waiter.event_type, waiter.node_id)] = (msg_id, now)
+
+
 # =============================================================================
 # WAITER CANCELLATION
 # =============================================================================
 
 def cancel(waiter_id: str) -> bool:
     """Cancel a waiter by ID."""
-    if w := _waiters.pop(waiter_id, None):
+    if w := _remove_waiter(waiter_id):
         w.cancelled = True
 
-        if w.future and not w.future.done():
+        if isinstance(w, Subscription):
+            w.close()
+        elif w.future and not w.future.done():
             w.future.cancel()
 
         # Also remove from Redis if in Redis mode
@@ -945,6 +1386,8 @@ def get_active_waiters() -> List[Dict[str, Any]]:
             "cancelled": w.cancelled,
             "age_seconds": time.time() - w.created_at,
             "mode": "redis" if is_redis_mode() else "memory",
+            **({"subscription": True, "pending": w.pending, "delivered": w.delivered,
+                "dropped": w.dropped} if isinstance(w, Subscription) else {}),
         }
         for w in _waiters.values()
     ]
@@ -955,9 +1398,16 @@ def clear_all() -> int:
     count = len(_waiters)
     for w in _waiters.values():
         w.cancelled = True
-        if w.future and not w.future.done():
+        if isinstance(w, Subscription):
+            w.close()
+        elif w.future and not w.future.done():
             w.future.cancel()
     _waiters.clear()
+    _subscriptions.clear()
+    _event_index.clear()
+    _trigger_positions.clear()
+    _ingress_times.clear()
+    _ingress_latency.reset()
 
     # Clear Redis waiter keys if in Redis mode
     if is_redis_mode():
@@ -14,12 +14,18 @@ from .models import (
     ExecutionContext,
     NodeExecution,
     RetryPolicy,
+    MemoPolicy,
     DLQEntry,
     hash_inputs,
     generate_cache_key,
+    generate_memo_key,
     get_retry_policy,
+    get_memo_policy,
     DEFAULT_RETRY_POLICIES,
+    DEFAULT_MEMO_POLICIES,
 )
+from .graph import WorkflowGraph
+from .memo import NodeMemo
 from .executor import WorkflowExecutor
 from .cache import ExecutionCache
 from .recovery import (
@@ -49,11 +55,19 @@ __all__ = [
     "ExecutionContext",
     "NodeExecution",
     "RetryPolicy",
+    "MemoPolicy",
     "DLQEntry",
     "hash_inputs",
     "generate_cache_key",
+    "generate_memo_key",
     "get_retry_policy",
+    "get_memo_policy",
     "DEFAULT_RETRY_POLICIES",
+    "DEFAULT_MEMO_POLICIES",
+    # Graph
+    "WorkflowGraph",
+    # Memoization
+    "NodeMemo",
     # Executor
     "WorkflowExecutor",
     # Cache
@@ -11,6 +11,7 @@ import asyncio
 import json
 import time
 import uuid
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from typing import Dict, Any, List, Optional, Set, Union
 
@@ -43,21 +44,31 @@ class ExecutionCache:
         execution:{id}:outputs   -> HASH {node_id -> output JSON}
         execution:{id}:events    -> STREAM (immutable event log)
         result:{exec}:{node}:{hash} -> JSON (cached result)
+        memo:{type}:{ver}:{hash} -> JSON (cross-run memoized result)
         executions:active        -> SET {execution_ids}
         lock:execution:{id}      -> STRING (lock token)
         heartbeat:{exec}:{node}  -> STRING (timestamp)
     """
 
-    def __init__(self, cache_service: CacheService):
+    def __init__(self, cache_service: CacheService, memo_max_entries: int = 1000):
         self.cache = cache_service
         self._local_locks: Dict[str, asyncio.Lock] = {}
+        # LRU index for memoized results on memory/SQLite backends
+        # (Redis expires memo keys natively). memo_key -> expires_at
+        self.memo_max_entries = memo_max_entries
+        self._memo_lru: "OrderedDict[str, float]" = OrderedDict()
 
     # =========================================================================
     # EXECUTION STATE PERSISTENCE
     # =========================================================================
 
     async def save_execution_state(self, ctx: ExecutionContext) -> bool:
-        """Persist execution context to Redis.
+        """Persist execution context incrementally.
+
+        Only node records and outputs that changed since the previous save are
+        written (see ExecutionContext.collect_delta); each output is stored
+        once under its own field instead of being re-serialized with the
+        whole context. On Redis all writes go out in a single pipeline.
 
         Args:
             ctx: ExecutionContext to save
@@ -65,38 +76,57 @@ class ExecutionCache:
         Returns:
             True if saved successfully
         """
+        dirty_nodes, dirty_outputs = ctx.collect_delta()
         try:
-            key = f"execution:{ctx.execution_id}:state"
-            data = ctx.to_dict()
+            prefix = f"execution:{ctx.execution_id}"
+            header = ctx.header_dict()
+            terminal = ctx.status in (WorkflowStatus.COMPLETED, WorkflowStatus.FAILED,
+                                      WorkflowStatus.CANCELLED)
 
-            # Use Redis HSET for structured storage
             if self.cache.is_redis_available():
-                mapping = {
+                pipe = self.cache.redis.pipeline(transaction=False)
+                pipe.hset(f"{prefix}:state", mapping={
                     k: json.dumps(v) if isinstance(v, (dict, list)) else str(v)
-                    for k, v in data.items()
-                }
-                if mapping:  # Only call hset if mapping is not empty
-                    await self.cache.redis.hset(key, mapping=mapping)
+                    for k, v in header.items()
+                })
+                if dirty_nodes:
+                    pipe.hset(f"{prefix}:nodes", mapping={
+                        k: json.dumps(v) for k, v in dirty_nodes.items()
+                    })
+                if dirty_outputs:
+                    pipe.hset(f"{prefix}:outputs", mapping={
+                        k: json.dumps(v, default=str) for k, v in dirty_outputs.items()
+                    })
                 # Set TTL (24 hours for completed, no TTL for active)
-                if ctx.status in (WorkflowStatus.COMPLETED, WorkflowStatus.FAILED,
-                                  WorkflowStatus.CANCELLED):
-                    await self.cache.redis.expire(key, 86400)
+                if terminal:
+                    for suffix in ("state", "nodes", "outputs"):
+                        pipe.expire(f"{prefix}:{suffix}", 86400)
 
                 # Track active executions
                 if ctx.status == WorkflowStatus.RUNNING:
-                    await self.cache.redis.sadd("executions:active", ctx.execution_id)
+                    pipe.sadd("executions:active", ctx.execution_id)
                 else:
-                    await self.cache.redis.srem("executions:active", ctx.execution_id)
+                    pipe.srem("executions:active", ctx.execution_id)
+                await pipe.execute()
 
                 logger.debug("Saved execution state", execution_id=ctx.execution_id,
-                           status=ctx.status.value)
+                           status=ctx.status.value, dirty_nodes=len(dirty_nodes),
+                           dirty_outputs=len(dirty_outputs))
                 return True
             else:
-                # Fallback to simple key-value
-                await self.cache.set(key, data, ttl=86400)
+                # Fallback to simple key-value: one key per node record/output
+                for node_id, record in dirty_nodes.items():
+                    await self.cache.set(f"{prefix}:node:{node_id}", record, ttl=86400)
+                for node_id, output in dirty_outputs.items():
+                    await self.cache.set(f"{prefix}:output:{node_id}", output, ttl=86400)
+                header["node_ids"] = list(ctx.node_executions)
+                header["output_ids"] = list(ctx.outputs)
+                await self.cache.set(f"{prefix}:state", header, ttl=86400)
                 return True
 
         except Exception as e:
+            # Next save must rewrite what this one failed to persist
+            ctx.reset_delta()
             logger.error("Failed to save execution state", execution_id=ctx.execution_id,
                         error=str(e))
             return False
@@ -115,10 +145,14 @@ class ExecutionCache:
             ExecutionContext if found, None otherwise
         """
         try:
-            key = f"execution:{execution_id}:state"
+            prefix = f"execution:{execution_id}"
 
             if self.cache.is_redis_available():
-                raw_data = await self.cache.redis.hgetall(key)
+                pipe = self.cache.redis.pipeline(transaction=False)
+                pipe.hgetall(f"{prefix}:state")
+                pipe.hgetall(f"{prefix}:nodes")
+                pipe.hgetall(f"{prefix}:outputs")
+                raw_data, raw_nodes, raw_outputs = await pipe.execute()
                 if not raw_data:
                     return None
 
@@ -133,13 +167,35 @@ class ExecutionCache:
                     except (json.JSONDecodeError, TypeError):
                         data[key_str] = val_str
 
-                return ExecutionContext.from_dict(data, nodes, edges)
+                # States written before incremental persistence keep
+                # node_executions/outputs inline in the state hash
+                if raw_nodes:
+                    data["node_executions"] = {
+                        ensure_str(k): json.loads(ensure_str(v)) for k, v in raw_nodes.items()
+                    }
+                if raw_outputs:
+                    data["outputs"] = {
+                        ensure_str(k): json.loads(ensure_str(v)) for k, v in raw_outputs.items()
+                    }
             else:
                 # Fallback to simple key-value
-                data = await self.cache.get(key)
-                if data:
-                    return ExecutionContext.from_dict(data, nodes, edges)
-                return None
+                data = await self.cache.get(f"{prefix}:state")
+                if not data:
+                    return None
+                if "node_ids" in data:
+                    data["node_executions"] = {}
+                    for node_id in data.pop("node_ids"):
+                        record = await self.cache.get(f"{prefix}:node:{node_id}")
+                        if record:
+                            data["node_executions"][node_id] = record
+                    data["outputs"] = {
+                        node_id: await self.cache.get(f"{prefix}:output:{node_id}")
+                        for node_id in data.pop("output_ids", [])
+                    }
+
+            ctx = ExecutionContext.from_dict(data, nodes, edges)
+            ctx.collect_delta()  # Everything loaded is already persisted
+            return ctx
 
         except Exception as e:
             logger.error("Failed to load execution state", execution_id=execution_id,
@@ -174,6 +230,8 @@ class ExecutionCache:
             if self.cache.is_redis_available():
                 keys = [
                     f"execution:{execution_id}:state",
+                    f"execution:{execution_id}:nodes",
+                    f"execution:{execution_id}:outputs",
                     f"execution:{execution_id}:events",
                 ]
                 await self.cache.redis.delete(*keys)
@@ -236,6 +294,74 @@ class ExecutionCache:
             logger.error("Failed to cache result", node_id=node_id, error=str(e))
             return False
 
+    # =========================================================================
+    # CROSS-RUN MEMOIZATION
+    # =========================================================================
+
+    async def get_memoized_result(self, memo_key: str) -> Optional[Dict[str, Any]]:
+        """Get a memoized node result by content-addressed key.
+
+        On memory/SQLite backends the LRU index enforces TTL and recency.
+        SQLite entries written before a restart are adopted into the index on
+        first hit (SQLite still expires them natively).
+
+        Args:
+            memo_key: Key from generate_memo_key()
+
+        Returns:
+            Memoized result if found and fresh, None otherwise
+        """
+        try:
+            if not self.cache.is_redis_available():
+                expires_at = self._memo_lru.get(memo_key)
+                if expires_at is None:
+                    if not self.cache.use_sqlite:
+                        return None
+                    result = await self.cache.get(memo_key)
+                    if result is not None:
+                        await self._memo_track(memo_key, float("inf"))
+                    return result
+                if expires_at <= time.time():
+                    self._memo_lru.pop(memo_key, None)
+                    await self.cache.delete(memo_key)
+                    return None
+                self._memo_lru.move_to_end(memo_key)
+            return await self.cache.get(memo_key)
+        except Exception as e:
+            logger.error("Failed to get memoized result", memo_key=memo_key, error=str(e))
+            return None
+
+    async def set_memoized_result(self, memo_key: str, result: Dict[str, Any],
+                                  ttl: int = 3600) -> bool:
+        """Store a memoized node result.
+
+        Memory/SQLite backends are bounded to memo_max_entries, evicting the
+        least recently used entry first.
+
+        Args:
+            memo_key: Key from generate_memo_key()
+            result: Node result to memoize
+            ttl: Time-to-live in seconds
+
+        Returns:
+            True if stored successfully
+        """
+        try:
+            if not self.cache.is_redis_available():
+                await self._memo_track(memo_key, time.time() + ttl)
+            return await self.cache.set(memo_key, result, ttl=ttl)
+        except Exception as e:
+            logger.error("Failed to memoize result", memo_key=memo_key, error=str(e))
+            return False
+
+    async def _memo_track(self, memo_key: str, expires_at: float) -> None:
+        """Record memo_key as most recently used, evicting past the size bound."""
+        self._memo_lru[memo_key] = expires_at
+        self._memo_lru.move_to_end(memo_key)
+        while len(self._memo_lru) > self.memo_max_entries:
+            evicted, _ = self._memo_lru.popitem(last=False)
+            await self.cache.delete(evicted)
+
     # =========================================================================
     # DISTRIBUTED LOCKING (Conductor pattern)
     # =========================================================================
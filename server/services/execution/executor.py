@@ -10,7 +10,7 @@ Implements:
 
 import asyncio
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Callable, Awaitable, Set
 
@@ -23,8 +23,11 @@ from .models import (
     NodeExecution,
     hash_inputs,
     get_retry_policy,
+    get_memo_policy,
 )
 from .cache import ExecutionCache
+from .graph import WorkflowGraph
+from .memo import NodeMemo
 from .conditions import evaluate_condition
 from .dlq import create_dlq_handler
 
@@ -87,7 +90,9 @@ class WorkflowExecutor:
 
     async def execute_workflow(self, workflow_id: str, nodes: List[Dict],
                                edges: List[Dict], session_id: str = "default",
-                               enable_caching: bool = True) -> Dict[str, Any]:
+                               enable_caching: bool = True,
+                               enable_memoization: bool = False,
+                               graph: Optional[WorkflowGraph] = None) -> Dict[str, Any]:
         """Execute a workflow with parallel node execution.
 
         Args:
@@ -96,6 +101,9 @@ class WorkflowExecutor:
             edges: List of edges connecting nodes
             session_id: Session identifier
             enable_caching: Whether to use result caching
+            enable_memoization: Reuse results of deterministic nodes across runs
+            graph: Precompiled graph of nodes/edges (a deployment run plan's);
+                forked for this run, its execution layers computed once
 
         Returns:
             Execution result dict
@@ -108,10 +116,18 @@ class WorkflowExecutor:
             session_id=session_id,
             nodes=nodes,
             edges=edges,
+            graph=graph.fork(nodes) if graph is not None else None,
         )
-
-        # Compute execution layers (for parallel batches)
-        ctx.execution_order = self._compute_execution_layers(nodes, edges)
+        ctx.memoize = enable_memoization
+
+        # Compute execution layers (for parallel batches); a precompiled
+        # graph keeps them for its next runs
+        if graph is not None:
+            if graph.layers is None:
+                graph.layers = self._compute_execution_layers(graph)
+            ctx.execution_order = [list(layer) for layer in graph.layers]
+        else:
+            ctx.execution_order = self._compute_execution_layers(ctx.graph)
 
         logger.info("Starting workflow execution",
                    execution_id=ctx.execution_id,
@@ -153,7 +169,7 @@ class WorkflowExecutor:
                 "execution_time": ctx.completed_at - ctx.started_at,
             })
 
-            return {
+            result = {
                 "success": ctx.status == WorkflowStatus.COMPLETED,
                 "execution_id": ctx.execution_id,
                 "status": ctx.status.value,
@@ -163,6 +179,9 @@ class WorkflowExecutor:
                 "execution_time": time.time() - start_time,
                 "timestamp": datetime.now().isoformat(),
             }
+            if ctx.memoize:
+                result["memo"] = dict(ctx.memo_stats)
+            return result
 
         except asyncio.CancelledError:
             ctx.status = WorkflowStatus.CANCELLED
@@ -396,8 +415,8 @@ class WorkflowExecutor:
                         ctx.add_checkpoint(node.node_id)
                         logger.info("Node completed", node_id=node.node_id)
 
-                        # Find nodes that are now ready (their dependencies just completed)
-                        newly_ready = self._find_ready_nodes(ctx)
+                        # Release dependents - O(out-degree), no full rescan
+                        newly_ready = self._find_newly_ready_nodes(ctx, node.node_id)
 
                 except asyncio.CancelledError:
                     node.status = TaskStatus.CANCELLED
@@ -803,7 +822,7 @@ class WorkflowExecutor:
 
         # Build execution context for node handler
         # workflow_id is included for per-workflow status scoping (n8n pattern)
-        logger.info(f"[Executor] Building context for {node.node_id}, ctx.outputs keys: {list(ctx.outputs.keys())}")
+        logger.debug("[Executor] Building context", node_id=node.node_id, output_count=len(ctx.outputs))
         exec_context = {
             "nodes": ctx.nodes,
             "edges": ctx.edges,
@@ -812,8 +831,15 @@ class WorkflowExecutor:
             "workflow_id": ctx.workflow_id,  # For per-workflow status broadcasts
             "start_time": node.started_at,
             "outputs": ctx.outputs,  # Previous node outputs
+            "key_index": ctx.graph.key_index,  # Run plan's template key index (None otherwise)
         }
-        logger.info(f"[Executor] exec_context['outputs'] keys: {list(exec_context['outputs'].keys())}")
+
+        # Cross-run memoization: lookup happens in the node executor once
+        # parameters are resolved
+        if ctx.memoize:
+            policy = get_memo_policy(node.node_type)
+            if policy:
+                exec_context["memo"] = NodeMemo(self.cache, policy, inputs, ctx.memo_stats)
 
         # Call the actual node executor
         result = await self.node_executor(
@@ -866,8 +892,7 @@ class WorkflowExecutor:
     # DAG ANALYSIS
     # =========================================================================
 
-    def _compute_execution_layers(self, nodes: List[Dict],
-                                   edges: List[Dict]) -> List[List[str]]:
+    def _compute_execution_layers(self, graph: WorkflowGraph) -> List[List[str]]:
         """Compute execution layers for parallel execution.
 
         Nodes in the same layer have no dependencies on each other
@@ -882,97 +907,49 @@ class WorkflowExecutor:
         they don't execute as independent workflow nodes.
 
         Args:
-            nodes: List of workflow nodes
-            edges: List of edges
+            graph: Compiled WorkflowGraph of the execution
 
         Returns:
             List of layers, where each layer is a list of node IDs
         """
-        from constants import CONFIG_NODE_TYPES, TOOLKIT_NODE_TYPES, AI_AGENT_TYPES
-
-        # Build node type lookup for trigger detection
-        node_types: Dict[str, str] = {
-            node["id"]: node.get("type", "unknown") for node in nodes
-        }
-
-        # Find toolkit sub-nodes (nodes that connect TO a toolkit)
-        toolkit_node_ids = {n.get("id") for n in nodes if n.get("type") in TOOLKIT_NODE_TYPES}
-
-        # Find AI Agent nodes (all agent types have config handles)
-        ai_agent_node_ids = {n.get("id") for n in nodes if n.get("type") in AI_AGENT_TYPES}
+        node_types = graph.node_types
 
-        subnode_ids: set = set()
-        for edge in edges:
-            source = edge.get("source")
-            target = edge.get("target")
-            target_handle = edge.get("targetHandle")
-
-            # Any node that connects TO a toolkit is a sub-node
-            if target in toolkit_node_ids and source:
-                subnode_ids.add(source)
-
-            # Nodes connected to AI Agent config handles are sub-nodes
-            # These handles: input-memory, input-tools, input-skill, input-teammates
-            if target in ai_agent_node_ids and source and target_handle:
-                if target_handle in ('input-memory', 'input-tools', 'input-skill', 'input-teammates'):
-                    subnode_ids.add(source)
-
-        # Filter out config nodes and sub-nodes from execution
-        excluded_ids = set()
-        for node in nodes:
-            node_id = node.get("id")
-            node_type = node.get("type", "unknown")
-            if node_type in CONFIG_NODE_TYPES or node_id in subnode_ids:
-                excluded_ids.add(node_id)
-
-        # Build adjacency and in-degree maps (excluding filtered nodes)
+        # Build adjacency and in-degree maps (excluding config nodes and sub-nodes)
         in_degree: Dict[str, int] = defaultdict(int)
         adjacency: Dict[str, List[str]] = defaultdict(list)
-        node_ids = {node["id"] for node in nodes if node["id"] not in excluded_ids}
+        node_ids = {node_id for node_id in graph.nodes_by_id if node_id not in graph.excluded_ids}
 
-        for edge in edges:
+        for edge in graph.edges:
             source = edge.get("source")
             target = edge.get("target")
             if source in node_ids and target in node_ids:
                 adjacency[source].append(target)
                 in_degree[target] += 1
 
-        # Initialize in-degree for all nodes
-        for node_id in node_ids:
-            if node_id not in in_degree:
-                in_degree[node_id] = 0
-
         # Kahn's algorithm for topological sort with layers
         layers = []
-        remaining = set(node_ids)
+        layer = [node_id for node_id in node_ids if in_degree[node_id] == 0]
+        remaining = len(node_ids)
         is_first_layer = True
 
         while remaining:
-            # Find all nodes with in-degree 0 (no dependencies)
-            layer = [
-                node_id for node_id in remaining
-                if in_degree[node_id] == 0
-            ]
-
             if not layer:
                 # Cycle detected or stuck
-                logger.warning("Cycle detected or no start nodes",
-                              remaining=list(remaining))
+                stuck = [node_id for node_id in node_ids if in_degree[node_id] > 0]
+                logger.warning("Cycle detected or no start nodes", remaining=stuck)
                 # Add remaining as single layer to avoid infinite loop
-                layers.append(list(remaining))
+                layers.append(stuck)
                 break
 
             # For layer 0, validate that starting nodes are trigger nodes
             if is_first_layer:
                 trigger_nodes = []
-                non_trigger_nodes = []
 
                 for node_id in layer:
                     node_type = node_types.get(node_id, "unknown")
                     if is_trigger_node(node_type):
                         trigger_nodes.append(node_id)
                     else:
-                        non_trigger_nodes.append(node_id)
                         logger.warning(
                             "Non-trigger node found at graph entry point",
                             node_id=node_id,
@@ -994,12 +971,16 @@ class WorkflowExecutor:
                 is_first_layer = False
 
             layers.append(layer)
+            remaining -= len(layer)
 
-            # Remove layer nodes and update in-degrees
+            # Update in-degrees of successors; those reaching 0 form the next layer
+            next_layer = []
             for node_id in layer:
-                remaining.remove(node_id)
                 for successor in adjacency[node_id]:
                     in_degree[successor] -= 1
+                    if in_degree[successor] == 0:
+                        next_layer.append(successor)
+            layer = next_layer
 
         logger.debug("Computed execution layers",
                     layer_count=len(layers),
@@ -1018,73 +999,100 @@ class WorkflowExecutor:
 
         Supports runtime conditional branching (Prefect-style dynamic workflows).
 
+        This is the full O(V + E) scan: it (re)seeds the graph's dependency
+        counters from current node statuses. Use it for the initial batch and
+        after recovery; per-completion scheduling goes through
+        _find_newly_ready_nodes.
+
         Args:
             ctx: ExecutionContext
 
         Returns:
             List of NodeExecution ready to run
         """
-        from constants import CONFIG_NODE_TYPES
+        graph = ctx.graph
+        graph.seed(ctx.get_completed_nodes())
 
-        # Build set of completed nodes
-        completed = set(ctx.get_completed_nodes())
+        candidates = [
+            node_exec for node_id, node_exec in ctx.node_executions.items()
+            if node_exec.status == TaskStatus.PENDING and graph.is_ready(node_id)
+        ]
+        return self._admit_ready_nodes(ctx, candidates)
 
-        # Build map of node_id -> node_type for config node detection
-        node_types: Dict[str, str] = {}
-        for node in ctx.nodes:
-            node_types[node.get("id", "")] = node.get("type", "unknown")
+    def _find_newly_ready_nodes(self, ctx: ExecutionContext,
+                                completed_node_id: str) -> List[NodeExecution]:
+        """Find nodes made ready by a single node completing.
 
-        # Build dependency map and track conditional edges
-        # Skip edges from config nodes (they don't execute, provide config only)
-        dependencies: Dict[str, Set[str]] = defaultdict(set)
-        conditional_edges: Dict[str, List[Dict]] = defaultdict(list)  # target -> edges with conditions
+        Decrements the remaining-dependency counters of the completed node's
+        dependents only - O(out-degree) instead of a full rescan.
 
-        for edge in ctx.edges:
-            target = edge.get("target")
-            source = edge.get("source")
-            if target and source:
-                # Skip edges from config nodes - they provide configuration, not execution dependencies
-                source_type = node_types.get(source, "unknown")
-                if source_type in CONFIG_NODE_TYPES:
-                    continue
+        Args:
+            ctx: ExecutionContext
+            completed_node_id: Node that just completed
+
+        Returns:
+            List of NodeExecution ready to run
+        """
+        return self._admit_ready_nodes(ctx, self._pending_nodes(
+            ctx, ctx.graph.settle(completed_node_id)))
+
+    def _pending_nodes(self, ctx: ExecutionContext,
+                       node_ids: List[str]) -> List[NodeExecution]:
+        """NodeExecutions for node_ids that are still PENDING."""
+        result = []
+        for node_id in node_ids:
+            node_exec = ctx.node_executions.get(node_id)
+            if node_exec and node_exec.status == TaskStatus.PENDING:
+                result.append(node_exec)
+        return result
 
-                dependencies[target].add(source)
-                # Track edges with conditions for evaluation
-                if edge.get("data", {}).get("condition"):
-                    conditional_edges[target].append(edge)
+    def _admit_ready_nodes(self, ctx: ExecutionContext,
+                           candidates: List[NodeExecution]) -> List[NodeExecution]:
+        """Apply disable and edge-condition checks to dependency-ready nodes.
 
-        # Find ready nodes
+        Skipped nodes count as settled, so their dependents are released and
+        checked in the same pass.
+
+        Args:
+            ctx: ExecutionContext
+            candidates: PENDING nodes whose dependencies have all settled
+
+        Returns:
+            List of NodeExecution ready to run
+        """
+        graph = ctx.graph
+        queue = deque(candidates)
         ready = []
-        for node_id, node_exec in ctx.node_executions.items():
-            if node_exec.status != TaskStatus.PENDING:
-                continue
 
-            # Check if all dependencies are satisfied
-            deps = dependencies.get(node_id, set())
-            if not deps <= completed:  # Not all deps completed
+        while queue:
+            node_exec = queue.popleft()
+            if node_exec.status != TaskStatus.PENDING:
                 continue
+            node_id = node_exec.node_id
 
             # Check if node is disabled (n8n-style disable)
-            node_data = self._get_node_data(ctx, node_id)
-            if node_data.get("data", {}).get("disabled"):
+            if graph.get_node(node_id).get("data", {}).get("disabled"):
                 node_exec.status = TaskStatus.SKIPPED
                 node_exec.completed_at = time.time()
                 logger.debug("Skipping disabled node", node_id=node_id)
                 # Notify status callback about skipped node
                 asyncio.create_task(self._notify_status(node_id, "skipped", {"disabled": True}))
+                queue.extend(self._pending_nodes(ctx, graph.settle(node_id)))
                 continue
 
             # Check conditional edges for this node
-            if node_id in conditional_edges:
+            conditional_edges = graph.conditional_edges.get(node_id)
+            if conditional_edges:
                 # Has conditional incoming edges - evaluate them
                 conditions_met = self._evaluate_incoming_conditions(
-                    ctx, node_id, conditional_edges[node_id]
+                    ctx, node_id, conditional_edges
                 )
                 if not conditions_met:
                     # Mark as SKIPPED if conditions not met and all deps done
                     node_exec.status = TaskStatus.SKIPPED
                     logger.info("Node skipped due to unmet conditions",
                                node_id=node_id)
+                    queue.extend(self._pending_nodes(ctx, graph.settle(node_id)))
                     continue
 
             ready.append(node_exec)
@@ -1137,10 +1145,7 @@ class WorkflowExecutor:
         Returns:
             Node data dict
         """
-        for node in ctx.nodes:
-            if node.get("id") == node_id:
-                return node
-        return {}
+        return ctx.graph.get_node(node_id)
 
     def _gather_node_inputs(self, ctx: ExecutionContext, node_id: str) -> Dict[str, Any]:
         """Gather inputs for a node from upstream outputs.
@@ -1153,14 +1158,11 @@ class WorkflowExecutor:
             Dict of upstream outputs keyed by source node type
         """
         inputs = {}
-        for edge in ctx.edges:
-            if edge.get("target") == node_id:
-                source_id = edge.get("source")
-                if source_id in ctx.outputs:
-                    # Find source node type
-                    source_node = self._get_node_data(ctx, source_id)
-                    source_type = source_node.get("type", source_id)
-                    inputs[source_type] = ctx.outputs[source_id]
+        for edge in ctx.graph.incoming_edges(node_id):
+            source_id = edge.get("source")
+            if source_id in ctx.outputs:
+                source_type = ctx.graph.get_node(source_id).get("type", source_id)
+                inputs[source_type] = ctx.outputs[source_id]
         return inputs
 
     # =========================================================================
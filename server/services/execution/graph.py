@@ -0,0 +1,170 @@
+"""Compiled workflow graph for O(1) lookups and incremental scheduling.
+
+The raw ``nodes``/``edges`` lists a workflow arrives with are fine for
+serialization but expensive to query: finding a node or its incoming edges is
+a linear scan. WorkflowGraph indexes them once (built by
+``ExecutionContext.create``) so the decide loop never rescans the workflow.
+
+Scheduling uses Kahn-style remaining-dependency counters: when a node settles
+(COMPLETED, CACHED or SKIPPED) only its out-edges are visited, making each
+completion an O(out-degree) update instead of a full rebuild of the
+dependency map.
+
+A graph compiled once can serve many runs of the same workflow (deployment
+run plans): ``fork`` shares the structure and starts fresh run state.
+"""
+
+from collections import defaultdict
+from typing import Dict, Any, List, Iterable, Optional, Set
+
+# AI Agent handles whose sources are sub-nodes (execute via the agent, not the DAG)
+AGENT_CONFIG_HANDLES = frozenset(('input-memory', 'input-tools', 'input-skill', 'input-teammates'))
+
+
+class WorkflowGraph:
+    """Indexed view of a workflow's nodes and edges.
+
+    Structure (immutable after compile):
+        nodes_by_id        -> node_id -> raw node dict
+        node_types         -> node_id -> node type
+        incoming           -> target -> all incoming edges (config edges included)
+        dependencies       -> target -> execution dependencies (config sources skipped)
+        dependents         -> source -> targets depending on it (reverse of dependencies)
+        conditional_edges  -> target -> incoming edges carrying data.condition
+        subnode_ids        -> toolkit / AI Agent config-handle sub-nodes
+        excluded_ids       -> config nodes + sub-nodes (never scheduled)
+        layers             -> execution layers, cached by the executor (None until computed)
+        key_index          -> template key index of the nodes, set by run plans (None otherwise)
+
+    Run state:
+        remaining          -> target -> number of unsettled dependencies
+        settled            -> node ids already released to their dependents
+    """
+
+    def __init__(self, nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]):
+        from constants import CONFIG_NODE_TYPES, TOOLKIT_NODE_TYPES, AI_AGENT_TYPES
+
+        self.nodes = nodes
+        self.edges = edges
+
+        self.nodes_by_id: Dict[str, Dict[str, Any]] = {}
+        self.node_types: Dict[str, str] = {}
+        for node in nodes:
+            node_id = node.get("id")
+            self.nodes_by_id[node_id] = node
+            self.node_types[node_id] = node.get("type", "unknown")
+
+        toolkit_node_ids = {nid for nid, t in self.node_types.items() if t in TOOLKIT_NODE_TYPES}
+        ai_agent_node_ids = {nid for nid, t in self.node_types.items() if t in AI_AGENT_TYPES}
+
+        self.incoming: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.dependencies: Dict[str, Set[str]] = defaultdict(set)
+        self.conditional_edges: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.subnode_ids: Set[str] = set()
+
+        for edge in edges:
+            source = edge.get("source")
+            target = edge.get("target")
+            target_handle = edge.get("targetHandle")
+
+            if target is not None:
+                self.incoming[target].append(edge)
+
+            # Any node that connects TO a toolkit is a sub-node
+            if target in toolkit_node_ids and source:
+                self.subnode_ids.add(source)
+
+            # Nodes connected to AI Agent config handles are sub-nodes
+            if target in ai_agent_node_ids and source and target_handle in AGENT_CONFIG_HANDLES:
+                self.subnode_ids.add(source)
+
+            if not (target and source):
+                continue
+
+            # Edges from config nodes provide configuration, not execution dependencies
+            if self.node_types.get(source, "unknown") in CONFIG_NODE_TYPES:
+                continue
+
+            self.dependencies[target].add(source)
+            if edge.get("data", {}).get("condition"):
+                self.conditional_edges[target].append(edge)
+
+        self.dependents: Dict[str, List[str]] = defaultdict(list)
+        for target, sources in self.dependencies.items():
+            for source in sources:
+                self.dependents[source].append(target)
+
+        self.excluded_ids: Set[str] = {
+            nid for nid, t in self.node_types.items()
+            if t in CONFIG_NODE_TYPES or nid in self.subnode_ids
+        }
+
+        self.layers: Optional[List[List[str]]] = None
+        self.key_index: Optional[Dict[str, Any]] = None
+
+        self.remaining: Dict[str, int] = {}
+        self.settled: Set[str] = set()
+        self.seed(())
+
+    def fork(self, nodes: List[Dict[str, Any]]) -> "WorkflowGraph":
+        """Graph of one run over the same structure, with fresh run state.
+
+        ``nodes`` must have the same ids as the compiled ones (per-run copies
+        carrying e.g. a trigger output). The structural indices and cached
+        layers are shared, only the node lookup and counters are rebuilt.
+        """
+        forked = object.__new__(WorkflowGraph)
+        forked.__dict__.update(self.__dict__)
+        forked.nodes = nodes
+        forked.nodes_by_id = {node.get("id"): node for node in nodes}
+        forked.seed(())
+        return forked
+
+    # =========================================================================
+    # LOOKUPS
+    # =========================================================================
+
+    def get_node(self, node_id: str) -> Dict[str, Any]:
+        """Raw node dict for node_id ({} if unknown)."""
+        return self.nodes_by_id.get(node_id, {})
+
+    def incoming_edges(self, node_id: str) -> List[Dict[str, Any]]:
+        """All edges targeting node_id, in workflow order."""
+        return self.incoming.get(node_id, [])
+
+    # =========================================================================
+    # DEPENDENCY COUNTERS
+    # =========================================================================
+
+    def seed(self, settled_ids: Iterable[str]) -> None:
+        """Reset counters from a set of already-settled nodes.
+
+        O(V + E). Called on the initial scan and after recovery, when node
+        statuses were set without going through settle().
+        """
+        self.settled = set(settled_ids)
+        self.remaining = {
+            target: sum(1 for source in sources if source not in self.settled)
+            for target, sources in self.dependencies.items()
+        }
+
+    def is_ready(self, node_id: str) -> bool:
+        """True when every execution dependency of node_id has settled."""
+        return self.remaining.get(node_id, 0) == 0
+
+    def settle(self, node_id: str) -> List[str]:
+        """Mark node_id settled and return dependents that just became ready.
+
+        Idempotent: settling the same node twice releases nothing.
+        """
+        if node_id in self.settled:
+            return []
+        self.settled.add(node_id)
+
+        released = []
+        for target in self.dependents.get(node_id, ()):
+            count = self.remaining[target] - 1
+            self.remaining[target] = count
+            if count == 0:
+                released.append(target)
+        return released
@@ -0,0 +1,61 @@
+"""Cross-run memoization for deterministic nodes.
+
+The Prefect-style result cache in ExecutionCache is scoped to one execution
+(its key includes execution_id), so it only helps retries and recovery.
+NodeMemo is the cross-run counterpart: results are content-addressed by
+(node_type, resolved parameters, upstream inputs, handler version), so a
+re-run that chunks or embeds the same document skips the work entirely.
+
+Parameters are only fully known after NodeExecutor has loaded them from the
+database and resolved templates, so the workflow executor hands a NodeMemo to
+the node executor via the execution context and the lookup happens there.
+"""
+
+from typing import Dict, Any, Optional, TYPE_CHECKING
+
+from core.logging import get_logger
+from .models import MemoPolicy, generate_memo_key
+
+if TYPE_CHECKING:
+    from .cache import ExecutionCache
+
+logger = get_logger(__name__)
+
+
+class NodeMemo:
+    """Memo lookup/store bound to one node execution.
+
+    Args:
+        cache: ExecutionCache holding memoized results
+        policy: MemoPolicy for the node type (ttl, version)
+        inputs: Upstream outputs feeding the node
+        stats: Shared hit/miss counters (ExecutionContext.memo_stats)
+    """
+
+    def __init__(self, cache: "ExecutionCache", policy: MemoPolicy,
+                 inputs: Optional[Dict[str, Any]] = None,
+                 stats: Optional[Dict[str, int]] = None):
+        self.cache = cache
+        self.policy = policy
+        self.inputs = inputs or {}
+        self.stats = stats if stats is not None else {"hits": 0, "misses": 0}
+
+    def key(self, node_type: str, parameters: Dict[str, Any]) -> str:
+        return generate_memo_key(node_type, parameters, self.inputs, self.policy.version)
+
+    async def lookup(self, node_type: str, parameters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the memoized result for these parameters, counting hit/miss."""
+        result = await self.cache.get_memoized_result(self.key(node_type, parameters))
+        if result is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        logger.debug("Memo hit", node_type=node_type)
+        return result
+
+    async def store(self, node_type: str, parameters: Dict[str, Any],
+                    result: Dict[str, Any]) -> bool:
+        """Memoize a successful node result for policy.ttl seconds."""
+        return await self.cache.set_memoized_result(
+            self.key(node_type, parameters), result, ttl=self.policy.ttl
+        )
@@ -10,9 +10,10 @@ import time
 import uuid
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from core.logging import get_logger
+from .graph import WorkflowGraph
 
 logger = get_logger(__name__)
 
@@ -151,6 +152,33 @@ def get_retry_policy(node_type: str, custom_policy: Dict = None) -> RetryPolicy:
     return DEFAULT_RETRY_POLICIES.get(node_type, RetryPolicy())
 
 
+@dataclass
+class MemoPolicy:
+    """Cross-run memoization settings for a deterministic node type.
+
+    Memoized results are keyed on (node_type, resolved parameters, upstream
+    input hash, version) - not on execution_id - so they hit across runs.
+    Bump version when a handler's output format changes to orphan old entries.
+    """
+    ttl: int = 3600                  # seconds
+    version: str = "1"
+
+
+# Node types whose output is a pure function of their parameters and inputs.
+# Only these are memoized, and only when a workflow opts in. httpScraper and
+# documentParser are not: their parameters name a URL or directory whose
+# content can change between runs without changing the key.
+DEFAULT_MEMO_POLICIES: Dict[str, MemoPolicy] = {
+    "textChunker": MemoPolicy(ttl=86400),
+    "embeddingGenerator": MemoPolicy(ttl=604800),
+}
+
+
+def get_memo_policy(node_type: str) -> Optional[MemoPolicy]:
+    """Get memoization policy for a node type (None if not memoizable)."""
+    return DEFAULT_MEMO_POLICIES.get(node_type)
+
+
 @dataclass
 class DLQEntry:
     """Dead Letter Queue entry for failed node executions.
@@ -231,19 +259,31 @@ class NodeExecution:
     completed_at: Optional[float] = None
     retry_count: int = 0
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to JSON-serializable dict."""
-        return {
+    def to_dict(self, include_output: bool = True) -> Dict[str, Any]:
+        """Convert to JSON-serializable dict.
+
+        Args:
+            include_output: False for the persisted node record, whose output
+                is stored once under the execution's outputs key instead.
+        """
+        data = {
             "node_id": self.node_id,
             "node_type": self.node_type,
             "status": self.status.value,
             "input_hash": self.input_hash,
-            "output": self.output,
             "error": self.error,
             "started_at": self.started_at,
             "completed_at": self.completed_at,
             "retry_count": self.retry_count,
         }
+        if include_output:
+            data["output"] = self.output
+        return data
+
+    def state_key(self) -> Tuple:
+        """Cheap fingerprint of the persisted fields (output excluded)."""
+        return (self.status, self.input_hash, self.error, self.started_at,
+                self.completed_at, self.retry_count)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "NodeExecution":
@@ -298,11 +338,33 @@ class ExecutionContext:
     # Error tracking
     errors: List[Dict[str, Any]] = field(default_factory=list)
 
+    # Cross-run memoization (opt-in per workflow run)
+    memoize: bool = False
+    memo_stats: Dict[str, int] = field(default_factory=lambda: {"hits": 0, "misses": 0})
+
+    # Compiled DAG index (built from nodes/edges unless given, never persisted)
+    graph: Optional[WorkflowGraph] = field(default=None, repr=False, compare=False)
+
+    # What the last save wrote: node_id -> state_key(), node_id -> output object
+    _persisted_nodes: Dict[str, Tuple] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    _persisted_outputs: Dict[str, Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.graph is None:
+            self.graph = WorkflowGraph(self.nodes, self.edges)
+
     @classmethod
     def create(cls, workflow_id: str, session_id: str = "default",
-               nodes: List[Dict] = None, edges: List[Dict] = None) -> "ExecutionContext":
+               nodes: List[Dict] = None, edges: List[Dict] = None,
+               graph: Optional[WorkflowGraph] = None) -> "ExecutionContext":
         """Factory method to create new execution context.
 
+        ``graph`` is a WorkflowGraph already compiled for these nodes and
+        edges with fresh run state (e.g. a run plan's graph forked for this
+        run); without it the graph is compiled here.
+
         Supports pre-executed nodes (marked with _pre_executed=True) for
         event-driven execution where trigger nodes are already complete.
 
@@ -312,7 +374,7 @@ class ExecutionContext:
         Toolkit sub-nodes (nodes connected TO a toolkit like androidTool) are also
         excluded - they execute only when called via the toolkit's tool interface.
         """
-        from constants import CONFIG_NODE_TYPES, TOOLKIT_NODE_TYPES, AI_AGENT_TYPES
+        from constants import CONFIG_NODE_TYPES
 
         execution_id = str(uuid.uuid4())
         ctx = cls(
@@ -321,30 +383,12 @@ class ExecutionContext:
             session_id=session_id,
             nodes=nodes or [],
             edges=edges or [],
+            graph=graph,
         )
 
-        # Find toolkit sub-nodes (nodes that connect TO a toolkit node)
-        # These should only execute when called via the toolkit, not as workflow nodes
-        toolkit_node_ids = {n.get("id") for n in (nodes or []) if n.get("type") in TOOLKIT_NODE_TYPES}
-
-        # Find AI Agent nodes (all agent types have config handles)
-        ai_agent_node_ids = {n.get("id") for n in (nodes or []) if n.get("type") in AI_AGENT_TYPES}
-
-        subnode_ids: set = set()
-        for edge in (edges or []):
-            source = edge.get("source")
-            target = edge.get("target")
-            target_handle = edge.get("targetHandle")
-
-            # Any node that connects TO a toolkit is a sub-node
-            if target in toolkit_node_ids and source:
-                subnode_ids.add(source)
-
-            # Nodes connected to AI Agent config handles are sub-nodes
-            # These handles: input-memory, input-tools, input-skill, input-teammates
-            if target in ai_agent_node_ids and source and target_handle:
-                if target_handle in ('input-memory', 'input-tools', 'input-skill', 'input-teammates'):
-                    subnode_ids.add(source)
+        # Toolkit sub-nodes and AI Agent config-handle sub-nodes, found while
+        # compiling the graph - these execute only via their parent node
+        subnode_ids = ctx.graph.subnode_ids
 
         # Initialize node executions for all nodes (excluding config nodes and sub-nodes)
         for node in (nodes or []):
@@ -449,17 +493,46 @@ class ExecutionContext:
                 return False
         return True
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to JSON-serializable dict for Redis storage."""
+    # =========================================================================
+    # INCREMENTAL PERSISTENCE
+    # =========================================================================
+
+    def collect_delta(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+        """Node records and outputs changed since the previous call.
+
+        Outputs are compared by identity: a node's output is written once when
+        it is set and again only if it is replaced (e.g. on retry).
+
+        Returns:
+            (node_id -> node record without output, node_id -> output)
+        """
+        dirty_nodes = {}
+        for node_id, node in self.node_executions.items():
+            key = node.state_key()
+            if self._persisted_nodes.get(node_id) != key:
+                self._persisted_nodes[node_id] = key
+                dirty_nodes[node_id] = node.to_dict(include_output=False)
+
+        dirty_outputs = {}
+        for node_id, output in self.outputs.items():
+            if self._persisted_outputs.get(node_id, self) is not output:
+                self._persisted_outputs[node_id] = output
+                dirty_outputs[node_id] = output
+
+        return dirty_nodes, dirty_outputs
+
+    def reset_delta(self) -> None:
+        """Forget persistence bookkeeping so the next save writes everything."""
+        self._persisted_nodes.clear()
+        self._persisted_outputs.clear()
+
+    def header_dict(self) -> Dict[str, Any]:
+        """Run-level fields (everything except node records and outputs)."""
         return {
             "execution_id": self.execution_id,
             "workflow_id": self.workflow_id,
             "status": self.status.value,
             "session_id": self.session_id,
-            "node_executions": {
-                k: v.to_dict() for k, v in self.node_executions.items()
-            },
-            "outputs": self.outputs,
             "execution_order": self.execution_order,
             "current_layer": self.current_layer,
             "checkpoints": self.checkpoints,
@@ -468,11 +541,23 @@ class ExecutionContext:
             "started_at": self.started_at,
             "completed_at": self.completed_at,
             "errors": self.errors,
+            "memoize": self.memoize,
+            "memo_stats": self.memo_stats,
             # Don't store full nodes/edges - too large
             "node_count": len(self.nodes),
             "edge_count": len(self.edges),
         }
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to JSON-serializable dict for Redis storage."""
+        return {
+            **self.header_dict(),
+            "node_executions": {
+                k: v.to_dict() for k, v in self.node_executions.items()
+            },
+            "outputs": self.outputs,
+        }
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any], nodes: List[Dict] = None,
                   edges: List[Dict] = None) -> "ExecutionContext":
@@ -492,15 +577,20 @@ class ExecutionContext:
             started_at=data.get("started_at"),
             completed_at=data.get("completed_at"),
             errors=data.get("errors", []),
+            memoize=data.get("memoize", False),
+            memo_stats=data.get("memo_stats") or {"hits": 0, "misses": 0},
         )
 
-        # Restore node executions
-        for node_id, node_data in data.get("node_executions", {}).items():
-            ctx.node_executions[node_id] = NodeExecution.from_dict(node_data)
-
         # Restore outputs
         ctx.outputs = data.get("outputs", {})
 
+        # Restore node executions (persisted records carry no output)
+        for node_id, node_data in data.get("node_executions", {}).items():
+            node = NodeExecution.from_dict(node_data)
+            if node.output is None:
+                node.output = ctx.outputs.get(node_id)
+            ctx.node_executions[node_id] = node
+
         return ctx
 
     def to_json(self) -> str:
@@ -536,3 +626,20 @@ def generate_cache_key(execution_id: str, node_id: str, inputs: Dict[str, Any])
     """
     input_hash = hash_inputs(inputs)
     return f"result:{execution_id}:{node_id}:{input_hash}"
+
+
+def generate_memo_key(node_type: str, parameters: Dict[str, Any],
+                      inputs: Dict[str, Any], version: str) -> str:
+    """Generate content-addressed key for a memoized node result.
+
+    Unlike generate_cache_key, the execution_id is not part of the key, so
+    identical work in different runs maps to the same entry.
+
+    Format: memo:{node_type}:{version}:{digest}
+    """
+    canonical = json.dumps(
+        {"parameters": parameters, "inputs": hash_inputs(inputs)},
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    digest = hashlib.sha256(canonical.encode()).hexdigest()
+    return f"memo:{node_type}:{version}:{digest}"
@@ -13,14 +13,25 @@ Handlers:
 """
 
 import asyncio
+import hashlib
 import json
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional
 from urllib.parse import urljoin, urlparse, unquote
 
 from core.logging import get_logger
+from services.document_parsing import (
+    ParseManifest, clamp_workers, get_parse_pool, is_spool, iter_documents, parse_and_fingerprint, spool_path, spool_ref,
+)
+from services.embeddings import get_embedding_service
+from services.http_pool import lease_http_client
+from services.vector_stores import (
+    DEFAULT_BATCH_SIZE, DEFAULT_CONCURRENCY, PINECONE_MAX_BATCH, get_vector_store_registry,
+    is_missing_collection_error, run_batches,
+)
+from services.vectors import is_vector_payload, pack_vectors, to_array, to_lists, vector_at, vector_shape
 
 logger = get_logger(__name__)
 
@@ -36,7 +47,6 @@ async def handle_http_scraper(
     context: Dict[str, Any]
 ) -> Dict[str, Any]:
     """Scrape links from web pages with date/page pagination support."""
-    import httpx
     from bs4 import BeautifulSoup
     start_time = time.time()
 
@@ -45,6 +55,7 @@ async def handle_http_scraper(
         iteration_mode = parameters.get('iterationMode', 'single')
         link_selector = parameters.get('linkSelector', 'a[href$=".pdf"]')
         headers_str = parameters.get('headers', '{}')
+        max_concurrency = max(1, int(parameters.get('maxConcurrency', 4)))
 
         if not url:
             raise ValueError("URL is required")
@@ -88,29 +99,32 @@ async def handle_http_scraper(
                 logger.warning("[httpScraper] Proxy lookup failed, proceeding without proxy", error=str(e))
 
         logger.info("[httpScraper] Starting", node_id=node_id, urls=len(urls_to_fetch),
-                     proxy=bool(proxy_url))
+                     proxy=bool(proxy_url), concurrency=max_concurrency)
 
-        client_kwargs: dict = {"timeout": 30, "follow_redirects": True}
-        if proxy_url:
-            client_kwargs["proxy"] = proxy_url
+        semaphore = asyncio.Semaphore(max_concurrency)
 
-        async with httpx.AsyncClient(**client_kwargs) as client:
-            for fetch_url, meta in urls_to_fetch:
-                try:
-                    response = await client.get(fetch_url, headers=headers)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    for el in soup.select(link_selector):
-                        href = el.get('href', '')
-                        if href:
-                            items.append({
-                                'url': urljoin(fetch_url, href),
-                                'text': el.get_text(strip=True),
-                                'source_url': fetch_url,
-                                **meta
-                            })
-                except Exception as e:
-                    errors.append(f"{fetch_url}: {str(e)}")
+        async def fetch_page(client, fetch_url: str, meta: Dict[str, Any]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                response = await client.get(fetch_url, headers=headers, timeout=30)
+                response.raise_for_status()
+                html = response.text
+            soup = BeautifulSoup(html, 'html.parser')
+            return [{
+                'url': urljoin(fetch_url, el.get('href', '')),
+                'text': el.get_text(strip=True),
+                'source_url': fetch_url,
+                **meta
+            } for el in soup.select(link_selector) if el.get('href', '')]
+
+        # Pages are fetched concurrently but reported in iteration order
+        async with lease_http_client(proxy_url) as client:
+            pages = await asyncio.gather(*[fetch_page(client, u, m) for u, m in urls_to_fetch],
+                                         return_exceptions=True)
+        for (fetch_url, _), page in zip(urls_to_fetch, pages):
+            if isinstance(page, Exception):
+                errors.append(f"{fetch_url}: {str(page)}")
+            else:
+                items.extend(page)
 
         return {
             "success": True,
@@ -133,6 +147,102 @@ async def handle_http_scraper(
 # File Downloader
 # =============================================================================
 
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+
+def _download_meta_path(file_path: Path) -> Path:
+    return file_path.parent / '.downloads' / f"{file_path.name}.json"
+
+
+def _read_download_meta(path: Path, url: str) -> Dict[str, Any]:
+    try:
+        meta = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return meta if meta.get('url') == url else {}
+
+
+def _write_download_meta(path: Path, meta: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(meta))
+
+
+def _partial_size(part: Path) -> Optional[int]:
+    try:
+        return part.stat().st_size
+    except OSError:
+        return None
+
+
+def _complete_download(part: Path, file_path: Path, meta_path: Path, meta: Dict[str, Any]) -> int:
+    part.replace(file_path)
+    size = file_path.stat().st_size
+    _write_download_meta(meta_path, {**meta, 'complete': True, 'size': size})
+    return size
+
+
+async def _stream_download(client, url: str, file_path: Path, timeout: float,
+                           revalidate: bool) -> Dict[str, Any]:
+    """Stream ``url`` into ``file_path`` via a ``.part`` file.
+
+    Validators (ETag / Last-Modified) are kept in ``.downloads/<name>.json``
+    next to the file. A leftover ``.part`` from an interrupted run is resumed
+    with ``Range`` + ``If-Range``; with ``revalidate`` a completed file is
+    re-requested with ``If-None-Match`` / ``If-Modified-Since`` and a 304
+    leaves it untouched. File I/O runs in worker threads, off the event loop.
+    """
+    part = file_path.with_name(file_path.name + '.part')
+    meta_path = _download_meta_path(file_path)
+    meta = await asyncio.to_thread(_read_download_meta, meta_path, url)
+    headers: Dict[str, str] = {}
+    offset = 0
+
+    if revalidate and meta.get('complete') and await asyncio.to_thread(file_path.exists):
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+    elif not meta.get('complete'):
+        # Weak ETags can't validate a byte range
+        etag = meta.get('etag') or ''
+        validator = etag if etag and not etag.startswith('W/') else meta.get('last_modified')
+        part_size = await asyncio.to_thread(_partial_size, part) if validator else None
+        if part_size is not None:
+            offset = part_size
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = validator
+
+    async with client.stream('GET', url, headers=headers, timeout=timeout) as response:
+        if response.status_code in (304, 416):
+            await response.aread()  # Drain so the connection goes back to the pool
+        if response.status_code == 304:
+            return {'status': 'skipped', 'path': str(file_path), 'url': url, 'not_modified': True}
+        if response.status_code == 416 and offset:
+            # Stale partial file the server can't continue; start over
+            await asyncio.to_thread(part.unlink, missing_ok=True)
+            await asyncio.to_thread(meta_path.unlink, missing_ok=True)
+            return await _stream_download(client, url, file_path, timeout, revalidate=False)
+        response.raise_for_status()
+
+        content_range = response.headers.get('content-range', '')
+        resumed = response.status_code == 206 and content_range.startswith(f'bytes {offset}-')
+        meta = {'url': url, 'etag': response.headers.get('etag'),
+                'last_modified': response.headers.get('last-modified'), 'complete': False}
+        if not resumed:
+            # Recorded before the body so an interrupted download can resume
+            await asyncio.to_thread(_write_download_meta, meta_path, meta)
+        f = await asyncio.to_thread(open, part, 'ab' if resumed else 'wb')
+        try:
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                await asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+
+    size = await asyncio.to_thread(_complete_download, part, file_path, meta_path, meta)
+    return {'status': 'downloaded', 'path': str(file_path), 'url': url, 'size': size,
+            'filename': file_path.name, 'resumed': resumed}
+
+
 async def handle_file_downloader(
     node_id: str,
     node_type: str,
@@ -140,7 +250,6 @@ async def handle_file_downloader(
     context: Dict[str, Any]
 ) -> Dict[str, Any]:
     """Download files from URLs in parallel using semaphore for concurrency."""
-    import httpx
     start_time = time.time()
 
     try:
@@ -150,6 +259,7 @@ async def handle_file_downloader(
         output_dir = Path(parameters.get('outputDir') or default_dir)
         max_workers = int(parameters.get('maxWorkers', 8))
         skip_existing = parameters.get('skipExisting', True)
+        revalidate = parameters.get('revalidate', False)
         timeout = float(parameters.get('timeout', 60))
 
         if not items:
@@ -164,27 +274,24 @@ async def handle_file_downloader(
         downloaded, skipped, failed = [], [], []
         semaphore = asyncio.Semaphore(max_workers)
 
-        async def download_file(item):
+        async def download_file(client, item):
             async with semaphore:
                 url = item.get('url', '') if isinstance(item, dict) else str(item)
                 if not url:
                     return {'status': 'failed', 'error': 'Empty URL'}
                 filename = unquote(Path(urlparse(url).path).name or 'download')
                 file_path = output_dir / filename
-                if skip_existing and file_path.exists():
+                if skip_existing and not revalidate and file_path.exists():
                     return {'status': 'skipped', 'path': str(file_path), 'url': url}
                 try:
-                    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-                        response = await client.get(url)
-                        response.raise_for_status()
-                        file_path.write_bytes(response.content)
-                        return {'status': 'downloaded', 'path': str(file_path), 'url': url,
-                                'size': len(response.content), 'filename': filename}
+                    return await _stream_download(client, url, file_path, timeout, revalidate)
                 except Exception as e:
                     return {'status': 'failed', 'url': url, 'error': str(e)}
 
         logger.info("[fileDownloader] Starting", node_id=node_id, items=len(items))
-        results = await asyncio.gather(*[download_file(i) for i in items], return_exceptions=True)
+        async with lease_http_client() as client:
+            results = await asyncio.gather(*[download_file(client, i) for i in items],
+                                           return_exceptions=True)
 
         for r in results:
             if isinstance(r, Exception):
@@ -216,27 +323,35 @@ async def handle_file_downloader(
 # Document Parser
 # =============================================================================
 
-def _parse_file_sync(path: Path, parser: str) -> str:
-    """Synchronous file parsing - runs in thread pool."""
-    if parser == 'pypdf':
-        from pypdf import PdfReader
-        return "\n\n".join(p.extract_text() or '' for p in PdfReader(str(path)).pages)
-    elif parser == 'marker':
-        from marker.converters.pdf import PdfConverter
-        from marker.models import create_model_dict
-        converter = PdfConverter(artifact_dict=create_model_dict())
-        result = converter(str(path))
-        return result.markdown if hasattr(result, 'markdown') else str(result)
-    elif parser == 'unstructured':
-        from unstructured.partition.auto import partition
-        return "\n\n".join(str(el) for el in partition(str(path)))
-    elif parser == 'beautifulsoup':
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(path.read_text(errors='ignore'), 'html.parser')
-        for s in soup(["script", "style"]):
-            s.decompose()
-        return soup.get_text(separator='\n')
-    raise ValueError(f"Unknown parser: {parser}")
+async def _parse_paths(paths: List[Path], parser: str, workers: int, fingerprint: bool):
+    """Yield ``(index, result_or_exception)`` as files finish parsing.
+
+    ``workers <= 1`` parses one file at a time in a thread; larger values use
+    the shared process pool so CPU-bound parsers run in parallel, with at
+    most ``workers`` (clamped to the pool size) of this run's files queued.
+    """
+    workers = clamp_workers(workers)
+    if workers <= 1:
+        for i, path in enumerate(paths):
+            try:
+                yield i, await asyncio.to_thread(parse_and_fingerprint, str(path), parser, fingerprint)
+            except Exception as e:
+                yield i, e
+        return
+
+    loop = asyncio.get_running_loop()
+    pool = get_parse_pool()
+    semaphore = asyncio.Semaphore(workers)
+
+    async def run(i: int, path: Path):
+        async with semaphore:
+            try:
+                return i, await loop.run_in_executor(pool, parse_and_fingerprint, str(path), parser, fingerprint)
+            except Exception as e:
+                return i, e
+
+    for next_done in asyncio.as_completed([run(i, p) for i, p in enumerate(paths)]):
+        yield await next_done
 
 
 async def handle_document_parser(
@@ -253,6 +368,9 @@ async def handle_document_parser(
         input_dir = parameters.get('inputDir', '')
         parser = parameters.get('parser', 'pypdf')
         file_pattern = parameters.get('filePattern', '*.pdf')
+        workers = max(1, int(parameters.get('workers', 1)))
+        skip_unchanged = parameters.get('skipUnchanged', False)
+        streaming = parameters.get('streaming', False)
 
         paths = []
         for f in files:
@@ -265,25 +383,67 @@ async def handle_document_parser(
         if not paths:
             return {
                 "success": True, "node_id": node_id, "node_type": node_type,
-                "result": {"documents": [], "parsed_count": 0, "failed": []},
+                "result": {"documents": [], "parsed_count": 0, "failed": [], "skipped": 0},
                 "execution_time": time.time() - start_time,
                 "timestamp": datetime.now().isoformat()
             }
 
-        logger.info("[documentParser] Starting", node_id=node_id, files=len(paths), parser=parser)
-        documents, failed = [], []
-
-        for path in paths:
-            try:
-                content = await asyncio.to_thread(_parse_file_sync, path, parser)
-                documents.append({'source': str(path), 'filename': path.name,
-                                 'content': content, 'length': len(content), 'parser': parser})
-            except Exception as e:
-                failed.append({'file': str(path), 'error': str(e)})
-
+        # Per-node manifest and spool live next to the workflow's other files
+        workspace_dir = context.get('workspace_dir', '')
+        state_dir = Path(workspace_dir or 'data') / '.document_parser'
+        manifest = None
+        skipped = []
+        if skip_unchanged:
+            manifest = ParseManifest(state_dir / f"{node_id}.manifest.json")
+            unchanged = await asyncio.to_thread(
+                lambda: [manifest.is_unchanged(str(p), parser) for p in paths])
+            skipped = [str(p) for p, same in zip(paths, unchanged) if same]
+            paths = [p for p, same in zip(paths, unchanged) if not same]
+
+        logger.info("[documentParser] Starting", node_id=node_id, files=len(paths), parser=parser,
+                    workers=workers, skipped=len(skipped), streaming=streaming)
+        slots: List[Optional[Dict[str, Any]]] = [None] * len(paths)
+        failed, parsed_count = [], 0
+        spool = None
+        spool_digest = hashlib.sha256()
+        if streaming:
+            # Per session, so concurrent deployed runs don't share a file
+            spool_file = spool_path(state_dir, context.get('session_id', 'default'), node_id)
+            await asyncio.to_thread(spool_file.parent.mkdir, parents=True, exist_ok=True)
+            spool = await asyncio.to_thread(open, spool_file, 'w', encoding='utf-8')
+
+        try:
+            async for i, parsed in _parse_paths(paths, parser, workers, fingerprint=manifest is not None):
+                path = paths[i]
+                if isinstance(parsed, Exception):
+                    failed.append({'file': str(path), 'error': str(parsed)})
+                    continue
+                content = parsed['content']
+                doc = {'source': str(path), 'filename': path.name,
+                       'content': content, 'length': len(content), 'parser': parser}
+                if spool is not None:
+                    # Written as it finishes; only one parsed document is held at a time
+                    line = json.dumps(doc) + "\n"
+                    spool_digest.update(line.encode('utf-8'))
+                    await asyncio.to_thread(spool.write, line)
+                else:
+                    slots[i] = doc
+                parsed_count += 1
+                if manifest is not None:
+                    manifest.record(str(path), parser, parsed)
+        finally:
+            if spool is not None:
+                await asyncio.to_thread(spool.close)
+
+        if manifest is not None:
+            await asyncio.to_thread(manifest.save)
+
+        documents = (spool_ref(spool_file, parsed_count, spool_digest.hexdigest()) if streaming
+                     else [d for d in slots if d is not None])
         return {
             "success": True, "node_id": node_id, "node_type": node_type,
-            "result": {"documents": documents, "parsed_count": len(documents), "failed": failed},
+            "result": {"documents": documents, "parsed_count": parsed_count, "failed": failed,
+                       "skipped": len(skipped)},
             "execution_time": time.time() - start_time,
             "timestamp": datetime.now().isoformat()
         }
@@ -315,7 +475,7 @@ async def handle_text_chunker(
         chunk_overlap = int(parameters.get('chunkOverlap', 200))
         strategy = parameters.get('strategy', 'recursive')
 
-        if not documents:
+        if not documents or (is_spool(documents) and not documents.get('count')):
             return {
                 "success": True, "node_id": node_id, "node_type": node_type,
                 "result": {"chunks": [], "chunk_count": 0},
@@ -330,10 +490,12 @@ async def handle_text_chunker(
         else:
             splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
 
-        logger.info("[textChunker] Starting", node_id=node_id, docs=len(documents))
+        logger.info("[textChunker] Starting", node_id=node_id,
+                    docs=documents['count'] if is_spool(documents) else len(documents))
         chunks = []
 
-        for doc in documents:
+        # A documentParser spool is read one document at a time
+        for doc in iter_documents(documents):
             content = doc.get('content', '') if isinstance(doc, dict) else str(doc)
             source = doc.get('source', 'input') if isinstance(doc, dict) else 'input'
             if not content:
@@ -387,27 +549,13 @@ async def handle_embedding_generator(
         texts = [c.get('content', '') if isinstance(c, dict) else str(c) for c in chunks]
         logger.info("[embeddingGenerator] Starting", node_id=node_id, texts=len(texts), provider=provider)
 
-        if provider == 'huggingface':
-            try:
-                from langchain_huggingface import HuggingFaceEmbeddings
-            except ImportError:
-                raise ImportError("HuggingFace embeddings not available. Install with: pip install langchain-huggingface sentence-transformers")
-            embedder = HuggingFaceEmbeddings(model_name=model)
-        elif provider == 'openai':
-            from langchain_openai import OpenAIEmbeddings
-            embedder = OpenAIEmbeddings(model=model, api_key=api_key)
-        elif provider == 'ollama':
-            from langchain_ollama import OllamaEmbeddings
-            embedder = OllamaEmbeddings(model=model)
-        else:
-            raise ValueError(f"Unknown provider: {provider}")
-
-        embeddings = await asyncio.to_thread(embedder.embed_documents, texts)
-        dimensions = len(embeddings[0]) if embeddings else 0
+        # Packed float32 payload (services/vectors.py), not a list of float lists
+        embeddings = await get_embedding_service().embed_vectors(texts, provider=provider, model=model, api_key=api_key)
+        count, dimensions = vector_shape(embeddings)
 
         return {
             "success": True, "node_id": node_id, "node_type": node_type,
-            "result": {"embeddings": embeddings, "embedding_count": len(embeddings),
+            "result": {"embeddings": embeddings, "embedding_count": count,
                       "dimensions": dimensions, "chunks": chunks, "provider": provider, "model": model},
             "execution_time": time.time() - start_time,
             "timestamp": datetime.now().isoformat()
@@ -442,14 +590,27 @@ async def handle_vector_store(
         logger.info("[vectorStore] Starting", node_id=node_id, op=operation, backend=backend)
 
         if backend == 'chroma':
-            result = await _chroma_op(operation, parameters, collection_name)
+            op = _chroma_op
         elif backend == 'qdrant':
-            result = await _qdrant_op(operation, parameters, collection_name)
+            op = _qdrant_op
         elif backend == 'pinecone':
-            result = await _pinecone_op(operation, parameters, collection_name)
+            op = _pinecone_op
         else:
             raise ValueError(f"Unknown backend: {backend}")
 
+        try:
+            result = await op(operation, parameters, collection_name)
+        except Exception as e:
+            if not is_missing_collection_error(e):
+                raise
+            # The cached handle outlived its collection (deleted externally):
+            # drop it and retry once with a fresh one
+            logger.warning("[vectorStore] Collection missing, reopening", node_id=node_id,
+                           backend=backend, collection=collection_name, error=str(e))
+            await asyncio.to_thread(get_vector_store_registry().forget_collection, backend,
+                                    _vector_store_location(backend, parameters), collection_name)
+            result = await op(operation, parameters, collection_name)
+
         result['backend'] = backend
         result['collection_name'] = collection_name
 
@@ -467,24 +628,81 @@ async def handle_vector_store(
         }
 
 
+def _vector_store_location(backend: str, params: Dict) -> str:
+    """Registry location of a backend: Chroma persist dir, Qdrant url or Pinecone API key."""
+    if backend == 'chroma':
+        return params.get('persistDir', './data/vectors')
+    if backend == 'qdrant':
+        return params.get('qdrantUrl', 'http://localhost:6333')
+    return params.get('pineconeApiKey', '')
+
+
+def _embedding_matrix(params: Dict):
+    """``embeddings`` param (packed payload or float lists) as a float32 (n, dim) array."""
+    embeddings = params.get('embeddings') or []
+    if not is_vector_payload(embeddings) and not len(embeddings):
+        embeddings = pack_vectors([])
+    return to_array(embeddings)
+
+
+def _query_vectors(params: Dict):
+    """Query vectors as float lists, plus whether the caller asked for a batch.
+
+    ``queryEmbeddings`` (packed payload or float lists) runs one query per
+    row. The single-query ``queryEmbedding`` keeps its old behaviour: a packed
+    payload uses its first row.
+    """
+    batch = params.get('queryEmbeddings')
+    if batch is not None and (is_vector_payload(batch) or len(batch)):
+        return to_lists(batch), True
+    query_emb = params.get('queryEmbedding') or []
+    if is_vector_payload(query_emb):
+        query_emb = vector_at(query_emb, 0) if vector_shape(query_emb)[0] else []
+    return ([list(query_emb)] if len(query_emb) else []), False
+
+
+def _query_result(per_query: List[List[Dict]], batched: bool) -> Dict:
+    """``{"matches"}`` for a single query, ``{"results", "query_count"}`` for a batch."""
+    if batched:
+        return {"results": [{"matches": m} for m in per_query], "query_count": len(per_query)}
+    return {"matches": per_query[0] if per_query else []}
+
+
+def _batch_options(params: Dict, max_batch: int = 0):
+    batch_size = int(params.get('batchSize') or DEFAULT_BATCH_SIZE)
+    if max_batch:
+        batch_size = min(batch_size, max_batch)
+    return batch_size, int(params.get('concurrency') or DEFAULT_CONCURRENCY)
+
+
+def _chunk_payload(chunks: List, i: int) -> Dict:
+    """Qdrant/Pinecone point payload for vector ``i``."""
+    if i >= len(chunks):
+        return {}
+    c = chunks[i]
+    if isinstance(c, dict):
+        return {'content': c.get('content', ''), 'source': c.get('source', 'unknown'),
+                'chunk_index': c.get('chunk_index', i)}
+    return {'content': str(c), 'source': 'input', 'chunk_index': i}
+
+
 async def _chroma_op(operation: str, params: Dict, collection: str) -> Dict:
     """ChromaDB operations."""
     try:
-        import chromadb
+        import chromadb  # noqa: F401
     except ImportError:
         raise ImportError("ChromaDB not available. Install with: pip install chromadb")
     import uuid
 
-    persist_dir = params.get('persistDir', './data/vectors')
-    client = chromadb.PersistentClient(path=persist_dir)
-    coll = client.get_or_create_collection(name=collection)
+    persist_dir = _vector_store_location('chroma', params)
+    coll = await asyncio.to_thread(get_vector_store_registry().chroma_collection, persist_dir, collection)
 
     if operation == 'store':
-        embeddings = params.get('embeddings', [])
+        embeddings = _embedding_matrix(params)
         chunks = params.get('chunks', [])
-        if not embeddings:
-            return {"stored_count": 0, "collection_count": coll.count()}
-        ids = [str(uuid.uuid4()) for _ in embeddings]
+        if not len(embeddings):
+            return {"stored_count": 0, "collection_count": await asyncio.to_thread(coll.count)}
+        ids = [str(uuid.uuid4()) for _ in range(len(embeddings))]
         docs = [c.get('content', '') if isinstance(c, dict) else str(c) for c in chunks]
         while len(docs) < len(embeddings):
             docs.append('')
@@ -493,25 +711,31 @@ async def _chroma_op(operation: str, params: Dict, collection: str) -> Dict:
                  for i, c in enumerate(chunks)]
         while len(metas) < len(embeddings):
             metas.append({'source': 'unknown', 'chunk_index': len(metas)})
-        await asyncio.to_thread(coll.add, ids=ids, embeddings=embeddings, documents=docs, metadatas=metas)
-        return {"stored_count": len(embeddings), "collection_count": coll.count()}
+
+        def add(start: int, end: int) -> None:
+            coll.add(ids=ids[start:end], embeddings=embeddings[start:end],
+                     documents=docs[start:end], metadatas=metas[start:end])
+
+        await run_batches(add, len(embeddings), *_batch_options(params))
+        return {"stored_count": len(embeddings), "collection_count": await asyncio.to_thread(coll.count)}
 
     elif operation == 'query':
-        query_emb = params.get('queryEmbedding', [])
+        queries, batched = _query_vectors(params)
         top_k = int(params.get('topK', 5))
-        if not query_emb:
-            return {"matches": []}
-        results = coll.query(query_embeddings=[query_emb], n_results=top_k)
-        matches = []
-        if results['ids'] and results['ids'][0]:
-            for i in range(len(results['ids'][0])):
-                matches.append({
-                    'id': results['ids'][0][i],
-                    'document': results['documents'][0][i] if results['documents'] else '',
-                    'metadata': results['metadatas'][0][i] if results['metadatas'] else {},
-                    'distance': results['distances'][0][i] if results.get('distances') else None
-                })
-        return {"matches": matches}
+        if not queries:
+            return _query_result([], batched)
+        # Chroma runs every query embedding in one call
+        results = await asyncio.to_thread(coll.query, query_embeddings=queries, n_results=top_k)
+        per_query = []
+        for q in range(len(queries)):
+            ids = results['ids'][q] if results['ids'] and q < len(results['ids']) else []
+            per_query.append([{
+                'id': ids[i],
+                'document': results['documents'][q][i] if results['documents'] else '',
+                'metadata': results['metadatas'][q][i] if results['metadatas'] else {},
+                'distance': results['distances'][q][i] if results.get('distances') else None
+            } for i in range(len(ids))])
+        return _query_result(per_query, batched)
 
     elif operation == 'delete':
         ids = params.get('ids', [])
@@ -525,51 +749,47 @@ async def _chroma_op(operation: str, params: Dict, collection: str) -> Dict:
 async def _qdrant_op(operation: str, params: Dict, collection: str) -> Dict:
     """Qdrant operations."""
     try:
-        from qdrant_client import QdrantClient
-        from qdrant_client.models import VectorParams, Distance, PointStruct
+        from qdrant_client.models import SearchRequest
     except ImportError:
         raise ImportError("Qdrant client not available. Install with: pip install qdrant-client")
     import uuid
 
-    url = params.get('qdrantUrl', 'http://localhost:6333')
-    client = QdrantClient(url=url)
+    url = _vector_store_location('qdrant', params)
+    registry = get_vector_store_registry()
 
     if operation == 'store':
-        embeddings = params.get('embeddings', [])
+        embeddings = _embedding_matrix(params)
         chunks = params.get('chunks', [])
-        if not embeddings:
+        if not len(embeddings):
             return {"stored_count": 0}
-        vec_size = len(embeddings[0])
-        colls = client.get_collections().collections
-        if collection not in [c.name for c in colls]:
-            client.create_collection(collection, vectors_config=VectorParams(size=vec_size, distance=Distance.COSINE))
-        points = []
-        for i, emb in enumerate(embeddings):
-            payload = {}
-            if i < len(chunks):
-                c = chunks[i]
-                if isinstance(c, dict):
-                    payload = {'content': c.get('content', ''), 'source': c.get('source', 'unknown'),
-                              'chunk_index': c.get('chunk_index', i)}
-                else:
-                    payload = {'content': str(c), 'source': 'input', 'chunk_index': i}
-            points.append(PointStruct(id=str(uuid.uuid4()), vector=emb, payload=payload))
-        await asyncio.to_thread(client.upsert, collection_name=collection, points=points)
+        client = await asyncio.to_thread(registry.ensure_qdrant_collection, url, collection, embeddings.shape[1])
+        payloads = [_chunk_payload(chunks, i) for i in range(len(embeddings))]
+        ids = [str(uuid.uuid4()) for _ in payloads]
+
+        def upload(start: int, end: int) -> None:
+            # upload_collection takes the NumPy slice as-is (no per-point float lists)
+            client.upload_collection(collection_name=collection, vectors=embeddings[start:end],
+                                     payload=payloads[start:end], ids=ids[start:end], wait=True)
+
+        await run_batches(upload, len(embeddings), *_batch_options(params))
         return {"stored_count": len(embeddings)}
 
     elif operation == 'query':
-        query_emb = params.get('queryEmbedding', [])
+        queries, batched = _query_vectors(params)
         top_k = int(params.get('topK', 5))
-        if not query_emb:
-            return {"matches": []}
-        results = await asyncio.to_thread(client.search, collection_name=collection,
-                                          query_vector=query_emb, limit=top_k)
-        return {"matches": [{'id': str(r.id), 'document': r.payload.get('content', ''),
-                            'metadata': r.payload, 'score': r.score} for r in results]}
+        if not queries:
+            return _query_result([], batched)
+        client = await asyncio.to_thread(registry.qdrant_client, url)
+        requests = [SearchRequest(vector=q, limit=top_k, with_payload=True) for q in queries]
+        results = await asyncio.to_thread(client.search_batch, collection_name=collection, requests=requests)
+        return _query_result([[{'id': str(r.id), 'document': (r.payload or {}).get('content', ''),
+                                'metadata': r.payload or {}, 'score': r.score} for r in hits]
+                              for hits in results], batched)
 
     elif operation == 'delete':
         ids = params.get('ids', [])
         if ids:
+            client = await asyncio.to_thread(registry.qdrant_client, url)
             await asyncio.to_thread(client.delete, collection_name=collection, points_selector=ids)
         return {"deleted": True, "count": len(ids)}
 
@@ -578,43 +798,43 @@ async def _qdrant_op(operation: str, params: Dict, collection: str) -> Dict:
 
 async def _pinecone_op(operation: str, params: Dict, collection: str) -> Dict:
     """Pinecone operations."""
-    from pinecone import Pinecone
     import uuid
 
-    api_key = params.get('pineconeApiKey', '')
+    api_key = _vector_store_location('pinecone', params)
     if not api_key:
         raise ValueError("Pinecone API key required")
 
-    pc = Pinecone(api_key=api_key)
-    index = pc.Index(collection)
+    index = await asyncio.to_thread(get_vector_store_registry().pinecone_index, api_key, collection)
 
     if operation == 'store':
-        embeddings = params.get('embeddings', [])
+        embeddings = _embedding_matrix(params)
         chunks = params.get('chunks', [])
-        if not embeddings:
+        if not len(embeddings):
             return {"stored_count": 0}
-        vectors = []
-        for i, emb in enumerate(embeddings):
-            meta = {}
-            if i < len(chunks):
-                c = chunks[i]
-                if isinstance(c, dict):
-                    meta = {'content': c.get('content', ''), 'source': c.get('source', 'unknown'),
-                           'chunk_index': c.get('chunk_index', i)}
-                else:
-                    meta = {'content': str(c), 'source': 'input', 'chunk_index': i}
-            vectors.append({'id': str(uuid.uuid4()), 'values': emb, 'metadata': meta})
-        await asyncio.to_thread(index.upsert, vectors=vectors)
+        ids = [str(uuid.uuid4()) for _ in range(len(embeddings))]
+
+        def upsert(start: int, end: int) -> None:
+            # Pinecone's request model wants float lists; tolist() converts in C
+            index.upsert(vectors=[{'id': ids[start + j], 'values': emb, 'metadata': _chunk_payload(chunks, start + j)}
+                                  for j, emb in enumerate(embeddings[start:end].tolist())])
+
+        await run_batches(upsert, len(embeddings), *_batch_options(params, PINECONE_MAX_BATCH))
         return {"stored_count": len(embeddings)}
 
     elif operation == 'query':
-        query_emb = params.get('queryEmbedding', [])
+        queries, batched = _query_vectors(params)
         top_k = int(params.get('topK', 5))
-        if not query_emb:
-            return {"matches": []}
-        results = await asyncio.to_thread(index.query, vector=query_emb, top_k=top_k, include_metadata=True)
-        return {"matches": [{'id': m.id, 'document': m.metadata.get('content', '') if m.metadata else '',
-                            'metadata': m.metadata or {}, 'score': m.score} for m in results.matches]}
+        if not queries:
+            return _query_result([], batched)
+
+        def query(start: int, _end: int) -> List[Dict]:
+            results = index.query(vector=queries[start], top_k=top_k, include_metadata=True)
+            return [{'id': m.id, 'document': m.metadata.get('content', '') if m.metadata else '',
+                     'metadata': m.metadata or {}, 'score': m.score} for m in results.matches]
+
+        # Pinecone has no multi-vector query; fan the queries out instead
+        per_query = await run_batches(query, len(queries), 1, _batch_options(params)[1])
+        return _query_result(per_query, batched)
 
     elif operation == 'delete':
         ids = params.get('ids', [])
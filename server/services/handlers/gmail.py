@@ -6,7 +6,7 @@ import time
 from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Dict, Any, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 from googleapiclient.discovery import build
 
@@ -373,22 +373,29 @@ async def _poll_gmail_ids(service, query: str, max_results: int = 20) -> Set[str
     Args:
         service: Authenticated Gmail API service
         query: Gmail search query string
-        max_results: Maximum messages to fetch
+        max_results: Maximum messages to fetch, newest first; pages through
+            ``messages.list`` (at most 500 per page) when larger
 
     Returns:
         Set of message IDs
     """
-    def list_messages():
-        return service.users().messages().list(
-            userId='me',
-            q=query,
-            maxResults=max_results
-        ).execute()
+    def list_messages(page_size, page_token):
+        kwargs = {'userId': 'me', 'q': query, 'maxResults': page_size}
+        if page_token:
+            kwargs['pageToken'] = page_token
+        return service.users().messages().list(**kwargs).execute()
 
     loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(None, list_messages)
-    messages = result.get('messages', [])
-    return {m.get('id') for m in messages if m.get('id')}
+    ids: Set[str] = set()
+    page_token = None
+    while len(ids) < max_results:
+        page_size = min(GMAIL_LIST_PAGE_SIZE, max_results - len(ids))
+        result = await loop.run_in_executor(None, list_messages, page_size, page_token)
+        ids.update(m.get('id') for m in result.get('messages', []) if m.get('id'))
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            break
+    return ids
 
 
 async def _fetch_email_details(service, message_id: str) -> Dict[str, Any]:
@@ -432,6 +439,290 @@ async def _mark_email_as_read(service, message_id: str) -> None:
     await loop.run_in_executor(None, modify_message)
 
 
+# ============================================================================
+# GMAIL RECEIVE - Incremental sync (deployment mode)
+# ============================================================================
+
+# Messages per batch request (Gmail allows 100; smaller batches avoid 429s)
+GMAIL_BATCH_SIZE = 50
+# messages.list maximum page size
+GMAIL_LIST_PAGE_SIZE = 500
+# Batch requests in flight at once, each on its own service (httplib2 is not thread-safe)
+GMAIL_FETCH_CONCURRENCY = 4
+# Gmail keeps roughly a week of history; older cursors return 404
+GMAIL_CURSOR_TTL = 7 * 24 * 3600
+# Attempts per message whose fetch failed inside a batch
+GMAIL_FETCH_ATTEMPTS = 3
+# Labels whose ID equals their name, so history.list can filter by them
+GMAIL_SYSTEM_LABELS = {
+    'INBOX', 'SENT', 'SPAM', 'TRASH', 'DRAFT', 'UNREAD', 'STARRED', 'IMPORTANT',
+    'CATEGORY_PERSONAL', 'CATEGORY_SOCIAL', 'CATEGORY_PROMOTIONS',
+    'CATEGORY_UPDATES', 'CATEGORY_FORUMS',
+}
+
+
+def gmail_cursor_key(node_id: str) -> str:
+    """Cache key of a deployed gmailReceive node's history cursor."""
+    return f"gmail:history:{node_id}"
+
+
+class HistoryExpiredError(Exception):
+    """The stored historyId is older than the history Gmail keeps."""
+
+
+def _http_status(error: Exception) -> Optional[int]:
+    """HTTP status of a googleapiclient HttpError (None for other errors)."""
+    resp = getattr(error, 'resp', None)
+    try:
+        return int(getattr(resp, 'status', None))
+    except (TypeError, ValueError):
+        return None
+
+
+async def _get_gmail_services(
+    parameters: Dict[str, Any],
+    context: Dict[str, Any],
+    count: int
+) -> List[Any]:
+    """Build ``count`` Gmail services sharing one set of credentials."""
+    creds = await get_google_credentials(parameters, context)
+
+    def build_services():
+        return [build("gmail", "v1", credentials=creds) for _ in range(count)]
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, build_services)
+
+
+async def _get_profile(service) -> Dict[str, Any]:
+    """The mailbox profile: ``emailAddress`` and current ``historyId``."""
+    def get_profile():
+        return service.users().getProfile(userId='me').execute()
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, get_profile)
+
+
+async def _get_history_id(service) -> str:
+    """Current historyId of the mailbox."""
+    return str((await _get_profile(service))['historyId'])
+
+
+async def _list_history(
+    service,
+    start_history_id: str,
+    label_id: Optional[str] = None
+) -> Tuple[List[str], str]:
+    """List messages added since ``start_history_id``, across all pages.
+
+    Returns:
+        (message IDs in the order they were added, historyId to resume from)
+
+    Raises:
+        HistoryExpiredError: Gmail no longer has history that old
+    """
+    def list_page(page_token):
+        kwargs = {
+            'userId': 'me',
+            'startHistoryId': start_history_id,
+            'historyTypes': ['messageAdded'],
+        }
+        if label_id:
+            kwargs['labelId'] = label_id
+        if page_token:
+            kwargs['pageToken'] = page_token
+        return service.users().history().list(**kwargs).execute()
+
+    loop = asyncio.get_event_loop()
+    message_ids: List[str] = []
+    seen: Set[str] = set()
+    history_id = start_history_id
+    page_token = None
+    while True:
+        try:
+            result = await loop.run_in_executor(None, list_page, page_token)
+        except Exception as e:
+            if _http_status(e) == 404:
+                raise HistoryExpiredError(start_history_id) from e
+            raise
+        for record in result.get('history', []):
+            for added in record.get('messagesAdded', []):
+                message_id = added.get('message', {}).get('id')
+                if message_id and message_id not in seen:
+                    seen.add(message_id)
+                    message_ids.append(message_id)
+        history_id = str(result.get('historyId', history_id))
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            return message_ids, history_id
+
+
+async def _fetch_email_batch(
+    services: List[Any],
+    message_ids: List[str],
+    batch_size: int = GMAIL_BATCH_SIZE
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Fetch full emails through batch requests, one batch in flight per service.
+
+    Returns:
+        (formatted emails in ``message_ids`` order, IDs whose fetch failed)
+    """
+    def run_batch(service, chunk):
+        found: Dict[str, Dict[str, Any]] = {}
+
+        def callback(request_id, response, exception):
+            if exception is None:
+                found[request_id] = response
+            else:
+                logger.warning(f"[Gmail] Batch fetch failed for {request_id}: {exception}")
+
+        batch = service.new_batch_http_request(callback=callback)
+        for message_id in chunk:
+            batch.add(service.users().messages().get(
+                userId='me',
+                id=message_id,
+                format='full',
+                metadataHeaders=['From', 'To', 'Subject', 'Date', 'Cc', 'Bcc']
+            ), request_id=message_id)
+        batch.execute()
+        return found
+
+    pool: asyncio.Queue = asyncio.Queue()
+    for service in services:
+        pool.put_nowait(service)
+    loop = asyncio.get_event_loop()
+
+    async def fetch(chunk):
+        service = await pool.get()
+        try:
+            return await loop.run_in_executor(None, run_batch, service, chunk)
+        except Exception as e:
+            logger.warning(f"[Gmail] Batch request failed: {e}")
+            return {}
+        finally:
+            pool.put_nowait(service)
+
+    chunks = [message_ids[i:i + batch_size] for i in range(0, len(message_ids), batch_size)]
+    messages: Dict[str, Dict[str, Any]] = {}
+    for found in await asyncio.gather(*(fetch(chunk) for chunk in chunks)):
+        messages.update(found)
+
+    emails = [_format_message(messages[m], include_body=True) for m in message_ids if m in messages]
+    failed = [m for m in message_ids if m not in messages]
+    return emails, failed
+
+
+async def _mark_emails_as_read(service, message_ids: List[str]) -> None:
+    """Remove the UNREAD label from up to 1000 messages in one call."""
+    def batch_modify():
+        return service.users().messages().batchModify(
+            userId='me',
+            body={'ids': message_ids, 'removeLabelIds': ['UNREAD']}
+        ).execute()
+
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, batch_modify)
+
+
+class GmailHistorySync:
+    """Incremental Gmail sync from a persisted historyId cursor.
+
+    Each ``poll()`` asks ``history.list`` for messages added since the cursor
+    instead of re-listing the mailbox, keeps those that still match the
+    query, and fetches them in batches. The cursor is stored in the cache
+    service under ``cursor_key`` together with the query, label and account
+    it was taken for, so a restarted poller resumes where it stopped. Without
+    a stored cursor, with one taken for a different query, label or account,
+    or with an expired one, it baselines at the mailbox's current historyId,
+    like the list-based poller did.
+    """
+
+    def __init__(
+        self,
+        services: List[Any],
+        query: str,
+        label_filter: Optional[str] = None,
+        cache=None,
+        cursor_key: Optional[str] = None,
+        batch_size: int = GMAIL_BATCH_SIZE
+    ):
+        self.services = services
+        self.query = query.strip()
+        self.label_id = label_filter if label_filter in GMAIL_SYSTEM_LABELS else None
+        self.cache = cache
+        self.cursor_key = cursor_key
+        self.batch_size = batch_size
+        self.label_filter = label_filter
+        self.account: Optional[str] = None
+        self.history_id: Optional[str] = None
+        self._retry: Dict[str, int] = {}
+
+    async def start(self) -> bool:
+        """Load the stored cursor, or baseline. Returns True when resuming."""
+        profile = await _get_profile(self.services[0])
+        self.account = profile.get('emailAddress')
+        if self.cache is not None and self.cursor_key:
+            stored = await self.cache.get(self.cursor_key)
+            if isinstance(stored, dict) and stored.get('scope') == self._scope():
+                self.history_id = str(stored['history_id'])
+                return True
+            if stored:
+                logger.info(f"[Gmail] Stored cursor {self.cursor_key} was taken for another "
+                            f"query, label or account, re-baselining")
+        self.history_id = str(profile['historyId'])
+        self._retry = {}
+        await self._save()
+        return False
+
+    async def poll(self) -> List[Dict[str, Any]]:
+        """New matching emails since the cursor, oldest first; advances the cursor."""
+        if self.history_id is None:
+            await self.start()
+        try:
+            added, history_id = await _list_history(self.services[0], self.history_id, self.label_id)
+        except HistoryExpiredError:
+            logger.warning(f"[Gmail] History cursor {self.history_id} expired, re-baselining")
+            await self._baseline()
+            return []
+
+        candidates = list(self._retry) + [m for m in added if m not in self._retry]
+        if candidates and self.query:
+            # history.list has no query filter; match against messages.list
+            # Candidates are the newest messages, so the first len + 20 matches
+            # cover them (paged when that is more than one page)
+            matching = await _poll_gmail_ids(self.services[0], self.query,
+                                             max_results=len(candidates) + 20)
+            candidates = [m for m in candidates if m in matching]
+
+        emails, failed = await _fetch_email_batch(self.services, candidates, self.batch_size)
+        retry = {}
+        for message_id in failed:
+            attempts = self._retry.get(message_id, 0) + 1
+            if attempts < GMAIL_FETCH_ATTEMPTS:
+                retry[message_id] = attempts
+            else:
+                logger.error(f"[Gmail] Giving up on message {message_id} after {attempts} attempts")
+        self._retry = retry
+
+        self.history_id = history_id
+        await self._save()
+        return emails
+
+    async def _baseline(self) -> None:
+        self.history_id = await _get_history_id(self.services[0])
+        self._retry = {}
+        await self._save()
+
+    def _scope(self) -> Dict[str, Optional[str]]:
+        return {'query': self.query, 'label': self.label_filter, 'account': self.account}
+
+    async def _save(self) -> None:
+        if self.cache is not None and self.cursor_key:
+            await self.cache.set(self.cursor_key,
+                                 {'history_id': self.history_id, 'scope': self._scope()},
+                                 ttl=GMAIL_CURSOR_TTL)
+
+
 async def handle_gmail_receive(
     node_id: str,
     node_type: str,
@@ -0,0 +1,184 @@
+"""Shared pooled HTTP clients for scraping and download nodes.
+
+httpScraper and fileDownloader used to open a fresh ``httpx.AsyncClient``
+per run (or per file), paying DNS, TCP and TLS setup on every request. This
+module keeps long-lived clients so connections (and HTTP/2 streams, when
+``h2`` is installed) are reused across files, pages and runs.
+
+Clients are pooled per proxy gateway (scheme, host and port; ``""`` for
+direct), not per full proxy URL: the URL's credentials change with the geo
+target and sticky session, so keying on it would let per-run session URLs
+fill the pool. A gateway slot holds the client for its latest proxy URL; a
+request through another URL on the same gateway replaces it.
+
+Callers lease a client for the duration of their requests
+(``lease_http_client``). A client that is replaced or evicted is retired and
+closed once its last lease ends, so a concurrent run never sees its client
+closed under it.
+
+Clients are bound to the event loop that created them; a call from another
+loop (Temporal worker threads, per-test loops) gets its own client instead of
+reusing connections owned by a different loop. Retired clients are closed on
+their own loop. At most ``MAX_CLIENTS`` are kept; the least recently used
+one is retired when the limit is exceeded.
+
+Usage:
+    from services.http_pool import lease_http_client
+
+    async with lease_http_client(proxy_url) as client:
+        async with client.stream("GET", url, timeout=60) as response:
+            ...
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+MAX_CLIENTS = 16
+LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30.0)
+DEFAULT_TIMEOUT = httpx.Timeout(30.0)
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:  # pragma: no cover - h2 is optional; HTTP/1.1 keep-alive still pools
+    HTTP2 = False
+
+# (proxy gateway, id(loop))
+ClientKey = Tuple[str, int]
+
+
+@dataclass
+class _PooledClient:
+    loop: asyncio.AbstractEventLoop
+    proxy: str
+    client: httpx.AsyncClient
+    leases: int = 0
+    retired: bool = False
+
+
+_lock = threading.Lock()  # Loops on other threads share the pool
+_clients: "OrderedDict[ClientKey, _PooledClient]" = OrderedDict()
+# Close tasks in flight (the loop only keeps weak references to tasks)
+_closing: Set[asyncio.Task] = set()
+
+
+def proxy_gateway(proxy: Optional[str]) -> str:
+    """Pool key of a proxy URL: ``scheme://host:port`` without credentials."""
+    if not proxy:
+        return ""
+    parts = urlsplit(proxy)
+    return f"{parts.scheme}://{parts.hostname}:{parts.port or ''}"
+
+
+def _acquire(proxy: Optional[str]) -> _PooledClient:
+    loop = asyncio.get_running_loop()
+    proxy = proxy or ""
+    key = (proxy_gateway(proxy), id(loop))
+    retired = []
+    with _lock:
+        entry = _clients.get(key)
+        if entry is not None and (entry.loop is not loop or entry.proxy != proxy or entry.client.is_closed):
+            # Another session on this gateway, or a dead loop whose id was reused
+            retired.append(_clients.pop(key))
+            entry = None
+        if entry is None:
+            entry = _PooledClient(loop, proxy, httpx.AsyncClient(
+                http2=HTTP2,
+                limits=LIMITS,
+                timeout=DEFAULT_TIMEOUT,
+                follow_redirects=True,
+                proxy=proxy or None,
+            ))
+            _clients[key] = entry
+            logger.debug("[HttpPool] Created client", proxy=bool(proxy), http2=HTTP2, pooled=len(_clients))
+            while len(_clients) > MAX_CLIENTS:
+                retired.append(_clients.popitem(last=False)[1])
+        _clients.move_to_end(key)
+        entry.leases += 1
+        idle = [old for old in retired if _retire(old)]
+    for old in idle:
+        _close_on_owner_loop(old)
+    return entry
+
+
+def _retire(entry: _PooledClient) -> bool:
+    """Mark entry retired (under ``_lock``); True if nobody holds a lease."""
+    entry.retired = True
+    return entry.leases == 0
+
+
+def _close_on_owner_loop(entry: _PooledClient) -> None:
+    """Close a retired, unleased client on the loop that owns it."""
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if entry.loop is running:
+        _track_close(entry.client)
+    elif not entry.loop.is_closed():
+        try:
+            entry.loop.call_soon_threadsafe(_track_close, entry.client)
+        except RuntimeError:  # Closed between the check and the call
+            pass
+    else:
+        # Its loop is gone, and with it the transports' event loop
+        logger.debug("[HttpPool] Dropped client of a closed loop")
+
+
+def _track_close(client: httpx.AsyncClient) -> None:
+    task = asyncio.get_running_loop().create_task(client.aclose())
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+@asynccontextmanager
+async def lease_http_client(proxy: Optional[str] = None) -> AsyncIterator[httpx.AsyncClient]:
+    """Pooled client for ``proxy`` (``None`` for direct) on the running loop.
+
+    The client stays open until the ``async with`` block exits, even if it is
+    replaced or evicted meanwhile. Callers pass per-request ``timeout=`` and
+    ``headers=``; the client only carries connection settings, so it is safe
+    to share between nodes.
+    """
+    entry = _acquire(proxy)
+    try:
+        yield entry.client
+    finally:
+        with _lock:
+            entry.leases -= 1
+            close = entry.retired and entry.leases == 0
+        if close:
+            await entry.client.aclose()
+
+
+async def close_http_clients() -> None:
+    """Close every pooled client (call on shutdown).
+
+    Clients of the running loop are closed here; those of other live loops
+    are closed on their own loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        entries = list(_clients.values())
+        _clients.clear()
+        for entry in entries:
+            entry.retired = True
+    for entry in entries:
+        if entry.loop is loop:
+            await entry.client.aclose()
+        else:
+            _close_on_owner_loop(entry)
+    pending = [task for task in _closing if task.get_loop() is loop]
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -82,9 +82,10 @@ def get_memory_vector_store(session_id: str):
     if session_id not in _memory_vector_stores:
         try:
             from langchain_core.vectorstores import InMemoryVectorStore
-            from langchain_huggingface import HuggingFaceEmbeddings
+            from services.embeddings import get_embedding_service
 
-            embeddings = HuggingFaceEmbeddings(model_name="BAAI/bge-small-en-v1.5")
+            # Shares the process-wide model instead of loading one per session
+            embeddings = get_embedding_service().get_embedder('huggingface', "BAAI/bge-small-en-v1.5")
             _memory_vector_stores[session_id] = InMemoryVectorStore(embeddings)
             logger.debug(f"[Memory] Created vector store for session '{session_id}'")
         except ImportError as e:
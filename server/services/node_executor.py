@@ -66,6 +66,7 @@ if TYPE_CHECKING:
     from services.maps import MapsService
     from services.text import TextService
     from services.android_service import AndroidService
+    from services.deployment import ParameterSnapshot
 
 logger = get_logger(__name__)
 
@@ -246,7 +247,8 @@ class NodeExecutor:
 
         try:
             # Load, validate, enhance parameters
-            params = await self._prepare_parameters(node_id, node_type, parameters, session_id)
+            params = await self._prepare_parameters(node_id, node_type, parameters, session_id,
+                                                    context.get('param_snapshot'))
 
             # Resolve templates if resolver provided
             nodes = context.get('nodes')
@@ -255,7 +257,8 @@ class NodeExecutor:
 
             if resolve_params_fn and nodes is not None and edges is not None:
                 logger.debug(f"[NodeExecutor] Before resolution: params={list(params.keys())}")
-                params = await resolve_params_fn(params, node_id, nodes, edges, session_id)
+                params = await resolve_params_fn(params, node_id, nodes, edges, session_id,
+                                                 key_index=context.get('key_index'))
                 logger.debug(f"[NodeExecutor] After resolution: params keys={list(params.keys())}")
 
             # Build handler context
@@ -264,11 +267,22 @@ class NodeExecutor:
                 "start_time": start_time,
                 "execution_id": execution_id,
             }
+            memo = handler_ctx.pop('memo', None)
             logger.info("NodeExecutor context", node_id=node_id, workflow_id=context.get('workflow_id'))
 
-            # Execute via registry or special handlers
-            result = await self._dispatch(node_id, node_type, params, handler_ctx)
-            result['execution_id'] = execution_id
+            # Cross-run memoization (deterministic nodes, opt-in per workflow)
+            memoized = await memo.lookup(node_type, params) if memo else None
+            if memoized is not None:
+                result = ExecutionResult(True, node_id, node_type, result=memoized,
+                                         execution_id=execution_id,
+                                         execution_time=time.time() - start_time).to_dict()
+                result['memoized'] = True
+            else:
+                # Execute via registry or special handlers
+                result = await self._dispatch(node_id, node_type, params, handler_ctx)
+                result['execution_id'] = execution_id
+                if memo and result.get('success'):
+                    await memo.store(node_type, params, result.get('result', {}))
 
             # Store output if successful
             if result.get('success') and self._output_store:
@@ -295,13 +309,10 @@ class NodeExecutor:
                     await self._output_store(session_id, node_id, "output_contact", output_data.get('contact', {}))
                     await self._output_store(session_id, node_id, "output_metadata", output_data.get('metadata', {}))
 
-                # Store with multiple keys for different handle IDs used by frontend components:
-                # - output_main: SquareNode, GenericNode, TriggerNode, StartNode
-                # - output_top: AIAgentNode (agents use top output handle)
-                # - output_0: backward compatibility
+                # Stored once; the other handle ids that frontend components use
+                # (output_top on AIAgentNode, legacy output_0) are read-time
+                # aliases of output_main (services.node_outputs.OUTPUT_ALIASES)
                 await self._output_store(session_id, node_id, "output_main", output_data)
-                await self._output_store(session_id, node_id, "output_top", output_data)
-                await self._output_store(session_id, node_id, "output_0", output_data)
 
             return result
 
@@ -313,8 +324,28 @@ class NodeExecutor:
             return ExecutionResult(False, node_id, node_type, error=str(e),
                                    execution_id=execution_id, execution_time=time.time()-start_time).to_dict()
 
-    async def _prepare_parameters(self, node_id: str, node_type: str, params: Dict, session_id: str) -> Dict:
-        """Load from DB, validate, inject API keys."""
+    async def _prepare_parameters(self, node_id: str, node_type: str, params: Dict, session_id: str,
+                                  snapshot: Optional["ParameterSnapshot"] = None) -> Dict:
+        """Load from DB, validate, inject API keys.
+
+        Deployed runs pass their deployment's snapshot: a node whose run
+        parameters, DB parameters and credentials are unchanged since its last
+        run reuses the prepared result without touching the DB or auth.
+        """
+        if snapshot is not None:
+            versions = (self.database.node_parameters_version(node_id),
+                        self.ai_service.auth.credentials_version)
+            cached = snapshot.get(node_id, params, versions)
+            if cached is not None:
+                return cached
+
+        prepared = await self._load_parameters(node_id, node_type, params)
+        if snapshot is not None:
+            snapshot.put(node_id, params, prepared, versions)
+        return prepared
+
+    async def _load_parameters(self, node_id: str, node_type: str, params: Dict) -> Dict:
+        """Merge DB parameters, validate and inject API keys (uncached)."""
         # Merge with DB parameters (DB provides defaults, frontend can override)
         db_params = await self.database.get_node_parameters(node_id) or {}
         merged = {**db_params, **params} if params else db_params
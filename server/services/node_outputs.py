@@ -0,0 +1,236 @@
+"""Node output store helpers: handle aliasing and write-behind batching.
+
+Frontend components read a node's main output through different handle ids
+(``output-main`` on generic nodes, ``output-top`` on agents, ``output_0`` for
+legacy callers). All of them name the same payload, so it is stored once
+under ``output_main`` and the other names are resolved at read time.
+
+``NodeOutputBuffer`` queues writes and upserts them in one session and commit
+per batch: when a workflow run finishes, when ``max_pending`` outputs are
+queued, or ``flush_delay`` seconds after the first queued write. Readers go
+through WorkflowService, which serves pending outputs from memory, so
+buffering is invisible to the executor.
+
+``NodeOutputCache`` is the in-memory side: outputs indexed by session, with
+the whole session evicted in O(1) when its run ends and least-recently-used
+sessions evicted past a size, count or idle-time bound. Evicted outputs are
+still readable from the database.
+"""
+
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from core.logging import get_logger
+
+if TYPE_CHECKING:
+    from core.database import Database
+
+logger = get_logger(__name__)
+
+MAIN_OUTPUT = "output_main"
+
+# Handle name -> stored output name
+OUTPUT_ALIASES: Dict[str, str] = {
+    "output_top": MAIN_OUTPUT,
+    "output_0": MAIN_OUTPUT,
+}
+
+OutputKey = Tuple[str, str, str]  # (session_id, node_id, output_name)
+
+
+def canonical_output_name(output_name: str) -> str:
+    """Stored name for a handle's output name."""
+    return OUTPUT_ALIASES.get(output_name, output_name)
+
+
+class NodeOutputBuffer:
+    """Write-behind buffer for ``Database.save_node_outputs``.
+
+    Writes to the same (session, node, output) coalesce, so a node that is
+    re-run before the flush is written once. Flushes are serialized so a
+    newer value is never overwritten by an older in-flight batch.
+    """
+
+    def __init__(self, database: "Database", max_pending: int = 256, flush_delay: float = 0.5):
+        self.database = database
+        self.max_pending = max_pending
+        self.flush_delay = flush_delay
+        self._pending: Dict[OutputKey, Any] = {}
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, session_id: str, node_id: str, output_name: str, data: Any) -> None:
+        """Queue an output; schedules a flush."""
+        self._pending[(session_id, node_id, output_name)] = data
+        if len(self._pending) >= self.max_pending:
+            asyncio.create_task(self.flush())
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    def get(self, session_id: str, node_id: str, output_name: str) -> Any:
+        """Pending (not yet committed) output, or None."""
+        return self._pending.get((session_id, node_id, output_name))
+
+    def discard_session(self, session_id: str) -> None:
+        """Drop pending outputs of a session that is being cleared."""
+        for key in [k for k in self._pending if k[0] == session_id]:
+            del self._pending[key]
+
+    async def flush(self, session_id: Optional[str] = None) -> int:
+        """Commit pending outputs (of one session, or all). Returns rows written."""
+        async with self._lock:
+            if session_id is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {k: v for k, v in self._pending.items() if k[0] == session_id}
+                for key in batch:
+                    del self._pending[key]
+            if not batch:
+                return 0
+
+            rows = [(node_id, sess, name, data) for (sess, node_id, name), data in batch.items()]
+            if await self.database.save_node_outputs(rows):
+                logger.debug("[NodeOutputBuffer] Flushed", rows=len(rows), session_id=session_id)
+                return len(rows)
+
+            # Keep the batch for the next flush unless it was overwritten meanwhile
+            for key, data in batch.items():
+                self._pending.setdefault(key, data)
+            logger.warning("[NodeOutputBuffer] Flush failed, will retry", rows=len(rows))
+            return 0
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def close(self) -> None:
+        """Cancel the timer and commit everything still pending."""
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        await self.flush()
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate deep size of a JSON-like value in bytes."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += estimate_size(k) + estimate_size(v)
+    elif isinstance(value, (list, tuple, set)):
+        for v in value:
+            size += estimate_size(v)
+    return size
+
+
+class _SessionOutputs:
+    __slots__ = ("outputs", "sizes", "size", "touched")
+
+    def __init__(self):
+        self.outputs: Dict[Tuple[str, str], Any] = {}  # (node_id, output_name) -> data
+        self.sizes: Dict[Tuple[str, str], int] = {}
+        self.size = 0
+        self.touched = time.monotonic()
+
+
+class NodeOutputCache:
+    """Bounded in-memory node outputs, indexed by session.
+
+    Sessions are kept in least-recently-used order. A put that exceeds
+    ``max_bytes`` or ``max_sessions`` evicts the oldest other sessions, and
+    sessions idle for longer than ``ttl`` seconds are dropped on access.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, max_sessions: int = 1000,
+                 ttl: float = 3600.0):
+        self.max_bytes = max_bytes
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, _SessionOutputs]" = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return sum(len(s.outputs) for s in self._sessions.values())
+
+    def get(self, session_id: str, node_id: str, output_name: str) -> Any:
+        """Cached output, or None."""
+        self._expire()
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        self._sessions.move_to_end(session_id)
+        session.touched = time.monotonic()
+        return session.outputs.get((node_id, output_name))
+
+    def put(self, session_id: str, node_id: str, output_name: str, data: Any) -> None:
+        """Cache an output and enforce the bounds."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _SessionOutputs()
+        else:
+            self._sessions.move_to_end(session_id)
+        session.touched = time.monotonic()
+
+        key = (node_id, output_name)
+        size = estimate_size(data)
+        delta = size - session.sizes.get(key, 0)
+        session.outputs[key] = data
+        session.sizes[key] = size
+        session.size += delta
+        self._bytes += delta
+
+        self._expire()
+        while (self._bytes > self.max_bytes or len(self._sessions) > self.max_sessions) \
+                and len(self._sessions) > 1:
+            oldest = next(iter(self._sessions))
+            if oldest == session_id:
+                break
+            self._evict(oldest)
+
+    def evict_session(self, session_id: str) -> None:
+        """Drop all outputs of a session (its run completed or was cleared)."""
+        if session_id in self._sessions:
+            self._evict(session_id)
+
+    def discard_node(self, node_id: str) -> int:
+        """Drop a node's outputs from every session. Returns sessions touched."""
+        touched = 0
+        for session in self._sessions.values():
+            keys = [k for k in session.outputs if k[0] == node_id]
+            for key in keys:
+                del session.outputs[key]
+                size = session.sizes.pop(key)
+                session.size -= size
+                self._bytes -= size
+            touched += bool(keys)
+        return touched
+
+    def stats(self) -> Dict[str, int]:
+        """Sessions, outputs and estimated bytes held, plus evictions so far."""
+        return {
+            "sessions": len(self._sessions),
+            "outputs": len(self),
+            "bytes": self._bytes,
+            "evictions": self._evictions,
+        }
+
+    def _evict(self, session_id: str) -> None:
+        session = self._sessions.pop(session_id)
+        self._bytes -= session.size
+        self._evictions += 1
+
+    def _expire(self) -> None:
+        if not self.ttl:
+            return
+        deadline = time.monotonic() - self.ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.touched >= deadline:
+                break
+            self._evict(session_id)
@@ -0,0 +1,240 @@
+"""Node Status Table - bounded, per-workflow node statuses behind the broadcaster.
+
+The broadcaster used to keep every node id it had ever seen in one flat dict,
+full outputs inline, and ship all of it in ``initial_status``. This table
+keeps at most ``max_nodes`` nodes per workflow and ``max_workflows``
+workflows, both least-recently-updated first out. Outputs and status data
+over ``inline_limit`` bytes are stored as summaries: an output becomes a
+reference the client resolves with ``get_node_output``, status data keeps
+only its small scalar fields.
+
+Every change takes the next value of one global version counter. A client
+that remembers the highest version it has seen for a workflow asks
+``snapshot(workflow_id, since=cursor)`` and gets only the nodes changed
+after it plus the ids removed after it. Removals are remembered as
+tombstones, up to ``max_tombstones`` per workflow; a cursor older than the
+oldest forgotten tombstone gets a full snapshot instead.
+
+Versions restart at 0 with the process, so the table also has an ``epoch``,
+a random id chosen when it is created. Clients send it back with their
+cursor. A cursor from another epoch, or one ahead of the current version,
+gets a full snapshot.
+"""
+
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+from core.logging import get_logger
+from services.node_outputs import estimate_size
+
+logger = get_logger(__name__)
+
+MAX_WORKFLOWS = 64
+MAX_NODES = 1000
+INLINE_LIMIT = 4096
+MAX_TOMBSTONES = 1000
+# Scalar string fields longer than this are dropped from summarized status data
+_SUMMARY_STR_LIMIT = 256
+_REF_KEYS = 20
+
+OUTPUT_REF = "node_output"
+
+
+def payload_size(value: Any) -> int:
+    """Serialized size of a JSON-like value in bytes (estimated if not serializable)."""
+    try:
+        return len(orjson.dumps(value))
+    except TypeError:
+        return estimate_size(value)
+
+
+def output_reference(node_id: str, output: Any, size: int) -> Dict[str, Any]:
+    """Stand-in for an output too large to keep inline."""
+    ref: Dict[str, Any] = {"__ref__": OUTPUT_REF, "node_id": node_id, "bytes": size,
+                           "type": type(output).__name__}
+    if isinstance(output, dict):
+        ref["keys"] = list(output)[:_REF_KEYS]
+    elif isinstance(output, (list, tuple, str)):
+        ref["length"] = len(output)
+    return ref
+
+
+def summarize_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Small scalar fields of oversized status data (phase, error, tool_name, ...)."""
+    summary = {
+        key: value for key, value in data.items()
+        if value is None or isinstance(value, (bool, int, float))
+        or (isinstance(value, str) and len(value) <= _SUMMARY_STR_LIMIT)
+    }
+    summary["_truncated"] = True
+    return summary
+
+
+class _WorkflowNodes:
+    __slots__ = ("nodes", "tombstones", "floor")
+
+    def __init__(self, max_tombstones: int):
+        self.nodes: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.tombstones: Deque[Tuple[int, str]] = deque(maxlen=max_tombstones)
+        self.floor = 0  # cursors below this get a full snapshot
+
+
+class NodeStatusTable:
+    """Bounded node statuses, scoped per workflow and versioned for deltas."""
+
+    def __init__(self, max_workflows: int = MAX_WORKFLOWS, max_nodes: int = MAX_NODES,
+                 inline_limit: int = INLINE_LIMIT, max_tombstones: int = MAX_TOMBSTONES):
+        self.max_workflows = max(1, max_workflows)
+        self.max_nodes = max(1, max_nodes)
+        self.inline_limit = inline_limit
+        self.max_tombstones = max(1, max_tombstones)
+
+        self.version = 0
+        self.epoch = uuid.uuid4().hex
+        self._workflows: "OrderedDict[Optional[str], _WorkflowNodes]" = OrderedDict()
+        self._node_workflow: Dict[str, Optional[str]] = {}  # node_id -> workflow_id
+        self._evicted_nodes = 0
+        self._evicted_workflows = 0
+
+    def __len__(self) -> int:
+        return len(self._node_workflow)
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    def set_status(self, node_id: str, status: str, data: Dict[str, Any], timestamp: float,
+                   workflow_id: Optional[str] = None) -> Dict[str, Any]:
+        """Record a node's status; keeps its stored output. Returns the stored entry."""
+        entry = self._take(node_id, workflow_id)
+        if data and payload_size(data) > self.inline_limit:
+            data = summarize_data(data)
+        entry.update(status=status, data=data or {}, timestamp=timestamp, workflow_id=workflow_id)
+        return self._put(node_id, workflow_id, entry)
+
+    def set_output(self, node_id: str, output: Any, workflow_id: Optional[str] = None) -> Dict[str, Any]:
+        """Record a node's output, by reference when large. Returns the stored entry."""
+        if workflow_id is None:
+            workflow_id = self._node_workflow.get(node_id)
+        entry = self._take(node_id, workflow_id)
+        entry.setdefault("status", "idle")
+        entry.setdefault("data", {})
+        entry["workflow_id"] = workflow_id
+        size = payload_size(output)
+        entry["output"] = output if size <= self.inline_limit else output_reference(node_id, output, size)
+        return self._put(node_id, workflow_id, entry)
+
+    def remove(self, node_id: str) -> Optional[Tuple[Optional[str], int]]:
+        """Drop a node. Returns (workflow_id, version) of the removal, None if unknown."""
+        if node_id not in self._node_workflow:
+            return None
+        workflow_id = self._node_workflow.pop(node_id)
+        wf = self._workflows[workflow_id]
+        del wf.nodes[node_id]
+        self.version += 1
+        if len(wf.tombstones) == wf.tombstones.maxlen:
+            wf.floor = wf.tombstones[0][0]
+        wf.tombstones.append((self.version, node_id))
+        return workflow_id, self.version
+
+    def _take(self, node_id: str, workflow_id: Optional[str]) -> Dict[str, Any]:
+        """The node's entry detached from the table (moved if its workflow changed)."""
+        previous = self._node_workflow.get(node_id, workflow_id)
+        if previous != workflow_id:
+            self.remove(node_id)
+            return {}
+        wf = self._workflows.get(workflow_id)
+        if wf is None or node_id not in wf.nodes:
+            return {}
+        return wf.nodes.pop(node_id)
+
+    def _put(self, node_id: str, workflow_id: Optional[str], entry: Dict[str, Any]) -> Dict[str, Any]:
+        wf = self._workflows.get(workflow_id)
+        if wf is None:
+            # Cursors from before this workflow's entries existed (or were
+            # evicted) cannot be served as deltas
+            wf = self._workflows[workflow_id] = _WorkflowNodes(self.max_tombstones)
+            wf.floor = self.version + 1
+            while len(self._workflows) > self.max_workflows:
+                self._evict_workflow()
+        else:
+            self._workflows.move_to_end(workflow_id)
+
+        self.version += 1
+        entry["version"] = self.version
+        wf.nodes[node_id] = entry
+        self._node_workflow[node_id] = workflow_id
+
+        while len(wf.nodes) > self.max_nodes:
+            evicted_id, _ = wf.nodes.popitem(last=False)
+            del self._node_workflow[evicted_id]
+            self._evicted_nodes += 1
+        return entry
+
+    def _evict_workflow(self) -> None:
+        workflow_id, wf = self._workflows.popitem(last=False)
+        for node_id in wf.nodes:
+            del self._node_workflow[node_id]
+        self._evicted_workflows += 1
+        logger.debug("Evicted node statuses of least recently updated workflow",
+                     workflow_id=workflow_id, nodes=len(wf.nodes))
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    def get(self, node_id: str) -> Optional[Dict[str, Any]]:
+        if node_id not in self._node_workflow:
+            return None
+        return self._workflows[self._node_workflow[node_id]].nodes.get(node_id)
+
+    def statuses(self, workflow_ids: Optional[Iterable[Optional[str]]] = None) -> Dict[str, Dict[str, Any]]:
+        """node_id -> entry of the given workflows (all workflows when None)."""
+        if workflow_ids is None:
+            workflow_ids = list(self._workflows)
+        result: Dict[str, Dict[str, Any]] = {}
+        for workflow_id in workflow_ids:
+            wf = self._workflows.get(workflow_id)
+            if wf is not None:
+                result.update(wf.nodes)
+        return result
+
+    def snapshot(self, workflow_id: Optional[str], since: Optional[int] = None,
+                 epoch: Optional[str] = None) -> Dict[str, Any]:
+        """A workflow's nodes, or only the changes after cursor ``since``.
+
+        Returns ``{workflow_id, epoch, version, full, nodes, removed}``.
+        ``epoch`` and ``version`` are the cursor for the next call; ``full``
+        tells the client to replace rather than merge. ``since`` is only
+        trusted when ``epoch`` (if given) is this table's.
+        """
+        wf = self._workflows.get(workflow_id)
+        if wf is None:
+            return {"workflow_id": workflow_id, "epoch": self.epoch, "version": self.version,
+                    "full": True, "nodes": {}, "removed": []}
+
+        if (since is None or since < wf.floor or since > self.version
+                or (epoch is not None and epoch != self.epoch)):
+            return {"workflow_id": workflow_id, "epoch": self.epoch, "version": self.version,
+                    "full": True, "nodes": dict(wf.nodes), "removed": []}
+
+        nodes = {node_id: entry for node_id, entry in wf.nodes.items() if entry["version"] > since}
+        removed: List[str] = [
+            node_id for version, node_id in wf.tombstones
+            if version > since and node_id not in wf.nodes
+        ]
+        return {"workflow_id": workflow_id, "epoch": self.epoch, "version": self.version,
+                "full": False, "nodes": nodes, "removed": removed}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "epoch": self.epoch,
+            "version": self.version,
+            "workflows": len(self._workflows),
+            "nodes": len(self._node_workflow),
+            "evicted_nodes": self._evicted_nodes,
+            "evicted_workflows": self._evicted_workflows,
+        }
@@ -1,12 +1,19 @@
 """Parameter Resolver - Template variable resolution.
 
 Resolves {{node.field}} template variables in parameters using connected node outputs.
+
+Template strings are compiled once (``compile_template``) into the node keys
+they reference and pre-split navigation steps. ``resolve`` only fetches the
+outputs of referenced nodes and returns template-free parameters untouched.
 """
 
 import re
-from typing import Dict, Any, List, Optional, Callable, TYPE_CHECKING
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, FrozenSet, List, Optional, Callable, Tuple, TYPE_CHECKING
 
 from core.logging import get_logger
+from services.vectors import is_vector_payload, vector_at
 
 if TYPE_CHECKING:
     from core.database import Database
@@ -15,6 +22,108 @@ logger = get_logger(__name__)
 
 # Compiled regex for template matching
 TEMPLATE_PATTERN = re.compile(r'\{\{([^}]+)\}\}')
+INDEX_PATTERN = re.compile(r'^(\w+)\[(\d+)\]$')
+
+# (field, index): index is None for a plain dict key, else field[index]
+PathStep = Tuple[str, Optional[int]]
+
+# Template key -> (node id, node type) of the nodes with that key, in workflow order
+KeyIndex = Dict[str, Tuple[Tuple[str, str], ...]]
+
+# Node lists whose key index is kept (one run resolves many nodes against one list)
+_KEY_INDEX_CACHE_SIZE = 16
+
+
+@dataclass(frozen=True)
+class TemplateRef:
+    """One ``{{node.path}}`` occurrence in a string."""
+
+    text: str  # Full match, e.g. "{{agent.items[0].text}}"
+    node_key: str  # Lowercased template key
+    steps: Tuple[PathStep, ...]
+
+
+def compile_path(parts: List[str]) -> Tuple[PathStep, ...]:
+    """Pre-split path parts (``items[0]`` -> ``("items", 0)``)."""
+    steps = []
+    for part in parts:
+        bracket_match = INDEX_PATTERN.match(part)
+        if bracket_match:
+            steps.append((bracket_match.group(1), int(bracket_match.group(2))))
+        else:
+            steps.append((part, None))
+    return tuple(steps)
+
+
+def compile_template(value: str) -> Tuple[TemplateRef, ...]:
+    """Template references in a string, in order (empty if it has none)."""
+    # Plain strings (often long prompts) never enter the cache
+    return _compile_template(value) if '{{' in value else ()
+
+
+@lru_cache(maxsize=4096)
+def _compile_template(value: str) -> Tuple[TemplateRef, ...]:
+    refs = []
+    for match in TEMPLATE_PATTERN.finditer(value):
+        path = match.group(1).split('.')
+        refs.append(TemplateRef(match.group(0), path[0].lower(), compile_path(path[1:])))
+    return tuple(refs)
+
+
+def template_keys(value: Any) -> FrozenSet[str]:
+    """Node keys referenced anywhere in a (nested) parameter value."""
+    if isinstance(value, str):
+        return frozenset(ref.node_key for ref in compile_template(value))
+    if isinstance(value, dict):
+        values = value.values()
+    elif isinstance(value, list):
+        values = value
+    else:
+        return frozenset()
+    keys = frozenset()
+    for item in values:
+        keys |= template_keys(item)
+    return keys
+
+
+def template_key(node: Dict) -> str:
+    """Get template key for a node (lowercase, no spaces).
+
+    Priority matches frontend useDragVariable hook:
+    1. node.data.label (user-defined label)
+    2. node.data.displayName (from node definition)
+    3. node.type (lowercased)
+    4. node.id (fallback)
+    """
+    # Priority 1: User-defined label
+    label = node.get('data', {}).get('label')
+    if label:
+        return re.sub(r'\s+', '', label.lower())
+
+    # Priority 2: displayName from node definition (passed in node.data)
+    display_name = node.get('data', {}).get('displayName')
+    if display_name:
+        return re.sub(r'\s+', '', display_name.lower())
+
+    # Priority 3: node type
+    node_type = node.get('type', '')
+    if node_type:
+        return node_type.lower()
+
+    # Priority 4: node id
+    return node.get('id', 'unknown').lower()
+
+
+def index_nodes_by_key(nodes: List[Dict]) -> KeyIndex:
+    """Template key -> (id, type) of the nodes with that key, in workflow order.
+
+    Only ids and types are kept, so the index of a run plan holds for every
+    run instantiated from it.
+    """
+    index: Dict[str, List[Tuple[str, str]]] = {}
+    for node in nodes:
+        index.setdefault(template_key(node), []).append((node.get('id'), node.get('type', '')))
+    return {key: tuple(entries) for key, entries in index.items()}
 
 
 class ParameterResolver:
@@ -29,6 +138,8 @@ class ParameterResolver:
         """
         self.database = database
         self.get_output = get_output_fn
+        # id(nodes) -> (nodes, key index); holding the list keeps its id stable
+        self._key_index: Dict[int, Tuple[List[Dict], KeyIndex]] = {}
 
     async def resolve(
         self,
@@ -36,23 +147,45 @@ class ParameterResolver:
         node_id: str,
         nodes: List[Dict],
         edges: List[Dict],
-        session_id: str
+        session_id: str,
+        key_index: Optional[KeyIndex] = None
     ) -> Dict[str, Any]:
-        """Resolve all template variables in parameters."""
-        # Build connected data map from upstream nodes
-        connected_data = await self._gather_connected_outputs(node_id, nodes, edges, session_id)
+        """Resolve all template variables in parameters.
+
+        ``key_index`` is the precompiled key index of ``nodes`` (a deployment
+        run plan's); without it the index is built from ``nodes``.
+        """
+        keys = template_keys(parameters)
+        if not keys:
+            return parameters
+
+        # Fetch outputs of the referenced nodes only
+        if key_index is None:
+            key_index = self._nodes_by_key(nodes)
+        connected_data = await self._gather_connected_outputs(node_id, key_index, keys, session_id)
 
         # Resolve templates
         return self._resolve_templates(parameters, connected_data)
 
+    def _nodes_by_key(self, nodes: List[Dict]) -> KeyIndex:
+        """Key index of nodes (cached per nodes list)."""
+        cached = self._key_index.get(id(nodes))
+        if cached is not None and cached[0] is nodes:
+            return cached[1]
+        index = index_nodes_by_key(nodes)
+        if len(self._key_index) >= _KEY_INDEX_CACHE_SIZE:
+            self._key_index.pop(next(iter(self._key_index)))
+        self._key_index[id(nodes)] = (nodes, index)
+        return index
+
     async def _gather_connected_outputs(
         self,
         node_id: str,
-        nodes: List[Dict],
-        edges: List[Dict],
+        key_index: KeyIndex,
+        keys: FrozenSet[str],
         session_id: str
     ) -> Dict[str, Any]:
-        """Gather outputs from all nodes in the workflow that have executed.
+        """Gather outputs of the workflow nodes whose template keys are referenced.
 
         n8n pattern: Template variables can reference ANY node's output in the workflow,
         not just directly connected nodes. This allows flexible data flow patterns like:
@@ -61,31 +194,23 @@ class ParameterResolver:
         """
         connected = {}
 
-        logger.debug(f"[ParameterResolver] Gathering outputs for node {node_id}, session_id={session_id}, total nodes: {len(nodes)}")
-
-        # Gather outputs from ALL nodes (not just directly connected)
-        # This allows {{nodeName.field}} to reference any previously executed node
-        for source_node in nodes:
-            source_id = source_node.get('id')
-            if source_id == node_id:
-                continue  # Skip self
-
-            node_type = source_node.get('type', '')
-            node_label = source_node.get('data', {}).get('label', 'NO_LABEL')
-            node_key = self._get_template_key(source_node)
+        logger.debug(f"[ParameterResolver] Gathering outputs for node {node_id}, session_id={session_id}, referenced keys: {sorted(keys)}")
 
-            logger.debug(f"[ParameterResolver] Processing node: id={source_id}, type={node_type}, label={node_label}, key={node_key}")
+        for node_key in keys:
+            for source_id, node_type in key_index.get(node_key, ()):
+                if source_id == node_id:
+                    continue  # Skip self
 
-            # Special handling for start nodes
-            if node_type == 'start':
-                data = await self._get_start_node_data(source_id)
-            else:
-                data = await self.get_output(session_id, source_id, "output_0")
-                logger.debug(f"[ParameterResolver] Output lookup: session={session_id}, node={source_id}, result={'FOUND' if data else 'NOT_FOUND'}")
+                # Special handling for start nodes
+                if node_type == 'start':
+                    data = await self._get_start_node_data(source_id)
+                else:
+                    data = await self.get_output(session_id, source_id, "output_0")
+                    logger.debug(f"[ParameterResolver] Output lookup: session={session_id}, node={source_id}, result={'FOUND' if data else 'NOT_FOUND'}")
 
-            if data:
-                connected[node_key] = data
-                logger.debug(f"[ParameterResolver] Stored output for key '{node_key}' (type={node_type}): keys={list(data.keys()) if isinstance(data, dict) else type(data)}")
+                # Same-key nodes: the last one with output wins
+                if data:
+                    connected[node_key] = data
 
         logger.debug(f"[ParameterResolver] Available data keys for resolution: {list(connected.keys())}")
         return connected
@@ -103,33 +228,6 @@ class ParameterResolver:
         except Exception:
             return {}
 
-    def _get_template_key(self, node: Dict) -> str:
-        """Get template key for a node (lowercase, no spaces).
-
-        Priority matches frontend useDragVariable hook:
-        1. node.data.label (user-defined label)
-        2. node.data.displayName (from node definition)
-        3. node.type (lowercased)
-        4. node.id (fallback)
-        """
-        # Priority 1: User-defined label
-        label = node.get('data', {}).get('label')
-        if label:
-            return re.sub(r'\s+', '', label.lower())
-
-        # Priority 2: displayName from node definition (passed in node.data)
-        display_name = node.get('data', {}).get('displayName')
-        if display_name:
-            return re.sub(r'\s+', '', display_name.lower())
-
-        # Priority 3: node type
-        node_type = node.get('type', '')
-        if node_type:
-            return node_type.lower()
-
-        # Priority 4: node id
-        return node.get('id', 'unknown').lower()
-
     def _resolve_templates(self, parameters: Dict[str, Any], connected_data: Dict[str, Any]) -> Dict[str, Any]:
         """Resolve {{variable}} templates in parameters recursively."""
         # Case-insensitive lookup
@@ -156,31 +254,26 @@ class ParameterResolver:
         """Resolve templates in a string value."""
         result = value
 
-        for match in TEMPLATE_PATTERN.finditer(value):
-            full_match = match.group(0)
-            path = match.group(1).split('.')
-            node_name = path[0].lower()
-            property_path = path[1:]
-
-            node_data = data.get(node_name)
-            resolved_value = self._navigate_path(node_data, property_path)
+        for ref in compile_template(value):
+            node_data = data.get(ref.node_key)
+            resolved_value = self._navigate_path(node_data, ref.steps)
 
-            logger.debug(f"[ParameterResolver] Resolving '{full_match}': node_name={node_name}, path={property_path}, found_data={node_data is not None}, resolved={resolved_value is not None}")
+            logger.debug(f"[ParameterResolver] Resolving '{ref.text}': node_name={ref.node_key}, path={ref.steps}, found_data={node_data is not None}, resolved={resolved_value is not None}")
 
             if resolved_value is not None:
                 # If entire value is just the template, preserve type
-                if value.strip() == full_match:
+                if value.strip() == ref.text:
                     return resolved_value
-                result = result.replace(full_match, str(resolved_value))
+                result = result.replace(ref.text, str(resolved_value))
             else:
                 # Log missing resolution for debugging
-                logger.debug(f"[ParameterResolver] Could not resolve '{full_match}': available keys={list(data.keys())}")
-                result = result.replace(full_match, '')
+                logger.debug(f"[ParameterResolver] Could not resolve '{ref.text}': available keys={list(data.keys())}")
+                result = result.replace(ref.text, '')
 
         return result
 
-    def _navigate_path(self, data: Any, path: List[str]) -> Any:
-        """Navigate through nested dict/list using path parts.
+    def _navigate_path(self, data: Any, steps: Tuple[PathStep, ...]) -> Any:
+        """Navigate through nested dict/list using compiled path steps.
 
         Supports:
         - Dict keys: 'field' -> data['field']
@@ -188,31 +281,22 @@ class ParameterResolver:
         - Nested paths: 'messages[0].text' -> data['messages'][0]['text']
         """
         current = data
-        for part in path:
+        for field_name, index in steps:
             if current is None:
                 return None
 
-            # Check for array index notation: field[index]
-            bracket_match = re.match(r'^(\w+)\[(\d+)\]$', part)
-            if bracket_match:
-                field_name = bracket_match.group(1)
-                index = int(bracket_match.group(2))
-
-                # Navigate to the field first
-                if isinstance(current, dict) and field_name in current:
-                    current = current[field_name]
-                else:
-                    return None
+            # Navigate to the field first
+            if not isinstance(current, dict) or field_name not in current:
+                return None
+            current = current[field_name]
 
-                # Then access the array index
+            # Then access the array index (field[index])
+            if index is not None:
                 if isinstance(current, list) and 0 <= index < len(current):
                     current = current[index]
+                elif is_vector_payload(current) and 0 <= index < current["shape"][0]:
+                    current = vector_at(current, index)  # Row of a packed embedding matrix
                 else:
                     return None
-            else:
-                # Standard dict key navigation
-                if not isinstance(current, dict) or part not in current:
-                    return None
-                current = current[part]
 
         return current
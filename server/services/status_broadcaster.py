@@ -2,23 +2,190 @@
 
 Manages WebSocket connections and broadcasts status updates to all connected clients.
 Supports all node types, variable updates, and workflow state changes.
+
+Each client has its own bounded send queue drained by a sender task, so a
+slow socket never stalls the others. Messages are serialized once per
+broadcast and flushed in frames: everything queued since the last send goes
+out as one ``batch`` message. Status messages are latest-value coalesced
+(a node's ``executing`` superseded by ``success`` before the frame flushes is
+never sent). Clients can subscribe to workflow ids and topics; until they
+do they receive everything.
+
+Node statuses live in a bounded NodeStatusTable rather than in the status
+dict, so ``initial_status`` stays small. Node messages carry the table's
+version; clients fetch a workflow's nodes with ``get_node_snapshot`` and,
+passing the last version they saw, receive only what changed.
+
+Custom events (WhatsApp messages, webhooks, task completions) go through an
+EventBus: trigger dispatch to event_waiter is its first, unbounded
+subscriber; the UI broadcast is a bounded one that drops its oldest events
+when behind. Neither waits for the other.
 """
 
 import asyncio
+import itertools
 import orjson
-from typing import Set, Dict, Any, Optional, List
+from collections import OrderedDict
+from typing import Set, Dict, Any, Optional, List, Iterable, Hashable
 from fastapi import WebSocket
 from core.logging import get_logger
+from services.event_bus import BusEvent, EventBus
+from services.node_status_table import NodeStatusTable
+from services.vectors import summarize_vectors
 
 logger = get_logger(__name__)
 
+# Seconds between frames flushed to one client
+FRAME_INTERVAL = 0.05
+# Queued messages per client before it is treated as too slow
+MAX_PENDING = 1000
+# Seconds one frame send may take before the client is dropped
+SEND_TIMEOUT = 5.0
+# Custom events waiting for the UI broadcast before the oldest are dropped
+EVENT_UI_QUEUE = 1000
+
+# Message types scoped by their workflow_id (delivered to subscribers of it)
+WORKFLOW_SCOPED_TYPES = frozenset({"node_status", "node_output", "node_status_cleared"})
+
+# Optional topics a client can subscribe to; other messages always go out
+MESSAGE_TOPICS = {
+    "node_status": "nodes",
+    "node_output": "nodes",
+    "node_status_cleared": "nodes",
+    "variable_update": "variables",
+    "variables_update": "variables",
+    "console_log": "console",
+    "console_logs_cleared": "console",
+    "terminal_log": "terminal",
+    "terminal_logs_cleared": "terminal",
+    "team_event": "teams",
+}
+TOPICS = frozenset(MESSAGE_TOPICS.values())
+
+# Status snapshots where only the latest value matters
+_LATEST_VALUE_TYPES = frozenset({
+    "workflow_status", "android_status", "whatsapp_status", "telegram_status",
+    "twitter_status", "google_status", "full_status",
+})
+
+
+def _coalesce_key(message: Dict[str, Any]) -> Optional[Hashable]:
+    """Key under which a newer message replaces a queued one, None if it never does."""
+    msg_type = message.get("type")
+    if msg_type in ("node_status", "node_output"):
+        return (msg_type, message.get("workflow_id"), message.get("node_id"))
+    if msg_type == "variable_update":
+        return (msg_type, message.get("name"))
+    if msg_type == "api_key_status":
+        return (msg_type, message.get("provider"))
+    if msg_type in _LATEST_VALUE_TYPES:
+        return msg_type
+    return None
+
+
+class _Client:
+    """One connected socket: its subscriptions, send queue and sender task."""
+
+    def __init__(self, websocket: WebSocket, frame_interval: float, max_pending: int,
+                 send_timeout: float):
+        self.websocket = websocket
+        self.workflow_ids: Optional[Set[str]] = None  # None: all workflows
+        self.topics: Optional[Set[str]] = None  # None: all topics
+        self.frame_interval = frame_interval
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+
+        self._pending: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._seq = itertools.count()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.coalesced = 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._send_loop())
+
+    def wants(self, message: Dict[str, Any]) -> bool:
+        msg_type = message.get("type")
+        if self.topics is not None:
+            topic = MESSAGE_TOPICS.get(msg_type)
+            if topic is not None and topic not in self.topics:
+                return False
+        if self.workflow_ids is not None and msg_type in WORKFLOW_SCOPED_TYPES:
+            workflow_id = message.get("workflow_id")
+            if workflow_id and workflow_id not in self.workflow_ids:
+                return False
+        return True
+
+    def enqueue(self, key: Optional[Hashable], payload: str) -> bool:
+        """Queue a serialized message. False when the queue is full."""
+        if key is None:
+            key = next(self._seq)
+        elif key in self._pending:
+            # Latest value wins and moves behind everything queued meanwhile
+            del self._pending[key]
+            self.coalesced += 1
+        if len(self._pending) >= self.max_pending:
+            return False
+        self._pending[key] = payload
+        self._ready.set()
+        return True
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def _send_loop(self) -> None:
+        while not self.closed:
+            await self._ready.wait()
+            self._ready.clear()
+            if not self._pending:
+                continue
+            payloads = list(self._pending.values())
+            self._pending.clear()
+            if len(payloads) == 1:
+                frame = payloads[0]
+            else:
+                frame = '{"type":"batch","messages":[' + ",".join(payloads) + ']}'
+            try:
+                await asyncio.wait_for(self.websocket.send_text(frame), self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[StatusBroadcaster] Send failed, dropping client: {e!r}")
+                self.closed = True
+                return
+            await asyncio.sleep(self.frame_interval)
+
+    async def close(self, code: Optional[int] = None, reason: str = "") -> None:
+        self.closed = True
+        self._pending.clear()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if code is not None:
+            try:
+                await asyncio.wait_for(self.websocket.close(code=code, reason=reason), self.send_timeout)
+            except Exception:
+                pass
+
 
 class StatusBroadcaster:
     """Manages WebSocket connections and broadcasts status updates."""
 
-    def __init__(self):
-        self._connections: Set[WebSocket] = set()
+    def __init__(self, frame_interval: float = FRAME_INTERVAL, max_pending: int = MAX_PENDING,
+                 send_timeout: float = SEND_TIMEOUT):
+        self._clients: Dict[WebSocket, _Client] = {}
         self._lock = asyncio.Lock()
+        self.frame_interval = frame_interval
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self._dropped_clients = 0
+        self._nodes = NodeStatusTable()
+
+        self._events = EventBus()
+        self._events.subscribe("triggers", self._dispatch_event)
+        self._events.subscribe("ui", self._broadcast_event, max_queue=EVENT_UI_QUEUE)
 
         # Current state for all status types
         self._status: Dict[str, Any] = {
@@ -59,7 +226,6 @@ class StatusBroadcaster:
                 "bot_name": None
             },
             "api_keys": {},  # provider -> validation status
-            "nodes": {},  # node_id -> node status
             "variables": {},  # variable_name -> value
             "workflow": {
                 "executing": False,
@@ -86,18 +252,23 @@ class StatusBroadcaster:
         then refreshes service statuses in a background task.
         """
         await websocket.accept()
+        client = _Client(websocket, self.frame_interval, self.max_pending, self.send_timeout)
         async with self._lock:
-            self._connections.add(websocket)
-        logger.info(f"[StatusBroadcaster] Client connected. Total: {len(self._connections)}")
+            self._clients[websocket] = client
+        logger.info(f"[StatusBroadcaster] Client connected. Total: {len(self._clients)}")
 
-        # Send cached status immediately -- don't block on service refreshes
+        # Send cached status immediately -- updates broadcast meanwhile queue
+        # up and go out after it once the sender starts. Node statuses are not
+        # included; clients request a snapshot of the workflows they show.
         try:
             await websocket.send_json({
                 "type": "initial_status",
-                "data": self._status
+                "data": {**self._status, "node_status_epoch": self._nodes.epoch,
+                         "node_status_version": self._nodes.version}
             })
         except Exception as e:
             logger.error(f"[StatusBroadcaster] Failed to send initial status: {e}")
+        client.start()
 
         # Refresh service statuses in background -- updates broadcast when ready
         asyncio.create_task(self._refresh_all_services())
@@ -105,8 +276,34 @@ class StatusBroadcaster:
     async def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection."""
         async with self._lock:
-            self._connections.discard(websocket)
-        logger.info(f"[StatusBroadcaster] Client disconnected. Total: {len(self._connections)}")
+            client = self._clients.pop(websocket, None)
+        if client is not None:
+            await client.close()
+        logger.info(f"[StatusBroadcaster] Client disconnected. Total: {len(self._clients)}")
+
+    def subscribe(
+        self,
+        websocket: WebSocket,
+        workflow_ids: Optional[Iterable[str]] = None,
+        topics: Optional[Iterable[str]] = None
+    ) -> bool:
+        """Limit what a client receives.
+
+        Args:
+            websocket: The subscribing connection
+            workflow_ids: Workflows whose node updates to deliver, None for all
+            topics: Topics to deliver (see TOPICS), None for all. Messages
+                without a topic (service status, deployment, locks) always go out.
+
+        Returns:
+            False if the websocket is not connected.
+        """
+        client = self._clients.get(websocket)
+        if client is None:
+            return False
+        client.workflow_ids = set(workflow_ids) if workflow_ids is not None else None
+        client.topics = set(topics) & TOPICS if topics is not None else None
+        return True
 
     async def _refresh_all_services(self):
         """Refresh all service statuses concurrently and broadcast updates.
@@ -133,47 +330,62 @@ class StatusBroadcaster:
             logger.warning("[StatusBroadcaster] Failed to broadcast refreshed status: %s", e)
 
     async def broadcast(self, message: Dict[str, Any]):
-        """Broadcast a message to all connected clients using TaskGroup.
+        """Queue a message for every connected client that subscribed to it.
 
-        Uses asyncio.TaskGroup (Python 3.11+) for structured concurrency:
-        - All tasks complete or cancel together
-        - Proper exception handling via ExceptionGroup
+        The message is serialized once and handed to each client's send
+        queue; the clients' sender tasks flush it with the next frame. A
+        client whose queue is full is too slow to keep up and gets
+        disconnected (it reconnects and resyncs from initial_status).
         """
-        if not self._connections:
+        if not self._clients:
             return
 
-        # Get connections list while holding lock
+        payload = None
+        key = _coalesce_key(message)
+        slow: List[_Client] = []
+
+        for client in list(self._clients.values()):
+            if client.closed:
+                slow.append(client)
+                continue
+            if not client.wants(message):
+                continue
+            if payload is None:
+                payload = orjson.dumps(message).decode()
+            if not client.enqueue(key, payload):
+                slow.append(client)
+
+        if slow:
+            await self._drop_clients(slow)
+
+    async def _drop_clients(self, clients: List[_Client]):
+        """Disconnect clients that failed a send or fell behind."""
         async with self._lock:
-            connections_list = list(self._connections)
-
-        if not connections_list:
-            return
-
-        message_bytes = orjson.dumps(message).decode()
-        disconnected: set[WebSocket] = set()
-
-        async def send_to_client(connection: WebSocket):
-            """Send message to a single client."""
-            try:
-                await connection.send_text(message_bytes)
-            except Exception as e:
-                logger.warning(f"[StatusBroadcaster] Send failed: {e}")
-                disconnected.add(connection)
-
-        # Execute all sends concurrently with TaskGroup
-        try:
-            async with asyncio.TaskGroup() as tg:
-                for conn in connections_list:
-                    tg.create_task(send_to_client(conn))
-        except* Exception as eg:
-            # TaskGroup aggregates exceptions - log them but continue
-            for exc in eg.exceptions:
-                logger.warning(f"[StatusBroadcaster] TaskGroup exception: {exc}")
-
-        # Remove failed connections
-        if disconnected:
-            async with self._lock:
-                self._connections -= disconnected
+            for client in clients:
+                if self._clients.get(client.websocket) is client:
+                    del self._clients[client.websocket]
+                    self._dropped_clients += 1
+        for client in clients:
+            if client.pending:
+                logger.warning("[StatusBroadcaster] Client send queue full, disconnecting",
+                               pending=client.pending)
+            await client.close(code=1013, reason="Too slow, reconnect")
+
+    def get_broadcast_stats(self) -> Dict[str, Any]:
+        """Connected clients with their queue depth and subscriptions."""
+        return {
+            "connections": len(self._clients),
+            "dropped_clients": self._dropped_clients,
+            "clients": [
+                {
+                    "pending": client.pending,
+                    "coalesced": client.coalesced,
+                    "workflow_ids": sorted(client.workflow_ids) if client.workflow_ids is not None else None,
+                    "topics": sorted(client.topics) if client.topics is not None else None,
+                }
+                for client in self._clients.values()
+            ],
+        }
 
     # =========================================================================
     # API Key Validation Status Updates
@@ -565,19 +777,22 @@ class StatusBroadcaster:
             data: Optional status data
             workflow_id: Optional workflow ID to scope the status update (n8n pattern)
         """
-        logger.debug(f"[BROADCAST] update_node_status: node={node_id}, status={status}, workflow={workflow_id}, connections={len(self._connections)}")
-        self._status["nodes"][node_id] = {
-            "status": status,
-            "data": data or {},
-            "timestamp": asyncio.get_event_loop().time(),
-            "workflow_id": workflow_id
-        }
+        logger.debug(f"[BROADCAST] update_node_status: node={node_id}, status={status}, workflow={workflow_id}, connections={len(self._clients)}")
+        data = summarize_vectors(data) if data else {}
+        timestamp = asyncio.get_event_loop().time()
+        entry = self._nodes.set_status(node_id, status, data, timestamp, workflow_id=workflow_id)
 
         await self.broadcast({
             "type": "node_status",
             "node_id": node_id,
             "workflow_id": workflow_id,
-            "data": self._status["nodes"][node_id]
+            "data": {
+                "status": status,
+                "data": data,
+                "timestamp": timestamp,
+                "workflow_id": workflow_id,
+                "version": entry["version"]
+            }
         })
 
     async def update_node_output(
@@ -586,19 +801,21 @@ class StatusBroadcaster:
         output: Any,
         workflow_id: Optional[str] = None
     ):
-        """Update a node's output data and broadcast."""
-        if node_id not in self._status["nodes"]:
-            self._status["nodes"][node_id] = {"status": "idle", "data": {}}
+        """Update a node's output data and broadcast.
 
-        self._status["nodes"][node_id]["output"] = output
-        if workflow_id:
-            self._status["nodes"][node_id]["workflow_id"] = workflow_id
+        Subscribers get the output itself; the status table keeps large
+        outputs only as a reference (see NodeStatusTable).
+        """
+        # Embedding matrices go out as {dtype, shape, bytes}, not the buffer
+        output = summarize_vectors(output)
+        entry = self._nodes.set_output(node_id, output, workflow_id=workflow_id)
 
         await self.broadcast({
             "type": "node_output",
             "node_id": node_id,
-            "workflow_id": workflow_id,
-            "output": output
+            "workflow_id": entry["workflow_id"],
+            "output": output,
+            "version": entry["version"]
         })
 
     # =========================================================================
@@ -996,26 +1213,39 @@ class StatusBroadcaster:
     async def send_custom_event(self, event_type: str, data: Any):
         """Send a custom event to all connected clients AND dispatch to event waiters.
 
-        Uses dispatch_async() directly since we're in an async context.
-        The sync dispatch() is for thread contexts like APScheduler callbacks.
-        See DESIGN.md section "Cross-Thread Event Dispatch" for pattern details.
+        Returns once the event is queued; see publish_event().
+        """
+        self.publish_event(event_type, data)
+
+    def publish_event(self, event_type: str, data: Any, received_at: Optional[float] = None):
+        """Publish an ingress event to trigger dispatch and the UI broadcast.
+
+        Does not wait for either; must be called on the event loop (thread
+        contexts use event_waiter.dispatch(), see DESIGN.md "Cross-Thread
+        Event Dispatch"). ``received_at`` (time.perf_counter() at receipt)
+        feeds the ingress latency histogram.
         """
-        # Broadcast to all WebSocket clients
+        self._events.publish(event_type, data, received_at)
+
+    async def _dispatch_event(self, event: BusEvent):
+        """Dispatch to event waiters (for trigger nodes)."""
+        from services import event_waiter
+        data = event.data if isinstance(event.data, dict) else {"data": event.data}
+        resolved_count = await event_waiter.dispatch_async(event.event_type, data,
+                                                           received_at=event.received_at)
+        if resolved_count > 0:
+            logger.info(f"[StatusBroadcaster] Event {event.event_type} resolved {resolved_count} waiters")
+
+    async def _broadcast_event(self, event: BusEvent):
         await self.broadcast({
-            "type": event_type,
-            "data": data
+            "type": event.event_type,
+            "data": event.data
         })
 
-        # Dispatch to event waiters (for trigger nodes)
-        # Use dispatch_async directly - we're in async context
-        try:
-            from services import event_waiter
-            event_data = data if isinstance(data, dict) else {"data": data}
-            resolved_count = await event_waiter.dispatch_async(event_type, event_data)
-            if resolved_count > 0:
-                logger.info(f"[StatusBroadcaster] Event {event_type} resolved {resolved_count} waiters")
-        except Exception as e:
-            logger.error(f"[StatusBroadcaster] Failed to dispatch to event waiters: {e}")
+    def get_event_stats(self) -> Dict[str, Any]:
+        """Custom event queues per subscriber and the receipt-to-trigger latency."""
+        from services import event_waiter
+        return {"subscribers": self._events.stats(), "ingress_latency": event_waiter.get_ingress_latency()}
 
     # =========================================================================
     # Getters
@@ -1031,20 +1261,39 @@ class StatusBroadcaster:
 
     def get_node_status(self, node_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific node's status."""
-        return self._status["nodes"].get(node_id)
+        return self._nodes.get(node_id)
+
+    def get_node_statuses(self, workflow_ids: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Node statuses (node_id -> status), optionally only those of the given workflows."""
+        return self._nodes.statuses(workflow_ids)
+
+    def get_node_snapshot(self, workflow_id: Optional[str], since: Optional[int] = None,
+                          epoch: Optional[str] = None) -> Dict[str, Any]:
+        """A workflow's node statuses, or only the changes after version ``since``.
+
+        See NodeStatusTable.snapshot for the returned fields.
+        """
+        return self._nodes.snapshot(workflow_id, since, epoch)
+
+    def get_node_table_stats(self) -> Dict[str, Any]:
+        """Size, version and eviction counters of the node status table."""
+        return self._nodes.stats()
 
     async def clear_node_status(self, node_id: str) -> bool:
         """Clear a node's status and output from the cache."""
-        if node_id in self._status["nodes"]:
-            del self._status["nodes"][node_id]
-            logger.info(f"[StatusBroadcaster] Cleared node status: {node_id}")
-            # Broadcast that node status was cleared
-            await self.broadcast({
-                "type": "node_status_cleared",
-                "node_id": node_id
-            })
-            return True
-        return False
+        removed = self._nodes.remove(node_id)
+        if removed is None:
+            return False
+        workflow_id, version = removed
+        logger.info(f"[StatusBroadcaster] Cleared node status: {node_id}")
+        # Broadcast that node status was cleared
+        await self.broadcast({
+            "type": "node_status_cleared",
+            "node_id": node_id,
+            "workflow_id": workflow_id,
+            "version": version
+        })
+        return True
 
     def get_variable(self, name: str) -> Any:
         """Get a variable value."""
@@ -1053,7 +1302,7 @@ class StatusBroadcaster:
     @property
     def connection_count(self) -> int:
         """Get the number of active WebSocket connections."""
-        return len(self._connections)
+        return len(self._clients)
 
 
 # Global singleton instance
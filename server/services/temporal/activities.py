@@ -10,7 +10,8 @@ References:
 Architecture:
 - NodeExecutionActivities class holds shared aiohttp.ClientSession
 - Session is passed via constructor, avoiding recreation per activity
-- Each activity call gets its own WebSocket connection from the session pool
+- Node executions share one multiplexed WebSocket (ActivityChannel) that
+  registers each workflow graph once and then references it by id
 """
 
 from datetime import datetime
@@ -21,6 +22,7 @@ from temporalio import activity
 
 from core.logging import get_logger
 from core.config import Settings
+from .ws_client import ActivityChannel
 
 logger = get_logger(__name__)
 
@@ -39,7 +41,7 @@ class NodeExecutionActivities:
     Following Temporal's recommended pattern for dependency injection:
     - aiohttp.ClientSession is passed via constructor
     - Session provides connection pooling for concurrent activities
-    - Each activity call gets its own WebSocket connection from the pool
+    - Node executions share one multiplexed WebSocket channel
 
     Reference: https://docs.temporal.io/develop/python/python-sdk-sync-vs-async
     """
@@ -52,6 +54,7 @@ class NodeExecutionActivities:
         """
         self.session = session
         self.ws_url = WS_URL
+        self.channel = ActivityChannel(session, WS_URL)
         self.http_url = f"{MACHINA_URL}/api/workflow/node/execute"
         self.broadcast_url = f"{MACHINA_URL}/api/workflow/broadcast-status"
 
@@ -76,6 +79,8 @@ class NodeExecutionActivities:
                 - session_id: Session identifier
                 - nodes: Full node list (for tool/memory detection by handlers)
                 - edges: Full edge list (for tool/memory detection by handlers)
+                - graph_id: Content hash of nodes/edges (channel registration key)
+                - memoize: Let the server reuse a memoized result for the node
 
         Returns:
             Dict with success, result, node_id, and metadata
@@ -134,7 +139,7 @@ class NodeExecutionActivities:
             # Heartbeat before potentially long WebSocket operation
             activity.heartbeat(f"Executing via WebSocket: {node_id}")
 
-            # Execute node via WebSocket (each call gets own connection from pool)
+            # Execute node over the shared WebSocket channel
             result = await self._execute_via_websocket(context)
 
             # Add metadata
@@ -171,79 +176,54 @@ class NodeExecutionActivities:
             raise
 
     async def _execute_via_websocket(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute node via WebSocket using shared session's connection pool.
+        """Execute node over the worker's multiplexed WebSocket channel.
 
-        Each call creates a new WebSocket connection from the session's pool,
-        avoiding race conditions when multiple activities run concurrently.
+        The graph is registered on the channel once (by content hash) and the
+        execute_node message references it by graph_id, so per-node traffic
+        no longer grows with the graph.
 
-        Heartbeats are sent both on incoming non-matching messages AND on a
-        30-second timer. This is critical for long-running nodes (DeepAgent,
-        browser, AI multi-tool) where the backend may be processing internally
-        without broadcasting any WS messages for minutes. Without the periodic
-        timer, the 2-minute heartbeat_timeout would cancel the activity even
+        Heartbeats are sent on a 30-second timer while waiting. This is
+        critical for long-running nodes (DeepAgent, browser, AI multi-tool)
+        where the backend may be processing internally for minutes. Without
+        it, the 2-minute heartbeat_timeout would cancel the activity even
         though the node is actively executing.
         """
-        import asyncio
-        import json
-        import uuid
-
         node_id = context["node_id"]
         node_type = context["node_type"]
-        request_id = str(uuid.uuid4())
 
         message = {
             "type": "execute_node",
-            "request_id": request_id,
             "node_id": node_id,
             "node_type": node_type,
             "parameters": context.get("node_data", {}),
-            "nodes": context.get("nodes", []),
-            "edges": context.get("edges", []),
             "session_id": context.get("session_id", "default"),
             "workflow_id": context.get("workflow_id"),
             # CRITICAL: Pass upstream node outputs for downstream nodes to access
             # This enables taskTrigger -> chatAgent data flow via input-task handle
             "outputs": context.get("inputs", {}),
+            "memoize": context.get("memoize", False),
         }
 
         activity.logger.debug(f"WebSocket execute for {node_id}")
 
         try:
-            # Each activity gets its own WebSocket connection from the pool
-            async with self.session.ws_connect(
-                self.ws_url,
-                heartbeat=30,
-                receive_timeout=None,  # No receive timeout — we handle liveness via heartbeats
-            ) as ws:
-                await ws.send_json(message)
-
-                # Read loop with periodic heartbeat timer.
-                # ws.receive() may block for minutes if the backend is doing
-                # heavy processing without broadcasting. The 30s timeout ensures
-                # we heartbeat at least every 30s regardless of message traffic.
-                while True:
-                    try:
-                        msg = await asyncio.wait_for(ws.receive(), timeout=30.0)
-                    except asyncio.TimeoutError:
-                        # No message in 30s — node is still running, send heartbeat
-                        activity.heartbeat(f"Waiting for {node_id} ({node_type})")
-                        continue
-
-                    if msg.type == aiohttp.WSMsgType.TEXT:
-                        response = json.loads(msg.data)
-                        if response.get("request_id") == request_id:
-                            activity.logger.debug(f"Got response for {node_id}: success={response.get('success')}")
-                            return response
-                        # Non-matching message (broadcast to other clients) — heartbeat
-                        activity.heartbeat(f"Waiting for {node_id}")
-                    elif msg.type == aiohttp.WSMsgType.ERROR:
-                        raise Exception(f"WebSocket error: {ws.exception()}")
-                    elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING):
-                        raise Exception("WebSocket closed unexpectedly")
+            response = await self.channel.execute_node(
+                message,
+                context.get("nodes", []),
+                context.get("edges", []),
+                on_wait=lambda: activity.heartbeat(f"Waiting for {node_id} ({node_type})"),
+                graph_id=context.get("graph_id"),
+            )
+            activity.logger.debug(f"Got response for {node_id}: success={response.get('success')}")
+            return response
 
         except aiohttp.ClientError as e:
             raise Exception(f"WebSocket connection error: {e}")
 
+    async def close(self) -> None:
+        """Close the WebSocket channel (the session is owned by the caller)."""
+        await self.channel.close()
+
     async def _broadcast_status(
         self,
         node_id: str,
@@ -48,6 +48,7 @@ class TemporalExecutor:
         edges: List[Dict],
         session_id: str = "default",
         enable_caching: bool = True,
+        memoize: bool = False,
     ) -> Dict[str, Any]:
         """Execute a workflow using Temporal.
 
@@ -57,6 +58,8 @@ class TemporalExecutor:
             edges: List of edge definitions
             session_id: Session identifier
             enable_caching: Whether to enable result caching (passed to activity)
+            memoize: Reuse results of deterministic nodes across runs (checked
+                by the server's execute_node handler)
 
         Returns:
             Dict with success, outputs, execution_trace, and timing info
@@ -81,6 +84,7 @@ class TemporalExecutor:
                     "edges": edges,
                     "session_id": session_id,
                     "workflow_id": workflow_id,
+                    "memoize": memoize,
                 },
                 id=execution_id,
                 task_queue=self.task_queue,
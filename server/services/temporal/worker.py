@@ -142,7 +142,9 @@ class TemporalWorkerManager:
                 pass
             self._worker_task = None
 
-        # Close shared session
+        # Close the activity channel, then the shared session
+        if self._activities:
+            await self._activities.close()
         if self._session and not self._session.closed:
             await self._session.close()
 
@@ -219,7 +221,8 @@ async def run_standalone_worker(
         await worker.run()
 
     finally:
-        # Cleanup session on shutdown
+        # Cleanup channel and session on shutdown
+        await activities.close()
         if not session.closed:
             await session.close()
 
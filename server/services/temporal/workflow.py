@@ -11,6 +11,8 @@ NO business logic in workflow - all execution happens in activities.
 This enables massive horizontal scaling and multi-tenant distribution.
 """
 
+import hashlib
+import json
 from datetime import timedelta
 from typing import Any, Dict, List, Set
 
@@ -41,6 +43,14 @@ SKILL_NODE_TYPES = {
     "masterSkill",
 }
 
+
+def graph_content_id(nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> str:
+    """Content hash identifying a workflow graph (deterministic, replay-safe)."""
+    payload = json.dumps({"nodes": nodes, "edges": edges}, sort_keys=True,
+                         separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
 @workflow.defn(sandboxed=False)
 class MachinaWorkflow:
     """Distributed workflow orchestrator.
@@ -66,6 +76,7 @@ class MachinaWorkflow:
                 - session_id: Session identifier
                 - workflow_id: Workflow ID for tracking
                 - tenant_id: Tenant identifier for multi-tenancy
+                - memoize: Reuse results of deterministic nodes across runs
 
         Returns:
             Dict with success, outputs, execution_trace, and errors
@@ -75,6 +86,7 @@ class MachinaWorkflow:
         session_id = workflow_data.get("session_id", "default")
         workflow_id = workflow_data.get("workflow_id")
         tenant_id = workflow_data.get("tenant_id")
+        memoize = workflow_data.get("memoize", False)
 
         workflow.logger.info(
             f"Starting workflow orchestration: {len(nodes)} nodes, {len(edges)} edges"
@@ -130,6 +142,9 @@ class MachinaWorkflow:
             maximum_attempts=3,
         )
 
+        # Activities register the graph on their channel under this id once
+        graph_id = graph_content_id(nodes, edges)
+
         # 6. Continuous scheduling loop
         loop_count = 0
         while True:
@@ -170,6 +185,8 @@ class MachinaWorkflow:
                     "session_id": session_id,
                     "nodes": nodes,  # Full list for tool/memory detection
                     "edges": edges,  # Full list for tool/memory detection
+                    "graph_id": graph_id,  # Content hash of nodes/edges
+                    "memoize": memoize,  # Cross-run memo, looked up by the server
                     # Include pre-executed info if applicable
                     "pre_executed": node.get("_pre_executed", False),
                     "trigger_output": node.get("_trigger_output"),
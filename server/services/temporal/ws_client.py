@@ -1,24 +1,33 @@
 """WebSocket client for Temporal activities.
 
-Uses aiohttp ClientSession for proper connection pooling and concurrent
-request handling. Each activity creates its own WebSocket connection
-to avoid race conditions, but the session manages connection reuse.
+One persistent, multiplexed connection to ``/ws/internal`` per worker
+(``ActivityChannel``). Concurrent activities share it: each request carries
+a ``request_id`` and a reader task resolves the matching waiter, so frames
+for other requests are never read by the wrong activity. The internal
+endpoint does not join the status broadcast, so only responses arrive.
+
+The workflow graph (``nodes``/``edges``) is registered once per connection
+under its content hash (``register_graph``; the workflow computes the hash
+once per execution and passes it as ``graph_id``); ``execute_node`` messages then
+carry the ``graph_id`` instead of the full lists. If the server no longer
+knows the id (reconnect, eviction) it answers ``UNKNOWN_GRAPH`` and the
+channel registers again and retries.
 
 References:
 - https://docs.aiohttp.org/en/stable/client_quickstart.html
-- https://websockets.readthedocs.io/en/stable/reference/asyncio/client.html
 """
 
 import asyncio
 import json
 import uuid
-from typing import Any, Dict, Optional
-from contextlib import asynccontextmanager
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
 
 import aiohttp
 
 from core.logging import get_logger
 from core.config import Settings
+from .workflow import graph_content_id
 
 logger = get_logger(__name__)
 
@@ -26,137 +35,182 @@ logger = get_logger(__name__)
 _settings = Settings()
 WS_URL = f"ws://{_settings.host}:{_settings.port}/ws/internal"
 
-print(f"[Temporal WS Client] WebSocket URL configured: {WS_URL}")
+# Graphs the server keeps per internal connection (least recently used evicted)
+GRAPH_CACHE_SIZE = 256
+# Seconds between on_wait callbacks while a request is outstanding
+WAIT_INTERVAL = 30.0
 
 
-class WSConnectionPool:
-    """WebSocket connection pool using aiohttp ClientSession.
+class ActivityChannel:
+    """Multiplexed request/response channel to ``/ws/internal``.
 
-    aiohttp ClientSession provides built-in connection pooling with:
-    - Connection reuse and keep-alive
-    - Configurable connection limits
-    - Proper concurrent request handling
-
-    Each execute_node call gets its own WebSocket connection from the pool,
-    avoiding the ConcurrencyError that occurs when sharing a single connection.
+    Connects lazily and reconnects on the next request after the socket
+    drops; requests in flight when it drops fail with ``ConnectionError`` so
+    Temporal retries the activity.
     """
 
-    def __init__(self, url: str = WS_URL, pool_size: int = 100):
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None, url: str = WS_URL):
         self.url = url
-        self.pool_size = pool_size
-        self._session: Optional[aiohttp.ClientSession] = None
-        self._lock = asyncio.Lock()
-
-    async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create the aiohttp session with connection pooling."""
-        if self._session is None or self._session.closed:
-            async with self._lock:
-                if self._session is None or self._session.closed:
-                    connector = aiohttp.TCPConnector(
-                        limit=self.pool_size,
-                        limit_per_host=self.pool_size,
-                        enable_cleanup_closed=True,
-                    )
-                    timeout = aiohttp.ClientTimeout(
-                        total=300,  # 5 min total timeout
-                        connect=10,  # 10 sec connect timeout
-                    )
-                    self._session = aiohttp.ClientSession(
-                        connector=connector,
-                        timeout=timeout,
-                    )
-                    print(f"[WS Pool] Created session with pool_size={self.pool_size}")
-        return self._session
-
-    @asynccontextmanager
-    async def connection(self):
-        """Get a WebSocket connection from the pool.
-
-        Usage:
-            async with pool.connection() as ws:
-                await ws.send_json(request)
-                response = await ws.receive_json()
-        """
-        session = await self._get_session()
-        async with session.ws_connect(
-            self.url,
-            heartbeat=20,
-            receive_timeout=120,
-        ) as ws:
-            yield ws
+        self._session = session
+        self._owns_session = session is None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._registered: "OrderedDict[str, None]" = OrderedDict()
+        self._registering: Dict[str, asyncio.Future] = {}
+        self._connect_lock = asyncio.Lock()
+        self._send_lock = asyncio.Lock()
+        self.connects = 0
+        self.graphs_registered = 0
 
-    async def execute_node(
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    async def _ensure_connected(self) -> aiohttp.ClientWebSocketResponse:
+        if self.connected:
+            return self._ws
+        async with self._connect_lock:
+            if self.connected:
+                return self._ws
+            if self._session is None or self._session.closed:
+                self._session = aiohttp.ClientSession()
+                self._owns_session = True
+            self._ws = await self._session.ws_connect(
+                self.url,
+                heartbeat=30,
+                receive_timeout=None,  # Liveness via heartbeats; nodes may run for minutes
+            )
+            # Graph registrations belong to the server-side connection
+            self._registered.clear()
+            self._reader = asyncio.create_task(self._read_loop(self._ws))
+            self.connects += 1
+            logger.debug(f"[ActivityChannel] Connected to {self.url}")
+            return self._ws
+
+    async def _read_loop(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        error: Exception = ConnectionError("Internal WebSocket closed unexpectedly")
+        try:
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    response = json.loads(msg.data)
+                    future = self._pending.pop(response.get("request_id"), None)
+                    if future is not None and not future.done():
+                        future.set_result(response)
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    error = ConnectionError(f"WebSocket error: {ws.exception()}")
+                    break
+        except Exception as e:
+            error = ConnectionError(f"WebSocket receive failed: {e}")
+        finally:
+            if self._ws is ws:
+                self._ws = None
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+    async def request(
         self,
-        node_id: str,
-        node_type: str,
-        data: Dict[str, Any],
-        context: Dict[str, Any],
-        timeout: float = 120.0,
+        message: Dict[str, Any],
+        on_wait: Optional[Callable[[], None]] = None,
+        wait_interval: float = WAIT_INTERVAL,
     ) -> Dict[str, Any]:
-        """Execute a node via WebSocket.
+        """Send ``message`` and wait for the response carrying its request_id.
 
-        Each call gets its own connection from the pool, allowing
-        concurrent execution without race conditions.
+        ``on_wait`` is called every ``wait_interval`` seconds while waiting
+        (activities heartbeat from it).
         """
+        ws = await self._ensure_connected()
         request_id = str(uuid.uuid4())
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            async with self._send_lock:
+                await ws.send_json({**message, "request_id": request_id})
+            while True:
+                try:
+                    return await asyncio.wait_for(asyncio.shield(future), timeout=wait_interval)
+                except asyncio.TimeoutError:
+                    if on_wait is not None:
+                        on_wait()
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def register_graph(self, nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]],
+                             graph_id: Optional[str] = None) -> str:
+        """Register the graph on this connection once; returns its id."""
+        graph_id = graph_id or graph_content_id(nodes, edges)
+        while True:
+            if graph_id in self._registered:
+                self._registered.move_to_end(graph_id)
+                return graph_id
+            # Concurrent activities of one execution share a single registration
+            pending = self._registering.get(graph_id)
+            if pending is None:
+                break
+            await asyncio.wait([pending])
+
+        pending = asyncio.get_running_loop().create_future()
+        self._registering[graph_id] = pending
+        try:
+            response = await self.request({"type": "register_graph", "graph_id": graph_id,
+                                           "nodes": nodes, "edges": edges})
+            if not response.get("success"):
+                raise RuntimeError(f"Graph registration failed: {response.get('error')}")
+            self._registered[graph_id] = None
+            while len(self._registered) > GRAPH_CACHE_SIZE:
+                self._registered.popitem(last=False)
+            self.graphs_registered += 1
+            return graph_id
+        finally:
+            # Waiters re-check; after a failure the next one registers itself
+            del self._registering[graph_id]
+            pending.set_result(None)
 
-        message = {
-            "type": "execute_node",
-            "request_id": request_id,
-            "node_id": node_id,
-            "node_type": node_type,
-            "parameters": data,
-            "nodes": context.get("nodes", []),
-            "edges": context.get("edges", []),
-            "session_id": context.get("session_id", "default"),
-            "workflow_id": context.get("workflow_id"),
-        }
+    async def execute_node(
+        self,
+        message: Dict[str, Any],
+        nodes: List[Dict[str, Any]],
+        edges: List[Dict[str, Any]],
+        on_wait: Optional[Callable[[], None]] = None,
+        graph_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Send an ``execute_node`` message that references the registered graph.
 
-        try:
-            async with self.connection() as ws:
-                await ws.send_json(message)
-                print(f"[WS Pool] Sent execute_node for {node_id}")
-
-                # Wait for response with matching request_id
-                async with asyncio.timeout(timeout):
-                    async for msg in ws:
-                        if msg.type == aiohttp.WSMsgType.TEXT:
-                            response = json.loads(msg.data)
-                            if response.get("request_id") == request_id:
-                                print(f"[WS Pool] Received response for {node_id}: success={response.get('success')}")
-                                return response
-                        elif msg.type == aiohttp.WSMsgType.ERROR:
-                            raise Exception(f"WebSocket error: {ws.exception()}")
-                        elif msg.type == aiohttp.WSMsgType.CLOSED:
-                            raise Exception("WebSocket closed unexpectedly")
-
-                raise Exception(f"No response received for request {request_id}")
-
-        except asyncio.TimeoutError:
-            raise Exception(f"WebSocket request timeout ({timeout}s) for node {node_id}")
-        except aiohttp.ClientError as e:
-            raise Exception(f"WebSocket connection error: {e}")
-
-    async def close(self):
-        """Close the connection pool."""
-        if self._session and not self._session.closed:
+        ``graph_id`` is the graph's content hash when the caller has it;
+        otherwise it is computed here.
+        """
+        graph_id = await self.register_graph(nodes, edges, graph_id)
+        response = await self.request({**message, "graph_id": graph_id}, on_wait)
+        if response.get("code") == "UNKNOWN_GRAPH":
+            self._registered.pop(graph_id, None)
+            await self.register_graph(nodes, edges, graph_id)
+            response = await self.request({**message, "graph_id": graph_id}, on_wait)
+        return response
+
+    async def close(self) -> None:
+        """Close the connection (and the session if the channel created it)."""
+        ws, self._ws = self._ws, None
+        if ws is not None and not ws.closed:
+            await ws.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        if self._owns_session and self._session is not None and not self._session.closed:
             await self._session.close()
-            print("[WS Pool] Session closed")
 
 
-# Global connection pool instance
-_pool: Optional[WSConnectionPool] = None
-_pool_lock = asyncio.Lock()
+# Global channel instance
+_channel: Optional[ActivityChannel] = None
 
 
-async def get_ws_pool() -> WSConnectionPool:
-    """Get or create the global WebSocket connection pool."""
-    global _pool
-
-    async with _pool_lock:
-        if _pool is None:
-            _pool = WSConnectionPool()
-        return _pool
+async def get_activity_channel() -> ActivityChannel:
+    """Get or create the process-wide activity channel."""
+    global _channel
+    if _channel is None:
+        _channel = ActivityChannel()
+    return _channel
 
 
 async def execute_node_ws(
@@ -166,71 +220,30 @@ async def execute_node_ws(
     context: Dict[str, Any],
     timeout: float = 120.0,
 ) -> Dict[str, Any]:
-    """Execute a node via WebSocket using the connection pool.
-
-    This is the recommended way to execute nodes from activities.
-    Each call gets its own connection from the pool.
-    """
-    pool = await get_ws_pool()
-    return await pool.execute_node(
-        node_id=node_id,
-        node_type=node_type,
-        data=data,
-        context=context,
-        timeout=timeout,
-    )
-
-
-async def close_ws_pool() -> None:
-    """Close the global WebSocket connection pool."""
-    global _pool
-
-    async with _pool_lock:
-        if _pool:
-            await _pool.close()
-            _pool = None
-
-
-# Backwards compatibility aliases
-async def get_ws_client() -> WSConnectionPool:
-    """Alias for get_ws_pool() for backwards compatibility."""
-    return await get_ws_pool()
-
-
-async def close_ws_client() -> None:
-    """Alias for close_ws_pool() for backwards compatibility."""
-    await close_ws_pool()
-
-
-# For backwards compatibility with old code that expects TemporalWSClient
-class TemporalWSClient:
-    """Backwards compatibility wrapper around WSConnectionPool."""
-
-    def __init__(self, url: str = WS_URL):
-        self._pool = WSConnectionPool(url=url)
-
-    @property
-    def connected(self) -> bool:
-        return True  # Pool manages connections
-
-    async def connect(self) -> None:
-        pass  # Pool connects on demand
-
-    async def disconnect(self) -> None:
-        await self._pool.close()
-
-    async def execute_node(
-        self,
-        node_id: str,
-        node_type: str,
-        data: Dict[str, Any],
-        context: Dict[str, Any],
-        timeout: float = 120.0,
-    ) -> Dict[str, Any]:
-        return await self._pool.execute_node(
-            node_id=node_id,
-            node_type=node_type,
-            data=data,
-            context=context,
+    """Execute a node over the process-wide activity channel."""
+    channel = await get_activity_channel()
+    message = {
+        "type": "execute_node",
+        "node_id": node_id,
+        "node_type": node_type,
+        "parameters": data,
+        "session_id": context.get("session_id", "default"),
+        "workflow_id": context.get("workflow_id"),
+        "memoize": context.get("memoize", False),
+    }
+    try:
+        return await asyncio.wait_for(
+            channel.execute_node(message, context.get("nodes", []), context.get("edges", []),
+                                 graph_id=context.get("graph_id")),
             timeout=timeout,
         )
+    except asyncio.TimeoutError:
+        raise Exception(f"WebSocket request timeout ({timeout}s) for node {node_id}")
+
+
+async def close_activity_channel() -> None:
+    """Close the process-wide activity channel."""
+    global _channel
+    if _channel is not None:
+        await _channel.close()
+        _channel = None
@@ -0,0 +1,165 @@
+"""Token usage accounting with write-behind persistence.
+
+``CompactionService.track`` runs after every LLM call. Session token state
+is loaded from the database once per session and then kept in memory, where
+it is authoritative: increments and reads never wait on SQLite. New
+TokenUsageMetric rows and changed session states are written together in one
+session and commit per batch -- ``flush_delay`` seconds after the first
+change, as soon as ``max_pending`` metrics are queued, and on shutdown
+(``close()``). A failed flush keeps its batch for the next one.
+"""
+
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+
+from core.logging import get_logger
+
+if TYPE_CHECKING:
+    from core.database import Database
+
+logger = get_logger(__name__)
+
+
+def default_session_state(session_id: str) -> Dict[str, Any]:
+    """Token state of a session that has no row yet."""
+    return {
+        "session_id": session_id,
+        "cumulative_input_tokens": 0,
+        "cumulative_output_tokens": 0,
+        "cumulative_cache_tokens": 0,
+        "cumulative_reasoning_tokens": 0,
+        "cumulative_total": 0,
+        "cumulative_input_cost": 0.0,
+        "cumulative_output_cost": 0.0,
+        "cumulative_total_cost": 0.0,
+        "last_compaction_at": None,
+        "compaction_count": 0,
+        "custom_threshold": None,
+        "compaction_enabled": True,
+    }
+
+
+class TokenUsageAccumulator:
+    """In-memory session token state plus a queue of unwritten metrics.
+
+    Up to ``max_sessions`` states are cached; past that the least recently
+    used sessions without unwritten changes are dropped (and reloaded from
+    the database on their next use).
+    """
+
+    def __init__(self, database: "Database", max_pending: int = 256, flush_delay: float = 1.0,
+                 max_sessions: int = 10_000):
+        self.database = database
+        self.max_pending = max_pending
+        self.flush_delay = flush_delay
+        self.max_sessions = max_sessions
+
+        self._states: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._dirty: Set[str] = set()
+        self._metrics: List[Dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+
+    @property
+    def pending_metrics(self) -> int:
+        return len(self._metrics)
+
+    async def get_state(self, session_id: str) -> Dict[str, Any]:
+        """Current token state of a session (a copy)."""
+        return dict(await self._state(session_id))
+
+    async def add(self, session_id: str, metric: Dict[str, Any],
+                  increments: Dict[str, float]) -> Dict[str, Any]:
+        """Queue a metric row and add ``increments`` to the session's counters.
+
+        Returns the updated state (a copy).
+        """
+        state = await self._state(session_id)
+        for field, value in increments.items():
+            state[field] = (state.get(field) or 0) + value
+
+        self._metrics.append({"session_id": session_id, "created_at": datetime.now(timezone.utc), **metric})
+        self._mark_dirty(session_id)
+        return dict(state)
+
+    async def update(self, session_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Set fields of the session's state. Returns the updated state (a copy)."""
+        state = await self._state(session_id)
+        state.update(updates)
+        self._mark_dirty(session_id)
+        return dict(state)
+
+    async def _state(self, session_id: str) -> Dict[str, Any]:
+        state = self._states.get(session_id)
+        if state is not None:
+            self._states.move_to_end(session_id)
+            return state
+
+        # One load per session even when several LLM calls finish together
+        loading = self._loading.get(session_id)
+        if loading is None:
+            loading = self._loading[session_id] = asyncio.ensure_future(self._load(session_id))
+            loading.add_done_callback(lambda _f: self._loading.pop(session_id, None))
+        return await asyncio.shield(loading)
+
+    async def _load(self, session_id: str) -> Dict[str, Any]:
+        state = default_session_state(session_id)
+        state.update(await self.database.get_or_create_session_token_state(session_id))
+        self._states[session_id] = state
+        self._evict()
+        return state
+
+    def _evict(self) -> None:
+        excess = len(self._states) - self.max_sessions
+        if excess <= 0:
+            return
+        for session_id in [s for s in self._states if s not in self._dirty][:excess]:
+            del self._states[session_id]
+
+    def _mark_dirty(self, session_id: str) -> None:
+        self._dirty.add(session_id)
+        if len(self._metrics) >= self.max_pending:
+            if self._flushing is None or self._flushing.done():
+                self._flushing = asyncio.create_task(self.flush())
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> int:
+        """Write queued metrics and changed states. Returns metric rows written."""
+        async with self._lock:
+            metrics, self._metrics = self._metrics, []
+            dirty, self._dirty = self._dirty, set()
+            if not metrics and not dirty:
+                return 0
+            states = {sid: dict(self._states[sid]) for sid in dirty if sid in self._states}
+
+            if await self.database.save_token_usage(metrics, states):
+                logger.debug("[TokenUsage] Flushed", metrics=len(metrics), sessions=len(states))
+                return len(metrics)
+
+            # Keep the batch for the next flush, ahead of anything queued meanwhile
+            self._metrics[:0] = metrics
+            self._dirty |= dirty
+            logger.warning("[TokenUsage] Flush failed, will retry", metrics=len(metrics), sessions=len(states))
+            return 0
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def close(self) -> None:
+        """Cancel the timer and write everything still pending."""
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self._states),
+            "dirty_sessions": len(self._dirty),
+            "pending_metrics": len(self._metrics),
+        }
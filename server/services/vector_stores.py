@@ -0,0 +1,196 @@
+"""Vector-store connection registry for the vectorStore node.
+
+Opening a ``chromadb.PersistentClient`` or ``QdrantClient`` is expensive
+(Chroma loads its SQLite system DB, Qdrant sets up an HTTP/gRPC channel), and
+vectorStore used to do it on every call. The registry keeps one client per
+(backend, path/url/key) and one handle per collection for the life of the
+process. Handles are resolved in worker threads since every backend client is
+blocking.
+
+``run_batches`` splits a store into bounded slices and runs them concurrently
+off the event loop, so large upserts neither block the loop nor exceed the
+backend's request size limits.
+"""
+
+import asyncio
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_CONCURRENCY = 4
+# Pinecone rejects upserts above ~2MB / 1000 vectors; 100 is its documented sweet spot
+PINECONE_MAX_BATCH = 100
+
+
+def _secret_key(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()[:16]
+
+
+def is_missing_collection_error(error: BaseException) -> bool:
+    """True if a backend call failed because the collection/index is gone.
+
+    Covers Chroma's NotFoundError / InvalidCollectionException, Pinecone's
+    NotFoundException and Qdrant's 404 UnexpectedResponse.
+    """
+    name = type(error).__name__
+    if "NotFound" in name or name == "InvalidCollectionException":
+        return True
+    if getattr(error, "status_code", None) == 404 or getattr(error, "status", None) == 404:
+        return True
+    message = str(error).lower()
+    return "does not exist" in message or "doesn't exist" in message
+
+
+class VectorStoreRegistry:
+    """Process-wide cache of vector DB clients and collection handles."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, str], Any] = {}
+        self._collections: Dict[Tuple[str, str, str], Any] = {}
+        # Qdrant collections known to exist (created or seen), per url
+        self._qdrant_known: Set[Tuple[str, str]] = set()
+
+    def _client(self, backend: str, location: str, factory: Callable[[], Any]) -> Any:
+        key = (backend, location)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = factory()
+                logger.info("[VectorStores] Opened client", backend=backend)
+            return client
+
+    # =========================================================================
+    # Chroma
+    # =========================================================================
+
+    def chroma_collection(self, persist_dir: str, name: str) -> Any:
+        """Cached ``get_or_create_collection`` on a cached PersistentClient."""
+        key = ("chroma", persist_dir, name)
+        with self._lock:
+            coll = self._collections.get(key)
+        if coll is not None:
+            return coll
+        import chromadb
+        client = self._client("chroma", persist_dir, lambda: chromadb.PersistentClient(path=persist_dir))
+        coll = client.get_or_create_collection(name=name)
+        with self._lock:
+            return self._collections.setdefault(key, coll)
+
+    # =========================================================================
+    # Qdrant
+    # =========================================================================
+
+    def qdrant_client(self, url: str) -> Any:
+        from qdrant_client import QdrantClient
+        # ":memory:" runs Qdrant embedded (local testing)
+        kwargs = {"location": url} if url == ":memory:" else {"url": url}
+        return self._client("qdrant", url, lambda: QdrantClient(**kwargs))
+
+    def ensure_qdrant_collection(self, url: str, name: str, dim: int) -> Any:
+        """Client for ``url`` with collection ``name`` created if missing.
+
+        Checks ``collection_exists`` once per collection instead of listing
+        every collection on each store.
+        """
+        client = self.qdrant_client(url)
+        if (url, name) in self._qdrant_known:
+            return client
+        if not client.collection_exists(name):
+            from qdrant_client.models import Distance, VectorParams
+            client.create_collection(name, vectors_config=VectorParams(size=dim, distance=Distance.COSINE))
+        self._qdrant_known.add((url, name))
+        return client
+
+    # =========================================================================
+    # Pinecone
+    # =========================================================================
+
+    def pinecone_index(self, api_key: str, name: str) -> Any:
+        location = _secret_key(api_key)
+        key = ("pinecone", location, name)
+        with self._lock:
+            index = self._collections.get(key)
+        if index is not None:
+            return index
+        from pinecone import Pinecone
+        pc = self._client("pinecone", location, lambda: Pinecone(api_key=api_key))
+        index = pc.Index(name)
+        with self._lock:
+            return self._collections.setdefault(key, index)
+
+    # =========================================================================
+    # Invalidation / shutdown
+    # =========================================================================
+
+    def forget_collection(self, backend: str, location: str, name: str) -> None:
+        """Drop a cached handle (e.g. after the collection was deleted externally).
+
+        ``location`` is the Chroma persist dir, Qdrant url or Pinecone API key.
+        """
+        if backend == "pinecone":
+            location = _secret_key(location)
+        with self._lock:
+            self._collections.pop((backend, location, name), None)
+            self._qdrant_known.discard((location, name))
+
+    def close(self) -> None:
+        with self._lock:
+            clients, self._clients = list(self._clients.items()), {}
+            self._collections.clear()
+            self._qdrant_known.clear()
+        for (backend, _), client in clients:
+            close = getattr(client, "close", None)
+            if backend == "qdrant" and close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    logger.warning("[VectorStores] Close failed", backend=backend, error=str(e))
+
+
+async def run_batches(fn: Callable[[int, int], T], total: int, batch_size: int,
+                      concurrency: int) -> List[T]:
+    """Run ``fn(start, end)`` over ``[0, total)`` in slices, in worker threads.
+
+    At most ``concurrency`` slices are in flight; results come back in slice
+    order. A failed slice is re-raised after the others finish.
+    """
+    batch_size = max(1, batch_size)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(start: int) -> T:
+        async with semaphore:
+            return await asyncio.to_thread(fn, start, min(start + batch_size, total))
+
+    results = await asyncio.gather(*[run(s) for s in range(0, total, batch_size)],
+                                   return_exceptions=True)
+    for r in results:
+        if isinstance(r, BaseException):
+            raise r
+    return results
+
+
+_registry: Optional[VectorStoreRegistry] = None
+
+
+def get_vector_store_registry() -> VectorStoreRegistry:
+    """Get the process-wide VectorStoreRegistry."""
+    global _registry
+    if _registry is None:
+        _registry = VectorStoreRegistry()
+    return _registry
+
+
+def close_vector_stores() -> None:
+    """Close pooled vector DB clients (call on shutdown)."""
+    global _registry
+    if _registry is not None:
+        _registry.close()
+        _registry = None
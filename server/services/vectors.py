@@ -0,0 +1,152 @@
+"""Compact vector payloads passed between nodes.
+
+An embedding matrix in a node output is a JSON-safe envelope around one
+little-endian float32 buffer instead of a list of float lists:
+
+    {"__vectors__": 1, "dtype": "float32", "shape": [n, dim], "data": "<base64>"}
+
+The envelope survives every hop a node output takes (``ctx.outputs``, the
+execution cache, the NodeOutput JSON column, Temporal and WebSocket JSON) as
+one string, so hashing and storing it never walks individual floats. Vector
+store backends decode it straight into a NumPy array; the status broadcaster
+sends ``summarize_vectors()`` instead of the buffer.
+
+Plain ``List[List[float]]`` is still accepted everywhere a payload is.
+"""
+
+import base64
+import sys
+from array import array
+from typing import Any, Dict, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with chromadb/sentence-transformers
+    np = None
+
+VECTORS_KEY = "__vectors__"
+DTYPE = "float32"
+_ITEMSIZE = 4
+_SWAP = sys.byteorder != "little"
+
+
+def _floats_to_bytes(values: Sequence[float]) -> bytes:
+    buf = array("f", values)
+    if _SWAP:
+        buf.byteswap()
+    return buf.tobytes()
+
+
+def row_to_floats(raw: bytes) -> List[float]:
+    """Decode one float32 row buffer (see ``vector_rows``)."""
+    buf = array("f")
+    buf.frombytes(raw)
+    if _SWAP:
+        buf.byteswap()
+    return buf.tolist()
+
+
+def is_vector_payload(value: Any) -> bool:
+    """True for a packed vector envelope."""
+    return isinstance(value, dict) and VECTORS_KEY in value
+
+
+def vector_rows(vectors: Any) -> List[bytes]:
+    """Split vectors (lists, ndarray or payload) into one float32 buffer per row."""
+    if is_vector_payload(vectors):
+        raw = base64.b64decode(vectors["data"])
+        count, dim = vectors["shape"]
+        width = dim * _ITEMSIZE
+        return [raw[i * width:(i + 1) * width] for i in range(count)]
+    if hasattr(vectors, "astype"):  # numpy
+        matrix = vectors.astype("<f4", copy=False)
+        return [row.tobytes() for row in matrix]
+    return [_floats_to_bytes(v) for v in vectors]
+
+
+def pack_rows(rows: Sequence[bytes], dim: int) -> Dict[str, Any]:
+    """Build a payload from per-row float32 buffers (see ``vector_rows``)."""
+    return {
+        VECTORS_KEY: 1,
+        "dtype": DTYPE,
+        "shape": [len(rows), dim],
+        "data": base64.b64encode(b"".join(rows)).decode("ascii"),
+    }
+
+
+def pack_vectors(vectors: Any) -> Dict[str, Any]:
+    """Pack a matrix (list of float lists or 2-D ndarray) into a payload."""
+    if is_vector_payload(vectors):
+        return vectors
+    if hasattr(vectors, "astype"):
+        matrix = vectors.astype("<f4", copy=False)
+        rows, dim = matrix.shape if matrix.ndim == 2 else (0, 0)
+        return {VECTORS_KEY: 1, "dtype": DTYPE, "shape": [rows, dim],
+                "data": base64.b64encode(matrix.tobytes()).decode("ascii")}
+    dim = len(vectors[0]) if vectors else 0
+    return pack_rows(vector_rows(vectors), dim)
+
+
+def vector_shape(vectors: Any) -> List[int]:
+    """``[count, dim]`` for a payload, ndarray or list of lists."""
+    if is_vector_payload(vectors):
+        return list(vectors["shape"])
+    if hasattr(vectors, "shape"):
+        return list(vectors.shape)
+    return [len(vectors), len(vectors[0]) if vectors else 0]
+
+
+def to_array(vectors: Any):
+    """Decode to a float32 ``(count, dim)`` NumPy array without a list round trip."""
+    if np is None:
+        raise ImportError("NumPy is required to decode vectors. Install with: pip install numpy")
+    if is_vector_payload(vectors):
+        raw = base64.b64decode(vectors["data"])
+        return np.frombuffer(raw, dtype="<f4").reshape(vectors["shape"])
+    return np.asarray(vectors, dtype="<f4")
+
+
+def to_lists(vectors: Any) -> List[List[float]]:
+    """Decode to plain float lists (for clients that require them)."""
+    if is_vector_payload(vectors):
+        return [row_to_floats(row) for row in vector_rows(vectors)]
+    if hasattr(vectors, "tolist"):
+        return vectors.tolist()
+    return [list(v) for v in vectors]
+
+
+def vector_at(vectors: Any, index: int) -> List[float]:
+    """One row as a float list (for templates like ``embeddings[0]``)."""
+    count, dim = vector_shape(vectors)
+    if not 0 <= index < count:
+        raise IndexError(index)
+    if is_vector_payload(vectors):
+        raw = base64.b64decode(vectors["data"])
+        width = dim * _ITEMSIZE
+        return row_to_floats(raw[index * width:(index + 1) * width])
+    return list(vectors[index])
+
+
+def summarize_vectors(value: Any) -> Any:
+    """Replace payload buffers with ``{dtype, shape, bytes}`` summaries.
+
+    Walks dicts and lists of containers; returns ``value`` itself when there
+    is nothing to replace.
+    """
+    if isinstance(value, dict):
+        if VECTORS_KEY in value:
+            count, dim = value["shape"]
+            return {VECTORS_KEY: 1, "dtype": value["dtype"], "shape": [count, dim],
+                    "bytes": count * dim * _ITEMSIZE}
+        summary = None
+        for k, v in value.items():
+            s = summarize_vectors(v)
+            if s is not v:
+                if summary is None:
+                    summary = dict(value)
+                summary[k] = s
+        return value if summary is None else summary
+    if isinstance(value, list) and value and isinstance(value[0], (dict, list)):
+        items = [summarize_vectors(v) for v in value]
+        return value if all(a is b for a, b in zip(items, value)) else items
+    return value
@@ -10,6 +10,7 @@ This is a thin facade that delegates to specialized modules:
 Following n8n/Conductor patterns for clean separation of concerns.
 """
 
+import asyncio
 import time
 from datetime import datetime
 from pathlib import Path
@@ -18,9 +19,11 @@ from typing import Dict, Any, List, Optional, TYPE_CHECKING
 from core.logging import get_logger
 from constants import WORKFLOW_TRIGGER_TYPES
 from services.node_executor import NodeExecutor
-from services.parameter_resolver import ParameterResolver
-from services.deployment import DeploymentManager
-from services.execution import WorkflowExecutor, ExecutionCache
+from services.node_outputs import NodeOutputBuffer, NodeOutputCache, canonical_output_name
+from services.parameter_resolver import KeyIndex, ParameterResolver
+from services.deployment import DEFAULT_DEPLOYMENT_SETTINGS, DeploymentManager
+from services.document_parsing import release_spools
+from services.execution import WorkflowExecutor, ExecutionCache, NodeMemo, WorkflowGraph, get_memo_policy
 
 if TYPE_CHECKING:
     from core.config import Settings
@@ -58,8 +61,15 @@ class WorkflowService:
         self.database = database
         self.settings = settings
 
-        # In-memory output storage (fast access during execution)
-        self._outputs: Dict[str, Dict[str, Any]] = {}
+        # In-memory output storage (fast access during execution), bounded
+        # by size, session count and idle time; deployment runs release theirs
+        self._outputs = NodeOutputCache(
+            max_bytes=settings.output_cache_max_mb * 1024 * 1024,
+            max_sessions=settings.output_cache_max_sessions,
+            ttl=settings.output_cache_ttl,
+        )
+        # Write-behind DB persistence, committed in batches per execution
+        self._output_buffer = NodeOutputBuffer(database)
 
         # Initialize NodeExecutor
         self._node_executor = NodeExecutor(
@@ -79,7 +89,9 @@ class WorkflowService:
         )
 
         # Initialize Execution Cache
-        self._execution_cache = ExecutionCache(cache)
+        self._execution_cache = ExecutionCache(
+            cache, memo_max_entries=settings.memo_cache_max_entries
+        )
         self._workflow_executor: Optional[WorkflowExecutor] = None
 
         # Temporal executor (set via set_temporal_executor when enabled)
@@ -94,6 +106,9 @@ class WorkflowService:
             "stop_on_error": False,
             "max_concurrent_runs": 100,
             "use_parallel_executor": True,
+            # Cross-run memo (DEFAULT_MEMO_POLICIES). Applies to the parallel and
+            # sequential executors only; Temporal runs never consult it
+            "memoize_nodes": False,
         }
 
     def set_temporal_executor(self, executor: "TemporalExecutor") -> None:
@@ -115,6 +130,7 @@ class WorkflowService:
                 execute_workflow_fn=self.execute_workflow,
                 store_output_fn=self.store_node_output,
                 broadcaster=self._broadcaster,
+                release_outputs_fn=self.release_session_outputs,
             )
         return self._deployment_manager
 
@@ -154,6 +170,8 @@ class WorkflowService:
         execution_id: str = None,
         workflow_id: str = None,
         outputs: Dict[str, Any] = None,
+        memo: Optional[NodeMemo] = None,
+        key_index: Optional[KeyIndex] = None,
     ) -> Dict[str, Any]:
         """Execute a single workflow node."""
         workspace_dir = self._get_workspace_dir(workflow_id)
@@ -167,6 +185,13 @@ class WorkflowService:
             "get_output_fn": self.get_node_output,
             "outputs": outputs or {},  # Upstream node outputs for data flow (e.g., taskTrigger -> chatAgent)
         }
+        if memo:
+            context["memo"] = memo  # Cross-run memoization (see services.execution.memo)
+        if key_index is not None:
+            context["key_index"] = key_index  # Template key index of a deployment run plan
+        snapshot = self._deployment_manager.get_param_snapshot(workflow_id) if self._deployment_manager else None
+        if snapshot is not None:
+            context["param_snapshot"] = snapshot  # Prepared parameters reused across deployed runs
         return await self._node_executor.execute(
             node_id=node_id,
             node_type=node_type,
@@ -175,6 +200,16 @@ class WorkflowService:
             resolve_params_fn=self._param_resolver.resolve,
         )
 
+    def node_memo(self, node_type: str, stats: Optional[Dict[str, int]] = None) -> Optional[NodeMemo]:
+        """NodeMemo for one execution of node_type, or None if it is not memoizable.
+
+        Used where no executor context supplies upstream inputs (sequential
+        runs, Temporal activities): upstream data reaches memoizable nodes
+        through resolved template params, which are part of the memo key.
+        """
+        policy = get_memo_policy(node_type)
+        return NodeMemo(self._execution_cache, policy, stats=stats) if policy else None
+
     async def _execute_node_adapter(
         self,
         node_id: str,
@@ -192,6 +227,8 @@ class WorkflowService:
             session_id=context.get("session_id", "default"),
             execution_id=context.get("execution_id"),
             workflow_id=context.get("workflow_id"),
+            memo=context.get("memo"),
+            key_index=context.get("key_index"),
         )
 
     # =========================================================================
@@ -208,6 +245,8 @@ class WorkflowService:
         skip_clear_outputs: bool = False,
         workflow_id: Optional[str] = None,
         use_temporal: bool = None,
+        memoize: Optional[bool] = None,
+        graph: Optional[WorkflowGraph] = None,
     ) -> Dict[str, Any]:
         """Execute entire workflow.
 
@@ -220,6 +259,10 @@ class WorkflowService:
             skip_clear_outputs: Skip clearing outputs (for deployment runs)
             workflow_id: Workflow ID for per-workflow status scoping (n8n pattern)
             use_temporal: Force Temporal execution (None = use settings default)
+            memoize: Reuse results of deterministic nodes (textChunker, embeddingGenerator, ...)
+                across runs (None = use settings default).
+            graph: Precompiled WorkflowGraph of nodes/edges (deployment run plans),
+                reused by the parallel executor instead of compiling one per run.
         """
         start_time = time.time()
 
@@ -238,31 +281,40 @@ class WorkflowService:
         # Determine execution mode
         if use_parallel is None:
             use_parallel = self._settings.get("use_parallel_executor", True)
+        if memoize is None:
+            memoize = self._settings.get("memoize_nodes", False)
 
         # Check if Temporal execution is requested
         if use_temporal is None:
             use_temporal = self.settings.temporal_enabled
 
-        # Use Temporal if enabled and executor is configured
-        if use_temporal and self._temporal_executor is not None:
-            return await self._execute_temporal(nodes, edges, session_id, status_callback, start_time, workflow_id)
-
-        # Log warning if Temporal was requested but not available
-        if use_temporal and self._temporal_executor is None:
-            logger.warning(
-                "Temporal execution requested but executor not configured. "
-                "Falling back to parallel/sequential execution. "
-                "Check TEMPORAL_ENABLED and Temporal server connection."
-            )
-
-        # Use parallel executor if enabled and Redis available
-        if use_parallel and self.settings.redis_enabled:
-            return await self._execute_parallel(nodes, edges, session_id, status_callback, start_time, workflow_id)
-
-        # Fall back to sequential
-        return await self._execute_sequential(nodes, edges, session_id, status_callback, start_time, workflow_id)
-
-    async def _execute_temporal(self, nodes, edges, session_id, status_callback, start_time, workflow_id: Optional[str] = None) -> Dict:
+        try:
+            # Use Temporal if enabled and executor is configured
+            if use_temporal and self._temporal_executor is not None:
+                return await self._execute_temporal(nodes, edges, session_id, status_callback, start_time, workflow_id,
+                                                    memoize)
+
+            # Log warning if Temporal was requested but not available
+            if use_temporal and self._temporal_executor is None:
+                logger.warning(
+                    "Temporal execution requested but executor not configured. "
+                    "Falling back to parallel/sequential execution. "
+                    "Check TEMPORAL_ENABLED and Temporal server connection."
+                )
+
+            # Use parallel executor if enabled and Redis available
+            if use_parallel and self.settings.redis_enabled:
+                return await self._execute_parallel(nodes, edges, session_id, status_callback, start_time, workflow_id,
+                                                   memoize, graph)
+
+            # Fall back to sequential
+            return await self._execute_sequential(nodes, edges, session_id, status_callback, start_time, workflow_id, memoize)
+        finally:
+            # Commit the run's outputs in one batch
+            await self._output_buffer.flush(session_id)
+
+    async def _execute_temporal(self, nodes, edges, session_id, status_callback, start_time, workflow_id: Optional[str] = None,
+                                memoize: bool = False) -> Dict:
         """Execute with Temporal for durable workflow orchestration."""
         # Use passed workflow_id (from deployment) or generate new one
         if not workflow_id:
@@ -280,6 +332,7 @@ class WorkflowService:
             edges=edges,
             session_id=session_id,
             enable_caching=True,
+            memoize=memoize,
         )
 
         # Notify status callback for completed nodes if provided
@@ -305,7 +358,8 @@ class WorkflowService:
             "timestamp": datetime.now().isoformat(),
         }
 
-    async def _execute_parallel(self, nodes, edges, session_id, status_callback, start_time, workflow_id: Optional[str] = None) -> Dict:
+    async def _execute_parallel(self, nodes, edges, session_id, status_callback, start_time, workflow_id: Optional[str] = None,
+                                memoize: bool = False, graph: Optional[WorkflowGraph] = None) -> Dict:
         """Execute with parallel orchestration engine."""
         # Use passed workflow_id (from deployment) or generate new one
         if not workflow_id:
@@ -318,9 +372,11 @@ class WorkflowService:
             edges=edges,
             session_id=session_id,
             enable_caching=True,
+            enable_memoization=memoize,
+            graph=graph,
         )
 
-        return {
+        response = {
             "success": result.get("success", False),
             "execution_id": result.get("execution_id"),
             "nodes_executed": result.get("nodes_executed", []),
@@ -330,14 +386,19 @@ class WorkflowService:
             "parallel_execution": True,
             "timestamp": datetime.now().isoformat(),
         }
+        if "memo" in result:
+            response["memo"] = result["memo"]
+        return response
 
-    async def _execute_sequential(self, nodes, edges, session_id, status_callback, start_time, workflow_id: Optional[str] = None) -> Dict:
+    async def _execute_sequential(self, nodes, edges, session_id, status_callback, start_time, workflow_id: Optional[str] = None,
+                                  memoize: bool = False) -> Dict:
         """Execute nodes sequentially (fallback mode)."""
         start_node = self._find_start_node(nodes)
         execution_order = self._build_execution_order(start_node, nodes, edges)
 
         results = {}
         executed = []
+        memo_stats = {"hits": 0, "misses": 0}
 
         for node in execution_order:
             node_id = node['id']
@@ -366,6 +427,8 @@ class WorkflowService:
                 except Exception:
                     pass
 
+            memo = self.node_memo(node_type, memo_stats) if memoize else None
+
             # Execute with workflow_id for per-workflow status scoping (n8n pattern)
             result = await self.execute_node(
                 node_id=node_id,
@@ -375,6 +438,7 @@ class WorkflowService:
                 edges=edges,
                 session_id=session_id,
                 workflow_id=workflow_id,
+                memo=memo,
             )
 
             results[node_id] = result
@@ -391,7 +455,7 @@ class WorkflowService:
             if not result.get("success") and self._settings.get("stop_on_error"):
                 break
 
-        return {
+        response = {
             "success": all(r.get("success", False) for r in results.values()),
             "nodes_executed": executed,
             "node_results": results,
@@ -399,6 +463,9 @@ class WorkflowService:
             "parallel_execution": False,
             "timestamp": datetime.now().isoformat(),
         }
+        if memoize:
+            response["memo"] = memo_stats
+        return response
 
     # =========================================================================
     # DEPLOYMENT
@@ -472,13 +539,39 @@ class WorkflowService:
         output_name: str,
         data: Dict[str, Any],
     ) -> None:
-        """Store node execution output."""
-        key = f"{session_id}_{node_id}"
-        if key not in self._outputs:
-            self._outputs[key] = {}
-        self._outputs[key][output_name] = data
-        logger.debug(f"[store_node_output] Stored in memory: key={key}, output_name={output_name}, _outputs keys={list(self._outputs.keys())}")
-        await self.database.save_node_output(node_id, session_id, output_name, data)
+        """Store node execution output.
+
+        Aliased handle names (``output_top``, ``output_0``) are stored once
+        under ``output_main``. The DB write is buffered (see
+        services.node_outputs) and committed with the rest of the run.
+        """
+        output_name = canonical_output_name(output_name)
+        self._outputs.put(session_id, node_id, output_name, data)
+        logger.debug(f"[store_node_output] Stored in memory: session={session_id}, node={node_id}, output_name={output_name}")
+        self._output_buffer.put(session_id, node_id, output_name, data)
+
+    async def release_session_outputs(self, session_id: str) -> None:
+        """Commit a finished run's outputs and drop them from memory.
+
+        They stay readable through get_node_output, which falls back to the
+        database. documentParser spool files written for the session are
+        deleted.
+        """
+        await self._output_buffer.flush(session_id)
+        self._outputs.evict_session(session_id)
+        await asyncio.to_thread(release_spools, session_id)
+
+    def discard_node_outputs(self, node_id: str) -> int:
+        """Drop a node's in-memory outputs across sessions. Returns sessions touched."""
+        return self._outputs.discard_node(node_id)
+
+    def get_output_cache_stats(self) -> Dict[str, int]:
+        """Sessions, outputs and estimated bytes held in memory."""
+        return self._outputs.stats()
+
+    async def flush_node_outputs(self) -> None:
+        """Commit all buffered node outputs (call on shutdown)."""
+        await self._output_buffer.close()
 
     async def get_node_output(
         self,
@@ -486,19 +579,23 @@ class WorkflowService:
         node_id: str,
         output_name: str,
     ) -> Optional[Dict[str, Any]]:
-        """Get stored node output."""
-        key = f"{session_id}_{node_id}"
-        logger.debug(f"[get_node_output] Looking for: key={key}, output_name={output_name}, _outputs keys={list(self._outputs.keys())}")
-        output = self._outputs.get(key, {}).get(output_name)
+        """Get stored node output (handle aliases resolve to the stored name)."""
+        requested_name = output_name
+        output_name = canonical_output_name(output_name)
+        logger.debug(f"[get_node_output] Looking for: session={session_id}, node={node_id}, output_name={output_name}")
+        output = self._outputs.get(session_id, node_id, output_name)
+        if output is None:
+            output = self._output_buffer.get(session_id, node_id, output_name)
         logger.debug(f"[get_node_output] Memory lookup result: {'FOUND' if output else 'NOT_FOUND'}")
 
         if output is None:
             output = await self.database.get_node_output(node_id, session_id, output_name)
+            if output is None and requested_name != output_name:
+                # Rows written before aliasing are stored under the handle name
+                output = await self.database.get_node_output(node_id, session_id, requested_name)
             logger.debug(f"[get_node_output] DB lookup result: {'FOUND' if output else 'NOT_FOUND'}")
             if output:
-                if key not in self._outputs:
-                    self._outputs[key] = {}
-                self._outputs[key][output_name] = output
+                self._outputs.put(session_id, node_id, output_name, output)
 
         # Special handling for start nodes
         if output is None and node_id.startswith('start-'):
@@ -526,10 +623,10 @@ class WorkflowService:
 
     async def clear_all_outputs(self, session_id: str = "default") -> None:
         """Clear all outputs for a session."""
-        keys = [k for k in self._outputs if k.startswith(f"{session_id}_")]
-        for k in keys:
-            del self._outputs[k]
+        self._outputs.evict_session(session_id)
+        self._output_buffer.discard_session(session_id)
         await self.database.clear_session_outputs(session_id)
+        await asyncio.to_thread(release_spools, session_id)
 
     # =========================================================================
     # HELPERS
@@ -592,25 +689,23 @@ class WorkflowService:
 
     async def load_deployment_settings(self) -> Dict[str, Any]:
         """Load deployment settings from database."""
-        try:
-            db = await self.database.get_deployment_settings()
-            if db:
-                self._settings.update(db)
-        except Exception:
-            pass
-        return self._settings.copy()
+        db = await self.database.get_deployment_settings()
+        if db:
+            self._settings.update(db)
+        return self.get_deployment_settings()
 
     async def update_deployment_settings(self, settings: Dict[str, Any]) -> Dict[str, Any]:
-        """Update deployment settings."""
-        self._settings.update(settings)
+        """Update deployment settings.
+
+        Merged into the stored settings; the deployment manager reads them on
+        the next deploy.
+        """
+        stored = await self.database.get_deployment_settings() or {}
+        self._settings.update({**stored, **settings})
         await self.database.save_deployment_settings(self._settings)
-        return self._settings.copy()
+        return self.get_deployment_settings()
 
     def get_deployment_settings(self) -> Dict[str, Any]:
-        """Get current deployment settings."""
-        return self._settings.copy()
+        """Get current deployment settings (defaults for keys never set)."""
+        return {**DEFAULT_DEPLOYMENT_SETTINGS, **self._settings}
 
-    @property
-    def node_outputs(self) -> Dict[str, Dict[str, Any]]:
-        """Backward compatibility: expose outputs as node_outputs."""
-        return self._outputs
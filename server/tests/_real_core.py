@@ -0,0 +1,28 @@
+"""Swap the stub ``core`` package from tests/conftest.py for the real one.
+
+Suites that exercise services built on real ``core`` modules (the execution
+engine needs ``core.cache``) call ``use_real_core()`` from their conftest. It
+is a no-op when the real package is already loaded, so several suites can
+call it without re-importing ``core.*`` twice. Log output below WARNING is
+dropped to keep timings and captured output clean.
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+
+
+def use_real_core() -> None:
+    if str(SERVER_DIR) not in sys.path:
+        sys.path.insert(0, str(SERVER_DIR))
+
+    core = sys.modules.get("core")
+    if core is not None and getattr(core, "__file__", None) is None:
+        for name in [n for n in list(sys.modules) if n == "core" or n.startswith("core.")]:
+            del sys.modules[name]
+
+    import structlog
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
@@ -0,0 +1,7 @@
+"""Performance benchmarks for server hot paths.
+
+Each module times one subsystem against synthetic load and prints a small
+results table; assertions only check correctness, never wall-clock numbers.
+Run with ``pytest tests/benchmarks -m benchmark -s`` to see the tables, or
+execute a module directly (``python -m tests.benchmarks.<module>``).
+"""
@@ -0,0 +1,35 @@
+"""Tiny helpers shared by the benchmark modules."""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Sequence
+
+
+def print_table(title: str, headers: Sequence[str], rows: List[Sequence]) -> None:
+    """Print rows as a fixed-width table (visible with ``pytest -s``)."""
+    cells = [[str(h) for h in headers]] + [[_fmt(v) for v in row] for row in rows]
+    widths = [max(len(r[i]) for r in cells) for i in range(len(headers))]
+    print(f"\n{title}")
+    for i, row in enumerate(cells):
+        print("  " + "  ".join(c.rjust(w) for c, w in zip(row, widths)))
+        if i == 0:
+            print("  " + "  ".join("-" * w for w in widths))
+
+
+@contextmanager
+def stopwatch() -> Iterator[List[float]]:
+    """Yield a one-element list that receives elapsed seconds on exit."""
+    elapsed = [0.0]
+    start = time.perf_counter()
+    try:
+        yield elapsed
+    finally:
+        elapsed[0] = time.perf_counter() - start
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float):
+        return f"{value:,.3f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value)
@@ -0,0 +1,5 @@
+"""Benchmarks run against the real ``core`` package (see tests/_real_core.py)."""
+
+from tests._real_core import use_real_core
+
+use_real_core()
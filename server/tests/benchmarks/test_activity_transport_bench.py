@@ -0,0 +1,121 @@
+"""Temporal activity transport: a WebSocket per node vs the multiplexed channel.
+
+EXECUTIONS node executions of one workflow go through the local
+``/ws/internal`` stand-in (``tests/execution/_internal_ws.py``), CONCURRENCY
+at a time, for graphs of each size in GRAPH_SIZES. "per node" replays the old
+``_execute_via_websocket``: it opens a connection per activity and sends the
+full ``nodes``/``edges`` with every ``execute_node``. "channel" is
+``ActivityChannel``, which registers the graph once and sends its
+``graph_id`` (hashed once per execution, as the workflow does). Both decode
+a fresh copy of the graph per activity, as Temporal's payload does.
+Reported: wall time, mean time per node, bytes per ``execute_node`` frame
+and connections opened. Loopback hides network RTT, so each handshake costs
+more on a real deployment.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from typing import List, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+EXECUTIONS = 400
+CONCURRENCY = 8
+GRAPH_SIZES = (10, 100, 500)
+
+
+def _graph(size: int):
+    nodes = [{"id": f"n{i}", "type": "aiAgent", "position": {"x": i, "y": i},
+              "data": {"label": f"Node {i}", "prompt": "p" * 300, "model": "gpt-4o"}}
+             for i in range(size)]
+    edges = [{"id": f"e{i}", "source": f"n{i}", "target": f"n{i + 1}",
+              "sourceHandle": "output-main", "targetHandle": "input-main"} for i in range(size - 1)]
+    return nodes, edges
+
+
+async def _per_node(session, url: str, node_id: str, nodes, edges) -> dict:
+    import aiohttp
+
+    request_id = str(uuid.uuid4())
+    async with session.ws_connect(url, heartbeat=30, receive_timeout=None) as ws:
+        await ws.send_json({"type": "execute_node", "request_id": request_id, "node_id": node_id,
+                            "node_type": "console", "parameters": {}, "nodes": nodes, "edges": edges,
+                            "workflow_id": "wf-1", "outputs": {}})
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                response = json.loads(msg.data)
+                if response.get("request_id") == request_id:
+                    return response
+    raise ConnectionError("closed")
+
+
+async def _run(mode: str, size: int) -> Tuple[float, float, float, int]:
+    import aiohttp
+
+    from services.temporal.workflow import graph_content_id
+    from services.temporal.ws_client import ActivityChannel
+    from tests.execution._internal_ws import InternalServer
+
+    server = InternalServer()
+    await server.start()
+    nodes, edges = _graph(size)
+    graph_id = graph_content_id(nodes, edges)
+    session = aiohttp.ClientSession()
+    channel = ActivityChannel(session, server.url)
+    gate = asyncio.Semaphore(CONCURRENCY)
+    per_node: List[float] = []
+
+    async def execute(n: int):
+        async with gate:
+            # Each activity gets its graph fresh from Temporal's payload
+            own_nodes, own_edges = json.loads(json.dumps([nodes, edges]))
+            start = time.perf_counter()
+            if mode == "per node":
+                await _per_node(session, server.url, f"n{n}", own_nodes, own_edges)
+            else:
+                await channel.execute_node({"type": "execute_node", "node_id": f"n{n}",
+                                            "node_type": "console", "parameters": {},
+                                            "workflow_id": "wf-1", "outputs": {}},
+                                           own_nodes, own_edges, graph_id=graph_id)
+            per_node.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(execute(n) for n in range(EXECUTIONS)))
+    wall = time.perf_counter() - start
+
+    await channel.close()
+    await session.close()
+    await server.stop()
+    frame = sum(server.execute_bytes) / len(server.execute_bytes)
+    return wall * 1000, sum(per_node) / len(per_node) * 1000, frame, server.connections
+
+
+async def run_benchmark() -> List[Tuple]:
+    rows = []
+    for size in GRAPH_SIZES:
+        for mode in ("per node", "channel"):
+            wall, mean, frame, connections = await _run(mode, size)
+            rows.append((size, mode, wall, mean, int(frame), connections))
+    print_table("%d node executions, %d concurrent, local /ws/internal" % (EXECUTIONS, CONCURRENCY),
+                ["graph nodes", "transport", "wall ms", "per node ms", "execute_node bytes",
+                 "connections"], rows)
+    return rows
+
+
+async def test_channel_keeps_per_node_cost_flat_in_graph_size():
+    pytest.importorskip("aiohttp")
+    rows = {(r[0], r[1]): r for r in await run_benchmark()}
+    largest = max(GRAPH_SIZES)
+    assert rows[(largest, "channel")][3] < rows[(largest, "per node")][3] / 2
+    assert rows[(largest, "channel")][4] == rows[(min(GRAPH_SIZES), "channel")][4]
+    assert rows[(largest, "channel")][5] == 1
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,119 @@
+"""Node-status fan-out of a 500-node run to 8 browser tabs, one of them slow.
+
+One tab views the running workflow, the others view other workflows; the
+slow tab takes 2 ms per socket send. "per-message" replays the old
+``StatusBroadcaster.broadcast``: every update is serialized and sent to
+every socket in a fresh TaskGroup, so the executor waits on the slowest
+tab. "framed" is the current broadcaster: per-client queues, workflow
+subscriptions, latest-value coalescing and 50 ms frames.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+import orjson
+import pytest
+
+from tests.benchmarks._report import print_table, stopwatch
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+NODES = 500
+TABS = 8
+SLOW_SEND = 0.002
+STATUSES = ("scheduled", "executing", "executing", "success")
+
+
+class _Socket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.frames = 0
+        self.messages = 0
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        pass
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames += 1
+        self.messages += text.count('"node_id"')
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        pass
+
+
+def _tabs() -> List[_Socket]:
+    return [_Socket(SLOW_SEND if i == 0 else 0.0) for i in range(TABS)]
+
+
+async def _legacy_broadcast(sockets: List[_Socket], message: Dict[str, Any]):
+    """The pre-frame ``StatusBroadcaster.broadcast``."""
+    text = orjson.dumps(message).decode()
+    async with asyncio.TaskGroup() as tg:
+        for socket in sockets:
+            tg.create_task(socket.send_text(text))
+
+
+async def _run(update) -> float:
+    """Seconds the executor spends emitting every node's status updates."""
+    with stopwatch() as elapsed:
+        for n in range(NODES):
+            for status in STATUSES:
+                await update(f"n{n}", status)
+            await asyncio.sleep(0)  # the node's own work
+    return elapsed[0]
+
+
+async def run_benchmark() -> List[Tuple]:
+    from services.status_broadcaster import StatusBroadcaster
+
+    legacy_tabs = _tabs()
+
+    async def legacy_update(node_id, status):
+        await _legacy_broadcast(legacy_tabs, {"type": "node_status", "node_id": node_id,
+                                              "workflow_id": "wf", "data": {"status": status}})
+
+    legacy_s = await _run(legacy_update)
+
+    broadcaster = StatusBroadcaster()
+    broadcaster._refresh_all_services = _no_refresh
+    framed_tabs = _tabs()
+    for i, socket in enumerate(framed_tabs):
+        await broadcaster.connect(socket)
+        broadcaster.subscribe(socket, workflow_ids=["wf" if i < 2 else f"other{i}"])
+
+    async def framed_update(node_id, status):
+        await broadcaster.update_node_status(node_id, status, workflow_id="wf")
+
+    framed_s = await _run(framed_update)
+    await asyncio.sleep(0.2)
+    for socket in framed_tabs:
+        await broadcaster.disconnect(socket)
+
+    rows = [
+        ("per-message", legacy_s * 1000, sum(t.frames for t in legacy_tabs),
+         sum(t.messages for t in legacy_tabs), legacy_tabs[0].messages),
+        ("framed", framed_s * 1000, sum(t.frames for t in framed_tabs),
+         sum(t.messages for t in framed_tabs), framed_tabs[0].messages),
+    ]
+    print_table("%d nodes x %d status updates, %d tabs (1 slow)" % (NODES, len(STATUSES), TABS),
+                ["broadcast", "executor ms", "frames", "messages", "slow tab msgs"], rows)
+    return rows
+
+
+async def _no_refresh():
+    pass
+
+
+async def test_framed_broadcast_does_not_stall_on_slow_tab():
+    rows = await run_benchmark()
+    assert rows[1][1] < rows[0][1]
+    assert rows[1][2] < rows[0][2]
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,101 @@
+"""documentParser: sequential vs process pool, skip-unchanged reruns, streaming memory.
+
+Parses ``FILES`` synthetic HTML pages (BeautifulSoup is pure-Python and
+CPU-bound, like pypdf) through ``handle_document_parser``:
+
+- "sequential" is the previous behaviour (one file at a time in a thread);
+  "process pool" uses ``workers=os.cpu_count()``. On a single-core host the
+  two are expected to match.
+- "rerun, skipUnchanged" re-runs the same node against its manifest.
+- Output size compares holding every document in the node output (which is
+  kept in ctx.outputs, the execution cache, NodeOutput and broadcasts) with
+  streaming them to a spool that textChunker reads back one at a time.
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table, stopwatch
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+FILES = 24
+PARAGRAPHS = 2000
+
+
+def _write_corpus(root: Path) -> Path:
+    corpus = root / "corpus"
+    corpus.mkdir()
+    for i in range(FILES):
+        body = "".join(f"<p>Document {i} paragraph {j} <b>bold</b> text.</p>" for j in range(PARAGRAPHS))
+        (corpus / f"{i}.html").write_text(f"<html><body>{body}</body></html>")
+    return corpus
+
+
+async def _run(corpus: Path, workspace: Path, node_id: str, **params) -> Tuple[float, dict]:
+    from services.handlers.document import handle_document_parser
+
+    parameters = {"inputDir": str(corpus), "filePattern": "*.html", "parser": "beautifulsoup", **params}
+    with stopwatch() as elapsed:
+        result = await handle_document_parser(node_id, "documentParser", parameters,
+                                              {"workspace_dir": str(workspace)})
+    assert result["success"], result
+    return elapsed[0], result["result"]
+
+
+async def _output_size(corpus: Path, workspace: Path, streaming: bool) -> Tuple[float, int]:
+    from services.handlers.document import handle_text_chunker
+
+    _, parsed = await _run(corpus, workspace, f"out-{streaming}", streaming=streaming)
+    chunked = await handle_text_chunker("chunker", "textChunker", {"documents": parsed["documents"]}, {})
+    return len(json.dumps(parsed)) / 1e3, chunked["result"]["chunk_count"]
+
+
+async def run_benchmark(tmp: Path) -> List[Tuple]:
+    from services.document_parsing import shutdown_parse_pool
+
+    corpus = _write_corpus(tmp)
+    workspace = tmp / "ws"
+    workers = os.cpu_count() or 1
+    try:
+        sequential, _ = await _run(corpus, workspace, "seq")
+        pooled, _ = await _run(corpus, workspace, "pool", workers=max(workers, 2))
+        first, _ = await _run(corpus, workspace, "incr", skipUnchanged=True)
+        rerun, result = await _run(corpus, workspace, "incr", skipUnchanged=True)
+    finally:
+        shutdown_parse_pool()
+    assert result["skipped"] == FILES
+
+    rows = [
+        ("sequential (thread)", sequential * 1000),
+        (f"process pool ({max(workers, 2)} workers)", pooled * 1000),
+        ("first run, skipUnchanged", first * 1000),
+        ("rerun, skipUnchanged", rerun * 1000),
+    ]
+    print_table(f"documentParser, {FILES} HTML files ({os.cpu_count()} CPUs)", ["mode", "ms"], rows)
+
+    in_memory, in_memory_chunks = await _output_size(corpus, workspace, streaming=False)
+    streamed, streamed_chunks = await _output_size(corpus, workspace, streaming=True)
+    assert in_memory_chunks == streamed_chunks
+    print_table("documentParser output -> textChunker", ["mode", "output KB", "chunks"],
+                [("documents in output", in_memory, in_memory_chunks),
+                 ("streaming spool", streamed, streamed_chunks)])
+    return rows + [("output in_memory", in_memory), ("output streamed", streamed)]
+
+
+async def test_document_parser_modes(tmp_path):
+    rows = dict(await run_benchmark(tmp_path))
+    assert rows["rerun, skipUnchanged"] < rows["sequential (thread)"] / 5
+    assert rows["output streamed"] < rows["output in_memory"] / 100
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as d:
+        asyncio.run(run_benchmark(Path(d)))
@@ -0,0 +1,91 @@
+"""Embedding throughput: per-execution models versus the shared service.
+
+A stub embedder stands in for a sentence-transformers model: loading costs
+``LOAD_S`` and each ``embed_documents`` call costs a fixed ``CALL_S`` plus
+``PER_TEXT_S`` per text, which is the shape of a batched forward pass.
+``WORKFLOWS`` concurrent embeddingGenerator-sized requests are issued twice
+(the second round re-embeds unchanged chunks).
+
+"per-execution" replays the previous handler: construct the model, then
+``asyncio.to_thread(embed_documents)``. "pooled" is ``EmbeddingService.embed``.
+"""
+
+import asyncio
+import time
+from typing import List, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table, stopwatch
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+WORKFLOWS = 50
+CHUNKS = 16
+LOAD_S = 0.05
+CALL_S = 0.005
+PER_TEXT_S = 0.00005
+
+
+class _StubModel:
+    def __init__(self, model_name: str = ""):
+        time.sleep(LOAD_S)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(CALL_S + PER_TEXT_S * len(texts))
+        return [[float(len(t))] * 8 for t in texts]
+
+
+def _requests() -> List[List[str]]:
+    return [[f"workflow {w} chunk {c}" for c in range(CHUNKS)] for w in range(WORKFLOWS)]
+
+
+async def _per_execution(requests: List[List[str]]) -> float:
+    async def one(texts):
+        model = _StubModel("m")
+        return await asyncio.to_thread(model.embed_documents, texts)
+
+    with stopwatch() as elapsed:
+        await asyncio.gather(*(one(t) for t in requests))
+    return elapsed[0]
+
+
+async def _pooled(service, requests: List[List[str]]) -> float:
+    with stopwatch() as elapsed:
+        await asyncio.gather(*(service.embed(t, model="m") for t in requests))
+    return elapsed[0]
+
+
+async def run_benchmark() -> List[Tuple]:
+    from services import embeddings
+
+    original = embeddings._create_embedder
+    embeddings._create_embedder = lambda provider, model, api_key="": _StubModel(model)
+    try:
+        service = embeddings.EmbeddingService()
+        requests = _requests()
+        texts = WORKFLOWS * CHUNKS
+
+        rows = []
+        for round_name in ("cold", "repeat"):
+            legacy = await _per_execution(requests)
+            pooled = await _pooled(service, requests)
+            rows.append((round_name, legacy * 1000, texts / legacy, pooled * 1000, texts / pooled))
+        stats = service.stats()
+    finally:
+        embeddings._create_embedder = original
+
+    print_table(f"{WORKFLOWS} concurrent requests x {CHUNKS} chunks (stub model)",
+                ["round", "per-execution ms", "texts/s", "pooled ms", "texts/s"], rows)
+    print_table("EmbeddingService.stats()", ["forward passes", "avg batch", "hit rate"],
+                [(stats["forward_passes"], stats["avg_batch_size"], stats["cache_hit_rate"])])
+    return rows
+
+
+async def test_pooled_embedding_throughput():
+    rows = await run_benchmark()
+    assert all(r[3] < r[1] for r in rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
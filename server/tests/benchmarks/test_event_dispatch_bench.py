@@ -0,0 +1,141 @@
+"""Redis-mode trigger dispatch latency versus number of deployed waiters.
+
+Each round registers one waiter whose filter matches the event next to
+``waiters - 1`` waiters that reject it, then measures the time from
+``dispatch_async`` (XADD) to the matching waiter's result, on fakeredis.
+
+"per-waiter" replays the previous design: every waiter owns a consumer group
+and runs its own blocking XREADGROUP loop, decoding every message and acking
+it one at a time. "fan-out" is the current single dispatcher per stream.
+"""
+
+import asyncio
+import json
+import statistics
+import uuid
+from types import SimpleNamespace
+from typing import List, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table, stopwatch
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+WAITER_COUNTS = (1, 50, 200)
+EVENTS = 20
+EVENT_TYPE = "whatsapp_message_received"
+STREAM = f"events:{EVENT_TYPE}"
+
+
+def _cache_service():
+    fakeredis = pytest.importorskip("fakeredis")
+    from core.cache import CacheService
+
+    service = CacheService(SimpleNamespace(redis_enabled=True, redis_url=None, cache_ttl=3600))
+    service.use_redis = True
+    # Per-waiter readers each hold a blocking connection
+    service.redis = fakeredis.FakeAsyncRedis(decode_responses=True, max_connections=1000)
+    service._streams_available = True
+    return service
+
+
+def _message(phone: str):
+    return {"chat_id": f"{phone}@s.whatsapp.net", "sender_phone": phone, "text": "hello",
+            "message_type": "text", "is_from_me": False, "is_group": False}
+
+
+def _params(phone: str):
+    return {"filter": "contact", "contactPhone": phone}
+
+
+async def _fan_out(count: int) -> List[float]:
+    from services import event_waiter
+
+    event_waiter.set_cache_service(_cache_service())
+    try:
+        for i in range(count - 1):
+            await event_waiter.register("whatsappReceive", f"idle{i}", _params(f"9{i:05d}"))
+
+        latencies = []
+        for _ in range(EVENTS):
+            waiter = await event_waiter.register("whatsappReceive", "hot", _params("100"))
+            with stopwatch() as elapsed:
+                await event_waiter.dispatch_async(EVENT_TYPE, _message("100"))
+                await event_waiter.wait_for_event(waiter, timeout=10)
+            latencies.append(elapsed[0])
+        return latencies
+    finally:
+        event_waiter.clear_all()
+        tasks = list(event_waiter._dispatchers.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        event_waiter.set_cache_service(None)
+
+
+async def _legacy_wait(cache, filter_fn, stop: asyncio.Event):
+    """The pre-dispatcher ``_wait_redis`` loop: own group, decode all, ack each."""
+    group = f"waiter_group_{uuid.uuid4()}"
+    await cache.stream_create_group(STREAM, group, start_id="$")
+    while not stop.is_set():
+        result = await cache.stream_read_group(group, f"c_{group}", {STREAM: ">"}, count=10, block=100)
+        for _stream, messages in result or []:
+            for msg_id, fields in messages:
+                data = {}
+                for k, v in fields.items():
+                    try:
+                        data[k] = json.loads(v)
+                    except (json.JSONDecodeError, TypeError):
+                        data[k] = v
+                await cache.stream_ack(STREAM, group, msg_id)
+                if filter_fn(data):
+                    return data
+    return None
+
+
+async def _per_waiter(count: int) -> List[float]:
+    from services.event_waiter import build_whatsapp_filter
+
+    cache = _cache_service()
+    stop = asyncio.Event()
+    idle = [
+        asyncio.create_task(_legacy_wait(cache, build_whatsapp_filter(_params(f"9{i:05d}")), stop))
+        for i in range(count - 1)
+    ]
+    await asyncio.sleep(0.05)  # Let idle readers create their groups
+    try:
+        latencies = []
+        for _ in range(EVENTS):
+            hot = asyncio.create_task(_legacy_wait(cache, build_whatsapp_filter(_params("100")), stop))
+            await asyncio.sleep(0.01)  # Group created before the event is sent
+            with stopwatch() as elapsed:
+                await cache.stream_add(STREAM, _message("100"))
+                await asyncio.wait_for(hot, timeout=10)
+            latencies.append(elapsed[0])
+        return latencies
+    finally:
+        stop.set()
+        await asyncio.gather(*idle, return_exceptions=True)
+
+
+async def run_benchmark() -> List[Tuple]:
+    rows = []
+    for count in WAITER_COUNTS:
+        legacy = await _per_waiter(count)
+        current = await _fan_out(count)
+        rows.append((count,
+                     statistics.median(legacy) * 1000, max(legacy) * 1000,
+                     statistics.median(current) * 1000, max(current) * 1000))
+    print_table(f"dispatch_async -> matching waiter resolved, fakeredis ({EVENTS} events)",
+                ["waiters", "per-waiter p50 ms", "max ms", "fan-out p50 ms", "max ms"], rows)
+    return rows
+
+
+async def test_dispatch_latency_vs_waiter_count():
+    rows = await run_benchmark()
+    assert [r[0] for r in rows] == list(WAITER_COUNTS)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
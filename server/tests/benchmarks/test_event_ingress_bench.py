@@ -0,0 +1,161 @@
+"""WhatsApp ingress under a message burst: inline handling vs the event bus.
+
+BURST messages of PAYLOAD bytes reach the RPC socket at once, with one RPC
+response queued in the middle. TABS browser tabs are connected and a
+deployed whatsappReceive trigger holds a subscription. "inline" replays the
+old receive loop: each event awaits the UI broadcast, then
+``event_waiter.dispatch_async``, before the next frame is read. "event bus"
+is the current loop: it publishes each event to the broadcaster's EventBus
+and reads on. Reported per backend and path:
+- median and p99 latency from arrival to delivery to the trigger;
+- how long the RPC response waited;
+- the ingress histogram p99 (frame read to waiter resolution; inline reads
+  late, so its backlog in the socket is not counted).
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from typing import Any, List, Optional, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+BURST = 500
+PAYLOAD = 16 * 1024
+TABS = 8
+EVENT_TYPE = "whatsapp_message_received"
+
+
+class _Socket:
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        pass
+
+    async def send_text(self, text: str):
+        pass
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        pass
+
+
+def _frames() -> List[str]:
+    frames = []
+    for n in range(BURST):
+        if n == BURST // 2:
+            frames.append(json.dumps({"jsonrpc": "2.0", "id": 1, "result": {"ok": True}}))
+        frames.append(json.dumps({"method": "event.message_received", "params": {
+            "chat_id": "111@s.whatsapp.net", "sender_phone": "111", "text": "x" * PAYLOAD,
+            "message_type": "text", "is_from_me": False, "n": n}}))
+    return frames
+
+
+def _redis_cache():
+    try:
+        import fakeredis
+    except ImportError:
+        return None
+    from core.cache import CacheService
+
+    service = CacheService(SimpleNamespace(redis_enabled=True, redis_url=None, cache_ttl=3600))
+    service.use_redis = True
+    service.redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    service._streams_available = True
+    return service
+
+
+async def _recv(frames: List[str], response: asyncio.Future, broadcaster, inline: bool) -> None:
+    from services import event_waiter as ew
+
+    for frame in frames:
+        received_at = time.perf_counter()
+        data = json.loads(frame)
+        if "id" in data:
+            response.set_result(time.perf_counter())
+        elif inline:
+            await broadcaster.broadcast({"type": EVENT_TYPE, "data": data["params"]})
+            await ew.dispatch_async(EVENT_TYPE, data["params"], received_at=received_at)
+        else:
+            broadcaster.publish_event(EVENT_TYPE, data["params"], received_at)
+        # A socket read yields to the loop between frames
+        await asyncio.sleep(0)
+
+
+async def _run(cache, inline: bool) -> Tuple[float, float, float, float]:
+    from services import event_waiter as ew
+    from services.status_broadcaster import StatusBroadcaster
+
+    ew.set_cache_service(cache)
+    broadcaster = StatusBroadcaster()
+    broadcaster._refresh_all_services = _noop
+    for _ in range(TABS):
+        await broadcaster.connect(_Socket())
+    subscription = await ew.subscribe("whatsappReceive", "trigger", {"filter": "all"})
+
+    frames = _frames()
+    latencies: List[float] = []
+    start = time.perf_counter()
+
+    async def trigger():
+        async for _event in subscription:
+            latencies.append(time.perf_counter() - start)
+            if len(latencies) == BURST:
+                return
+
+    consumer = asyncio.ensure_future(trigger())
+    response: asyncio.Future = asyncio.get_running_loop().create_future()
+    await _recv(frames, response, broadcaster, inline)
+    await asyncio.wait_for(consumer, 30)
+    response_wait = await response - start
+
+    bus_p99 = ew.get_ingress_latency()["p99_ms"]
+    ew.clear_all()
+    for task in list(ew._dispatchers.values()):
+        task.cancel()
+    await asyncio.gather(*ew._dispatchers.values(), return_exceptions=True)
+    ew._dispatchers.clear()
+    ew.set_cache_service(None)
+    await broadcaster._events.close()
+    for socket in list(broadcaster._clients):
+        await broadcaster.disconnect(socket)
+
+    latencies.sort()
+    return (latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000,
+            response_wait * 1000, bus_p99)
+
+
+async def _noop():
+    pass
+
+
+async def run_benchmark() -> List[Tuple]:
+    rows = []
+    backends: List[Tuple[str, Optional[Any]]] = [("memory", None)]
+    if _redis_cache() is not None:
+        backends.append(("redis", _redis_cache))
+    for backend, make_cache in backends:
+        for name, inline in (("inline", True), ("event bus", False)):
+            p50, p99, response, hist_p99 = await _run(make_cache() if make_cache else None, inline)
+            rows.append((backend, name, p50, p99, response, hist_p99))
+    print_table("burst of %d WhatsApp messages (%d KB), %d tabs, RPC response mid-burst"
+                % (BURST, PAYLOAD // 1024, TABS),
+                ["backend", "path", "trigger p50 ms", "trigger p99 ms", "rpc response ms",
+                 "histogram p99 ms"], rows)
+    return rows
+
+
+async def test_event_bus_keeps_rpc_responses_ahead_of_event_handling():
+    # Memory-mode dispatch is synchronous, so only the Redis path has awaits to overlap
+    pytest.importorskip("fakeredis")
+    rows = {(r[0], r[1]): r for r in await run_benchmark()}
+    assert rows[("redis", "event bus")][4] < rows[("redis", "inline")][4] / 2
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,87 @@
+"""Gmail poller cycles: list-and-diff vs incremental history sync.
+
+Runs both pollers against the local stand-in Gmail API
+(``tests/triggers/_gmail.py``), where every HTTP request takes LATENCY
+seconds; a batch request counts as one request. The mailbox starts with
+INBOX_SIZE unread messages. "list" replays the old deployment poller:
+``messages.list`` (20 results) every cycle, diff against the seen set, one
+``messages.get`` per new ID in turn. "history" is ``GmailHistorySync`` with
+GMAIL_FETCH_CONCURRENCY services. Reported per scenario: API requests, cycle
+time and how many new emails were delivered.
+"""
+
+import asyncio
+import time
+from typing import List, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+LATENCY = 0.02
+INBOX_SIZE = 500
+SCENARIOS = (("quiet", 0), ("5 new", 5), ("burst of 200", 200))
+QUERY = "label:INBOX is:unread"
+
+
+async def _list_cycle(services, seen: set) -> list:
+    from services.handlers.gmail import _fetch_email_details, _poll_gmail_ids
+
+    current = await _poll_gmail_ids(services[0], QUERY)
+    emails = []
+    for message_id in current - seen:
+        seen.add(message_id)
+        emails.append(await _fetch_email_details(services[0], message_id))
+    return emails
+
+
+async def _run(mode: str, new: int) -> Tuple[int, float, int]:
+    from services.handlers.gmail import GMAIL_FETCH_CONCURRENCY, GmailHistorySync
+    from tests.triggers._gmail import FakeGmailService, FakeMailbox
+
+    mailbox = FakeMailbox(latency=LATENCY)
+    for n in range(INBOX_SIZE):
+        mailbox.deliver(f"old {n}")
+    services = [FakeGmailService(mailbox) for _ in range(GMAIL_FETCH_CONCURRENCY)]
+
+    if mode == "list":
+        from services.handlers.gmail import _poll_gmail_ids
+        seen = await _poll_gmail_ids(services[0], QUERY)
+        cycle = lambda: _list_cycle(services, seen)
+    else:
+        sync = GmailHistorySync(services, QUERY, "INBOX")
+        await sync.start()
+        cycle = sync.poll
+
+    for n in range(new):
+        mailbox.deliver(f"new {n}")
+    mailbox.calls.clear()
+    start = time.perf_counter()
+    emails = await cycle()
+    return mailbox.total_calls(), (time.perf_counter() - start) * 1000, len(emails)
+
+
+async def run_benchmark() -> List[Tuple]:
+    rows = []
+    for scenario, new in SCENARIOS:
+        for mode in ("list", "history"):
+            requests, ms, delivered = await _run(mode, new)
+            rows.append((scenario, mode, requests, ms, f"{delivered}/{new}"))
+    print_table("one poll cycle, %d unread in INBOX, %d ms per request" % (INBOX_SIZE, LATENCY * 1000),
+                ["scenario", "poller", "API requests", "cycle ms", "delivered"], rows)
+    return rows
+
+
+async def test_history_sync_cuts_requests_and_delivers_bursts():
+    rows = {(r[0], r[1]): r for r in await run_benchmark()}
+    burst_list, burst_history = rows[("burst of 200", "list")], rows[("burst of 200", "history")]
+    assert burst_history[4] == "200/200"
+    assert burst_history[2] < burst_list[2]
+    assert burst_history[3] < burst_list[3]
+    assert rows[("quiet", "history")][2] == 1
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
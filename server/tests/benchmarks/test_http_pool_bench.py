@@ -0,0 +1,171 @@
+"""httpScraper / fileDownloader throughput against a local aiohttp server.
+
+The server adds ``LATENCY_MS`` to every response to stand in for a remote
+host, and serves ``FILES`` files of ``FILE_KB`` with ETag support.
+
+- Scraper: ``PAGES`` paginated pages fetched one at a time (the previous
+  behaviour; ``maxConcurrency=1``) vs ``maxConcurrency=8``.
+- Downloader: "client per file" reproduces the previous handler (a new
+  ``httpx.AsyncClient`` per file and ``write_bytes(response.content)``);
+  "pooled" is ``handle_file_downloader``, which streams each body to disk
+  over the shared client. "revalidate" re-runs it with ``revalidate=True``,
+  where every file comes back 304.
+
+The server counts new TCP connections, which is where pooling shows up over
+loopback (real hosts add DNS and TLS setup on top).
+"""
+
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+from aiohttp import web
+
+from tests.benchmarks._report import print_table, stopwatch
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+PAGES = 40
+FILES = 64
+FILE_KB = 512
+LATENCY_MS = 10
+
+
+class _Server:
+    def __init__(self):
+        self.body = bytes(range(256)) * (FILE_KB * 4)
+        self.etag = '"%s"' % hashlib.md5(self.body).hexdigest()
+        self.connections = 0
+        self.not_modified = 0
+        self.runner = None
+        self.base = ""
+
+    @web.middleware
+    async def count_connections(self, request, handler):
+        # First request served on a keep-alive connection
+        if request.protocol._request_count == 1:
+            self.connections += 1
+        return await handler(request)
+
+    async def page(self, request):
+        await asyncio.sleep(LATENCY_MS / 1000)
+        n = request.match_info["n"]
+        links = "".join(f'<a href="/file/{n}-{i}.bin">f{i}</a>' for i in range(5))
+        return web.Response(text=f"<html><body>{links}</body></html>", content_type="text/html")
+
+    async def file(self, request):
+        await asyncio.sleep(LATENCY_MS / 1000)
+        if request.headers.get("If-None-Match") == self.etag:
+            self.not_modified += 1
+            return web.Response(status=304)
+        return web.Response(body=self.body, headers={"ETag": self.etag})
+
+    async def start(self):
+        app = web.Application(middlewares=[self.count_connections])
+        app.router.add_get("/page/{n}", self.page)
+        app.router.add_get("/file/{name}", self.file)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+async def _scrape(server: _Server, concurrency: int) -> Tuple[float, int]:
+    from services.handlers.document import handle_http_scraper
+
+    params = {"url": f"{server.base}/page/{{page}}", "iterationMode": "page", "startPage": 1,
+              "endPage": PAGES, "linkSelector": "a", "maxConcurrency": concurrency}
+    with stopwatch() as elapsed:
+        result = await handle_http_scraper("scraper", "httpScraper", params, {})
+    assert result["success"] and not result["result"]["errors"], result
+    return elapsed[0], result["result"]["item_count"]
+
+
+async def _download_per_client(server: _Server, urls: List[str], out: Path) -> float:
+    import httpx
+
+    semaphore = asyncio.Semaphore(8)
+
+    async def fetch(url: str):
+        async with semaphore:
+            async with httpx.AsyncClient(timeout=60, follow_redirects=True) as client:
+                response = await client.get(url)
+                response.raise_for_status()
+                (out / url.rsplit("/", 1)[1]).write_bytes(response.content)
+
+    out.mkdir()
+    with stopwatch() as elapsed:
+        await asyncio.gather(*[fetch(u) for u in urls])
+    return elapsed[0]
+
+
+async def _download_pooled(urls: List[str], out: Path, **params) -> Tuple[float, dict]:
+    from services.handlers.document import handle_file_downloader
+
+    with stopwatch() as elapsed:
+        result = await handle_file_downloader("downloader", "fileDownloader",
+                                              {"items": urls, "outputDir": str(out), **params}, {})
+    assert result["success"] and not result["result"]["failed"], result
+    return elapsed[0], result["result"]
+
+
+async def run_benchmark(tmp: Path) -> List[Tuple]:
+    from services.http_pool import close_http_clients
+
+    server = _Server()
+    await server.start()
+    rows = []
+    try:
+        for label, concurrency in (("scraper, sequential", 1), ("scraper, maxConcurrency=8", 8)):
+            before = server.connections
+            seconds, count = await _scrape(server, concurrency)
+            rows.append((label, seconds * 1000, PAGES / seconds, server.connections - before, count))
+
+        urls = [f"{server.base}/file/{i}.bin" for i in range(FILES)]
+        mb = FILES * FILE_KB / 1024
+
+        before = server.connections
+        seconds = await _download_per_client(server, urls, tmp / "per_client")
+        rows.append(("download, client per file", seconds * 1000, mb / seconds,
+                     server.connections - before, FILES))
+
+        before = server.connections
+        seconds, result = await _download_pooled(urls, tmp / "pooled")
+        rows.append(("download, pooled+streamed", seconds * 1000, mb / seconds,
+                     server.connections - before, result["downloaded"]))
+
+        before = server.connections
+        seconds, result = await _download_pooled(urls, tmp / "pooled", revalidate=True)
+        rows.append(("download, revalidate (304)", seconds * 1000, FILES / seconds,
+                     server.connections - before, result["skipped"]))
+        assert server.not_modified == FILES
+    finally:
+        await close_http_clients()
+        await server.stop()
+
+    print_table(f"{PAGES} pages / {FILES} x {FILE_KB}KB files, {LATENCY_MS}ms server latency",
+                ["case", "total ms", "pages|MB|files per s", "new conns", "items"], rows)
+    return rows
+
+
+async def test_pooled_concurrent_http_throughput(tmp_path):
+    rows = await run_benchmark(tmp_path)
+    scrape_seq, scrape_conc, per_client, pooled, revalidated = rows
+    assert scrape_conc[4] == scrape_seq[4] == PAGES * 5
+    assert scrape_conc[1] < scrape_seq[1] / 3
+    assert pooled[3] < per_client[3]
+    assert revalidated[4] == FILES and revalidated[3] < FILES
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as d:
+        asyncio.run(run_benchmark(Path(d)))
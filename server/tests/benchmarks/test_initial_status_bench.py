@@ -0,0 +1,74 @@
+"""Reconnect payload of the status broadcaster after a long-running session.
+
+200 workflows x 50 nodes have run, each node reporting a ~2 KB status result
+and a ~20 KB output. "flat dict" is the old ``_status["nodes"]``: every node
+ever seen, outputs inline, all of it in ``initial_status``. "table" is the
+current broadcaster: a lean ``initial_status``, then a snapshot of the one
+workflow the tab shows, then (on a later reconnect) only the delta since the
+tab's cursor.
+"""
+
+import asyncio
+from typing import List, Tuple
+
+import orjson
+import pytest
+
+from tests.benchmarks._report import print_table
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+WORKFLOWS = 200
+NODES = 50
+
+
+def _result(n: int):
+    return {"text": "r" * 2000, "n": n}
+
+
+def _output(n: int):
+    return {"rows": [{"id": i, "value": "v" * 16} for i in range(500)], "n": n}
+
+
+def _kb(value) -> float:
+    return len(orjson.dumps(value)) / 1024
+
+
+async def run_benchmark() -> List[Tuple]:
+    from services.status_broadcaster import StatusBroadcaster
+
+    flat = {}
+    broadcaster = StatusBroadcaster()
+    for w in range(WORKFLOWS):
+        for n in range(NODES):
+            node_id, workflow_id = f"w{w}n{n}", f"wf{w}"
+            flat[node_id] = {"status": "success", "data": _result(n), "timestamp": 0.0,
+                             "workflow_id": workflow_id, "output": _output(n)}
+            await broadcaster.update_node_status(node_id, "success", _result(n), workflow_id=workflow_id)
+            await broadcaster.update_node_output(node_id, _output(n), workflow_id=workflow_id)
+
+    legacy_status = {**broadcaster.get_status(), "nodes": flat}
+    lean_status = {**broadcaster.get_status(), "node_status_version": broadcaster.get_node_snapshot(None)["version"]}
+    shown = WORKFLOWS - 1
+    snapshot = broadcaster.get_node_snapshot(f"wf{shown}")
+    for n in range(3):
+        await broadcaster.update_node_status(f"w{shown}n{n}", "executing", workflow_id=f"wf{shown}")
+    delta = broadcaster.get_node_snapshot(f"wf{shown}", since=snapshot["version"])
+
+    stats = broadcaster.get_node_table_stats()
+    rows = [
+        ("flat dict", len(flat), _kb(legacy_status), "-", "-"),
+        ("table", stats["nodes"], _kb(lean_status), _kb(snapshot), _kb(delta)),
+    ]
+    print_table("reconnect payload after %d workflows x %d nodes" % (WORKFLOWS, NODES),
+                ["node statuses", "nodes retained", "initial_status KB", "snapshot KB", "delta KB"], rows)
+    return rows
+
+
+async def test_reconnect_payload_is_bounded():
+    rows = await run_benchmark()
+    assert rows[1][2] * 100 < rows[0][2]
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
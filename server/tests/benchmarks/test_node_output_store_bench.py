@@ -0,0 +1,81 @@
+"""Node output persistence throughput (nodes/sec) on the SQLite backend.
+
+Replays a run that stores one output per completed node against a real
+``core.database.Database`` on a temp SQLite file. "per-handle" is the old
+behaviour: ``save_node_output`` for output_main, output_top and output_0,
+each a SELECT + UPSERT in its own session and commit. "buffered" stores one
+row per node through ``NodeOutputBuffer`` and commits once when the run ends.
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table, stopwatch
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+NODE_COUNTS = (50, 200, 1000)
+OUTPUT = {"text": "x" * 1000, "items": list(range(20))}
+
+
+async def _database(path: Path):
+    pytest.importorskip("aiosqlite")
+    from core.database import Database
+
+    settings = SimpleNamespace(database_url=f"sqlite+aiosqlite:///{path}", database_echo=False,
+                               database_pool_size=5, database_max_overflow=10)
+    database = Database(settings)
+    await database.startup()
+    return database
+
+
+async def _per_handle(database, count: int) -> None:
+    for i in range(count):
+        for name in ("output_main", "output_top", "output_0"):
+            await database.save_node_output(f"n{i}", "bench", name, OUTPUT)
+
+
+async def _buffered(database, count: int) -> None:
+    from services.node_outputs import NodeOutputBuffer
+
+    buffer = NodeOutputBuffer(database)
+    for i in range(count):
+        buffer.put("bench", f"n{i}", "output_main", OUTPUT)
+        await asyncio.sleep(0)  # let size-triggered flushes run, as between nodes
+    await buffer.flush("bench")
+
+
+async def _replay(count: int, store) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        database = await _database(Path(tmp) / "bench.db")
+        try:
+            with stopwatch() as elapsed:
+                await store(database, count)
+        finally:
+            await database.shutdown()
+    return elapsed[0]
+
+
+async def run_benchmark() -> List[Tuple]:
+    rows = []
+    for count in NODE_COUNTS:
+        old = await _replay(count, _per_handle)
+        new = await _replay(count, _buffered)
+        rows.append((count, count / old, count / new, old / new))
+    print_table("node output persistence, SQLite",
+                ["nodes", "per-handle nodes/s", "buffered nodes/s", "speedup"], rows)
+    return rows
+
+
+async def test_buffered_store_beats_per_handle_writes():
+    rows = await run_benchmark()
+    assert rows[-1][2] > rows[-1][1]
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
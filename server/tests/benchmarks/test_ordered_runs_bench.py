@@ -0,0 +1,100 @@
+"""Multi-conversation trigger load: sequential vs unordered vs keyed runs.
+
+A bot trigger receives MESSAGES messages from each of CHATS chats, round
+robin. Runs of one chat take SLOW_RUN seconds (a long agent run), all others
+FAST_RUN. "sequential" awaits each run before taking the next event, the
+behaviour the request describes. "unordered" admits every run at once with
+no ordering key. "keyed" submits each run with its chat id as ordering key,
+which is what deployed WhatsApp/Telegram/chat triggers do now. Reported per
+mode:
+- total wall time;
+- median latency of the fast chats' messages (all messages arrive at once);
+- messages that started before an earlier message of the same chat finished.
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table, stopwatch
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+CHATS = 20
+MESSAGES = 5
+SLOW_RUN = 0.2
+FAST_RUN = 0.01
+
+
+class _Recorder:
+    def __init__(self):
+        self.latency: Dict[str, List[float]] = {}
+        self.finished: Dict[str, int] = {}
+        self.out_of_order = 0
+
+    async def run(self, chat: str, seq: int, arrived: float) -> None:
+        if self.finished.get(chat, -1) != seq - 1:
+            self.out_of_order += 1
+        await asyncio.sleep(SLOW_RUN if chat == "chat-0" else FAST_RUN)
+        self.finished[chat] = max(self.finished.get(chat, -1), seq)
+        self.latency.setdefault(chat, []).append(time.perf_counter() - arrived)
+
+
+def _events() -> List[Tuple[str, int]]:
+    return [(f"chat-{c}", seq) for seq in range(MESSAGES) for c in range(CHATS)]
+
+
+async def _sequential(recorder: _Recorder) -> None:
+    arrived = time.perf_counter()
+    for chat, seq in _events():
+        await recorder.run(chat, seq, arrived)
+
+
+async def _admitted(recorder: _Recorder, keyed: bool) -> None:
+    from services.deployment.admission import RunAdmissionQueue
+
+    tasks: List[asyncio.Task] = []
+
+    def start_run(run) -> asyncio.Task:
+        data = run.trigger_data
+        task = asyncio.ensure_future(recorder.run(data["chat"], data["seq"], arrived))
+        tasks.append(task)
+        return task
+
+    arrived = time.perf_counter()
+    queue = RunAdmissionQueue("bench", start_run=start_run, concurrency=100, max_depth=1000)
+    for chat, seq in _events():
+        key: Optional[str] = chat if keyed else None
+        await queue.submit("trigger", {"chat": chat, "seq": seq}, ordering_key=key)
+    while queue.depth or queue.running:
+        await asyncio.sleep(0.005)
+    await asyncio.gather(*tasks)
+
+
+async def run_benchmark() -> List[Tuple]:
+    rows = []
+    for mode, fire in (("sequential", _sequential),
+                       ("unordered", lambda r: _admitted(r, keyed=False)),
+                       ("keyed", lambda r: _admitted(r, keyed=True))):
+        recorder = _Recorder()
+        with stopwatch() as elapsed:
+            await fire(recorder)
+        fast = sorted(s for chat, samples in recorder.latency.items() if chat != "chat-0" for s in samples)
+        rows.append((mode, elapsed[0], fast[len(fast) // 2] * 1000, recorder.out_of_order))
+    print_table("%d chats x %d messages, one chat %.1fs per run, others %.2fs"
+                % (CHATS, MESSAGES, SLOW_RUN, FAST_RUN),
+                ["mode", "total s", "fast chat p50 ms", "out of order"], rows)
+    return rows
+
+
+async def test_keyed_runs_overlap_chats_and_keep_each_in_order():
+    rows = {row[0]: row for row in await run_benchmark()}
+    assert rows["keyed"][3] == 0
+    assert rows["keyed"][1] < rows["sequential"][1] / 1.5
+    assert rows["keyed"][2] < rows["sequential"][2] / 10
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
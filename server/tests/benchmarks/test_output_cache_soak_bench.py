@@ -0,0 +1,85 @@
+"""Soak: in-memory node output footprint over 100k deployment runs.
+
+Each run stores a trigger output plus RUN_NODES node outputs under its own
+``{session}_{run_id}`` session, the way deployment runs do. "unbounded" is
+the old plain dict keyed ``{session}_{node}``; "released" is NodeOutputCache
+with the session evicted when the run ends; "bounded" is NodeOutputCache
+without releases, held flat by its session bound alone.
+"""
+
+import gc
+import tracemalloc
+from typing import Dict, List, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table, stopwatch
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+RUNS = 100_000
+RUN_NODES = 5
+CHECKPOINTS = (10_000, 50_000, 100_000)
+OUTPUT = {"text": "x" * 200, "items": list(range(10))}
+
+
+def _unbounded(outputs: Dict, session_id: str) -> None:
+    for node in range(RUN_NODES + 1):
+        outputs.setdefault(f"{session_id}_n{node}", {})["output_main"] = dict(OUTPUT)
+
+
+def _soak(mode: str) -> List[Tuple]:
+    from services.node_outputs import NodeOutputCache
+
+    cache = NodeOutputCache(max_sessions=1000) if mode != "unbounded" else None
+    plain: Dict = {}
+    rows = []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        with stopwatch() as elapsed:
+            for run in range(1, RUNS + 1):
+                session_id = f"default_run_{run}"
+                if cache is None:
+                    _unbounded(plain, session_id)
+                else:
+                    for node in range(RUN_NODES + 1):
+                        cache.put(session_id, f"n{node}", "output_main", dict(OUTPUT))
+                    if mode == "released":
+                        cache.evict_session(session_id)
+                if run in CHECKPOINTS:
+                    current, _ = tracemalloc.get_traced_memory()
+                    held = len(plain) if cache is None else cache.stats()["outputs"]
+                    rows.append((mode, run, held, current / 1024 / 1024))
+    finally:
+        tracemalloc.stop()
+    rows[-1] += (elapsed[0],)
+    return rows
+
+
+def run_benchmark() -> List[Tuple]:
+    rows = []
+    for mode in ("unbounded", "released", "bounded"):
+        rows.extend(_soak(mode))
+    rows = [r if len(r) == 5 else r + ("",) for r in rows]
+    print_table("node output memory over %d runs" % RUNS,
+                ["mode", "runs", "outputs held", "traced MB", "total s"], rows)
+    return rows
+
+
+def test_output_memory_stays_flat_over_100k_runs():
+    rows = run_benchmark()
+    by_mode = {}
+    for mode, runs, held, mb, _ in rows:
+        by_mode.setdefault(mode, []).append((held, mb))
+
+    for mode in ("released", "bounded"):
+        first, last = by_mode[mode][0], by_mode[mode][-1]
+        assert last[0] == first[0]
+        assert last[1] < first[1] * 1.5 + 1
+    # The old dict grows linearly with the run count
+    assert by_mode["unbounded"][-1][0] == RUNS * (RUN_NODES + 1)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,164 @@
+"""Trigger-to-first-node latency of deployment runs on a 200-node workflow.
+
+Measures from the trigger event to the node executor's first call. "per-event"
+replays the old ``_execute_from_trigger`` path: a recursive edge scan for the
+downstream set, a copy and filter of every node and edge, then
+``execute_workflow`` compiling its own graph and layers. "run plan" compiles
+the trigger's RunPlan once (as ``deploy`` does) and per event only
+instantiates it and forks the precompiled graph.
+"""
+
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from constants import AI_AGENT_TYPES, WORKFLOW_TRIGGER_TYPES
+from tests.benchmarks._report import print_table
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+SIZE = 200
+EVENTS = 20
+
+
+def build_workflow(size: int, seed: int = 7) -> Tuple[List[Dict], List[Dict]]:
+    """A webhook trigger feeding a random DAG, with a model config node on every 10th agent."""
+    rng = random.Random(seed)
+    nodes = [{"id": "n0", "type": "webhookTrigger", "parameters": {}}]
+    edges = []
+    for i in range(1, size):
+        node_type = "aiAgent" if i % 10 == 0 else "httpRequest"
+        nodes.append({"id": f"n{i}", "type": node_type, "parameters": {}})
+        for j in sorted(set(rng.randrange(i) for _ in range(2))):
+            edges.append({"id": f"e{j}-{i}", "source": f"n{j}", "target": f"n{i}"})
+        if node_type == "aiAgent":
+            nodes.append({"id": f"m{i}", "type": "openaiChatModel", "parameters": {}})
+            edges.append({"id": f"m{i}", "source": f"m{i}", "target": f"n{i}",
+                          "targetHandle": "input-model"})
+    return nodes, edges
+
+
+def _legacy_downstream(node_id: str, nodes: List[Dict], edges: List[Dict]) -> List[Dict]:
+    """The pre-plan ``DeploymentManager._get_downstream_nodes``."""
+    downstream_ids = set()
+    node_types = {n['id']: n.get('type', '') for n in nodes}
+
+    def collect(current_id: str):
+        for edge in edges:
+            if edge.get('source') != current_id:
+                continue
+            target_id = edge.get('target')
+            if not target_id or target_id in downstream_ids:
+                continue
+            if node_types.get(target_id, '') in WORKFLOW_TRIGGER_TYPES:
+                continue
+            downstream_ids.add(target_id)
+            collect(target_id)
+
+    collect(node_id)
+
+    for edge in edges:
+        target, source = edge.get('target'), edge.get('source')
+        handle = edge.get('targetHandle', '')
+        is_config = handle and handle.startswith('input-') and handle != 'input-main'
+        if is_config and target in downstream_ids and source not in downstream_ids:
+            if node_types.get(source, '') not in WORKFLOW_TRIGGER_TYPES:
+                downstream_ids.add(source)
+
+    toolkit_ids = {n['id'] for n in nodes if n.get('type') == 'androidTool' and n['id'] in downstream_ids}
+    for edge in edges:
+        if edge.get('target') in toolkit_ids and edge.get('source') not in downstream_ids:
+            downstream_ids.add(edge.get('source'))
+
+    agent_ids = {n['id'] for n in nodes if n.get('type') in AI_AGENT_TYPES and n['id'] in downstream_ids}
+    for edge in edges:
+        if (edge.get('target') in agent_ids and edge.get('targetHandle', '') == 'input-tools'
+                and edge.get('source') not in downstream_ids):
+            downstream_ids.add(edge.get('source'))
+
+    return [n for n in nodes if n['id'] in downstream_ids]
+
+
+def _legacy_run_graph(trigger_id: str, nodes: List[Dict], edges: List[Dict],
+                      trigger_output: Any) -> Tuple[List[Dict], List[Dict]]:
+    downstream = _legacy_downstream(trigger_id, nodes, edges)
+    run_filter = {trigger_id} | {n['id'] for n in downstream}
+    run_nodes = []
+    for node in nodes:
+        if node['id'] not in run_filter:
+            continue
+        node_copy = node.copy()
+        if node['id'] == trigger_id:
+            node_copy['_pre_executed'] = True
+            node_copy['_trigger_output'] = trigger_output
+        elif node.get('type', '') in WORKFLOW_TRIGGER_TYPES:
+            node_copy['_pre_executed'] = True
+            node_copy['_trigger_output'] = {'not_triggered': True}
+        run_nodes.append(node_copy)
+    run_edges = [e for e in edges if e.get('source') in run_filter and e.get('target') in run_filter]
+    return run_nodes, run_edges
+
+
+def _executor(first_call: List[float]):
+    from core.cache import CacheService
+    from services.execution import ExecutionCache, WorkflowExecutor
+
+    async def node_executor(node_id: str, node_type: str, params: Dict[str, Any],
+                            context: Dict[str, Any]) -> Dict[str, Any]:
+        if not first_call:
+            first_call.append(time.perf_counter())
+        return {"success": True, "result": {"node_id": node_id}}
+
+    settings = SimpleNamespace(redis_enabled=False, redis_url=None, cache_ttl=3600)
+    return WorkflowExecutor(cache=ExecutionCache(CacheService(settings)), node_executor=node_executor)
+
+
+async def _latency(fire) -> float:
+    """Median trigger-to-first-node latency over EVENTS events, in ms."""
+    samples = []
+    for n in range(EVENTS):
+        first_call: List[float] = []
+        executor = _executor(first_call)
+        start = time.perf_counter()
+        result = await fire(executor, {"event": n})
+        assert result["success"], result.get("errors")
+        samples.append((first_call[0] - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+async def run_benchmark() -> List[Tuple]:
+    from services.deployment import compile_run_plan
+
+    nodes, edges = build_workflow(SIZE)
+
+    async def per_event(executor, trigger_output):
+        run_nodes, run_edges = _legacy_run_graph("n0", nodes, edges, trigger_output)
+        return await executor.execute_workflow("bench", run_nodes, run_edges, enable_caching=False)
+
+    plan = compile_run_plan("n0", nodes, edges)
+
+    async def planned(executor, trigger_output):
+        run_nodes, run_edges = plan.instantiate(trigger_output)
+        return await executor.execute_workflow("bench", run_nodes, run_edges, enable_caching=False,
+                                               graph=plan.graph)
+
+    old = await _latency(per_event)
+    new = await _latency(planned)
+    rows = [(len(nodes), len(edges), old, new, old / new)]
+    print_table("trigger -> first node latency, median of %d events" % EVENTS,
+                ["nodes", "edges", "per-event ms", "run plan ms", "speedup"], rows)
+    return rows
+
+
+async def test_run_plan_cuts_trigger_latency():
+    rows = await run_benchmark()
+    assert rows[0][3] < rows[0][2]
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
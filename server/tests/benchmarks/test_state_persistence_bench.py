@@ -0,0 +1,86 @@
+"""Execution state save cost versus node count and output size.
+
+Replays a run in which nodes complete one at a time and the state is saved
+after every completion (as continuous scheduling does), against fakeredis.
+"full" re-serializes ``ExecutionContext.to_dict()`` into the state hash on
+every save (the pre-incremental behaviour); "delta" is
+``ExecutionCache.save_execution_state``.
+"""
+
+import asyncio
+import json
+from typing import List, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table, stopwatch
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+NODE_COUNTS = (10, 100, 500)
+OUTPUT_BYTES = (100, 10_000)
+
+
+def _cache():
+    fakeredis = pytest.importorskip("fakeredis")
+    from types import SimpleNamespace
+    from core.cache import CacheService
+    from services.execution import ExecutionCache
+
+    service = CacheService(SimpleNamespace(redis_enabled=True, redis_url=None, cache_ttl=3600))
+    service.use_redis = True
+    service.redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    return ExecutionCache(service)
+
+
+def _context(count: int):
+    from services.execution import ExecutionContext, WorkflowStatus
+
+    nodes = [{"id": f"n{i}", "type": "httpRequest"} for i in range(count)]
+    ctx = ExecutionContext.create("bench", nodes=nodes, edges=[])
+    ctx.status = WorkflowStatus.RUNNING
+    return ctx
+
+
+async def _full_save(cache, ctx) -> None:
+    mapping = {
+        k: json.dumps(v) if isinstance(v, (dict, list)) else str(v)
+        for k, v in ctx.to_dict().items()
+    }
+    await cache.cache.redis.hset(f"execution:{ctx.execution_id}:state", mapping=mapping)
+
+
+async def _replay(count: int, size: int, save) -> float:
+    from services.execution import TaskStatus
+
+    cache = _cache()
+    ctx = _context(count)
+    with stopwatch() as elapsed:
+        for node_id, node in ctx.node_executions.items():
+            node.status = TaskStatus.COMPLETED
+            node.output = {"text": "x" * size}
+            ctx.outputs[node_id] = node.output
+            await save(cache, ctx)
+    return elapsed[0]
+
+
+async def run_benchmark() -> List[Tuple]:
+    rows = []
+    for size in OUTPUT_BYTES:
+        for count in NODE_COUNTS:
+            full = await _replay(count, size, _full_save)
+            delta = await _replay(count, size, lambda c, x: c.save_execution_state(x))
+            rows.append((count, size, full * 1000, delta * 1000, full / delta))
+    print_table("save_execution_state after every completion (fakeredis)",
+                ["nodes", "output B", "full ms", "delta ms", "speedup"], rows)
+    return rows
+
+
+async def test_delta_saves_scale_linearly():
+    rows = await run_benchmark()
+    # Largest case: full rewrites are quadratic, delta saves are not
+    assert rows[-1][3] < rows[-1][2]
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,129 @@
+"""Token accounting overhead per agent iteration.
+
+Runs AGENTS concurrent agent loops against a stub LLM that answers at once
+with a fixed usage block, so all measured time is accounting. The database
+stand-in serializes calls behind one lock and charges ROUND_TRIP seconds
+each, like commits on the single SQLite writer. "per call" replays the old
+``CompactionService.track`` path (save metric, read state, write state: three
+round trips per iteration); "write-behind" goes through
+TokenUsageAccumulator and pays for its batched flushes, including the final
+one on close.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+AGENTS = 20
+ITERATIONS = 50
+ROUND_TRIP = 0.001
+USAGE = {"input_tokens": 1200, "output_tokens": 300, "total_tokens": 1500}
+
+
+class _SlowDatabase:
+    """Counts round trips; each one holds the writer lock for ROUND_TRIP."""
+
+    def __init__(self):
+        self.round_trips = 0
+        self.metrics = 0
+        self._lock = asyncio.Lock()
+        self._states: Dict[str, Dict[str, Any]] = {}
+
+    async def _round_trip(self) -> None:
+        async with self._lock:
+            self.round_trips += 1
+            await asyncio.sleep(ROUND_TRIP)
+
+    async def save_token_metric(self, metric: Dict[str, Any]) -> bool:
+        await self._round_trip()
+        self.metrics += 1
+        return True
+
+    async def get_or_create_session_token_state(self, session_id: str) -> Dict[str, Any]:
+        from services.token_usage import default_session_state
+
+        await self._round_trip()
+        return dict(self._states.setdefault(session_id, default_session_state(session_id)))
+
+    async def update_session_token_state(self, session_id: str, updates: Dict[str, Any]) -> bool:
+        await self._round_trip()
+        self._states[session_id].update(updates)
+        return True
+
+    async def save_token_usage(self, metrics: List[Dict[str, Any]], states: Dict[str, Dict[str, Any]]) -> bool:
+        await self._round_trip()
+        self.metrics += len(metrics)
+        for session_id, state in states.items():
+            self._states[session_id] = dict(state)
+        return True
+
+
+async def _llm() -> Dict[str, int]:
+    await asyncio.sleep(0)
+    return USAGE
+
+
+async def _per_call(db: _SlowDatabase, session_id: str) -> None:
+    usage = await _llm()
+    await db.save_token_metric({"session_id": session_id, **usage})
+    state = await db.get_or_create_session_token_state(session_id)
+    await db.update_session_token_state(session_id, {
+        "cumulative_total": state["cumulative_total"] + usage["total_tokens"],
+    })
+
+
+def _write_behind(usage_acc):
+    async def iteration(db: _SlowDatabase, session_id: str) -> None:
+        usage = await _llm()
+        await usage_acc.add(session_id, dict(usage), {"cumulative_total": usage["total_tokens"]})
+    return iteration
+
+
+async def _run(iteration, db: _SlowDatabase, close=None) -> float:
+    """Mean wall time per agent iteration, in ms."""
+    async def agent(n: int) -> None:
+        for _ in range(ITERATIONS):
+            await iteration(db, f"session-{n}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(agent(n) for n in range(AGENTS)))
+    if close is not None:
+        await close()
+    return (time.perf_counter() - start) * 1000 / ITERATIONS
+
+
+async def run_benchmark() -> List[Tuple]:
+    from services.token_usage import TokenUsageAccumulator
+
+    rows = []
+    legacy_db = _SlowDatabase()
+    legacy_ms = await _run(_per_call, legacy_db)
+    rows.append(("per call", legacy_db.round_trips, legacy_db.metrics, legacy_ms))
+
+    db = _SlowDatabase()
+    acc = TokenUsageAccumulator(db)
+    new_ms = await _run(_write_behind(acc), db, close=acc.close)
+    rows.append(("write-behind", db.round_trips, db.metrics, new_ms))
+    assert db.metrics == AGENTS * ITERATIONS
+    assert db._states["session-0"]["cumulative_total"] == ITERATIONS * USAGE["total_tokens"]
+
+    print_table("token accounting, %d agents x %d iterations, %.0f ms per DB round trip"
+                % (AGENTS, ITERATIONS, ROUND_TRIP * 1000),
+                ["path", "DB round trips", "metrics saved", "ms per iteration"], rows)
+    return rows
+
+
+async def test_write_behind_cuts_iteration_overhead():
+    rows = await run_benchmark()
+    assert rows[1][1] < rows[0][1] / 10
+    assert rows[1][3] < rows[0][3]
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,116 @@
+"""In-memory trigger matching: 10k WhatsApp messages against 1k waiters.
+
+Waiters are a realistic mix of contact, group and keyword filters. "scan"
+evaluates every waiter's filter per message (the pre-index behaviour);
+"indexed" is ``event_waiter.dispatch``, which only runs the filters of the
+candidates its EventBucket returns. Resolved waiters are re-registered so the
+waiter count stays constant.
+"""
+
+import asyncio
+import random
+from typing import Dict, List, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table, stopwatch
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+WAITERS = 1000
+MESSAGES = 10_000
+EVENT_TYPE = "whatsapp_message_received"
+WORDS = ["order", "invoice", "refund", "hello", "status", "delivery", "price", "support"]
+
+
+def _waiter_params(rng: random.Random) -> List[Dict]:
+    params = []
+    for i in range(WAITERS):
+        kind = i % 10
+        if kind < 5:
+            params.append({"filter": "contact", "contactPhone": f"9198{i:06d}"})
+        elif kind < 8:
+            params.append({"filter": "group", "group_id": f"1203{i:06d}@g.us"})
+        else:
+            params.append({"filter": "keywords", "keywords": f"{rng.choice(WORDS)}{i}"})
+    return params
+
+
+def _messages(rng: random.Random) -> List[Dict]:
+    messages = []
+    for _ in range(MESSAGES):
+        i = rng.randrange(WAITERS * 2)  # About half the messages match a waiter
+        text = " ".join(rng.choice(WORDS) for _ in range(8)) + f" {rng.choice(WORDS)}{i}"
+        if i % 10 in (5, 6, 7):
+            messages.append({"chat_id": f"1203{i:06d}@g.us", "is_group": True, "text": text,
+                             "group_info": {"sender_phone": f"9198{rng.randrange(10**6):06d}"},
+                             "message_type": "text", "is_from_me": False})
+        else:
+            messages.append({"chat_id": f"9198{i:06d}@s.whatsapp.net", "sender_phone": f"9198{i:06d}",
+                             "text": text, "message_type": "text", "is_from_me": False})
+    return messages
+
+
+async def _indexed(params: List[Dict], messages: List[Dict]) -> Tuple[float, int]:
+    from services import event_waiter
+
+    event_waiter.set_cache_service(None)
+    done: List[int] = []
+
+    async def register(i: int) -> None:
+        w = await event_waiter.register("whatsappReceive", f"n{i}", params[i])
+        w.future.add_done_callback(lambda _f: done.append(i))
+
+    for i in range(len(params)):
+        await register(i)
+    resolved = 0
+    try:
+        with stopwatch() as elapsed:
+            for msg in messages:
+                count = event_waiter.dispatch(EVENT_TYPE, msg)
+                if count:
+                    resolved += count
+                    await asyncio.sleep(0)  # Run done callbacks
+                    while done:
+                        await register(done.pop())
+        return elapsed[0], resolved
+    finally:
+        event_waiter.clear_all()
+
+
+def _scan(params: List[Dict], messages: List[Dict]) -> Tuple[float, int]:
+    from services.event_waiter import build_whatsapp_filter
+
+    filters = [(EVENT_TYPE, build_whatsapp_filter(p)) for p in params]
+    resolved = 0
+    with stopwatch() as elapsed:
+        for msg in messages:
+            resolved += sum(1 for event_type, fn in filters if event_type == EVENT_TYPE and fn(msg))
+    return elapsed[0], resolved
+
+
+async def run_benchmark() -> List[Tuple]:
+    rng = random.Random(11)
+    params = _waiter_params(rng)
+    messages = _messages(rng)
+
+    scan_s, scan_hits = _scan(params, messages)
+    indexed_s, indexed_hits = await _indexed(params, messages)
+    assert indexed_hits == scan_hits
+
+    rows = [
+        ("scan", scan_s * 1000, scan_s * 1e6 / MESSAGES, scan_hits),
+        ("indexed", indexed_s * 1000, indexed_s * 1e6 / MESSAGES, indexed_hits),
+    ]
+    print_table(f"{MESSAGES:,} messages x {WAITERS:,} waiters (memory mode)",
+                ["matcher", "total ms", "us/message", "matches"], rows)
+    return rows
+
+
+async def test_indexed_matching_10k_messages_1k_waiters():
+    rows = await run_benchmark()
+    assert rows[1][1] < rows[0][1]
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
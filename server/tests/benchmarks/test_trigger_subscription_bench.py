@@ -0,0 +1,152 @@
+"""Event loss of a deployed whatsappReceive trigger at 5,000 messages/sec.
+
+Pushes RATE matching messages per second for DURATION seconds through a
+``TriggerManager`` event trigger and counts what reaches ``on_event``.
+"re-register" replays the old collector, which registered a one-shot waiter
+per event: messages dispatched before the next waiter exists are lost (memory
+mode). "subscription" is the current trigger holding one event_waiter
+subscription for its lifetime. Redis rows run on fakeredis when installed;
+fakeredis XADD throughput caps their send rate below RATE.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+RATE = 5000
+DURATION = 2.0
+TICK = 0.01
+EVENT_TYPE = "whatsapp_message_received"
+PARAMS = {"filter": "all"}
+
+
+class _Broadcaster:
+    async def update_node_status(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+
+def _message(n: int) -> Dict[str, Any]:
+    return {"chat_id": "111@s.whatsapp.net", "sender_phone": "111", "text": f"msg {n}",
+            "message_type": "text", "is_from_me": False, "is_group": False, "n": n}
+
+
+async def _legacy_trigger(ew, on_event):
+    """The pre-subscription collector + processor pair of setup_event_trigger."""
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def collector():
+        while True:
+            waiter = await ew.register("whatsappReceive", "trigger", PARAMS)
+            await queue.put(await ew.wait_for_event(waiter))
+
+    async def processor():
+        while True:
+            await on_event(await queue.get())
+
+    return [asyncio.ensure_future(collector()), asyncio.ensure_future(processor())]
+
+
+async def _subscribed_trigger(ew, on_event):
+    from services.deployment.triggers import TriggerManager
+
+    manager = TriggerManager()
+    manager.set_running(True)
+    await manager.setup_event_trigger("trigger", "whatsappReceive", PARAMS, on_event, _Broadcaster())
+    return list(manager._active_listeners.values())
+
+
+async def _push(ew, redis: bool) -> int:
+    """Dispatch RATE messages/sec for DURATION seconds. Returns messages sent."""
+    per_tick = int(RATE * TICK)
+    sent = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        for _ in range(per_tick):
+            if redis:
+                await ew.dispatch_async(EVENT_TYPE, _message(sent))
+            else:
+                ew.dispatch(EVENT_TYPE, _message(sent))
+            sent += 1
+        next_tick = start + (sent // per_tick) * TICK
+        await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+    return sent
+
+
+def _redis_cache():
+    try:
+        import fakeredis
+    except ImportError:
+        return None
+    from core.cache import CacheService
+
+    service = CacheService(SimpleNamespace(redis_enabled=True, redis_url=None, cache_ttl=3600))
+    service.use_redis = True
+    service.redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    service._streams_available = True
+    return service
+
+
+async def _run(start_trigger, cache) -> Tuple[int, int, float]:
+    from services import event_waiter as ew
+
+    ew.set_cache_service(cache)
+    received: List[int] = []
+
+    async def on_event(event: Dict[str, Any]) -> None:
+        received.append(event["n"])
+
+    tasks = await start_trigger(ew, on_event)
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    sent = await _push(ew, redis=cache is not None)
+    send_rate = sent / (time.perf_counter() - start)
+    # Let the trigger drain what it buffered
+    deadline = time.perf_counter() + 10
+    while len(received) < sent and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    ew.clear_all()
+    for task in list(ew._dispatchers.values()):
+        task.cancel()
+    await asyncio.gather(*ew._dispatchers.values(), return_exceptions=True)
+    ew._dispatchers.clear()
+    ew.set_cache_service(None)
+    assert received == sorted(received)
+    return sent, len(received), send_rate
+
+
+async def run_benchmark() -> List[Tuple]:
+    rows = []
+    backends = [("memory", None)]
+    if _redis_cache() is not None:
+        backends.append(("redis", _redis_cache))
+    for backend, make_cache in backends:
+        for name, start_trigger in (("re-register", _legacy_trigger), ("subscription", _subscribed_trigger)):
+            if backend == "redis" and name == "re-register":
+                continue  # Redis dispatch already catches up from the stream
+            sent, delivered, rate = await _run(start_trigger, make_cache() if make_cache else None)
+            rows.append((backend, name, rate, sent, delivered, sent - delivered))
+    print_table("whatsappReceive trigger at %d msg/s for %.0f s" % (RATE, DURATION),
+                ["backend", "trigger", "sent/s", "sent", "delivered", "lost"], rows)
+    return rows
+
+
+async def test_subscription_loses_no_events_at_5k_per_second():
+    rows = await run_benchmark()
+    for backend, name, _rate, sent, delivered, lost in rows:
+        if name == "subscription":
+            assert lost == 0, (backend, sent, delivered)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,105 @@
+"""Provider usage summary latency as token usage history grows (SQLite).
+
+Seeds ``token_usage_metrics`` with HISTORY rows spread over DAYS days and
+MODELS provider/model pairs through ``save_token_usage`` (which maintains
+the rollups), then times the summary. "raw scan" is the old
+``get_provider_usage_summary`` query, a GROUP BY over every metric row;
+"rollups" is the current one over the daily rollup rows, plus a 7-day
+range query that mixes daily and hourly rows.
+"""
+
+import asyncio
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table, stopwatch
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+HISTORY = (10_000, 100_000)
+DAYS = 30
+MODELS = 12
+REPEAT = 5
+CHUNK = 5000
+
+RAW_SCAN = """
+    SELECT provider, model, SUM(input_tokens), SUM(output_tokens), SUM(total_tokens),
+           SUM(input_cost), SUM(output_cost), SUM(cache_cost), SUM(total_cost), COUNT(*)
+    FROM token_usage_metrics GROUP BY provider, model ORDER BY provider, model
+"""
+
+
+async def _database(path: Path):
+    pytest.importorskip("aiosqlite")
+    from core.database import Database
+
+    settings = SimpleNamespace(database_url=f"sqlite+aiosqlite:///{path}", database_echo=False,
+                               database_pool_size=5, database_max_overflow=10)
+    database = Database(settings)
+    await database.startup()
+    return database
+
+
+async def _seed(database, count: int, now: datetime) -> None:
+    step = timedelta(days=DAYS) / count
+    for offset in range(0, count, CHUNK):
+        metrics = [{
+            "session_id": f"s{i % 50}", "provider": f"p{i % 3}", "model": f"m{i % MODELS}",
+            "input_tokens": 100, "output_tokens": 20, "total_tokens": 120, "total_cost": 0.001,
+            "created_at": now - step * (count - i),
+        } for i in range(offset, min(count, offset + CHUNK))]
+        assert await database.save_token_usage(metrics, {})
+
+
+async def _median_ms(query) -> float:
+    samples = []
+    for _ in range(REPEAT):
+        with stopwatch() as elapsed:
+            await query()
+        samples.append(elapsed[0] * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+async def run_benchmark() -> List[Tuple]:
+    from sqlalchemy import text
+
+    rows = []
+    now = datetime.now(timezone.utc)
+    for count in HISTORY:
+        with tempfile.TemporaryDirectory() as tmp:
+            database = await _database(Path(tmp) / "bench.db")
+            try:
+                await _seed(database, count, now)
+
+                async def raw_scan():
+                    async with database.get_session() as session:
+                        return (await session.execute(text(RAW_SCAN))).all()
+
+                summary = await database.get_provider_usage_summary()
+                assert sum(p["execution_count"] for p in summary) == count
+
+                old = await _median_ms(raw_scan)
+                new = await _median_ms(database.get_provider_usage_summary)
+                week = await _median_ms(lambda: database.get_provider_usage_summary(
+                    start=now - timedelta(days=7, hours=5), end=now))
+            finally:
+                await database.shutdown()
+        rows.append((count, old, new, week, old / new))
+    print_table("provider usage summary latency, median of %d (ms)" % REPEAT,
+                ["metric rows", "raw scan", "rollups", "rollups 7d range", "speedup"], rows)
+    return rows
+
+
+async def test_rollup_summary_stays_flat():
+    rows = await run_benchmark()
+    assert rows[-1][2] < rows[-1][1]
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
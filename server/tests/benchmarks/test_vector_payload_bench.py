@@ -0,0 +1,65 @@
+"""Cost of moving an embeddingGenerator output between nodes.
+
+10k chunks x 384 dims, as float lists (the previous output) and as the packed
+float32 payload from ``services.vectors``. Each hop is timed separately:
+canonical-JSON input hashing (``hash_inputs``), a JSON round trip (execution
+cache / NodeOutput column), and building the broadcast frame with orjson.
+"""
+
+import asyncio
+import json
+import random
+from typing import List, Tuple
+
+import orjson
+import pytest
+
+from tests.benchmarks._report import print_table, stopwatch
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+CHUNKS = 10_000
+DIMS = 384
+
+
+def _hop_costs(embeddings) -> Tuple[float, float, float, int]:
+    from services.execution.models import hash_inputs
+    from services.vectors import summarize_vectors
+
+    output = {"embeddings": embeddings, "embedding_count": CHUNKS, "dimensions": DIMS}
+    with stopwatch() as hashing:
+        hash_inputs(output)
+    with stopwatch() as round_trip:
+        encoded = json.dumps(output)
+        json.loads(encoded)
+    with stopwatch() as broadcast:
+        orjson.dumps({"type": "node_output", "output": summarize_vectors(output)})
+    return hashing[0], round_trip[0], broadcast[0], len(encoded)
+
+
+async def run_benchmark() -> List[Tuple]:
+    from services.vectors import pack_vectors
+
+    rng = random.Random(5)
+    lists = [[rng.uniform(-1, 1) for _ in range(DIMS)] for _ in range(CHUNKS)]
+    with stopwatch() as packing:
+        packed = pack_vectors(lists)
+
+    rows = []
+    for name, embeddings in (("float lists", lists), ("packed float32", packed)):
+        hashing, round_trip, broadcast, size = _hop_costs(embeddings)
+        rows.append((name, size / 1e6, hashing * 1000, round_trip * 1000, broadcast * 1000))
+    print_table(f"{CHUNKS:,} x {DIMS} embeddings per hop (pack once: {packing[0] * 1000:.0f} ms)",
+                ["format", "JSON MB", "hash ms", "JSON round trip ms", "broadcast ms"], rows)
+    return rows
+
+
+async def test_packed_payload_is_cheaper_per_hop():
+    rows = await run_benchmark()
+    lists, packed = rows
+    assert packed[1] < lists[1] / 3
+    assert packed[3] < lists[3]
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,72 @@
+"""WorkflowExecutor scheduling overhead on synthetic DAGs.
+
+Runs 10/100/1000-node workflows through ``execute_workflow`` with a no-op
+node executor and the in-memory cache backend, so the numbers are dominated
+by the decide loop itself (dependency tracking, input gathering, state saves).
+"""
+
+import asyncio
+import random
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from tests.benchmarks._report import print_table, stopwatch
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+SIZES = (10, 100, 1000)
+RUNS = 3
+
+
+def build_dag(size: int, fan_in: int = 2, seed: int = 7) -> Tuple[List[Dict], List[Dict]]:
+    """One ``start`` trigger plus size-1 nodes, each fed by up to fan_in earlier nodes."""
+    rng = random.Random(seed)
+    nodes = [{"id": "n0", "type": "start", "parameters": {}}]
+    edges = []
+    for i in range(1, size):
+        nodes.append({"id": f"n{i}", "type": "httpRequest", "parameters": {}})
+        for j in sorted(set(rng.randrange(i) for _ in range(fan_in))):
+            edges.append({"id": f"e{j}-{i}", "source": f"n{j}", "target": f"n{i}"})
+    return nodes, edges
+
+
+async def _noop(node_id: str, node_type: str, params: Dict[str, Any],
+                context: Dict[str, Any]) -> Dict[str, Any]:
+    return {"success": True, "result": {"node_id": node_id}}
+
+
+def _executor():
+    from core.cache import CacheService
+    from services.execution import ExecutionCache, WorkflowExecutor
+
+    settings = SimpleNamespace(redis_enabled=False, redis_url=None, cache_ttl=3600)
+    return WorkflowExecutor(cache=ExecutionCache(CacheService(settings)), node_executor=_noop)
+
+
+async def run_benchmark() -> List[Tuple]:
+    rows = []
+    for size in SIZES:
+        nodes, edges = build_dag(size)
+        best = float("inf")
+        for _ in range(RUNS):
+            executor = _executor()
+            with stopwatch() as elapsed:
+                result = await executor.execute_workflow("bench", nodes, edges, enable_caching=False)
+            assert result["success"], result.get("errors")
+            assert len(result["nodes_executed"]) == size
+            best = min(best, elapsed[0])
+        rows.append((size, len(edges), best * 1000, best * 1e6 / size))
+    print_table("execute_workflow, no-op nodes (best of %d)" % RUNS,
+                ["nodes", "edges", "total ms", "us/node"], rows)
+    return rows
+
+
+async def test_scheduling_scales_with_dag_size():
+    rows = await run_benchmark()
+    assert [r[0] for r in rows] == list(SIZES)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
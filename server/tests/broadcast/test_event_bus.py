@@ -0,0 +1,86 @@
+"""Tests for the ingress EventBus and its latency histogram."""
+
+import asyncio
+
+from services.event_bus import EventBus, LatencyHistogram
+
+
+class _Consumer:
+    """Handler recording event types; waits on ``gate`` when it is cleared."""
+
+    def __init__(self):
+        self.seen = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def __call__(self, event):
+        await self.gate.wait()
+        self.seen.append(event.event_type)
+
+
+class TestEventBus:
+    async def test_slow_subscriber_does_not_delay_the_others(self):
+        bus = EventBus()
+        fast, slow = _Consumer(), _Consumer()
+        slow.gate.clear()
+        bus.subscribe("fast", fast)
+        bus.subscribe("slow", slow)
+
+        for n in range(3):
+            bus.publish(f"e{n}", {})
+        await asyncio.sleep(0.01)
+
+        assert fast.seen == ["e0", "e1", "e2"]
+        assert slow.seen == []
+        slow.gate.set()
+        await asyncio.sleep(0.01)
+        assert slow.seen == ["e0", "e1", "e2"]
+        await bus.close()
+
+    async def test_bounded_subscriber_drops_oldest(self):
+        bus = EventBus()
+        ui = _Consumer()
+        bus.subscribe("ui", ui, max_queue=2)
+
+        # Published back to back: the worker has not taken anything yet
+        for n in range(5):
+            bus.publish(f"e{n}", {})
+        await asyncio.sleep(0.01)
+
+        assert ui.seen == ["e3", "e4"]
+        assert bus.stats()["ui"]["dropped"] == 3
+        await bus.close()
+
+    async def test_failing_handler_keeps_its_worker(self):
+        bus = EventBus()
+        seen = []
+
+        async def handler(event):
+            if event.data["fail"]:
+                raise RuntimeError("boom")
+            seen.append(event.event_type)
+
+        bus.subscribe("flaky", handler)
+        bus.publish("bad", {"fail": True})
+        bus.publish("good", {"fail": False})
+        await asyncio.sleep(0.01)
+
+        assert seen == ["good"]
+        assert bus.stats()["flaky"]["errors"] == 1
+        await bus.close()
+
+
+class TestLatencyHistogram:
+    def test_percentiles_from_buckets(self):
+        hist = LatencyHistogram()
+        for _ in range(98):
+            hist.record(0.0008)
+        hist.record(0.02)
+        hist.record(7.0)
+
+        snap = hist.snapshot()
+        assert snap["count"] == 100
+        assert snap["p50_ms"] == 1
+        assert snap["p99_ms"] == 25
+        assert snap["max_ms"] == 7000
+        assert snap["buckets"] == {"<=1ms": 98, "<=25ms": 1, ">5000ms": 1}
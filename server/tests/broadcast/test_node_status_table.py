@@ -0,0 +1,153 @@
+"""Tests for the bounded, versioned node status table."""
+
+from services.node_status_table import NodeStatusTable
+
+
+def _table(**kwargs):
+    return NodeStatusTable(**kwargs)
+
+
+class TestBounds:
+    def test_nodes_per_workflow_are_bounded_lru(self):
+        table = _table(max_nodes=3)
+        for node_id in ("a", "b", "c"):
+            table.set_status(node_id, "success", {}, 0.0, workflow_id="wf")
+        table.set_status("a", "executing", {}, 0.0, workflow_id="wf")  # a is now newest
+        table.set_status("d", "success", {}, 0.0, workflow_id="wf")
+
+        assert set(table.statuses(["wf"])) == {"a", "c", "d"}
+        assert table.get("b") is None
+        assert table.stats()["evicted_nodes"] == 1
+
+    def test_least_recently_updated_workflow_is_evicted(self):
+        table = _table(max_workflows=2)
+        table.set_status("a", "success", {}, 0.0, workflow_id="wf1")
+        table.set_status("b", "success", {}, 0.0, workflow_id="wf2")
+        table.set_status("a2", "success", {}, 0.0, workflow_id="wf1")
+        table.set_status("c", "success", {}, 0.0, workflow_id="wf3")
+
+        assert set(table.statuses()) == {"a", "a2", "c"}
+        assert len(table) == 3
+
+    def test_large_output_is_stored_as_reference(self):
+        table = _table(inline_limit=100)
+        big = {"rows": ["x" * 50] * 10, "count": 10}
+
+        entry = table.set_output("a", big, workflow_id="wf")
+
+        assert entry["output"]["__ref__"] == "node_output"
+        assert entry["output"]["keys"] == ["rows", "count"]
+        assert entry["output"]["bytes"] > 100
+        assert table.set_output("b", {"ok": True}, workflow_id="wf")["output"] == {"ok": True}
+
+    def test_large_status_data_keeps_scalars(self):
+        table = _table(inline_limit=100)
+
+        entry = table.set_status("a", "executing", {"phase": "tool", "result": "x" * 500,
+                                                    "items": list(range(50))}, 0.0, workflow_id="wf")
+
+        assert entry["data"] == {"phase": "tool", "_truncated": True}
+
+    def test_output_keeps_status_and_workflow(self):
+        table = _table()
+        table.set_status("a", "success", {"n": 1}, 1.0, workflow_id="wf")
+
+        entry = table.set_output("a", [1, 2])
+
+        assert entry["status"] == "success"
+        assert entry["workflow_id"] == "wf"
+        assert entry["output"] == [1, 2]
+
+
+class TestSnapshots:
+    def test_full_snapshot_without_cursor(self):
+        table = _table()
+        table.set_status("a", "success", {}, 0.0, workflow_id="wf1")
+        table.set_status("b", "success", {}, 0.0, workflow_id="wf2")
+
+        snapshot = table.snapshot("wf1")
+
+        assert snapshot["full"] is True
+        assert set(snapshot["nodes"]) == {"a"}
+        assert snapshot["version"] == table.version
+
+    def test_delta_since_cursor(self):
+        table = _table()
+        table.set_status("a", "success", {}, 0.0, workflow_id="wf")
+        table.set_status("b", "success", {}, 0.0, workflow_id="wf")
+        cursor = table.snapshot("wf")["version"]
+
+        table.set_status("b", "error", {}, 0.0, workflow_id="wf")
+        table.remove("a")
+        table.set_status("c", "success", {}, 0.0, workflow_id="other")
+        delta = table.snapshot("wf", since=cursor)
+
+        assert delta["full"] is False
+        assert {k: v["status"] for k, v in delta["nodes"].items()} == {"b": "error"}
+        assert delta["removed"] == ["a"]
+        assert table.snapshot("wf", since=delta["version"])["nodes"] == {}
+
+    def test_readded_node_is_not_reported_removed(self):
+        table = _table()
+        table.set_status("a", "success", {}, 0.0, workflow_id="wf")
+        cursor = table.version
+        table.remove("a")
+        table.set_status("a", "executing", {}, 0.0, workflow_id="wf")
+
+        delta = table.snapshot("wf", since=cursor)
+
+        assert delta["removed"] == []
+        assert delta["nodes"]["a"]["status"] == "executing"
+
+    def test_cursor_older_than_forgotten_tombstones_gets_full(self):
+        table = _table(max_tombstones=2)
+        for node_id in "abcd":
+            table.set_status(node_id, "success", {}, 0.0, workflow_id="wf")
+        cursor = table.version
+        for node_id in "abc":
+            table.remove(node_id)
+
+        snapshot = table.snapshot("wf", since=cursor)
+
+        assert snapshot["full"] is True
+        assert set(snapshot["nodes"]) == {"d"}
+
+    def test_evicted_workflow_gets_full_snapshot(self):
+        table = _table(max_workflows=1)
+        table.set_status("a", "success", {}, 0.0, workflow_id="wf1")
+        cursor = table.version
+        table.set_status("b", "success", {}, 0.0, workflow_id="wf2")
+
+        assert table.snapshot("wf1", since=cursor) == {
+            "workflow_id": "wf1", "epoch": table.epoch, "version": table.version, "full": True,
+            "nodes": {}, "removed": [],
+        }
+        table.set_status("a", "executing", {}, 0.0, workflow_id="wf1")
+        assert table.snapshot("wf1", since=cursor)["full"] is True
+
+    def test_cursor_from_another_epoch_gets_full(self):
+        before = _table()
+        for node_id in "abc":
+            before.set_status(node_id, "success", {}, 0.0, workflow_id="wf")
+        # Server restarted: versions count from 0 again
+        table = _table()
+        table.set_status("a", "success", {}, 0.0, workflow_id="wf")
+        table.set_status("b", "success", {}, 0.0, workflow_id="wf")
+
+        stale = table.snapshot("wf", since=1, epoch=before.epoch)
+        ahead = table.snapshot("wf", since=before.version)
+
+        assert table.epoch != before.epoch
+        assert stale["full"] is True and set(stale["nodes"]) == {"a", "b"}
+        assert stale["epoch"] == table.epoch
+        assert ahead["full"] is True
+        assert table.snapshot("wf", since=1, epoch=table.epoch)["full"] is False
+
+    def test_moving_node_to_another_workflow(self):
+        table = _table()
+        table.set_status("a", "success", {}, 0.0, workflow_id="wf1")
+        cursor = table.version
+        table.set_status("a", "success", {}, 0.0, workflow_id="wf2")
+
+        assert table.snapshot("wf1", since=cursor)["removed"] == ["a"]
+        assert set(table.statuses(["wf2"])) == {"a"}
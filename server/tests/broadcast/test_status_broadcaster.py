@@ -0,0 +1,268 @@
+"""Tests for StatusBroadcaster subscriptions, frame batching and slow clients."""
+
+import asyncio
+import json
+
+from services.status_broadcaster import StatusBroadcaster
+
+FRAME = 0.02
+
+
+class FakeSocket:
+    """WebSocket stand-in recording decoded frames; ``block`` stalls sends."""
+
+    def __init__(self):
+        self.frames = []
+        self.closed_with = None
+        self.block = asyncio.Event()
+        self.block.set()
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        self.frames.append(data)
+
+    async def send_text(self, text):
+        await self.block.wait()
+        self.frames.append(json.loads(text))
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+
+    def messages(self):
+        """Broadcast messages received after initial_status, batches unpacked."""
+        out = []
+        for frame in self.frames[1:]:
+            out.extend(frame["messages"] if frame["type"] == "batch" else [frame])
+        return out
+
+
+async def _connect(broadcaster):
+    socket = FakeSocket()
+    await broadcaster.connect(socket)
+    return socket
+
+
+async def _flush():
+    await asyncio.sleep(FRAME * 3)
+
+
+def _broadcaster(**kwargs):
+    broadcaster = StatusBroadcaster(frame_interval=FRAME, **kwargs)
+    # Keep connect() from touching WhatsApp/Twitter/... services
+    broadcaster._refresh_all_services = _noop
+    return broadcaster
+
+
+async def _noop():
+    pass
+
+
+class TestFrames:
+    async def test_initial_status_then_broadcasts(self):
+        broadcaster = _broadcaster()
+        socket = await _connect(broadcaster)
+
+        await broadcaster.update_variable("x", 1)
+        await _flush()
+
+        assert socket.frames[0]["type"] == "initial_status"
+        assert socket.messages() == [{"type": "variable_update", "name": "x", "value": 1}]
+
+    async def test_burst_is_sent_as_one_batch(self):
+        broadcaster = _broadcaster()
+        socket = await _connect(broadcaster)
+        await broadcaster.update_variable("first", 0)
+        await asyncio.sleep(0)  # first frame goes out alone
+
+        for n in range(5):
+            await broadcaster.broadcast({"type": "console_log", "data": {"n": n}})
+        await _flush()
+
+        assert len(socket.frames) == 3
+        assert socket.frames[2]["type"] == "batch"
+        assert [m["data"]["n"] for m in socket.frames[2]["messages"]] == list(range(5))
+
+    async def test_node_status_coalesces_to_latest(self):
+        broadcaster = _broadcaster()
+        socket = await _connect(broadcaster)
+        await broadcaster.update_variable("first", 0)
+        await asyncio.sleep(0)
+
+        for status in ("scheduled", "executing", "success"):
+            await broadcaster.update_node_status("a", status, workflow_id="wf")
+        await broadcaster.update_node_status("b", "executing", workflow_id="wf")
+        await _flush()
+
+        statuses = [(m["node_id"], m["data"]["status"]) for m in socket.messages()
+                    if m["type"] == "node_status"]
+        assert statuses == [("a", "success"), ("b", "executing")]
+        assert broadcaster.get_broadcast_stats()["clients"][0]["coalesced"] == 2
+
+    async def test_coalesced_update_keeps_order_with_other_messages(self):
+        broadcaster = _broadcaster()
+        socket = await _connect(broadcaster)
+        await broadcaster.update_variable("first", 0)
+        await asyncio.sleep(0)
+
+        await broadcaster.update_node_status("a", "executing", workflow_id="wf")
+        await broadcaster.clear_node_status("a")
+        await broadcaster.update_node_status("a", "success", workflow_id="wf")
+        await _flush()
+
+        assert [m["type"] for m in socket.messages()[1:]] == ["node_status_cleared", "node_status"]
+
+
+class TestSubscriptions:
+    async def test_workflow_subscription_filters_node_updates(self):
+        broadcaster = _broadcaster()
+        viewer, other = await _connect(broadcaster), await _connect(broadcaster)
+        assert broadcaster.subscribe(viewer, workflow_ids=["wf1"])
+
+        await broadcaster.update_node_status("a", "success", workflow_id="wf1")
+        await broadcaster.update_node_status("b", "success", workflow_id="wf2")
+        await broadcaster.update_deployment_status(True, "running", workflow_id="wf2")
+        await _flush()
+
+        assert [m.get("node_id") for m in viewer.messages()] == ["a", None]
+        assert [m.get("node_id") for m in other.messages()] == ["a", "b", None]
+
+    async def test_topic_subscription(self):
+        broadcaster = _broadcaster()
+        socket = await _connect(broadcaster)
+        broadcaster.subscribe(socket, topics=["nodes"])
+
+        await broadcaster.broadcast_terminal_log({"message": "noise"})
+        await broadcaster.update_node_status("a", "success", workflow_id="wf")
+        await broadcaster.update_workflow_status(False)
+        await _flush()
+
+        assert [m["type"] for m in socket.messages()] == ["node_status", "workflow_status"]
+
+    async def test_node_statuses_by_workflow(self):
+        broadcaster = _broadcaster()
+        await broadcaster.update_node_status("a", "success", workflow_id="wf1")
+        await broadcaster.update_node_status("b", "error", workflow_id="wf2")
+
+        assert set(broadcaster.get_node_statuses(["wf1"])) == {"a"}
+        assert set(broadcaster.get_node_statuses()) == {"a", "b"}
+
+    async def test_initial_status_leaves_out_node_statuses(self):
+        broadcaster = _broadcaster()
+        await broadcaster.update_node_status("a", "success", workflow_id="wf")
+        await broadcaster.update_node_output("a", {"rows": list(range(5000))}, workflow_id="wf")
+
+        socket = await _connect(broadcaster)
+        initial = socket.frames[0]["data"]
+
+        assert "nodes" not in initial
+        assert initial["node_status_version"] == 2
+        assert initial["node_status_epoch"] == broadcaster.get_node_snapshot("wf")["epoch"]
+        assert broadcaster.get_node_status("a")["output"]["__ref__"] == "node_output"
+
+    async def test_node_messages_carry_versions_for_snapshots(self):
+        broadcaster = _broadcaster()
+        socket = await _connect(broadcaster)
+
+        await broadcaster.update_node_status("a", "executing", workflow_id="wf")
+        await _flush()
+        cursor = socket.messages()[-1]["data"]["version"]
+        await broadcaster.update_node_status("a", "success", workflow_id="wf")
+        await broadcaster.update_node_status("b", "success", workflow_id="wf")
+        await broadcaster.clear_node_status("a")
+        await _flush()
+
+        cleared = socket.messages()[-1]
+        assert cleared["type"] == "node_status_cleared"
+        assert cleared["workflow_id"] == "wf"
+        delta = broadcaster.get_node_snapshot("wf", since=cursor)
+        assert set(delta["nodes"]) == {"b"}
+        assert delta["removed"] == ["a"]
+        assert delta["version"] == cleared["version"]
+
+    async def test_subscribe_unknown_socket(self):
+        assert not _broadcaster().subscribe(FakeSocket(), workflow_ids=["wf"])
+
+
+class TestSlowClients:
+    async def test_full_queue_drops_only_the_slow_client(self):
+        broadcaster = _broadcaster(max_pending=10)
+        slow, fast = await _connect(broadcaster), await _connect(broadcaster)
+        slow.block.clear()
+
+        for n in range(20):
+            await broadcaster.broadcast({"type": "console_log", "data": {"n": n}})
+            await asyncio.sleep(FRAME / 4)
+        await _flush()
+
+        assert slow.closed_with == 1013
+        assert broadcaster.connection_count == 1
+        assert broadcaster.get_broadcast_stats()["dropped_clients"] == 1
+        assert [m["data"]["n"] for m in fast.messages()] == list(range(20))
+
+    async def test_coalescing_keeps_status_floods_within_bound(self):
+        broadcaster = _broadcaster(max_pending=10)
+        socket = await _connect(broadcaster)
+        socket.block.clear()
+
+        for n in range(500):
+            await broadcaster.update_node_status(f"n{n % 5}", "executing", {"n": n}, workflow_id="wf")
+        socket.block.set()
+        await _flush()
+
+        assert broadcaster.connection_count == 1
+        latest = {m["node_id"]: m["data"]["data"]["n"] for m in socket.messages()}
+        assert latest == {f"n{i}": 495 + i for i in range(5)}
+
+    async def test_send_timeout_drops_client(self):
+        broadcaster = _broadcaster(send_timeout=0.05)
+        socket = await _connect(broadcaster)
+        socket.block.clear()
+
+        await broadcaster.update_variable("x", 1)
+        await asyncio.sleep(0.1)
+        await broadcaster.update_variable("x", 2)
+
+        assert broadcaster.connection_count == 0
+
+    async def test_disconnect_stops_sender(self):
+        broadcaster = _broadcaster()
+        socket = await _connect(broadcaster)
+
+        await broadcaster.disconnect(socket)
+        await broadcaster.update_variable("x", 1)
+        await _flush()
+
+        assert socket.messages() == []
+        assert broadcaster.connection_count == 0
+
+
+class TestCustomEvents:
+    async def test_trigger_dispatch_does_not_wait_for_ui_broadcast(self):
+        from services import event_waiter
+
+        broadcaster = _broadcaster()
+        ui_release = asyncio.Event()
+        broadcast_to_ui = broadcaster.broadcast
+        sent = []
+
+        async def stalled_broadcast(message):
+            await ui_release.wait()
+            sent.append(message)
+            await broadcast_to_ui(message)
+
+        broadcaster.broadcast = stalled_broadcast
+        waiter = await event_waiter.register("webhookTrigger", "hook", {"path": "/x"})
+        try:
+            await broadcaster.send_custom_event("webhook_received", {"path": "/x"})
+
+            assert await asyncio.wait_for(waiter.future, 0.5) == {"path": "/x"}
+            assert event_waiter.get_ingress_latency()["count"] == 1
+            assert sent == []
+            ui_release.set()
+            await asyncio.sleep(0.01)
+            assert sent == [{"type": "webhook_received", "data": {"path": "/x"}}]
+        finally:
+            event_waiter.clear_all()
+            await broadcaster._events.close()
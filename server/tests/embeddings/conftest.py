@@ -0,0 +1,52 @@
+"""Fixtures for the embedding service suite.
+
+Providers are replaced by a deterministic fake so no model is downloaded.
+"""
+
+import threading
+import time
+from typing import List
+
+import pytest
+
+
+class FakeEmbedder:
+    """Deterministic embedder that records every ``embed_documents`` call."""
+
+    def __init__(self, model: str = "fake", delay: float = 0.0, per_text: float = 0.0):
+        self.model = model
+        self.delay = delay
+        self.per_text = per_text
+        self.calls: List[List[str]] = []
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            self.calls.append(list(texts))
+        if self.delay or self.per_text:
+            time.sleep(self.delay + self.per_text * len(texts))
+        return [[float(len(t)), float(sum(map(ord, t)) % 997)] for t in texts]
+
+
+@pytest.fixture
+def fake_embedders(monkeypatch):
+    """Patch provider construction; returns the created embedders by model."""
+    from services import embeddings
+
+    created = {}
+
+    def create(provider, model, api_key=""):
+        if provider == "broken":
+            raise ValueError(f"Unknown provider: {provider}")
+        created[model] = FakeEmbedder(model)
+        return created[model]
+
+    monkeypatch.setattr(embeddings, "_create_embedder", create)
+    return created
+
+
+@pytest.fixture
+def service(fake_embedders):
+    from services.embeddings import EmbeddingService
+
+    return EmbeddingService(max_models=2, cache_max_entries=100, batch_window_ms=5, max_batch_size=64)
@@ -0,0 +1,162 @@
+"""Tests for the process-wide embedding service."""
+
+import asyncio
+
+import pytest
+
+
+class TestMicroBatching:
+    async def test_concurrent_requests_share_one_forward_pass(self, service, fake_embedders):
+        results = await asyncio.gather(
+            service.embed(["a", "bb"], model="m"),
+            service.embed(["ccc"], model="m"),
+            service.embed(["dddd"], model="m"),
+        )
+
+        assert fake_embedders["m"].calls == [["a", "bb", "ccc", "dddd"]]
+        assert [[v[0] for v in r] for r in results] == [[1.0, 2.0], [3.0], [4.0]]
+        assert service.stats()["forward_passes"] == 1
+
+    async def test_full_batch_flushes_before_window(self, fake_embedders):
+        from services.embeddings import EmbeddingService
+
+        service = EmbeddingService(batch_window_ms=10_000, max_batch_size=3)
+
+        await asyncio.wait_for(service.embed(["a", "b", "c"], model="m"), timeout=1)
+
+        assert fake_embedders["m"].calls == [["a", "b", "c"]]
+
+    async def test_duplicate_texts_are_embedded_once(self, service, fake_embedders):
+        a, b = await asyncio.gather(service.embed(["x", "x"], model="m"), service.embed(["x"], model="m"))
+
+        assert fake_embedders["m"].calls == [["x"]]
+        assert a == [b[0], b[0]]
+
+    async def test_errors_reach_every_request_in_the_batch(self, service, fake_embedders):
+        await service.embed(["warm"], model="m")
+        fake_embedders["m"].embed_documents = lambda texts: 1 / 0
+
+        results = await asyncio.gather(
+            service.embed(["a"], model="m"), service.embed(["b"], model="m"), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ZeroDivisionError) for r in results)
+
+    async def test_close_runs_queued_batches_and_waits_for_them(self, fake_embedders):
+        from services.embeddings import EmbeddingService
+
+        service = EmbeddingService(batch_window_ms=10_000)
+        request = asyncio.create_task(service.embed(["a", "b"], model="m"))
+        await asyncio.sleep(0.05)  # Queued behind the 10s window
+        fake_embedders["m"].delay = 0.05
+
+        await asyncio.wait_for(service.close(), timeout=1)
+
+        assert request.done() and len(request.result()) == 2
+        assert service._batches == set()
+
+    async def test_unknown_provider_raises(self, service):
+        with pytest.raises(ValueError, match="provider"):
+            await service.embed(["a"], provider="broken")
+
+
+class TestVectorCache:
+    async def test_unchanged_chunks_are_not_re_embedded(self, service, fake_embedders):
+        first = await service.embed(["a", "b"], model="m")
+        second = await service.embed(["b", "a", "c"], model="m")
+
+        assert fake_embedders["m"].calls == [["a", "b"], ["c"]]
+        assert second[:2] == [first[1], first[0]]
+        stats = service.stats()
+        assert stats["cache_hits"] == 2 and stats["cache_misses"] == 3
+        assert stats["cache_hit_rate"] == 0.4
+
+    async def test_cache_holds_float32_rows_and_packs_them(self, service, fake_embedders):
+        from services.vectors import to_lists
+
+        await service.embed(["a", "bb"], model="m")
+        payload = await service.embed_vectors(["bb", "a"], model="m")
+
+        assert payload["shape"] == [2, 2]
+        assert to_lists(payload) == [[2.0, 196.0], [1.0, 97.0]]
+        assert service.stats()["cache_bytes"] == 2 * 2 * 4
+        assert len(fake_embedders["m"].calls) == 1
+
+    async def test_cache_is_per_model(self, service, fake_embedders):
+        await service.embed(["a"], model="m1")
+        await service.embed(["a"], model="m2")
+
+        assert fake_embedders["m2"].calls == [["a"]]
+
+    async def test_cache_is_bounded(self, fake_embedders):
+        from services.embeddings import EmbeddingService
+
+        service = EmbeddingService(cache_max_entries=2, batch_window_ms=0)
+        await service.embed(["a", "b", "c"], model="m")
+
+        assert service.stats()["cached_vectors"] == 2
+        await service.embed(["a"], model="m")
+        assert fake_embedders["m"].calls[-1] == ["a"]
+
+    async def test_sync_callers_in_threads_keep_cache_and_stats_consistent(self, fake_embedders):
+        from services.embeddings import EmbeddingService
+
+        service = EmbeddingService(cache_max_entries=50, batch_window_ms=1)
+        texts = [[f"t{n}-{i % 80}" for i in range(20)] for n in range(3)]
+
+        await asyncio.gather(*(
+            asyncio.to_thread(service.embed_sync, texts[n % 3], model="m") for n in range(60)
+        ), *(service.embed(texts[n % 3], model="m") for n in range(20)))
+
+        stats = service.stats()
+        assert stats["requests"] == 80
+        assert stats["cache_hits"] + stats["cache_misses"] == 80 * 20
+        assert stats["cached_vectors"] == 50
+
+
+class TestModelPool:
+    async def test_models_are_loaded_once_and_lru_evicted(self, service, fake_embedders):
+        for model in ("m1", "m2", "m1", "m3"):
+            await service.embed([f"text for {model} {len(fake_embedders)}"], model=model)
+
+        stats = service.stats()
+        assert stats["models_loaded"] == 3
+        assert stats["models_evicted"] == 1
+        assert [m["model"] for m in stats["loaded_models"]] == ["m1", "m3"]
+
+    async def test_langchain_adapter_uses_pool_and_cache(self, service, fake_embedders):
+        embedder = service.get_embedder("huggingface", "m")
+
+        sync = embedder.embed_documents(["a", "b"])
+        query = await embedder.aembed_query("a")
+
+        assert query == sync[0]
+        assert fake_embedders["m"].calls == [["a", "b"]]
+
+    async def test_memory_vector_store_shares_the_pool(self, fake_embedders, monkeypatch):
+        pytest.importorskip("langchain_core.vectorstores")
+        from services import embeddings, memory
+
+        monkeypatch.setattr(embeddings, "_service", None)
+        monkeypatch.setattr(memory, "_memory_vector_stores", {})
+
+        stores = [memory.get_memory_vector_store(f"s{i}") for i in range(3)]
+
+        assert len(fake_embedders) == 1
+        stores[0].add_texts(["remember this"])
+        assert stores[0].similarity_search("remember this", k=1)[0].page_content == "remember this"
+
+
+async def test_stats_endpoint(service, monkeypatch):
+    from routers import embeddings as embeddings_router
+    from services import embeddings
+
+    monkeypatch.setattr(embeddings, "_service", service)
+    await service.embed(["a"], model="m")
+    await service.embed(["a"], model="m")
+
+    response = await embeddings_router.embedding_stats()
+
+    stats = response["stats"]
+    assert stats["embedded"] == 1 and stats["cache_hit_rate"] == 0.5
+    assert stats["embeddings_per_sec"] > 0
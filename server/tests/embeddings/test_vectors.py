@@ -0,0 +1,89 @@
+"""Tests for packed vector payloads."""
+
+import json
+
+import pytest
+
+from services.vectors import (
+    is_vector_payload, pack_vectors, summarize_vectors, to_array, to_lists, vector_at, vector_shape,
+)
+
+
+MATRIX = [[0.5, -1.25, 3.0], [2.0, 0.0, -0.75]]
+
+
+def test_round_trip_through_json():
+    payload = json.loads(json.dumps(pack_vectors(MATRIX)))
+
+    assert is_vector_payload(payload)
+    assert payload["dtype"] == "float32" and payload["shape"] == [2, 3]
+    assert to_lists(payload) == MATRIX
+    assert to_array(payload).tolist() == MATRIX
+    assert vector_at(payload, 1) == MATRIX[1]
+
+
+def test_payload_is_smaller_than_float_json():
+    import random
+
+    rng = random.Random(1)
+    matrix = [[rng.uniform(-1, 1) for _ in range(384)] for _ in range(100)]
+
+    assert len(json.dumps(pack_vectors(matrix))) * 3 < len(json.dumps(matrix))
+
+
+def test_numpy_and_lists_pack_identically():
+    np = pytest.importorskip("numpy")
+
+    assert pack_vectors(np.array(MATRIX, dtype="float64")) == pack_vectors(MATRIX)
+    assert vector_shape(np.zeros((4, 2))) == [4, 2]
+
+
+def test_empty_matrix():
+    payload = pack_vectors([])
+
+    assert payload["shape"] == [0, 0]
+    assert to_lists(payload) == []
+    with pytest.raises(IndexError):
+        vector_at(payload, 0)
+
+
+def test_summary_drops_buffer_and_keeps_other_fields():
+    output = {"embeddings": pack_vectors(MATRIX), "chunks": [{"content": "a"}], "dimensions": 3}
+
+    summary = summarize_vectors(output)
+
+    assert summary["embeddings"] == {"__vectors__": 1, "dtype": "float32", "shape": [2, 3], "bytes": 24}
+    assert summary["chunks"] is output["chunks"]
+    assert "data" in output["embeddings"]  # Input not mutated
+    plain = {"text": "x", "items": [{"a": 1}]}
+    assert summarize_vectors(plain) is plain
+
+
+def test_template_index_into_packed_embeddings():
+    from services.parameter_resolver import ParameterResolver
+
+    resolver = ParameterResolver(database=None, get_output_fn=None)
+    resolved = resolver._resolve_string(
+        "{{embeddinggenerator.embeddings[1]}}",
+        {"embeddinggenerator": {"embeddings": pack_vectors(MATRIX)}},
+    )
+
+    assert resolved == MATRIX[1]
+
+
+async def test_broadcaster_sends_summary():
+    from services.status_broadcaster import StatusBroadcaster
+
+    broadcaster = StatusBroadcaster()
+    sent = []
+
+    async def capture(message):
+        sent.append(message)
+
+    broadcaster.broadcast = capture
+    await broadcaster.update_node_output("n1", {"embeddings": pack_vectors(MATRIX)})
+    await broadcaster.update_node_status("n1", "success", {"embeddings": pack_vectors(MATRIX)})
+
+    assert "data" not in sent[0]["output"]["embeddings"]
+    assert sent[1]["data"]["data"]["embeddings"]["shape"] == [2, 3]
+    assert "data" not in sent[1]["data"]["data"]["embeddings"]
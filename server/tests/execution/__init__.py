@@ -0,0 +1 @@
+"""Unit tests for the workflow execution engine (services/execution)."""
@@ -0,0 +1,96 @@
+"""Local stand-in for the server's ``/ws/internal`` endpoint.
+
+Speaks the same protocol as ``routers/websocket.py``: ``register_graph``
+stores a graph per connection; ``execute_node`` resolves ``graph_id`` (or
+takes inline ``nodes``/``edges``) and answers with the request's
+``request_id``. Each request is handled in its own task, so responses come
+back in completion order. ``parameters`` steer a request: ``delay`` seconds
+before answering, ``drop`` closes the connection instead.
+
+Counts connections, registrations and the bytes of every ``execute_node``
+frame received.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from aiohttp import WSMsgType, web
+
+
+class InternalServer:
+    def __init__(self):
+        self.connections = 0
+        self.registrations = 0
+        self.execute_bytes: List[int] = []
+        self.sockets: List[web.WebSocketResponse] = []
+        self.runner = None
+        self.url = ""
+
+    def forget_graphs(self) -> None:
+        """Drop every connection's registered graphs (as after eviction)."""
+        for ws in self.sockets:
+            ws["graphs"].clear()
+
+    async def internal(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        ws["graphs"] = {}
+        self.connections += 1
+        self.sockets.append(ws)
+        tasks = set()
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            data = json.loads(msg.data)
+            if data.get("type") == "execute_node":
+                self.execute_bytes.append(len(msg.data))
+            task = asyncio.create_task(self._handle(ws, data))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        for task in tasks:
+            task.cancel()
+        return ws
+
+    async def _handle(self, ws: web.WebSocketResponse, data: Dict[str, Any]) -> None:
+        graphs = ws["graphs"]
+        request_id = data.get("request_id")
+        if data["type"] == "register_graph":
+            graphs[data["graph_id"]] = {"nodes": data["nodes"], "edges": data["edges"]}
+            self.registrations += 1
+            await ws.send_json({"type": "register_graph_result", "request_id": request_id,
+                                "success": True, "graph_id": data["graph_id"]})
+            return
+
+        if data.get("graph_id"):
+            graph = graphs.get(data["graph_id"])
+            if graph is None:
+                await ws.send_json({"type": "execute_node_result", "request_id": request_id,
+                                    "success": False, "code": "UNKNOWN_GRAPH",
+                                    "error": f"Unknown graph: {data['graph_id']}"})
+                return
+            data = {**data, **graph}
+
+        parameters = data.get("parameters", {})
+        if parameters.get("drop"):
+            await ws.close()
+            return
+        await asyncio.sleep(parameters.get("delay", 0))
+        await ws.send_json({"type": "execute_node_result", "request_id": request_id,
+                            "success": True, "node_id": data["node_id"],
+                            "result": {"graph_nodes": len(data.get("nodes", []))}})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/ws/internal", self.internal)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/ws/internal"
+
+    async def stop(self):
+        for ws in list(self.sockets):
+            await ws.close()
+        await self.runner.cleanup()
@@ -0,0 +1,66 @@
+"""Fixtures for the execution engine test suite.
+
+The engine imports ``core.cache``, which the stubbed ``core`` package from
+tests/conftest.py doesn't provide, so this suite runs against the real one.
+"""
+
+from types import SimpleNamespace
+from typing import Any, Dict
+
+import pytest
+
+from tests._real_core import use_real_core
+
+use_real_core()
+
+
+def make_memory_cache():
+    """ExecutionCache on CacheService's in-memory backend (no Redis, no SQLite)."""
+    from core.cache import CacheService
+    from services.execution import ExecutionCache
+
+    settings = SimpleNamespace(redis_enabled=False, redis_url=None, cache_ttl=3600)
+    return ExecutionCache(CacheService(settings))
+
+
+def make_redis_cache():
+    """ExecutionCache on a fakeredis-backed CacheService (skips without fakeredis)."""
+    fakeredis = pytest.importorskip("fakeredis")
+    from core.cache import CacheService
+    from services.execution import ExecutionCache
+
+    settings = SimpleNamespace(redis_enabled=True, redis_url=None, cache_ttl=3600)
+    service = CacheService(settings)
+    service.use_redis = True
+    service.redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    return ExecutionCache(service)
+
+
+async def noop_node_executor(node_id: str, node_type: str, params: Dict[str, Any],
+                             context: Dict[str, Any]) -> Dict[str, Any]:
+    """Node executor that succeeds instantly with a tiny output."""
+    return {"success": True, "result": {"node_id": node_id}}
+
+
+@pytest.fixture
+def execution_cache():
+    return make_memory_cache()
+
+
+@pytest.fixture
+def executor(execution_cache):
+    from services.execution import WorkflowExecutor
+
+    return WorkflowExecutor(cache=execution_cache, node_executor=noop_node_executor)
+
+
+async def make_sqlite_database(path):
+    """Real ``core.database.Database`` on a SQLite file (skips without aiosqlite)."""
+    pytest.importorskip("aiosqlite")
+    from core.database import Database
+
+    settings = SimpleNamespace(database_url=f"sqlite+aiosqlite:///{path}", database_echo=False,
+                               database_pool_size=5, database_max_overflow=10)
+    database = Database(settings)
+    await database.startup()
+    return database
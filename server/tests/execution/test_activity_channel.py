@@ -0,0 +1,99 @@
+"""Temporal activity transport: the multiplexed ActivityChannel against a local /ws/internal."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from services.temporal.workflow import graph_content_id
+from services.temporal.ws_client import ActivityChannel
+from tests.execution._internal_ws import InternalServer
+
+NODES = [{"id": f"n{i}", "type": "console", "data": {"label": "x" * 200}} for i in range(50)]
+EDGES = [{"id": f"e{i}", "source": f"n{i}", "target": f"n{i + 1}"} for i in range(49)]
+
+
+@pytest.fixture
+async def server():
+    server = InternalServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+async def channel(server):
+    channel = ActivityChannel(url=server.url)
+    yield channel
+    await channel.close()
+
+
+def _message(node_id: str, **parameters):
+    return {"type": "execute_node", "node_id": node_id, "node_type": "console",
+            "parameters": parameters, "workflow_id": "wf-1"}
+
+
+class TestActivityChannel:
+    async def test_concurrent_requests_share_one_connection_and_match_by_request_id(self, server, channel):
+        delays = [0.05, 0.0, 0.03, 0.01]
+        responses = await asyncio.gather(*(
+            channel.execute_node(_message(f"n{i}", delay=d), NODES, EDGES)
+            for i, d in enumerate(delays)))
+
+        assert [r["node_id"] for r in responses] == ["n0", "n1", "n2", "n3"]
+        assert all(r["result"]["graph_nodes"] == len(NODES) for r in responses)
+        assert server.connections == 1
+
+    async def test_graph_is_registered_once_and_referenced_by_id(self, server, channel):
+        for i in range(5):
+            await channel.execute_node(_message(f"n{i}"), NODES, EDGES)
+        await asyncio.gather(*(channel.execute_node(_message(f"n{i}"), NODES, EDGES)
+                               for i in range(5)))
+
+        assert server.registrations == 1
+        assert channel.graphs_registered == 1
+        # execute_node frames carry the graph_id, not the node list
+        assert max(server.execute_bytes) < 500
+
+    async def test_graph_id_from_the_workflow_is_used_as_is(self, server, channel):
+        graph_id = graph_content_id(NODES, EDGES)
+        await channel.execute_node(_message("n0"), NODES, EDGES, graph_id=graph_id)
+
+        assert list(server.sockets[0]["graphs"]) == [graph_id]
+
+    async def test_unknown_graph_is_registered_again(self, server, channel):
+        await channel.execute_node(_message("n0"), NODES, EDGES)
+        server.forget_graphs()
+
+        response = await channel.execute_node(_message("n1"), NODES, EDGES)
+
+        assert response["success"] is True
+        assert server.registrations == 2
+
+    async def test_dropped_connection_fails_pending_requests_then_reconnects(self, server, channel):
+        slow = asyncio.ensure_future(channel.execute_node(_message("slow", delay=1), NODES, EDGES))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(ConnectionError):
+            await asyncio.gather(slow, channel.execute_node(_message("drop", drop=True), NODES, EDGES))
+        await asyncio.gather(slow, return_exceptions=True)
+
+        response = await channel.execute_node(_message("after"), NODES, EDGES)
+        assert response["node_id"] == "after"
+        assert server.connections == 2
+        assert server.registrations == 2
+
+    async def test_on_wait_fires_while_a_request_is_outstanding(self, channel):
+        beats = []
+        response = await channel.request(_message("n0", delay=0.12), on_wait=lambda: beats.append(1),
+                                         wait_interval=0.03)
+
+        assert response["node_id"] == "n0"
+        assert len(beats) >= 2
+
+
+def test_graph_content_id_ignores_key_order():
+    reordered = [{"data": n["data"], "type": n["type"], "id": n["id"]} for n in NODES]
+    assert graph_content_id(NODES, EDGES) == graph_content_id(reordered, EDGES)
+    assert graph_content_id(NODES, EDGES) != graph_content_id(NODES, EDGES[:-1])
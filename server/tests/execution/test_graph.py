@@ -0,0 +1,155 @@
+"""Tests for the compiled WorkflowGraph and counter-driven scheduling."""
+
+import pytest
+
+from services.execution import ExecutionContext, WorkflowGraph
+
+
+def _node(node_id, node_type="httpRequest", **data):
+    node = {"id": node_id, "type": node_type, "parameters": {}}
+    if data:
+        node["data"] = data
+    return node
+
+
+def _edge(source, target, target_handle=None, condition=None):
+    edge = {"id": f"{source}-{target}", "source": source, "target": target}
+    if target_handle:
+        edge["targetHandle"] = target_handle
+    if condition:
+        edge["data"] = {"condition": condition}
+    return edge
+
+
+class TestWorkflowGraph:
+    def test_indexes_nodes_and_incoming_edges(self):
+        nodes = [_node("t", "start"), _node("a"), _node("b")]
+        edges = [_edge("t", "a"), _edge("a", "b"), _edge("t", "b")]
+        graph = WorkflowGraph(nodes, edges)
+
+        assert graph.get_node("a") is nodes[1]
+        assert graph.get_node("missing") == {}
+        assert [e["source"] for e in graph.incoming_edges("b")] == ["a", "t"]
+        assert graph.dependencies["b"] == {"a", "t"}
+        assert sorted(graph.dependents["t"]) == ["a", "b"]
+
+    def test_config_sources_are_not_dependencies(self):
+        nodes = [_node("t", "start"), _node("agent", "aiAgent"), _node("model", "openaiChatModel")]
+        edges = [_edge("t", "agent"), _edge("model", "agent", "input-model")]
+        graph = WorkflowGraph(nodes, edges)
+
+        assert graph.dependencies["agent"] == {"t"}
+        assert "model" in graph.excluded_ids
+        # Config edges still count as inputs
+        assert len(graph.incoming_edges("agent")) == 2
+
+    def test_agent_config_handle_sources_are_subnodes(self):
+        nodes = [_node("agent", "aiAgent"), _node("http"), _node("t", "start")]
+        edges = [_edge("http", "agent", "input-tools"), _edge("t", "agent")]
+        graph = WorkflowGraph(nodes, edges)
+
+        assert graph.subnode_ids == {"http"}
+        assert "http" in graph.excluded_ids
+
+    def test_settle_releases_only_when_all_dependencies_settled(self):
+        graph = WorkflowGraph(
+            [_node("a"), _node("b"), _node("c")],
+            [_edge("a", "c"), _edge("b", "c")],
+        )
+
+        assert graph.settle("a") == []
+        assert not graph.is_ready("c")
+        assert graph.settle("b") == ["c"]
+        assert graph.is_ready("c")
+        # Idempotent
+        assert graph.settle("b") == []
+
+    def test_duplicate_edges_count_once(self):
+        graph = WorkflowGraph([_node("a"), _node("b")], [_edge("a", "b"), _edge("a", "b")])
+
+        assert graph.settle("a") == ["b"]
+
+    def test_seed_recomputes_counters(self):
+        graph = WorkflowGraph(
+            [_node("a"), _node("b"), _node("c")],
+            [_edge("a", "c"), _edge("b", "c")],
+        )
+        graph.seed(["a"])
+
+        assert graph.remaining["c"] == 1
+        assert graph.settle("b") == ["c"]
+
+    def test_execution_context_builds_graph(self):
+        ctx = ExecutionContext.create("wf", nodes=[_node("t", "start")], edges=[])
+
+        assert isinstance(ctx.graph, WorkflowGraph)
+        assert ctx.graph.get_node("t")["type"] == "start"
+        assert "graph" not in ctx.to_dict()
+
+
+class TestScheduling:
+    async def test_diamond_runs_every_node_once(self, executor):
+        calls = []
+
+        async def record(node_id, node_type, params, context):
+            calls.append(node_id)
+            return {"success": True, "result": {"v": node_id}}
+
+        executor.node_executor = record
+        nodes = [_node("t", "start"), _node("a"), _node("b"), _node("join")]
+        edges = [_edge("t", "a"), _edge("t", "b"), _edge("a", "join"), _edge("b", "join")]
+
+        result = await executor.execute_workflow("wf", nodes, edges)
+
+        assert result["success"]
+        assert sorted(calls) == ["a", "b", "join", "t"]
+        assert calls[-1] == "join"
+
+    async def test_disabled_node_is_skipped_and_releases_dependents(self, executor):
+        nodes = [_node("t", "start"), _node("off", disabled=True), _node("after")]
+        edges = [_edge("t", "off"), _edge("off", "after")]
+
+        result = await executor.execute_workflow("wf", nodes, edges)
+
+        assert result["success"]
+        assert "after" in result["outputs"]
+        assert "off" not in result["outputs"]
+
+    async def test_unmet_condition_skips_branch(self, executor):
+        nodes = [_node("t", "start"), _node("yes"), _node("no")]
+        edges = [
+            _edge("t", "yes", condition={"field": "node_id", "operator": "eq", "value": "t"}),
+            _edge("t", "no", condition={"field": "node_id", "operator": "eq", "value": "x"}),
+        ]
+
+        result = await executor.execute_workflow("wf", nodes, edges)
+
+        assert "yes" in result["outputs"]
+        assert "no" not in result["outputs"]
+
+    async def test_gather_inputs_keyed_by_source_type(self, executor):
+        ctx = ExecutionContext.create(
+            "wf", nodes=[_node("t", "start"), _node("a")], edges=[_edge("t", "a")]
+        )
+        ctx.outputs["t"] = {"x": 1}
+
+        assert executor._gather_node_inputs(ctx, "a") == {"start": {"x": 1}}
+
+    def test_layers_exclude_config_nodes(self, executor):
+        nodes = [_node("t", "start"), _node("a"), _node("m", "openaiChatModel")]
+        edges = [_edge("t", "a"), _edge("m", "a", "input-model")]
+        ctx = ExecutionContext.create("wf", nodes=nodes, edges=edges)
+
+        assert executor._compute_execution_layers(ctx.graph) == [["t"], ["a"]]
+
+    @pytest.mark.parametrize("width", [1, 5])
+    async def test_pre_executed_trigger_seeds_counters(self, executor, width):
+        nodes = [{**_node("t", "start"), "_pre_executed": True, "_trigger_output": {"x": 1}}]
+        nodes += [_node(f"n{i}") for i in range(width)]
+        edges = [_edge("t", f"n{i}") for i in range(width)]
+
+        result = await executor.execute_workflow("wf", nodes, edges)
+
+        assert result["success"]
+        assert set(result["outputs"]) == {"t", *(f"n{i}" for i in range(width))}
+        assert result["outputs"]["t"] == {"x": 1}
@@ -0,0 +1,119 @@
+"""Tests for cross-run memoization of deterministic nodes."""
+
+import time
+
+from services.execution import MemoPolicy, NodeMemo, generate_memo_key, get_memo_policy
+
+from tests.execution.conftest import make_memory_cache
+
+
+def _node(node_id, node_type):
+    return {"id": node_id, "type": node_type, "parameters": {}}
+
+
+def _edge(source, target):
+    return {"id": f"{source}-{target}", "source": source, "target": target}
+
+
+class TestMemoKey:
+    def test_key_ignores_param_order_and_execution(self):
+        a = generate_memo_key("textChunker", {"size": 1, "overlap": 2}, {"start": {"x": 1}}, "1")
+        b = generate_memo_key("textChunker", {"overlap": 2, "size": 1}, {"start": {"x": 1}}, "1")
+
+        assert a == b
+        assert a.startswith("memo:textChunker:1:")
+
+    def test_key_changes_with_params_inputs_and_version(self):
+        base = generate_memo_key("textChunker", {"size": 1}, {}, "1")
+
+        assert generate_memo_key("textChunker", {"size": 2}, {}, "1") != base
+        assert generate_memo_key("textChunker", {"size": 1}, {"start": {"x": 1}}, "1") != base
+        assert generate_memo_key("textChunker", {"size": 1}, {}, "2") != base
+
+    def test_only_deterministic_types_have_policies(self):
+        assert get_memo_policy("embeddingGenerator").ttl > get_memo_policy("textChunker").ttl
+        assert get_memo_policy("aiAgent") is None
+
+    def test_nodes_reading_external_content_are_not_memoized(self):
+        assert get_memo_policy("httpScraper") is None
+        assert get_memo_policy("documentParser") is None
+
+
+class TestMemoStore:
+    async def test_lookup_counts_hits_and_misses(self):
+        memo = NodeMemo(make_memory_cache(), MemoPolicy())
+
+        assert await memo.lookup("textChunker", {"size": 1}) is None
+        await memo.store("textChunker", {"size": 1}, {"chunks": ["a"]})
+
+        assert await memo.lookup("textChunker", {"size": 1}) == {"chunks": ["a"]}
+        assert memo.stats == {"hits": 1, "misses": 1}
+
+    async def test_expired_entry_misses(self, monkeypatch):
+        cache = make_memory_cache()
+        memo = NodeMemo(cache, MemoPolicy(ttl=10))
+        await memo.store("textChunker", {}, {"chunks": []})
+
+        later = time.time() + 11
+        monkeypatch.setattr(time, "time", lambda: later)
+
+        assert await memo.lookup("textChunker", {}) is None
+        assert cache._memo_lru == {}
+
+    async def test_lru_eviction_bounds_entries(self):
+        cache = make_memory_cache()
+        cache.memo_max_entries = 2
+        memo = NodeMemo(cache, MemoPolicy())
+
+        await memo.store("textChunker", {"n": 1}, {"v": 1})
+        await memo.store("textChunker", {"n": 2}, {"v": 2})
+        await memo.lookup("textChunker", {"n": 1})  # 1 becomes most recent
+        await memo.store("textChunker", {"n": 3}, {"v": 3})
+
+        assert await memo.lookup("textChunker", {"n": 2}) is None
+        assert await memo.lookup("textChunker", {"n": 1}) == {"v": 1}
+        assert len(cache.cache.memory_cache) == 2
+
+
+class TestWorkflowMemoization:
+    async def test_second_run_hits_memo(self, executor):
+        calls = []
+
+        # Mirrors NodeExecutor.execute: lookup after params are resolved
+        async def chunker(node_id, node_type, params, context):
+            memo = context.get("memo")
+            cached = await memo.lookup(node_type, params) if memo else None
+            if cached is not None:
+                return {"success": True, "result": cached}
+            calls.append(node_id)
+            result = {"chunks": [node_id]}
+            if memo:
+                await memo.store(node_type, params, result)
+            return {"success": True, "result": result}
+
+        executor.node_executor = chunker
+        nodes = [_node("t", "start"), _node("c", "textChunker")]
+        edges = [_edge("t", "c")]
+
+        first = await executor.execute_workflow("wf", nodes, edges, enable_memoization=True)
+        second = await executor.execute_workflow("wf", nodes, edges, enable_memoization=True)
+
+        assert calls == ["t", "c", "t"]
+        assert first["memo"] == {"hits": 0, "misses": 1}
+        assert second["memo"] == {"hits": 1, "misses": 0}
+        assert second["outputs"]["c"] == {"chunks": ["c"]}
+
+    async def test_disabled_by_default(self, executor):
+        seen = []
+
+        async def record(node_id, node_type, params, context):
+            seen.append(context.get("memo"))
+            return {"success": True, "result": {}}
+
+        executor.node_executor = record
+        result = await executor.execute_workflow(
+            "wf", [_node("c", "textChunker")], []
+        )
+
+        assert seen == [None]
+        assert "memo" not in result
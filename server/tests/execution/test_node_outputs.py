@@ -0,0 +1,161 @@
+"""Tests for node output aliasing and the write-behind output buffer."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from services.node_outputs import MAIN_OUTPUT, NodeOutputBuffer, NodeOutputCache, canonical_output_name
+
+from tests.execution.conftest import make_sqlite_database
+
+
+@pytest.fixture
+async def database(tmp_path):
+    db = await make_sqlite_database(tmp_path / "outputs.db")
+    yield db
+    await db.shutdown()
+
+
+class TestAliases:
+    @pytest.mark.parametrize("name", ["output_main", "output_top", "output_0"])
+    def test_main_handles_share_one_stored_name(self, name):
+        assert canonical_output_name(name) == MAIN_OUTPUT
+
+    def test_other_handles_are_stored_as_is(self):
+        assert canonical_output_name("output_message") == "output_message"
+
+
+class TestNodeOutputBuffer:
+    async def test_writes_coalesce_and_commit_in_one_batch(self):
+        db = AsyncMock()
+        db.save_node_outputs = AsyncMock(return_value=True)
+        buffer = NodeOutputBuffer(db, flush_delay=60)
+
+        buffer.put("s", "n1", MAIN_OUTPUT, {"v": 1})
+        buffer.put("s", "n1", MAIN_OUTPUT, {"v": 2})
+        buffer.put("s", "n2", MAIN_OUTPUT, {"v": 3})
+        buffer.put("other", "n3", MAIN_OUTPUT, {"v": 4})
+        assert buffer.get("s", "n1", MAIN_OUTPUT) == {"v": 2}
+
+        assert await buffer.flush("s") == 2
+        db.save_node_outputs.assert_awaited_once()
+        rows = db.save_node_outputs.await_args.args[0]
+        assert sorted(rows, key=lambda r: r[0]) == [
+            ("n1", "s", MAIN_OUTPUT, {"v": 2}),
+            ("n2", "s", MAIN_OUTPUT, {"v": 3}),
+        ]
+        # The other session stays pending
+        assert len(buffer) == 1
+        await buffer.close()
+        assert len(buffer) == 0
+
+    async def test_failed_flush_keeps_rows_without_clobbering_newer(self):
+        db = AsyncMock()
+        db.save_node_outputs = AsyncMock(return_value=False)
+        buffer = NodeOutputBuffer(db, flush_delay=60)
+
+        buffer.put("s", "n1", MAIN_OUTPUT, {"v": 1})
+        assert await buffer.flush() == 0
+        assert buffer.get("s", "n1", MAIN_OUTPUT) == {"v": 1}
+
+        db.save_node_outputs = AsyncMock(return_value=True)
+        buffer.put("s", "n1", MAIN_OUTPUT, {"v": 2})
+        await buffer.close()
+        assert db.save_node_outputs.await_args.args[0] == [("n1", "s", MAIN_OUTPUT, {"v": 2})]
+
+    async def test_discard_session_drops_pending(self):
+        buffer = NodeOutputBuffer(AsyncMock(), flush_delay=60)
+        buffer.put("s", "n1", MAIN_OUTPUT, {"v": 1})
+        buffer.discard_session("s")
+        assert buffer.get("s", "n1", MAIN_OUTPUT) is None
+        assert await buffer.flush() == 0
+
+    async def test_max_pending_triggers_flush(self):
+        db = AsyncMock()
+        db.save_node_outputs = AsyncMock(return_value=True)
+        buffer = NodeOutputBuffer(db, max_pending=2, flush_delay=60)
+
+        buffer.put("s", "n1", MAIN_OUTPUT, 1)
+        buffer.put("s", "n2", MAIN_OUTPUT, 2)
+        await buffer.close()
+        assert db.save_node_outputs.await_count >= 1
+        assert len(buffer) == 0
+
+
+class TestNodeOutputCache:
+    def test_put_get_and_session_eviction(self):
+        cache = NodeOutputCache()
+        cache.put("s1", "n1", MAIN_OUTPUT, {"v": 1})
+        cache.put("s1", "n2", MAIN_OUTPUT, {"v": 2})
+        cache.put("s2", "n1", MAIN_OUTPUT, {"v": 3})
+
+        assert cache.get("s1", "n1", MAIN_OUTPUT) == {"v": 1}
+        cache.evict_session("s1")
+        assert cache.get("s1", "n2", MAIN_OUTPUT) is None
+        assert cache.stats()["sessions"] == 1
+        assert cache.get("s2", "n1", MAIN_OUTPUT) == {"v": 3}
+
+    def test_byte_accounting_follows_overwrites_and_evictions(self):
+        cache = NodeOutputCache()
+        cache.put("s", "n", MAIN_OUTPUT, "x" * 1000)
+        large = cache.stats()["bytes"]
+        cache.put("s", "n", MAIN_OUTPUT, "x")
+
+        assert cache.stats()["bytes"] < large
+        cache.evict_session("s")
+        assert cache.stats()["bytes"] == 0
+
+    def test_least_recently_used_sessions_evicted_past_bounds(self):
+        cache = NodeOutputCache(max_sessions=2)
+        cache.put("a", "n", MAIN_OUTPUT, 1)
+        cache.put("b", "n", MAIN_OUTPUT, 2)
+        cache.get("a", "n", MAIN_OUTPUT)
+        cache.put("c", "n", MAIN_OUTPUT, 3)
+
+        assert cache.get("b", "n", MAIN_OUTPUT) is None
+        assert cache.get("a", "n", MAIN_OUTPUT) == 1
+
+        cache = NodeOutputCache(max_bytes=3000)
+        cache.put("a", "n", MAIN_OUTPUT, "x" * 2000)
+        cache.put("b", "n", MAIN_OUTPUT, "x" * 2000)
+        assert cache.stats()["sessions"] == 1
+        assert cache.get("b", "n", MAIN_OUTPUT) is not None
+
+    def test_idle_sessions_expire(self, monkeypatch):
+        import services.node_outputs as node_outputs
+
+        now = [1000.0]
+        monkeypatch.setattr(node_outputs, "time", SimpleNamespace(monotonic=lambda: now[0]))
+        cache = NodeOutputCache(ttl=60)
+        cache.put("old", "n", MAIN_OUTPUT, 1)
+        now[0] += 61
+
+        assert cache.get("old", "n", MAIN_OUTPUT) is None
+        assert cache.stats()["evictions"] == 1
+
+    def test_discard_node_across_sessions(self):
+        cache = NodeOutputCache()
+        cache.put("s1", "n", MAIN_OUTPUT, 1)
+        cache.put("s2", "n", "output_message", 2)
+        cache.put("s2", "m", MAIN_OUTPUT, 3)
+
+        assert cache.discard_node("n") == 2
+        assert len(cache) == 1
+
+
+class TestSaveNodeOutputs:
+    async def test_inserts_then_updates_in_place(self, database):
+        assert await database.save_node_outputs([
+            ("n1", "s", MAIN_OUTPUT, {"v": 1}),
+            ("n2", "s", MAIN_OUTPUT, {"v": 2}),
+        ])
+        assert await database.save_node_outputs([
+            ("n1", "s", MAIN_OUTPUT, {"v": 10}),
+            ("n1", "s", "output_message", {"m": "hi"}),
+        ])
+
+        assert await database.get_node_output("n1", "s", MAIN_OUTPUT) == {"v": 10}
+        assert await database.get_node_output("n2", "s", MAIN_OUTPUT) == {"v": 2}
+        assert await database.get_node_output("n1", "s", "output_message") == {"m": "hi"}
+        assert await database.clear_session_outputs("s") == 3
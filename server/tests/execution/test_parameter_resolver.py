@@ -0,0 +1,83 @@
+"""Tests for reference-driven template resolution in ParameterResolver."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from services.parameter_resolver import (
+    ParameterResolver, compile_template, index_nodes_by_key, template_keys,
+)
+
+
+def _nodes(count):
+    return [{"id": f"n{i}", "type": "httpRequest", "data": {"label": f"Node {i}"}} for i in range(count)]
+
+
+@pytest.fixture
+def get_output():
+    async def lookup(session_id, node_id, output_name):
+        return {"text": f"out-{node_id}", "items": [{"text": "first"}, {"text": "second"}]}
+
+    return AsyncMock(side_effect=lookup)
+
+
+class TestCompile:
+    def test_compiles_keys_and_index_steps(self):
+        (ref,) = compile_template("Hi {{Node1.items[1].text}}!")
+        assert ref.text == "{{Node1.items[1].text}}"
+        assert ref.node_key == "node1"
+        assert ref.steps == (("items", 1), ("text", None))
+
+    def test_plain_strings_have_no_refs(self):
+        assert compile_template("no templates here") == ()
+
+    def test_template_keys_walks_nested_values(self):
+        params = {"a": "{{x.v}}", "b": [{"c": "{{Y.w}} and {{z}}"}], "n": 3}
+        assert template_keys(params) == {"x", "y", "z"}
+
+
+class TestResolve:
+    async def test_template_free_parameters_skip_lookups(self, get_output):
+        resolver = ParameterResolver(database=None, get_output_fn=get_output)
+        params = {"url": "https://example.com", "retries": 3}
+
+        resolved = await resolver.resolve(params, "n0", _nodes(50), [], "s")
+
+        assert resolved == params
+        get_output.assert_not_awaited()
+
+    async def test_only_referenced_nodes_are_fetched(self, get_output):
+        resolver = ParameterResolver(database=None, get_output_fn=get_output)
+        params = {"prompt": "{{node3.text}} / {{node7.items[0].text}}", "whole": "{{node3.items[1]}}"}
+
+        resolved = await resolver.resolve(params, "n0", _nodes(50), [], "s")
+
+        assert resolved == {"prompt": "out-n3 / first", "whole": {"text": "second"}}
+        fetched = sorted(call.args[1] for call in get_output.await_args_list)
+        assert fetched == ["n3", "n7"]
+
+    async def test_unknown_reference_resolves_to_empty(self, get_output):
+        resolver = ParameterResolver(database=None, get_output_fn=get_output)
+
+        resolved = await resolver.resolve({"p": "a{{missing.x}}b"}, "n0", _nodes(3), [], "s")
+
+        assert resolved == {"p": "ab"}
+        get_output.assert_not_awaited()
+
+    async def test_self_reference_is_not_fetched(self, get_output):
+        resolver = ParameterResolver(database=None, get_output_fn=get_output)
+
+        await resolver.resolve({"p": "{{node0.text}}"}, "n0", _nodes(3), [], "s")
+
+        get_output.assert_not_awaited()
+
+    async def test_precompiled_key_index_serves_fresh_node_lists(self, get_output):
+        resolver = ParameterResolver(database=None, get_output_fn=get_output)
+        key_index = index_nodes_by_key(_nodes(50))
+
+        for run in range(3):
+            resolved = await resolver.resolve({"p": "{{node3.text}}"}, "n0", _nodes(50), [], f"s{run}",
+                                              key_index=key_index)
+            assert resolved == {"p": "out-n3"}
+
+        assert resolver._key_index == {}
@@ -0,0 +1,123 @@
+"""Tests for incremental execution state persistence."""
+
+import json
+
+import pytest
+
+from services.execution import ExecutionContext, TaskStatus, WorkflowStatus
+
+from tests.execution.conftest import make_memory_cache, make_redis_cache
+
+
+def _ctx(count=3):
+    nodes = [{"id": f"n{i}", "type": "httpRequest"} for i in range(count)]
+    ctx = ExecutionContext.create("wf", nodes=nodes, edges=[])
+    ctx.status = WorkflowStatus.RUNNING
+    return ctx
+
+
+def _complete(ctx, node_id, output):
+    node = ctx.node_executions[node_id]
+    node.status = TaskStatus.COMPLETED
+    node.output = output
+    ctx.outputs[node_id] = output
+
+
+class TestCollectDelta:
+    def test_first_call_returns_everything_then_nothing(self):
+        ctx = _ctx()
+        _complete(ctx, "n0", {"v": 0})
+
+        nodes, outputs = ctx.collect_delta()
+        assert set(nodes) == {"n0", "n1", "n2"}
+        assert outputs == {"n0": {"v": 0}}
+        assert "output" not in nodes["n0"]
+
+        assert ctx.collect_delta() == ({}, {})
+
+    def test_only_changed_nodes_and_new_outputs_are_dirty(self):
+        ctx = _ctx()
+        _complete(ctx, "n0", {"v": 0})
+        ctx.collect_delta()
+
+        _complete(ctx, "n1", {"v": 1})
+        nodes, outputs = ctx.collect_delta()
+
+        assert list(nodes) == ["n1"]
+        assert list(outputs) == ["n1"]
+
+    def test_replaced_output_is_dirty_again(self):
+        ctx = _ctx(1)
+        _complete(ctx, "n0", {"v": 0})
+        ctx.collect_delta()
+
+        ctx.outputs["n0"] = {"v": 0}  # Equal but new object (retry)
+
+        assert ctx.collect_delta()[1] == {"n0": {"v": 0}}
+
+    def test_reset_delta_forces_full_write(self):
+        ctx = _ctx(2)
+        ctx.collect_delta()
+        ctx.reset_delta()
+
+        assert set(ctx.collect_delta()[0]) == {"n0", "n1"}
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    return make_memory_cache() if request.param == "memory" else make_redis_cache()
+
+
+class TestSaveLoad:
+    async def test_round_trip(self, cache):
+        ctx = _ctx()
+        _complete(ctx, "n0", {"text": "hello"})
+        await cache.save_execution_state(ctx)
+        _complete(ctx, "n1", {"text": "world"})
+        ctx.node_executions["n2"].status = TaskStatus.FAILED
+        ctx.node_executions["n2"].error = "boom"
+        await cache.save_execution_state(ctx)
+
+        loaded = await cache.load_execution_state(ctx.execution_id, ctx.nodes, ctx.edges)
+
+        assert loaded.status == WorkflowStatus.RUNNING
+        assert loaded.outputs == {"n0": {"text": "hello"}, "n1": {"text": "world"}}
+        assert loaded.node_executions["n1"].output == {"text": "world"}
+        assert loaded.node_executions["n2"].error == "boom"
+        # A freshly loaded context has nothing left to write
+        assert loaded.collect_delta() == ({}, {})
+
+    async def test_load_missing_returns_none(self, cache):
+        assert await cache.load_execution_state("nope") is None
+
+    async def test_outputs_written_once(self):
+        cache = make_redis_cache()
+        redis = cache.cache.redis
+        ctx = _ctx(2)
+        _complete(ctx, "n0", {"blob": "x" * 1000})
+        await cache.save_execution_state(ctx)
+
+        await redis.hset(f"execution:{ctx.execution_id}:outputs", "n0", json.dumps("sentinel"))
+        _complete(ctx, "n1", {"v": 1})
+        await cache.save_execution_state(ctx)
+
+        stored = await redis.hgetall(f"execution:{ctx.execution_id}:outputs")
+        assert json.loads(stored["n0"]) == "sentinel"
+        assert json.loads(stored["n1"]) == {"v": 1}
+        state = await redis.hgetall(f"execution:{ctx.execution_id}:state")
+        assert "outputs" not in state and "node_executions" not in state
+
+    async def test_loads_legacy_inline_state(self):
+        cache = make_redis_cache()
+        ctx = _ctx(1)
+        _complete(ctx, "n0", {"v": 0})
+        legacy = {
+            k: json.dumps(v) if isinstance(v, (dict, list)) else str(v)
+            for k, v in ctx.to_dict().items()
+        }
+        await cache.cache.redis.hset(f"execution:{ctx.execution_id}:state", mapping=legacy)
+
+        loaded = await cache.load_execution_state(ctx.execution_id)
+
+        assert loaded.outputs == {"n0": {"v": 0}}
+        assert loaded.node_executions["n0"].status == TaskStatus.COMPLETED
@@ -0,0 +1,170 @@
+"""Tests for deployment run plans and executing a run from a precompiled graph."""
+
+from services.deployment import compile_run_plan, compile_run_plans
+from services.execution import ExecutionContext
+
+
+def _node(node_id, node_type="httpRequest"):
+    return {"id": node_id, "type": node_type, "parameters": {}}
+
+
+def _edge(source, target, target_handle=None):
+    edge = {"id": f"{source}-{target}", "source": source, "target": target}
+    if target_handle:
+        edge["targetHandle"] = target_handle
+    return edge
+
+
+def _workflow():
+    nodes = [
+        _node("hook", "webhookTrigger"),
+        _node("cron", "cronScheduler"),
+        _node("a"),
+        _node("agent", "aiAgent"),
+        _node("model", "openaiChatModel"),
+        _node("tool", "calculatorTool"),
+        _node("toolkit", "androidTool"),
+        _node("battery", "batteryMonitor"),
+        _node("other"),
+    ]
+    edges = [
+        _edge("hook", "a"),
+        _edge("a", "agent"),
+        _edge("model", "agent", "input-model"),
+        _edge("tool", "agent", "input-tools"),
+        _edge("toolkit", "agent", "input-tools"),
+        _edge("battery", "toolkit"),
+        _edge("agent", "cron"),  # walk stops at other triggers
+        _edge("cron", "other"),
+    ]
+    return nodes, edges
+
+
+class TestRunPlan:
+    def test_plan_covers_reachable_nodes_and_attachments(self):
+        nodes, edges = _workflow()
+        plan = compile_run_plan("hook", nodes, edges)
+
+        assert plan.downstream_ids == ("a", "agent", "model", "tool", "toolkit", "battery")
+        assert [n["id"] for n in plan.nodes] == ["hook", *plan.downstream_ids]
+        assert {(e["source"], e["target"]) for e in plan.edges} == {
+            ("hook", "a"), ("a", "agent"), ("model", "agent"), ("tool", "agent"),
+            ("toolkit", "agent"), ("battery", "toolkit"),
+        }
+
+    def test_triggers_are_not_config_sources(self):
+        nodes = [_node("hook", "webhookTrigger"), _node("chat", "chatTrigger"), _node("agent", "aiAgent")]
+        edges = [_edge("hook", "agent"), _edge("chat", "agent", "input-chat")]
+
+        plan = compile_run_plan("hook", nodes, edges)
+
+        assert [n["id"] for n in plan.nodes] == ["hook", "agent"]
+
+    def test_non_firing_triggers_are_pre_executed(self):
+        nodes = [_node("chat", "chatTrigger"), _node("agent", "aiAgent"), _node("hook", "webhookTrigger")]
+        edges = [_edge("chat", "agent"), _edge("hook", "agent", "input-tools")]
+
+        plan = compile_run_plan("chat", nodes, edges)
+
+        assert [n["id"] for n in plan.nodes] == ["chat", "agent", "hook"]
+        assert "_pre_executed" not in plan.nodes[0]
+        assert plan.nodes[2]["_pre_executed"] is True
+        assert plan.nodes[2]["_trigger_output"] == {"not_triggered": True}
+
+    def test_trigger_feeding_only_triggers_has_empty_plan(self):
+        nodes = [_node("cron", "cronScheduler"), _node("hook", "webhookTrigger"), _node("a")]
+        edges = [_edge("cron", "hook"), _edge("hook", "a")]
+
+        plan = compile_run_plan("cron", nodes, edges)
+
+        assert plan.is_empty
+        assert [n["id"] for n in plan.nodes] == ["cron"]
+
+    def test_instantiate_copies_only_the_firing_trigger(self):
+        nodes, edges = _workflow()
+        plan = compile_run_plan("hook", nodes, edges)
+
+        first, _ = plan.instantiate({"n": 1})
+        second, run_edges = plan.instantiate({"n": 2})
+
+        assert first[0]["_trigger_output"] == {"n": 1}
+        assert second[0]["_trigger_output"] == {"n": 2}
+        assert "_trigger_output" not in plan.nodes[0]
+        assert first[1] is second[1] is plan.nodes[1]
+        assert run_edges == list(plan.edges)
+
+    def test_compile_run_plans_per_trigger(self):
+        nodes, edges = _workflow()
+        plans = compile_run_plans(["hook", "cron"], nodes, edges)
+
+        assert plans["cron"].downstream_ids == ("other",)
+        assert plans["hook"].graph.get_node("a") is plans["hook"].nodes[1]
+
+
+class TestRunFromPlan:
+    def test_fork_shares_structure_with_fresh_state(self):
+        nodes, edges = _workflow()
+        plan = compile_run_plan("hook", nodes, edges)
+        plan.graph.settle("hook")
+
+        run_nodes, _ = plan.instantiate({})
+        forked = plan.graph.fork(run_nodes)
+
+        assert forked.dependencies is plan.graph.dependencies
+        assert forked.get_node("hook") is run_nodes[0]
+        assert forked.settled == set()
+        assert not forked.is_ready("a")
+
+    def test_key_index_is_compiled_once_and_shared_by_runs(self):
+        nodes, edges = _workflow()
+        plan = compile_run_plan("hook", nodes, edges)
+
+        first = plan.graph.fork(plan.instantiate({"n": 1})[0])
+        second = plan.graph.fork(plan.instantiate({"n": 2})[0])
+
+        assert first.key_index is second.key_index is plan.graph.key_index
+        assert plan.graph.key_index["webhooktrigger"] == (("hook", "webhookTrigger"),)
+        assert plan.graph.key_index["httprequest"] == (("a", "httpRequest"),)
+
+    def test_create_uses_given_graph(self):
+        nodes, edges = _workflow()
+        plan = compile_run_plan("hook", nodes, edges)
+        run_nodes, run_edges = plan.instantiate({})
+        graph = plan.graph.fork(run_nodes)
+
+        ctx = ExecutionContext.create("wf", nodes=run_nodes, edges=run_edges, graph=graph)
+
+        assert ctx.graph is graph
+        assert set(ctx.node_executions) == {"hook", "a", "agent"}
+
+    async def test_executor_runs_plan_and_caches_layers(self, executor):
+        nodes, edges = _workflow()
+        plan = compile_run_plan("hook", nodes, edges)
+
+        for n in (1, 2):
+            run_nodes, run_edges = plan.instantiate({"n": n})
+            result = await executor.execute_workflow("wf", run_nodes, run_edges, graph=plan.graph)
+
+            assert result["success"]
+            assert set(result["outputs"]) == {"hook", "a", "agent"}
+            assert result["outputs"]["hook"] == {"n": n}
+
+        assert plan.graph.layers == [["hook"], ["a"], ["agent"]]
+
+    async def test_executor_hands_the_plans_key_index_to_nodes(self, execution_cache):
+        from services.execution import WorkflowExecutor
+
+        seen = []
+
+        async def node_executor(node_id, node_type, params, context):
+            seen.append(context["key_index"])
+            return {"success": True, "result": {}}
+
+        nodes, edges = _workflow()
+        plan = compile_run_plan("hook", nodes, edges)
+        executor = WorkflowExecutor(cache=execution_cache, node_executor=node_executor)
+        run_nodes, run_edges = plan.instantiate({})
+
+        await executor.execute_workflow("wf", run_nodes, run_edges, graph=plan.graph)
+
+        assert seen and all(index is plan.graph.key_index for index in seen)
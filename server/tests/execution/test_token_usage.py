@@ -0,0 +1,123 @@
+"""Tests for the write-behind token usage accumulator."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from services.token_usage import TokenUsageAccumulator, default_session_state
+
+from tests.execution.conftest import make_sqlite_database
+
+
+def _db(saved=True, stored=None):
+    db = AsyncMock()
+    db.get_or_create_session_token_state = AsyncMock(
+        side_effect=lambda sid: {**default_session_state(sid), **(stored or {})})
+    db.save_token_usage = AsyncMock(return_value=saved)
+    return db
+
+
+def _usage(tokens, cost=0.5):
+    return {"cumulative_total": tokens, "cumulative_total_cost": cost}
+
+
+class TestAccumulator:
+    async def test_state_is_loaded_once_then_kept_in_memory(self):
+        db = _db(stored={"cumulative_total": 100})
+        usage = TokenUsageAccumulator(db, flush_delay=60)
+
+        results = await asyncio.gather(*(usage.add("s", {"model": "m"}, _usage(10)) for _ in range(5)))
+
+        db.get_or_create_session_token_state.assert_awaited_once_with("s")
+        assert sorted(r["cumulative_total"] for r in results) == [110, 120, 130, 140, 150]
+        assert (await usage.get_state("s"))["cumulative_total_cost"] == pytest.approx(2.5)
+        db.save_token_usage.assert_not_awaited()
+        await usage.close()
+
+    async def test_flush_writes_metrics_and_dirty_states_in_one_batch(self):
+        db = _db()
+        usage = TokenUsageAccumulator(db, flush_delay=60)
+        await usage.add("a", {"model": "m1"}, _usage(10))
+        await usage.add("b", {"model": "m2"}, _usage(20))
+        await usage.update("a", {"custom_threshold": 5000})
+
+        assert await usage.flush() == 2
+        metrics, states = db.save_token_usage.await_args.args
+        assert [(m["session_id"], m["model"]) for m in metrics] == [("a", "m1"), ("b", "m2")]
+        assert all(m["created_at"] is not None for m in metrics)
+        assert states["a"]["custom_threshold"] == 5000
+        assert states["b"]["cumulative_total"] == 20
+        assert await usage.flush() == 0
+        assert db.save_token_usage.await_count == 1
+
+    async def test_size_threshold_triggers_flush(self):
+        db = _db()
+        usage = TokenUsageAccumulator(db, max_pending=3, flush_delay=60)
+
+        for _ in range(3):
+            await usage.add("s", {}, _usage(1))
+        await asyncio.sleep(0)
+
+        assert len(db.save_token_usage.await_args.args[0]) == 3
+        assert usage.pending_metrics == 0
+
+    async def test_interval_flush(self):
+        db = _db()
+        usage = TokenUsageAccumulator(db, flush_delay=0.01)
+
+        await usage.add("s", {}, _usage(1))
+        await asyncio.sleep(0.05)
+
+        db.save_token_usage.assert_awaited_once()
+
+    async def test_failed_flush_keeps_batch_in_order(self):
+        db = _db(saved=False)
+        usage = TokenUsageAccumulator(db, flush_delay=60)
+        await usage.add("s", {"iteration": 1}, _usage(1))
+
+        assert await usage.flush() == 0
+        await usage.add("s", {"iteration": 2}, _usage(1))
+        db.save_token_usage.return_value = True
+        assert await usage.flush() == 2
+
+        metrics, states = db.save_token_usage.await_args.args
+        assert [m["iteration"] for m in metrics] == [1, 2]
+        assert states["s"]["cumulative_total"] == 2
+
+    async def test_only_clean_sessions_are_evicted(self):
+        db = _db()
+        usage = TokenUsageAccumulator(db, max_sessions=2, flush_delay=60)
+        await usage.add("a", {}, _usage(1))
+        await usage.get_state("b")
+        await usage.get_state("c")
+
+        assert usage.stats()["sessions"] == 2
+        assert (await usage.get_state("a"))["cumulative_total"] == 1
+        assert db.get_or_create_session_token_state.await_count == 3
+
+
+class TestPersistence:
+    @pytest.fixture
+    async def database(self, tmp_path):
+        db = await make_sqlite_database(tmp_path / "usage.db")
+        yield db
+        await db.shutdown()
+
+    async def test_close_persists_state_and_metrics(self, database):
+        usage = TokenUsageAccumulator(database, flush_delay=60)
+        for n in range(3):
+            await usage.add("s", {"node_id": "agent", "provider": "openai", "model": "gpt",
+                                  "total_tokens": 10, "total_cost": 0.25, "iteration": n},
+                            {"cumulative_total": 10, "cumulative_total_cost": 0.25})
+        await usage.update("s", {"compaction_count": 1, "last_compaction_at": "2026-01-01T00:00:00+00:00"})
+
+        await usage.close()
+
+        state = await database.get_or_create_session_token_state("s")
+        assert state["cumulative_total"] == 30
+        assert state["cumulative_total_cost"] == pytest.approx(0.75)
+        assert state["compaction_count"] == 1
+        assert len(await database.get_session_token_metrics("s")) == 3
+        reloaded = TokenUsageAccumulator(database)
+        assert (await reloaded.get_state("s"))["cumulative_total"] == 30
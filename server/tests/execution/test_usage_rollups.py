@@ -0,0 +1,100 @@
+"""Tests for the hourly/daily usage rollups behind the usage summaries."""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tests.execution.conftest import make_sqlite_database
+
+T0 = datetime(2026, 3, 1, 10, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def database(tmp_path):
+    db = await make_sqlite_database(tmp_path / "usage.db")
+    yield db
+    await db.shutdown()
+
+
+def _metric(hours, model="gpt", provider="openai"):
+    return {"session_id": "s", "provider": provider, "model": model, "input_tokens": 10,
+            "output_tokens": 5, "total_tokens": 15, "input_cost": 0.006, "output_cost": 0.004,
+            "total_cost": 0.01, "created_at": T0 + timedelta(hours=hours)}
+
+
+def _counts(summary):
+    return {p["provider"]: p["execution_count"] for p in summary}
+
+
+class TestTokenRollups:
+    async def test_summary_matches_raw_metrics(self, database):
+        await database.save_token_usage([_metric(h, model="gpt" if h % 2 else "mini") for h in range(48)], {})
+        await database.save_token_metric(_metric(0, provider="anthropic", model="claude"))
+
+        summary = {p["provider"]: p for p in await database.get_provider_usage_summary()}
+
+        openai = summary["openai"]
+        assert openai["execution_count"] == 48
+        assert openai["total_tokens"] == 720
+        assert openai["total_cost"] == pytest.approx(0.48)
+        assert {m["model"]: m["execution_count"] for m in openai["models"]} == {"gpt": 24, "mini": 24}
+        assert summary["anthropic"]["execution_count"] == 1
+
+    async def test_range_uses_hour_resolution(self, database):
+        await database.save_token_usage([_metric(h) for h in range(48)], {})
+
+        # 12:00 day 1 .. 17:00 day 2 (edges rounded out to whole hours)
+        summary = await database.get_provider_usage_summary(
+            start=T0 + timedelta(hours=2), end=T0 + timedelta(hours=30))
+
+        assert _counts(summary) == {"openai": 29}
+
+    async def test_prune_keeps_totals_and_widens_old_ranges_to_days(self, database):
+        await database.save_token_usage([_metric(h) for h in range(48)], {})
+
+        deleted = await database.prune_usage_history(raw_days=1, hourly_days=1)
+
+        assert deleted["token_metrics"] == 48
+        assert deleted["token_hourly"] == 48
+        assert await database.get_session_token_metrics("s") == []
+        assert _counts(await database.get_provider_usage_summary()) == {"openai": 48}
+        # Hourly rows are gone: both edges widen to whole days (all of day 1 and day 2)
+        summary = await database.get_provider_usage_summary(
+            start=T0 + timedelta(hours=2), end=T0 + timedelta(hours=30))
+        assert _counts(summary) == {"openai": 38}
+
+    async def test_existing_history_is_backfilled(self, tmp_path):
+        path = tmp_path / "legacy.db"
+        db = await make_sqlite_database(path)
+        await db.save_token_metric(_metric(0))
+        await db.shutdown()
+
+        conn = sqlite3.connect(path)
+        conn.execute("DELETE FROM token_usage_rollups")
+        conn.commit()
+        conn.close()
+
+        db = await make_sqlite_database(path)
+        try:
+            assert _counts(await db.get_provider_usage_summary()) == {"openai": 1}
+        finally:
+            await db.shutdown()
+
+
+class TestApiRollups:
+    async def test_api_summary_reads_rollups(self, database):
+        for count in (3, 2):
+            await database.save_api_usage_metric({"service": "twitter", "operation": "posts_read",
+                                                  "resource_count": count, "cost": 0.1})
+
+        summary = await database.get_api_usage_summary("twitter")
+        recent = await database.get_api_usage_summary(
+            start=datetime.now(timezone.utc) - timedelta(minutes=5))
+        old = await database.get_api_usage_summary(end=datetime(2020, 1, 1, tzinfo=timezone.utc))
+
+        assert summary[0]["total_resources"] == 5
+        assert summary[0]["execution_count"] == 2
+        assert summary[0]["total_cost"] == pytest.approx(0.2)
+        assert recent == summary
+        assert old == []
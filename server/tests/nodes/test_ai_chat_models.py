@@ -381,3 +381,105 @@ class TestValidationErrors:
 
         harness.assert_envelope(result, success=False)
         assert "api key" in result["error"].lower()
+
+
+# ============================================================================
+# Deployment parameter snapshot (NodeExecutor._prepare_parameters)
+# ============================================================================
+
+
+class TestDeploymentParamSnapshot:
+    """Deployed runs reuse prepared params until parameters or credentials change."""
+
+    def _deployed(self, harness):
+        from unittest.mock import MagicMock
+        from services.deployment import ParameterSnapshot
+
+        versions = {"params": 0}
+        harness.database.node_parameters_version = MagicMock(side_effect=lambda _id: versions["params"])
+        harness.ai_service.auth.credentials_version = 0
+        harness.ai_service.execute_chat = AsyncMock(return_value=_canned_success("openai"))
+        snapshot = ParameterSnapshot()
+
+        async def run(params):
+            ctx = harness.build_context(extra={"param_snapshot": snapshot})
+            return await harness.execute("openaiChatModel", params, node_id="chat_1", context=ctx)
+
+        return run, versions
+
+    async def test_repeat_runs_skip_db_and_auth(self, harness):
+        run, _ = self._deployed(harness)
+
+        for _ in range(3):
+            harness.assert_envelope(await run({"prompt": "hi"}), success=True)
+
+        assert harness.database.get_node_parameters.await_count == 1
+        assert harness.ai_service.auth.get_api_key.await_count == 1
+        params = harness.ai_service.execute_chat.await_args.args[2]
+        assert params["api_key"] == "test-api-key"
+
+    async def test_parameter_save_and_key_change_invalidate(self, harness):
+        run, versions = self._deployed(harness)
+
+        await run({"prompt": "hi"})
+        versions["params"] += 1  # save_node_parameters
+        await run({"prompt": "hi"})
+        harness.ai_service.auth.credentials_version += 1  # store_api_key
+        await run({"prompt": "hi"})
+        await run({"prompt": "changed"})  # different run params
+
+        assert harness.database.get_node_parameters.await_count == 4
+
+    def test_snapshot_hands_out_independent_copies(self):
+        from services.deployment import ParameterSnapshot
+
+        snapshot = ParameterSnapshot()
+        prepared = {"prompt": "hi", "stop": ["a"], "options": {"temperature": 0.1}}
+        snapshot.put("chat_1", {"prompt": "hi"}, prepared, (0, 0))
+        prepared["stop"].append("from caller")
+
+        first = snapshot.get("chat_1", {"prompt": "hi"}, (0, 0))
+        first["stop"].append("b")
+        first["options"]["temperature"] = 1.0
+
+        assert snapshot.get("chat_1", {"prompt": "hi"}, (0, 0)) == {
+            "prompt": "hi", "stop": ["a"], "options": {"temperature": 0.1}}
+
+    async def test_parameters_version_moves_only_after_the_commit(self, tmp_path, monkeypatch):
+        from sqlalchemy.ext.asyncio import AsyncSession
+        from tests.execution.conftest import make_sqlite_database
+
+        db = await make_sqlite_database(tmp_path / "params.db")
+        commit, at_commit = AsyncSession.commit, []
+
+        async def observed_commit(session):
+            # A reader loading the old row now must cache it under the old version
+            at_commit.append(db.node_parameters_version("chat_1"))
+            await commit(session)
+
+        monkeypatch.setattr(AsyncSession, "commit", observed_commit)
+        await db.save_node_parameters("chat_1", {"prompt": "old"})
+        await db.save_node_parameters("chat_1", {"prompt": "new"})
+        await db.delete_node_parameters("chat_1")
+
+        assert at_commit == [0, 1, 2]
+        assert db.node_parameters_version("chat_1") == 3
+
+        async def failing_commit(session):
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(AsyncSession, "commit", failing_commit)
+        assert await db.save_node_parameters("chat_1", {"prompt": "lost"}) is False
+        assert db.node_parameters_version("chat_1") == 3
+        await db.shutdown()
+
+    async def test_saving_a_workflow_reports_success(self, tmp_path):
+        from tests.execution.conftest import make_sqlite_database
+
+        db = await make_sqlite_database(tmp_path / "workflows.db")
+
+        assert await db.save_workflow("wf-1", "First", {"nodes": [], "edges": []}) is True
+        assert await db.save_workflow("wf-1", "Renamed", {"nodes": [], "edges": []}) is True
+        assert (await db.get_workflow("wf-1")).name == "Renamed"
+        assert db.node_parameters_version("wf-1") == 0
+        await db.shutdown()
@@ -12,13 +12,17 @@ External side-effects are mocked:
     (`services.handlers.document.<lib>`), or real HTML is fed through
     BeautifulSoup for the happy path.
   - textChunker: pure function, exercised with real LangChain splitters.
-  - embeddingGenerator: the embedder class is patched to return canned vectors.
+  - embeddingGenerator: the embedder class is patched to return canned vectors
+    (behind a fresh process-wide EmbeddingService per test).
   - vectorStore: the ChromaDB client is patched to a fake collection.
 """
 
 from __future__ import annotations
 
+import asyncio
+import os
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -119,6 +123,37 @@ class TestHttpScraper:
         # Three calls: 01, 02, 03
         assert len(respx.calls) == 3
 
+    @respx.mock
+    async def test_pages_fetched_concurrently_in_order(self, harness):
+        in_flight, peak = 0, 0
+
+        async def slow_page(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            page = request.url.path.strip("/")
+            return httpx.Response(200, text=f'<a href="{page}.pdf">x</a>')
+
+        respx.get(url__regex=r"https://example\.com/p\d+").mock(side_effect=slow_page)
+
+        result = await harness.execute(
+            "httpScraper",
+            {
+                "url": "https://example.com/p{page}",
+                "iterationMode": "page",
+                "startPage": 1,
+                "endPage": 6,
+                "linkSelector": "a",
+                "maxConcurrency": 3,
+            },
+        )
+
+        harness.assert_envelope(result, success=True)
+        assert peak == 3
+        assert [i["page"] for i in result["result"]["items"]] == [1, 2, 3, 4, 5, 6]
+
 
 # ============================================================================
 # fileDownloader
@@ -207,6 +242,126 @@ class TestFileDownloader:
         assert result["result"]["failed"] == 1
         assert result["result"]["downloaded"] == 0
 
+    @respx.mock
+    async def test_interrupted_download_resumes_with_range(self, harness, tmp_path):
+        (tmp_path / "a.pdf.part").write_bytes(b"AAA")
+        (tmp_path / ".downloads").mkdir()
+        (tmp_path / ".downloads" / "a.pdf.json").write_text(
+            '{"url": "https://example.com/a.pdf", "etag": "\\"v1\\"", "complete": false}'
+        )
+        route = respx.get("https://example.com/a.pdf").mock(
+            return_value=httpx.Response(206, content=b"BBB",
+                                        headers={"Content-Range": "bytes 3-5/6", "ETag": '"v1"'})
+        )
+
+        result = await harness.execute(
+            "fileDownloader",
+            {"items": ["https://example.com/a.pdf"], "outputDir": str(tmp_path)},
+        )
+
+        harness.assert_envelope(result, success=True)
+        request = route.calls.last.request
+        assert request.headers["Range"] == "bytes=3-"
+        assert request.headers["If-Range"] == '"v1"'
+        assert result["result"]["files"][0]["resumed"] is True
+        assert (tmp_path / "a.pdf").read_bytes() == b"AAABBB"
+        assert not (tmp_path / "a.pdf.part").exists()
+
+    @respx.mock
+    async def test_revalidate_sends_validators_and_keeps_file_on_304(self, harness, tmp_path):
+        route = respx.get("https://example.com/a.pdf").mock(side_effect=[
+            httpx.Response(200, content=b"AAA",
+                           headers={"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}),
+            httpx.Response(304),
+        ])
+        params = {"items": ["https://example.com/a.pdf"], "outputDir": str(tmp_path), "revalidate": True}
+
+        first = await harness.execute("fileDownloader", params)
+        second = await harness.execute("fileDownloader", params)
+
+        assert first["result"]["downloaded"] == 1
+        assert second["result"]["skipped"] == 1 and second["result"]["downloaded"] == 0
+        request = route.calls.last.request
+        assert request.headers["If-None-Match"] == '"v1"'
+        assert request.headers["If-Modified-Since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+        assert (tmp_path / "a.pdf").read_bytes() == b"AAA"
+
+    async def test_downloads_share_one_pooled_client(self, harness, tmp_path):
+        from services import http_pool
+
+        seen = []
+        original = http_pool.lease_http_client
+
+        @asynccontextmanager
+        async def spy(proxy=None):
+            async with original(proxy) as client:
+                seen.append(client)
+                yield client
+
+        with respx.mock:
+            respx.get(url__regex=r"https://example\.com/.*").mock(return_value=httpx.Response(200, content=b"x"))
+            with patch("services.handlers.document.lease_http_client", spy):
+                for name in ("a", "b"):
+                    await harness.execute(
+                        "fileDownloader",
+                        {"items": [f"https://example.com/{name}.pdf"], "outputDir": str(tmp_path)},
+                    )
+
+        assert len(seen) == 2 and seen[0] is seen[1]
+
+
+class TestHttpPool:
+    @pytest.fixture(autouse=True)
+    async def empty_pool(self):
+        from services import http_pool
+
+        await http_pool.close_http_clients()
+        yield http_pool
+        await http_pool.close_http_clients()
+
+    async def test_evicted_client_stays_open_while_leased(self, empty_pool, monkeypatch):
+        monkeypatch.setattr(empty_pool, "MAX_CLIENTS", 1)
+
+        async with empty_pool.lease_http_client() as direct:
+            async with empty_pool.lease_http_client("http://u:p@gw-a:8000"):
+                pass
+            assert not direct.is_closed
+        assert direct.is_closed
+
+    async def test_sticky_sessions_share_one_gateway_slot(self, empty_pool):
+        urls = [f"http://user-session-{n}:pw@gw.example:7000" for n in range(40)]
+        clients = []
+        async with empty_pool.lease_http_client() as direct:
+            for url in urls:
+                async with empty_pool.lease_http_client(url) as client:
+                    clients.append(client)
+            await asyncio.sleep(0.05)
+
+            assert len(empty_pool._clients) == 2
+            assert not direct.is_closed
+            assert [c.is_closed for c in clients] == [True] * 39 + [False]
+
+    async def test_client_of_another_loop_is_closed_on_that_loop(self, empty_pool):
+        import threading
+
+        other = asyncio.new_event_loop()
+        thread = threading.Thread(target=other.run_forever)
+        thread.start()
+        try:
+            async def lease():
+                async with empty_pool.lease_http_client() as client:
+                    return client
+
+            client = asyncio.run_coroutine_threadsafe(lease(), other).result(5)
+            await empty_pool.close_http_clients()
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), other))
+
+            assert client.is_closed
+        finally:
+            other.call_soon_threadsafe(other.stop)
+            thread.join()
+            other.close()
+
 
 # ============================================================================
 # documentParser
@@ -267,7 +422,7 @@ class TestDocumentParser:
         assert "Unknown parser" in payload["failed"][0]["error"]
 
     async def test_pypdf_branch_via_patched_reader(self, harness, tmp_path):
-        # Patch pypdf at its import site inside _parse_file_sync.
+        # Patch pypdf at its import site inside document_parsing.parse_file.
         f = tmp_path / "doc.pdf"
         f.write_bytes(b"%PDF-FAKE")
 
@@ -290,6 +445,128 @@ class TestDocumentParser:
         assert "page text" in doc["content"]
 
 
+    async def test_skip_unchanged_files(self, harness, tmp_path):
+        import os
+
+        a, b = tmp_path / "a.html", tmp_path / "b.html"
+        a.write_text("<p>alpha</p>")
+        b.write_text("<p>beta</p>")
+        params = {"inputDir": str(tmp_path), "filePattern": "*.html", "parser": "beautifulsoup",
+                  "skipUnchanged": True}
+        ctx = harness.build_context(workspace_dir=str(tmp_path / "ws"))
+
+        first = await harness.execute("documentParser", params, node_id="parser", context=ctx)
+        os.utime(a, ns=(1, 1))  # Touched, same content
+        b.write_text("<p>beta v2</p>")
+        second = await harness.execute("documentParser", params, node_id="parser", context=ctx)
+
+        assert first["result"]["parsed_count"] == 2 and first["result"]["skipped"] == 0
+        assert [d["filename"] for d in second["result"]["documents"]] == ["b.html"]
+        assert second["result"]["skipped"] == 1
+        assert "beta v2" in second["result"]["documents"][0]["content"]
+
+    async def test_streaming_spools_documents_for_text_chunker(self, harness, tmp_path):
+        for i in range(3):
+            (tmp_path / f"{i}.html").write_text(f"<p>{'word ' * 300}doc{i}</p>")
+        parsed = await harness.execute("documentParser", {
+            "inputDir": str(tmp_path), "filePattern": "*.html", "parser": "beautifulsoup",
+            "streaming": True,
+        }, context=harness.build_context(workspace_dir=str(tmp_path / "ws")))
+        documents = parsed["result"]["documents"]
+        chunked = await harness.execute("textChunker", {"documents": documents, "chunkSize": 500,
+                                                         "chunkOverlap": 0})
+
+        assert documents["__spool__"] == "jsonl" and documents["count"] == 3
+        assert parsed["result"]["parsed_count"] == 3
+        sources = {c["source"] for c in chunked["result"]["chunks"]}
+        assert sources == {str(tmp_path / f"{i}.html") for i in range(3)}
+
+    async def test_streaming_spools_are_per_session_hashed_and_released(self, harness, tmp_path):
+        from services.document_parsing import release_spools
+
+        (tmp_path / "a.html").write_text("<p>alpha</p>")
+        params = {"inputDir": str(tmp_path), "filePattern": "*.html", "parser": "beautifulsoup",
+                  "streaming": True}
+        runs = {}
+        for session in ("run_1", "run_2"):
+            ctx = harness.build_context(session_id=session, workspace_dir=str(tmp_path / "ws"))
+            runs[session] = (await harness.execute("documentParser", params, node_id="parser",
+                                                   context=ctx))["result"]["documents"]
+        (tmp_path / "a.html").write_text("<p>alpha v2</p>")
+        ctx = harness.build_context(session_id="run_3", workspace_dir=str(tmp_path / "ws"))
+        changed = (await harness.execute("documentParser", params, node_id="parser",
+                                         context=ctx))["result"]["documents"]
+
+        assert runs["run_1"]["path"] != runs["run_2"]["path"]
+        assert runs["run_1"]["sha256"] == runs["run_2"]["sha256"] != changed["sha256"]
+        assert release_spools("run_1") == 1
+        assert not Path(runs["run_1"]["path"]).exists()
+        assert Path(runs["run_2"]["path"]).exists()
+        release_spools("run_2")
+        release_spools("run_3")
+
+    def test_runs_share_one_pool_and_workers_are_clamped(self, monkeypatch):
+        from services import document_parsing
+
+        monkeypatch.setattr(document_parsing, "PARSE_POOL_WORKERS", 4)
+        assert document_parsing.clamp_workers(1000) == 4
+        assert document_parsing.clamp_workers(0) == 1
+        try:
+            pool = document_parsing.get_parse_pool()
+            assert document_parsing.get_parse_pool() is pool
+            assert pool._max_workers == 4
+        finally:
+            document_parsing.shutdown_parse_pool()
+        assert document_parsing._pool is None
+
+    def test_concurrent_runs_keep_each_others_manifest_entries(self, tmp_path):
+        from services.document_parsing import ParseManifest, file_sha256
+
+        def fingerprint(f):
+            stat = os.stat(f)
+            return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": file_sha256(f)}
+
+        path = tmp_path / "parser.manifest.json"
+        files = []
+        for name in ("a.html", "b.html"):
+            (tmp_path / name).write_text(f"<p>{name}</p>")
+            files.append(str(tmp_path / name))
+        # Both runs load the manifest before either saves
+        first, second = ParseManifest(path), ParseManifest(path)
+        first.record(files[0], "beautifulsoup", fingerprint(files[0]))
+        second.record(files[1], "beautifulsoup", fingerprint(files[1]))
+        first.save()
+        second.save()
+
+        reloaded = ParseManifest(path)
+        assert all(reloaded.is_unchanged(f, "beautifulsoup") for f in files)
+
+    @pytest.mark.slow
+    async def test_process_pool_parses_in_parallel_workers(self, harness, tmp_path):
+        from services import document_parsing
+
+        files = []
+        for i in range(4):
+            f = tmp_path / f"{i}.html"
+            f.write_text(f"<p>doc {i}</p>")
+            files.append({"path": str(f)})
+        files.append({"path": str(tmp_path / "missing.html")})
+
+        try:
+            result = await harness.execute("documentParser", {
+                "files": files, "parser": "beautifulsoup", "workers": 64,
+            })
+            # One pool, sized to the CPUs rather than the requested workers
+            assert document_parsing._pool._max_workers == document_parsing.PARSE_POOL_WORKERS
+        finally:
+            document_parsing.shutdown_parse_pool()
+
+        harness.assert_envelope(result, success=True)
+        # Input order is kept even though files finish out of order
+        assert [d["filename"] for d in result["result"]["documents"]] == [f"{i}.html" for i in range(4)]
+        assert len(result["result"]["failed"]) == 1
+
+
 # ============================================================================
 # textChunker
 # ============================================================================
@@ -362,6 +639,12 @@ class TestTextChunker:
 
 
 class TestEmbeddingGenerator:
+    @pytest.fixture(autouse=True)
+    def fresh_embedding_service(self, monkeypatch):
+        from services import embeddings
+
+        monkeypatch.setattr(embeddings, "_service", None)
+
     async def test_huggingface_happy_path_with_patched_embedder(self, harness):
         # Patch langchain_huggingface at its lazy import site.
         fake_embedder = MagicMock()
@@ -394,6 +677,12 @@ class TestEmbeddingGenerator:
         assert payload["embedding_count"] == 2
         assert payload["dimensions"] == 3
         assert payload["provider"] == "huggingface"
+        # Packed float32 matrix, not nested float lists
+        from services.vectors import is_vector_payload, to_lists
+        assert is_vector_payload(payload["embeddings"])
+        assert payload["embeddings"]["shape"] == [2, 3]
+        rows = to_lists(payload["embeddings"])
+        assert rows[0] == pytest.approx([0.1, 0.2, 0.3]) and rows[1] == pytest.approx([0.4, 0.5, 0.6])
         # Embedder was constructed with the requested model
         fake_hf_mod.HuggingFaceEmbeddings.assert_called_once()
         kwargs = fake_hf_mod.HuggingFaceEmbeddings.call_args.kwargs
@@ -451,6 +740,7 @@ class _FakeChromaCollection:
     def __init__(self):
         self.added = []
         self.deleted_ids = []
+        self.queries = []
         self._count = 0
 
     def add(self, ids, embeddings, documents, metadatas):
@@ -462,11 +752,13 @@ class _FakeChromaCollection:
         return self._count
 
     def query(self, query_embeddings, n_results):
+        self.queries.append(query_embeddings)
+        n = len(query_embeddings)
         return {
-            "ids": [["id-1", "id-2"]],
-            "documents": [["doc one", "doc two"]],
-            "metadatas": [[{"source": "s1"}, {"source": "s2"}]],
-            "distances": [[0.1, 0.2]],
+            "ids": [["id-1", "id-2"]] * n,
+            "documents": [["doc one", "doc two"]] * n,
+            "metadatas": [[{"source": "s1"}, {"source": "s2"}]] * n,
+            "distances": [[0.1, 0.2]] * n,
         }
 
     def delete(self, ids):
@@ -484,6 +776,12 @@ def _patched_chromadb_module():
 
 
 class TestVectorStore:
+    @pytest.fixture(autouse=True)
+    def fresh_vector_store_registry(self, monkeypatch):
+        from services import vector_stores
+
+        monkeypatch.setattr(vector_stores, "_registry", None)
+
     async def test_chroma_store_happy_path(self, harness, tmp_path):
         chromadb_mod, coll = _patched_chromadb_module()
 
@@ -511,9 +809,31 @@ class TestVectorStore:
         # The collection actually received our vectors + docs
         assert len(coll.added) == 1
         batch = coll.added[0]
-        assert batch["embeddings"] == [[0.1, 0.2], [0.3, 0.4]]
+        assert batch["embeddings"].dtype == "float32"
+        assert batch["embeddings"].flatten().tolist() == pytest.approx([0.1, 0.2, 0.3, 0.4])
         assert batch["documents"] == ["c1", "c2"]
 
+    async def test_chroma_store_consumes_packed_embeddings(self, harness, tmp_path):
+        from services.vectors import pack_vectors
+
+        chromadb_mod, coll = _patched_chromadb_module()
+        with patch.dict(sys.modules, {"chromadb": chromadb_mod}):
+            result = await harness.execute(
+                "vectorStore",
+                {
+                    "operation": "store",
+                    "backend": "chroma",
+                    "embeddings": pack_vectors([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]),
+                    "chunks": [{"content": f"c{i}"} for i in range(3)],
+                    "persistDir": str(tmp_path),
+                },
+            )
+
+        harness.assert_envelope(result, success=True)
+        assert result["result"]["stored_count"] == 3
+        assert coll.added[0]["embeddings"].shape == (3, 2)
+        assert coll.added[0]["embeddings"][2].tolist() == [5.0, 6.0]
+
     async def test_chroma_store_with_empty_embeddings_returns_zero(self, harness, tmp_path):
         chromadb_mod, coll = _patched_chromadb_module()
         with patch.dict(sys.modules, {"chromadb": chromadb_mod}):
@@ -555,6 +875,87 @@ class TestVectorStore:
         assert matches[0]["distance"] == 0.1
         assert matches[0]["metadata"] == {"source": "s1"}
 
+    async def test_chroma_batched_query_runs_one_call(self, harness, tmp_path):
+        from services.vectors import pack_vectors
+
+        chromadb_mod, coll = _patched_chromadb_module()
+        with patch.dict(sys.modules, {"chromadb": chromadb_mod}):
+            result = await harness.execute(
+                "vectorStore",
+                {
+                    "operation": "query",
+                    "backend": "chroma",
+                    "queryEmbeddings": pack_vectors([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]),
+                    "topK": 2,
+                    "persistDir": str(tmp_path),
+                },
+            )
+
+        harness.assert_envelope(result, success=True)
+        payload = result["result"]
+        assert payload["query_count"] == 3
+        assert [len(r["matches"]) for r in payload["results"]] == [2, 2, 2]
+        assert len(coll.queries) == 1
+        assert coll.queries[0][2] == pytest.approx([0.5, 0.6])
+
+    async def test_externally_deleted_collection_is_reopened_once(self, harness, tmp_path):
+        class NotFoundError(Exception):
+            pass
+
+        chromadb_mod, stale = _patched_chromadb_module()
+        fresh = _FakeChromaCollection()
+        client = chromadb_mod.PersistentClient.return_value
+        client.get_or_create_collection.side_effect = [stale, fresh]
+        params = {"operation": "store", "backend": "chroma", "collectionName": "docs",
+                  "embeddings": [[0.1, 0.2]], "chunks": ["c1"], "persistDir": str(tmp_path)}
+
+        with patch.dict(sys.modules, {"chromadb": chromadb_mod}):
+            await harness.execute("vectorStore", params)
+
+            def gone(**kwargs):
+                raise NotFoundError("Collection docs does not exist.")
+
+            stale.add = gone
+            result = await harness.execute("vectorStore", params)
+
+        harness.assert_envelope(result, success=True)
+        assert result["result"]["stored_count"] == 1
+        assert client.get_or_create_collection.call_count == 2
+        assert len(fresh.added) == 1
+
+    async def test_chroma_store_splits_into_batches(self, harness, tmp_path):
+        chromadb_mod, coll = _patched_chromadb_module()
+        with patch.dict(sys.modules, {"chromadb": chromadb_mod}):
+            result = await harness.execute(
+                "vectorStore",
+                {
+                    "operation": "store",
+                    "backend": "chroma",
+                    "embeddings": [[float(i), 0.0] for i in range(5)],
+                    "chunks": [{"content": f"c{i}"} for i in range(5)],
+                    "batchSize": 2,
+                    "persistDir": str(tmp_path),
+                },
+            )
+
+        harness.assert_envelope(result, success=True)
+        assert result["result"]["stored_count"] == 5
+        assert result["result"]["collection_count"] == 5
+        assert sorted(len(b["ids"]) for b in coll.added) == [1, 2, 2]
+        docs = sorted(d for b in coll.added for d in b["documents"])
+        assert docs == [f"c{i}" for i in range(5)]
+
+    async def test_chroma_client_is_reused_across_runs(self, harness, tmp_path):
+        chromadb_mod, coll = _patched_chromadb_module()
+        params = {"operation": "delete", "backend": "chroma", "ids": ["x"], "persistDir": str(tmp_path)}
+        with patch.dict(sys.modules, {"chromadb": chromadb_mod}):
+            for _ in range(3):
+                harness.assert_envelope(await harness.execute("vectorStore", params), success=True)
+
+        chromadb_mod.PersistentClient.assert_called_once()
+        chromadb_mod.PersistentClient.return_value.get_or_create_collection.assert_called_once()
+        assert coll.deleted_ids == ["x", "x", "x"]
+
     async def test_chroma_delete_happy_path(self, harness, tmp_path):
         chromadb_mod, coll = _patched_chromadb_module()
         with patch.dict(sys.modules, {"chromadb": chromadb_mod}):
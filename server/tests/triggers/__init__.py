@@ -0,0 +1 @@
+"""Unit tests for trigger event dispatch (services/event_waiter)."""
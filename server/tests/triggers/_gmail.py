@@ -0,0 +1,229 @@
+"""Local stand-in for the Gmail API surface the Gmail poller uses.
+
+``FakeMailbox`` holds messages and a history log; ``FakeGmailService`` mimics
+the googleapiclient resource chain (``service.users().messages().list(...)
+.execute()``) and ``new_batch_http_request``. Every ``execute()`` is one HTTP
+request: it is counted per endpoint and, with ``latency`` set, sleeps that
+long so executor threads overlap the way real requests do.
+
+Queries understand ``label:X`` and ``is:unread`` terms only.
+"""
+
+import base64
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class FakeHttpError(Exception):
+    """Carries ``resp.status`` like ``googleapiclient.errors.HttpError``."""
+
+    def __init__(self, status: int, reason: str = ""):
+        super().__init__(f"<HttpError {status} {reason}>")
+        self.resp = type("Resp", (), {"status": status, "reason": reason})()
+
+
+class FakeMailbox:
+    def __init__(self, latency: float = 0.0, history_page_size: int = 100,
+                 address: str = "me@example.com"):
+        self.latency = latency
+        self.address = address
+        self.history_page_size = history_page_size
+        self.messages: Dict[str, Dict[str, Any]] = {}
+        self.order: List[str] = []  # oldest first
+        self.history: List[Dict[str, Any]] = []
+        self.history_id = 1000
+        self.oldest_history_id = 1000
+        self.calls: Dict[str, int] = {}
+        self.failing_ids: set = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def deliver(self, subject: str, labels=("INBOX", "UNREAD")) -> str:
+        """Add a message and its ``messageAdded`` history record."""
+        message_id = f"m{len(self.order) + 1:05d}"
+        self.history_id += 1
+        self.messages[message_id] = {
+            "id": message_id,
+            "threadId": f"t{message_id}",
+            "labelIds": list(labels),
+            "snippet": subject,
+            "sizeEstimate": 100,
+            "payload": {
+                "mimeType": "text/plain",
+                "headers": [{"name": "Subject", "value": subject},
+                            {"name": "From", "value": "sender@example.com"}],
+                "body": {"data": base64.urlsafe_b64encode(subject.encode()).decode()},
+            },
+        }
+        self.order.append(message_id)
+        self.history.append({"id": str(self.history_id),
+                             "messagesAdded": [{"message": {"id": message_id,
+                                                            "labelIds": list(labels)}}]})
+        return message_id
+
+    def expire_history(self) -> None:
+        """Drop all history, as Gmail does after about a week."""
+        self.history.clear()
+        self.oldest_history_id = self.history_id
+
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def request(self, endpoint: str, fn: Callable[[], Any]) -> "_Request":
+        return _Request(self, endpoint, fn)
+
+    def _http(self, endpoint: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            return fn()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _matches(self, message: Dict[str, Any], query: str) -> bool:
+        for term in query.split():
+            if term.startswith("label:"):
+                if term[6:] not in message["labelIds"]:
+                    return False
+            elif term == "is:unread":
+                if "UNREAD" not in message["labelIds"]:
+                    return False
+        return True
+
+    # Endpoint implementations
+
+    def list_messages(self, q: str = "", maxResults: int = 100, pageToken: Optional[str] = None,
+                      **_) -> Dict[str, Any]:
+        if maxResults > 500:
+            raise FakeHttpError(400, "maxResults above 500")
+        ids = [m for m in reversed(self.order) if self._matches(self.messages[m], q)]
+        offset = int(pageToken or 0)
+        result: Dict[str, Any] = {"messages": [{"id": m} for m in ids[offset:offset + maxResults]]}
+        if offset + maxResults < len(ids):
+            result["nextPageToken"] = str(offset + maxResults)
+        return result
+
+    def get_message(self, id: str, **_) -> Dict[str, Any]:
+        if id in self.failing_ids or id not in self.messages:
+            raise FakeHttpError(404, "Not Found")
+        return self.messages[id]
+
+    def modify(self, ids: List[str], remove: List[str]) -> Dict[str, Any]:
+        for message_id in ids:
+            labels = self.messages[message_id]["labelIds"]
+            self.messages[message_id]["labelIds"] = [l for l in labels if l not in remove]
+        return {}
+
+    def list_history(self, startHistoryId: str, labelId: Optional[str] = None,
+                     pageToken: Optional[str] = None, **_) -> Dict[str, Any]:
+        start = int(startHistoryId)
+        if start < self.oldest_history_id:
+            raise FakeHttpError(404, "Requested entity was not found.")
+        records = [r for r in self.history if int(r["id"]) > start]
+        if labelId:
+            records = [r for r in records
+                       if labelId in r["messagesAdded"][0]["message"]["labelIds"]]
+        offset = int(pageToken or 0)
+        page = records[offset:offset + self.history_page_size]
+        result: Dict[str, Any] = {"historyId": str(self.history_id)}
+        if page:
+            result["history"] = page
+        if offset + self.history_page_size < len(records):
+            result["nextPageToken"] = str(offset + self.history_page_size)
+        return result
+
+
+class _Request:
+    def __init__(self, mailbox: FakeMailbox, endpoint: str, fn: Callable[[], Any]):
+        self.mailbox = mailbox
+        self.endpoint = endpoint
+        self.fn = fn
+
+    def execute(self) -> Any:
+        return self.mailbox._http(self.endpoint, self.fn)
+
+
+class _Batch:
+    def __init__(self, mailbox: FakeMailbox, callback: Callable):
+        self.mailbox = mailbox
+        self.callback = callback
+        self.requests: List = []
+
+    def add(self, request: _Request, request_id: str) -> None:
+        self.requests.append((request_id, request))
+
+    def execute(self) -> None:
+        def run():
+            results = []
+            for request_id, request in self.requests:
+                try:
+                    results.append((request_id, request.fn(), None))
+                except Exception as e:
+                    results.append((request_id, None, e))
+            return results
+
+        for request_id, response, exception in self.mailbox._http("batch", run):
+            self.callback(request_id, response, exception)
+
+
+class _Messages:
+    def __init__(self, mailbox: FakeMailbox):
+        self.mailbox = mailbox
+
+    def list(self, userId: str, **kwargs) -> _Request:
+        return self.mailbox.request("messages.list", lambda: self.mailbox.list_messages(**kwargs))
+
+    def get(self, userId: str, id: str, **kwargs) -> _Request:
+        return self.mailbox.request("messages.get", lambda: self.mailbox.get_message(id))
+
+    def modify(self, userId: str, id: str, body: Dict[str, Any]) -> _Request:
+        return self.mailbox.request("messages.modify",
+                                    lambda: self.mailbox.modify([id], body["removeLabelIds"]))
+
+    def batchModify(self, userId: str, body: Dict[str, Any]) -> _Request:
+        return self.mailbox.request("messages.batchModify",
+                                    lambda: self.mailbox.modify(body["ids"], body["removeLabelIds"]))
+
+
+class _History:
+    def __init__(self, mailbox: FakeMailbox):
+        self.mailbox = mailbox
+
+    def list(self, userId: str, **kwargs) -> _Request:
+        return self.mailbox.request("history.list", lambda: self.mailbox.list_history(**kwargs))
+
+
+class _Users:
+    def __init__(self, mailbox: FakeMailbox):
+        self.mailbox = mailbox
+
+    def messages(self) -> _Messages:
+        return _Messages(self.mailbox)
+
+    def history(self) -> _History:
+        return _History(self.mailbox)
+
+    def getProfile(self, userId: str) -> _Request:
+        return self.mailbox.request("getProfile",
+                                    lambda: {"emailAddress": self.mailbox.address,
+                                             "historyId": str(self.mailbox.history_id)})
+
+
+class FakeGmailService:
+    """What ``build("gmail", "v1", ...)`` returns, backed by a FakeMailbox."""
+
+    def __init__(self, mailbox: FakeMailbox):
+        self.mailbox = mailbox
+
+    def users(self) -> _Users:
+        return _Users(self.mailbox)
+
+    def new_batch_http_request(self, callback: Callable) -> _Batch:
+        return _Batch(self.mailbox, callback)
@@ -0,0 +1,47 @@
+"""Fixtures for the trigger dispatch test suite.
+
+Redis mode runs against fakeredis through the real ``core.cache``.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from tests._real_core import use_real_core
+
+use_real_core()
+
+
+def make_redis_cache_service():
+    """CacheService on fakeredis with streams enabled (skips without fakeredis)."""
+    fakeredis = pytest.importorskip("fakeredis")
+    from core.cache import CacheService
+
+    service = CacheService(SimpleNamespace(redis_enabled=True, redis_url=None, cache_ttl=3600))
+    service.use_redis = True
+    service.redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    service._streams_available = True
+    return service
+
+
+@pytest.fixture
+async def event_waiter():
+    """The event_waiter module in memory mode, reset after each test."""
+    from services import event_waiter
+
+    event_waiter.set_cache_service(None)
+    yield event_waiter
+    event_waiter.clear_all()
+    for task in list(event_waiter._dispatchers.values()):
+        task.cancel()
+    await asyncio.gather(*event_waiter._dispatchers.values(), return_exceptions=True)
+    event_waiter._dispatchers.clear()
+    event_waiter.set_cache_service(None)
+
+
+@pytest.fixture
+def redis_event_waiter(event_waiter):
+    """The event_waiter module in Redis Streams mode (fakeredis)."""
+    event_waiter.set_cache_service(make_redis_cache_service())
+    return event_waiter
@@ -0,0 +1,288 @@
+"""Tests for event_waiter registration and dispatch in both backends."""
+
+import asyncio
+import time
+
+import pytest
+
+
+def _whatsapp(chat_id="123@s.whatsapp.net", text="hi", **extra):
+    return {"chat_id": chat_id, "sender_phone": chat_id.split("@")[0], "text": text,
+            "message_type": "text", "is_from_me": False, **extra}
+
+
+class TestMemoryMode:
+    async def test_dispatch_resolves_matching_waiters_only(self, event_waiter):
+        match = await event_waiter.register("whatsappReceive", "a", {"filter": "keywords", "keywords": "hi"})
+        other = await event_waiter.register("whatsappReceive", "b", {"filter": "keywords", "keywords": "bye"})
+
+        assert event_waiter.dispatch("whatsapp_message_received", _whatsapp()) == 1
+        assert await event_waiter.wait_for_event(match, timeout=1) == _whatsapp()
+        assert not other.future.done()
+        assert match.id not in event_waiter._waiters
+
+    async def test_index_tracks_event_types(self, event_waiter):
+        w = await event_waiter.register("webhookTrigger", "hook", {"path": "/x"})
+
+        assert event_waiter._event_index["webhook_received"].waiters == {w.id: w}
+        assert event_waiter.dispatch("whatsapp_message_received", {"path": "/x"}) == 0
+
+        event_waiter.cancel(w.id)
+        assert "webhook_received" not in event_waiter._event_index
+
+    async def test_ordering_key_names_the_conversation(self, event_waiter):
+        assert event_waiter.ordering_key("whatsappReceive", _whatsapp(chat_id="g1@g.us")) == "g1@g.us"
+        assert event_waiter.ordering_key("chatTrigger", {"session_id": "s1"}) == "s1"
+        assert event_waiter.ordering_key("chatTrigger", {}) is None
+        assert event_waiter.ordering_key("webhookTrigger", {"path": "/x"}) is None
+
+
+class TestIndexedMatching:
+    async def test_candidates_narrowed_by_chat_sender_and_keyword(self, event_waiter):
+        group = await event_waiter.register("whatsappReceive", "g", {"filter": "group", "group_id": "g1@g.us"})
+        contact = await event_waiter.register("whatsappReceive", "c", {"filter": "contact", "contactPhone": "5551234"})
+        keyword = await event_waiter.register("whatsappReceive", "k", {"filter": "keywords", "keywords": "invoice, refund"})
+        anyone = await event_waiter.register("whatsappReceive", "a", {"filter": "all"})
+        bucket = event_waiter._event_index["whatsapp_message_received"]
+
+        # Contact phone without country code still matches (substring semantics)
+        candidates = bucket.candidates(_whatsapp("15551234@s.whatsapp.net", text="hello"))
+        assert set(candidates) == {contact.id, anyone.id}
+
+        candidates = bucket.candidates(_whatsapp("999@s.whatsapp.net", text="Need a REFUND"))
+        assert set(candidates) == {keyword.id, anyone.id}
+
+        candidates = bucket.candidates(_whatsapp("g1@g.us", is_group=True, group_info={"sender_phone": "7"}))
+        assert set(candidates) == {group.id, anyone.id}
+
+    async def test_telegram_keys(self, event_waiter):
+        chat = await event_waiter.register("telegramReceive", "c", {"senderFilter": "specific_chat", "chat_id": 42})
+        legacy_user = await event_waiter.register("telegramReceive", "u", {"from_user": "7"})
+        groups = await event_waiter.register("telegramReceive", "g", {"senderFilter": "group"})
+        bucket = event_waiter._event_index["telegram_message_received"]
+
+        msg = {"chat_id": 42, "from_id": 7, "chat_type": "private", "text": "hi"}
+        assert set(bucket.candidates(msg)) == {chat.id, legacy_user.id}
+        assert set(bucket.candidates({**msg, "chat_id": 1, "chat_type": "group"})) == {legacy_user.id, groups.id}
+
+    async def test_index_never_hides_a_match(self, event_waiter):
+        import random
+
+        rng = random.Random(3)
+        phones = ["5551234", "15551234", "4420", "999"]
+        params = [
+            {"filter": "contact", "contactPhone": rng.choice(phones + [""])} for _ in range(10)
+        ] + [
+            {"filter": "group", "group_id": rng.choice(["g1@g.us", "g2@g.us"])} for _ in range(10)
+        ] + [
+            {"filter": "keywords", "keywords": rng.choice(["in", "invoice,hel", "x"])} for _ in range(10)
+        ] + [{"filter": "channel", "channel_jid": "c@newsletter"}, {"filter": "self"}]
+        waiters = [await event_waiter.register("whatsappReceive", f"n{i}", p) for i, p in enumerate(params)]
+        bucket = event_waiter._event_index["whatsapp_message_received"]
+
+        for _ in range(200):
+            chat = rng.choice(["g1@g.us", "g2@g.us", "c@newsletter"] + [f"{p}@s.whatsapp.net" for p in phones])
+            msg = _whatsapp(chat, text=rng.choice(["Hello", "invoice 7", "xyz", ""]),
+                            is_group=chat.endswith("@g.us"), group_info={"sender_phone": rng.choice(phones)})
+            expected = {w.id for w in waiters if w.filter_fn(msg)}
+            candidates = bucket.candidates(msg)
+            assert expected <= set(candidates)
+            assert {wid for wid, w in candidates.items() if w.filter_fn(msg)} == expected
+
+    async def test_remove_cleans_up_keys(self, event_waiter):
+        a = await event_waiter.register("whatsappReceive", "a", {"filter": "keywords", "keywords": "abc,de"})
+        bucket = event_waiter._event_index["whatsapp_message_received"]
+        b = await event_waiter.register("whatsappReceive", "b", {"filter": "all"})
+
+        event_waiter.cancel(a.id)
+
+        assert bucket.substring == {} and bucket.key_lengths == {}
+        assert bucket.candidates(_whatsapp(text="abc")) == {b.id: b}
+
+
+class TestRedisMode:
+    async def test_one_dispatcher_per_stream(self, redis_event_waiter):
+        ew = redis_event_waiter
+        waiters = [await ew.register("whatsappReceive", f"n{i}", {}) for i in range(20)]
+        await ew.register("webhookTrigger", "hook", {})
+
+        assert set(ew._dispatchers) == {"whatsapp_message_received", "webhook_received"}
+        assert all(not w.future.done() for w in waiters)
+
+    async def test_event_fans_out_to_matching_waiters(self, redis_event_waiter):
+        ew = redis_event_waiter
+        a = await ew.register("whatsappReceive", "a", {"filter": "contact", "contactPhone": "111"})
+        b = await ew.register("whatsappReceive", "b", {"filter": "contact", "contactPhone": "111"})
+        c = await ew.register("whatsappReceive", "c", {"filter": "contact", "contactPhone": "222"})
+
+        await ew.dispatch_async("whatsapp_message_received", _whatsapp("111@s.whatsapp.net"))
+
+        results = await asyncio.gather(ew.wait_for_event(a, timeout=2), ew.wait_for_event(b, timeout=2))
+        assert [r["chat_id"] for r in results] == ["111@s.whatsapp.net"] * 2
+        assert results[0]["is_from_me"] is False  # Decoded from JSON
+        assert not c.future.done()
+
+    async def test_event_sent_right_after_register_is_not_lost(self, redis_event_waiter):
+        ew = redis_event_waiter
+        # Older event on the stream must not resolve a new waiter
+        await ew.get_cache_service().stream_add("events:webhook_received", {"path": "/old"})
+
+        waiter = await ew.register("webhookTrigger", "hook", {})
+        await ew.dispatch_async("webhook_received", {"path": "/new"})
+
+        assert (await ew.wait_for_event(waiter, timeout=2))["path"] == "/new"
+
+    async def test_ingress_latency_recorded_at_resolution(self, redis_event_waiter):
+        ew = redis_event_waiter
+        waiter = await ew.register("webhookTrigger", "hook", {})
+        await ew.dispatch_async("webhook_received", {"path": "/x"}, received_at=time.perf_counter() - 0.05)
+        await ew.wait_for_event(waiter, timeout=2)
+
+        latency = ew.get_ingress_latency()
+        assert latency["count"] == 1
+        assert latency["max_ms"] >= 50
+        assert ew._ingress_times == {}
+
+    async def test_dispatcher_exits_when_no_waiters_remain(self, redis_event_waiter, monkeypatch):
+        ew = redis_event_waiter
+        monkeypatch.setattr(ew, "DISPATCHER_BLOCK_MS", 50)
+        waiter = await ew.register("webhookTrigger", "hook", {})
+        task = ew._dispatchers["webhook_received"]
+
+        ew.cancel(waiter.id)
+        await asyncio.wait_for(task, timeout=2)
+
+        assert "webhook_received" not in ew._dispatchers
+
+    async def test_re_registered_trigger_resumes_after_its_event(self, redis_event_waiter, monkeypatch):
+        ew = redis_event_waiter
+        monkeypatch.setattr(ew, "DISPATCHER_BLOCK_MS", 50)
+        waiter = await ew.register("webhookTrigger", "hook", {})
+        task = ew._dispatchers["webhook_received"]
+        await ew.dispatch_async("webhook_received", {"path": "/first"})
+        await ew.dispatch_async("webhook_received", {"path": "/second"})
+        assert (await ew.wait_for_event(waiter, timeout=2))["path"] == "/first"
+        await asyncio.wait_for(task, timeout=2)
+
+        # Sent while no waiter (and no dispatcher) was there
+        await ew.dispatch_async("webhook_received", {"path": "/third"})
+        received = []
+        for _ in range(2):
+            waiter = await ew.register("webhookTrigger", "hook", {})
+            received.append((await ew.wait_for_event(waiter, timeout=2))["path"])
+
+        assert received == ["/second", "/third"]
+
+    async def test_new_trigger_skips_events_from_before_it(self, redis_event_waiter, monkeypatch):
+        ew = redis_event_waiter
+        monkeypatch.setattr(ew, "DISPATCHER_BLOCK_MS", 50)
+        waiter = await ew.register("webhookTrigger", "hook", {})
+        task = ew._dispatchers["webhook_received"]
+        await ew.dispatch_async("webhook_received", {"path": "/first"})
+        await ew.wait_for_event(waiter, timeout=2)
+        await asyncio.wait_for(task, timeout=2)
+        await ew.dispatch_async("webhook_received", {"path": "/stale"})
+
+        # The dispatcher replays /stale for the returning "hook" only
+        waiter = await ew.register("webhookTrigger", "hook", {})
+        other = await ew.register("webhookTrigger", "other", {})
+        assert (await ew.wait_for_event(waiter, timeout=2))["path"] == "/stale"
+        await ew.dispatch_async("webhook_received", {"path": "/new"})
+
+        assert (await ew.wait_for_event(other, timeout=2))["path"] == "/new"
+
+    async def test_stale_trigger_position_starts_at_the_stream_tail(self, redis_event_waiter, monkeypatch):
+        ew = redis_event_waiter
+        monkeypatch.setattr(ew, "DISPATCHER_BLOCK_MS", 50)
+        monkeypatch.setattr(ew, "TRIGGER_RESUME_WINDOW", 0)
+        waiter = await ew.register("webhookTrigger", "hook", {})
+        task = ew._dispatchers["webhook_received"]
+        await ew.dispatch_async("webhook_received", {"path": "/first"})
+        await ew.wait_for_event(waiter, timeout=2)
+        await asyncio.wait_for(task, timeout=2)
+        await ew.dispatch_async("webhook_received", {"path": "/old"})
+
+        waiter = await ew.register("webhookTrigger", "hook", {})
+        await ew.dispatch_async("webhook_received", {"path": "/new"})
+
+        assert (await ew.wait_for_event(waiter, timeout=2))["path"] == "/new"
+
+    async def test_timeout(self, redis_event_waiter):
+        waiter = await redis_event_waiter.register("webhookTrigger", "hook", {})
+
+        with pytest.raises(asyncio.TimeoutError):
+            await redis_event_waiter.wait_for_event(waiter, timeout=0.05)
+
+
+async def _drain(subscription, count, timeout=2):
+    received = []
+
+    async def read():
+        async for event in subscription:
+            received.append(event)
+            if len(received) == count:
+                return
+
+    await asyncio.wait_for(read(), timeout)
+    return received
+
+
+class TestSubscriptions:
+    async def test_buffers_every_match_between_reads(self, event_waiter):
+        sub = await event_waiter.subscribe("whatsappReceive", "a", {"filter": "keywords", "keywords": "hi"})
+
+        for n in range(5):
+            event_waiter.dispatch("whatsapp_message_received", _whatsapp(text=f"hi {n}"))
+        event_waiter.dispatch("whatsapp_message_received", _whatsapp(text="bye"))
+
+        assert sub.pending == 5
+        assert [e["text"] for e in await _drain(sub, 5)] == [f"hi {n}" for n in range(5)]
+        # Still registered: no re-registration between events
+        assert event_waiter.dispatch("whatsapp_message_received", _whatsapp(text="hi again")) == 1
+        assert sub.id in event_waiter._waiters
+
+    async def test_one_shot_waiters_and_subscriptions_coexist(self, event_waiter):
+        sub = await event_waiter.subscribe("webhookTrigger", "hook", {})
+        waiter = await event_waiter.register("webhookTrigger", "hook", {})
+
+        assert event_waiter.dispatch("webhook_received", {"path": "/x"}) == 2
+        assert event_waiter.dispatch("webhook_received", {"path": "/y"}) == 1
+
+        assert (await event_waiter.wait_for_event(waiter, timeout=1))["path"] == "/x"
+        assert [e["path"] for e in await _drain(sub, 2)] == ["/x", "/y"]
+
+    @pytest.mark.parametrize("overflow, kept", [("drop_oldest", [2, 3]), ("drop_newest", [0, 1]),
+                                                ("block", [0, 1])])
+    async def test_memory_overflow_policies(self, event_waiter, overflow, kept):
+        sub = await event_waiter.subscribe("webhookTrigger", "hook", {}, max_buffer=2, overflow=overflow)
+
+        for n in range(4):
+            event_waiter.dispatch("webhook_received", {"n": n})
+
+        assert [e["n"] for e in await _drain(sub, 2)] == kept
+        assert sub.dropped == 2
+
+    async def test_cancel_ends_iteration(self, event_waiter):
+        sub = await event_waiter.subscribe("webhookTrigger", "hook", {})
+        reader = asyncio.ensure_future(_drain(sub, 10))
+        await asyncio.sleep(0)
+
+        assert event_waiter.cancel_for_node("hook") == 1
+
+        assert await asyncio.wait_for(reader, 1) == []
+        assert "webhook_received" not in event_waiter._event_index
+        assert event_waiter.dispatch("webhook_received", {}) == 0
+
+
+class TestRedisSubscriptions:
+    async def test_block_policy_holds_the_stream_instead_of_dropping(self, redis_event_waiter):
+        ew = redis_event_waiter
+        sub = await ew.subscribe("webhookTrigger", "hook", {}, max_buffer=3, overflow="block")
+
+        for n in range(20):
+            await ew.dispatch_async("webhook_received", {"n": n})
+        await asyncio.sleep(0.05)
+        assert sub.pending == 3
+
+        assert [e["n"] for e in await _drain(sub, 20)] == list(range(20))
+        assert sub.dropped == 0
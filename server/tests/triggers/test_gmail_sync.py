@@ -0,0 +1,154 @@
+"""Incremental Gmail sync (GmailHistorySync) against a local stand-in Gmail API."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from services.handlers.gmail import GmailHistorySync, gmail_cursor_key
+from tests.triggers._gmail import FakeGmailService, FakeMailbox
+
+QUERY = "label:INBOX is:unread"
+
+
+def _memory_cache():
+    from core.cache import CacheService
+
+    return CacheService(SimpleNamespace(redis_enabled=False, redis_url=None, cache_ttl=3600))
+
+
+def _sync(mailbox, cache=None, services=1, query=QUERY, label="INBOX", **kwargs) -> GmailHistorySync:
+    return GmailHistorySync([FakeGmailService(mailbox) for _ in range(services)], query, label,
+                            cache=cache, cursor_key=gmail_cursor_key("node-1"), **kwargs)
+
+
+def _subjects(emails):
+    return [e["subject"] for e in emails]
+
+
+class TestGmailHistorySync:
+    async def test_baseline_skips_existing_mail_then_returns_new_oldest_first(self):
+        mailbox = FakeMailbox()
+        mailbox.deliver("old")
+        sync = _sync(mailbox)
+
+        assert await sync.start() is False
+        assert await sync.poll() == []
+        mailbox.deliver("first")
+        mailbox.deliver("second")
+
+        emails = await sync.poll()
+        assert _subjects(emails) == ["first", "second"]
+        assert emails[0]["body"] == "first"
+        assert await sync.poll() == []
+
+    async def test_quiet_cycle_costs_one_request(self):
+        mailbox = FakeMailbox()
+        for n in range(50):
+            mailbox.deliver(f"old {n}")
+        sync = _sync(mailbox)
+        await sync.start()
+        mailbox.calls.clear()
+
+        await sync.poll()
+
+        assert mailbox.calls == {"history.list": 1}
+
+    async def test_restart_resumes_from_the_persisted_cursor(self):
+        mailbox, cache = FakeMailbox(), _memory_cache()
+        await _sync(mailbox, cache).start()
+        mailbox.deliver("while down")
+
+        restarted = _sync(mailbox, cache)
+        assert await restarted.start() is True
+        assert _subjects(await restarted.poll()) == ["while down"]
+        assert (await cache.get("gmail:history:node-1"))["history_id"] == str(mailbox.history_id)
+
+    @pytest.mark.parametrize("change", ["query", "label", "account"])
+    async def test_cursor_of_another_query_label_or_account_rebaselines(self, change):
+        mailbox, cache = FakeMailbox(), _memory_cache()
+        await _sync(mailbox, cache).start()
+        mailbox.deliver("before the change")
+
+        if change == "query":
+            restarted = _sync(mailbox, cache, query="label:INBOX")
+        elif change == "label":
+            restarted = _sync(mailbox, cache, query="label:SENT is:unread", label="SENT")
+        else:
+            mailbox.address = "other@example.com"
+            restarted = _sync(mailbox, cache)
+
+        assert await restarted.start() is False
+        assert await restarted.poll() == []
+        mailbox.deliver("after", labels=("INBOX", "SENT", "UNREAD"))
+        assert _subjects(await restarted.poll()) == ["after"]
+
+    async def test_expired_cursor_rebaselines(self):
+        mailbox = FakeMailbox()
+        sync = _sync(mailbox)
+        await sync.start()
+        mailbox.deliver("lost")
+        mailbox.expire_history()
+
+        assert await sync.poll() == []
+        assert sync.history_id == str(mailbox.history_id)
+        mailbox.deliver("after")
+        assert _subjects(await sync.poll()) == ["after"]
+
+    async def test_label_and_query_filter_new_messages(self):
+        mailbox = FakeMailbox()
+        sync = _sync(mailbox)
+        await sync.start()
+        mailbox.deliver("sent", labels=("SENT",))
+        mailbox.deliver("already read", labels=("INBOX",))
+        mailbox.deliver("match")
+
+        assert _subjects(await sync.poll()) == ["match"]
+
+    async def test_burst_is_fetched_in_bounded_concurrent_batches(self):
+        mailbox = FakeMailbox(latency=0.01, history_page_size=50)
+        sync = _sync(mailbox, services=2, batch_size=50)
+        await sync.start()
+        for n in range(120):
+            mailbox.deliver(f"burst {n}")
+        mailbox.calls.clear()
+
+        emails = await sync.poll()
+
+        assert _subjects(emails) == [f"burst {n}" for n in range(120)]
+        assert mailbox.calls == {"history.list": 3, "messages.list": 1, "batch": 3}
+        assert mailbox.max_in_flight == 2
+
+    async def test_burst_larger_than_a_list_page_is_delivered_in_full(self):
+        mailbox = FakeMailbox(history_page_size=500)
+        for n in range(30):
+            mailbox.deliver(f"old {n}")
+        sync = _sync(mailbox, services=2)
+        await sync.start()
+        for n in range(700):
+            mailbox.deliver(f"burst {n}")
+        mailbox.calls.clear()
+
+        emails = await sync.poll()
+
+        assert len(emails) == 700
+        assert mailbox.calls["messages.list"] == 2
+
+    @pytest.mark.parametrize("recovers", [True, False])
+    async def test_failed_fetch_is_retried_on_later_cycles(self, recovers):
+        mailbox = FakeMailbox()
+        sync = _sync(mailbox)
+        await sync.start()
+        flaky = mailbox.deliver("flaky")
+        mailbox.deliver("fine")
+        mailbox.failing_ids.add(flaky)
+
+        assert _subjects(await sync.poll()) == ["fine"]
+        if recovers:
+            mailbox.failing_ids.clear()
+            assert _subjects(await sync.poll()) == ["flaky"]
+        else:
+            assert await sync.poll() == []
+            assert await sync.poll() == []
+            mailbox.failing_ids.clear()
+            # Given up after GMAIL_FETCH_ATTEMPTS
+            assert await sync.poll() == []
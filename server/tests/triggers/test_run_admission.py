@@ -0,0 +1,279 @@
+"""Tests for the deployment run admission queue and its overflow policies."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services.deployment.admission import (
+    QUEUED, REJECTED, SPILLED, STARTED, RunAdmissionQueue, RunSpillStore,
+)
+from tests.triggers.conftest import make_redis_cache_service
+
+
+class _Runs:
+    """start_run stand-in: each run blocks until released."""
+
+    def __init__(self, failing=()):
+        self.started = []
+        self.failing = set(failing)
+        self._gates = {}
+
+    def start(self, run):
+        if run.trigger_data["n"] in self.failing:
+            raise RuntimeError("cannot start")
+        gate = asyncio.Event()
+        self._gates[run.trigger_data["n"]] = gate
+        self.started.append(run.trigger_data["n"])
+        return asyncio.ensure_future(gate.wait())
+
+    async def finish(self, n):
+        self._gates[n].set()
+        await asyncio.sleep(0.01)
+
+
+def _queue(runs, **kwargs):
+    return RunAdmissionQueue("wf", start_run=runs.start, **kwargs)
+
+
+def _memory_cache():
+    from core.cache import CacheService
+
+    return CacheService(SimpleNamespace(redis_enabled=False, redis_url=None, cache_ttl=3600))
+
+
+class TestAdmission:
+    async def test_starts_up_to_concurrency_then_queues_fifo(self):
+        runs = _Runs()
+        queue = _queue(runs, concurrency=2, max_depth=10)
+
+        outcomes = [await queue.submit("t", {"n": n}) for n in range(4)]
+
+        assert outcomes == [STARTED, STARTED, QUEUED, QUEUED]
+        assert runs.started == [0, 1]
+        assert queue.depth == 2
+
+        await runs.finish(0)
+        assert runs.started == [0, 1, 2]
+        await runs.finish(1)
+        assert runs.started == [0, 1, 2, 3]
+        assert queue.metrics()["started"] == 4
+
+    async def test_drop_oldest_evicts_longest_waiting(self):
+        runs = _Runs()
+        queue = _queue(runs, concurrency=1, max_depth=2, overflow="drop_oldest")
+
+        for n in range(4):
+            await queue.submit("t", {"n": n})
+        await runs.finish(0)
+        await runs.finish(2)
+
+        assert runs.started == [0, 2, 3]
+        assert queue.metrics()["dropped"] == 1
+
+    async def test_reject_refuses_new_runs(self):
+        runs = _Runs()
+        queue = _queue(runs, concurrency=1, max_depth=1, overflow="reject")
+
+        outcomes = [await queue.submit("t", {"n": n}) for n in range(3)]
+
+        assert outcomes == [STARTED, QUEUED, REJECTED]
+        assert queue.metrics()["rejected"] == 1
+
+    async def test_spill_without_store_rejects(self):
+        queue = _queue(_Runs(), concurrency=1, max_depth=0, overflow="spill")
+
+        assert queue.overflow == "reject"
+
+    async def test_close_discards_waiting_runs(self):
+        runs = _Runs()
+        queue = _queue(runs, concurrency=1, max_depth=5)
+        for n in range(3):
+            await queue.submit("t", {"n": n})
+
+        assert await queue.close() == 2
+        await runs.finish(0)
+        assert runs.started == [0]
+        assert await queue.submit("t", {"n": 9}) == REJECTED
+
+    async def test_run_that_fails_to_start_does_not_hold_a_slot(self):
+        runs = _Runs(failing={0, 2})
+        queue = _queue(runs, concurrency=1, max_depth=5)
+
+        assert await queue.submit("t", {"n": 0}) == REJECTED
+        assert await queue.submit("t", {"n": 1}) == STARTED
+        await queue.submit("t", {"n": 2})
+        await queue.submit("t", {"n": 3})
+        await runs.finish(1)
+
+        assert runs.started == [1, 3]
+        metrics = queue.metrics()
+        assert metrics["running"] == 1 and metrics["failed_to_start"] == 2
+
+    async def test_metrics_record_wait_time(self):
+        runs = _Runs()
+        queue = _queue(runs, concurrency=1, max_depth=5)
+        await queue.submit("t", {"n": 0})
+        await queue.submit("t", {"n": 1})
+        await asyncio.sleep(0.02)
+        await runs.finish(0)
+
+        metrics = queue.metrics()
+        assert metrics["wait_max"] >= 0.02
+        assert 0 < metrics["wait_avg"] <= metrics["wait_max"]
+
+
+class TestOrderingKeys:
+    async def test_same_key_runs_one_at_a_time_in_order(self):
+        runs = _Runs()
+        queue = _queue(runs, concurrency=4, max_depth=10)
+
+        outcomes = [await queue.submit("t", {"n": n}, ordering_key="chat-a") for n in range(3)]
+
+        assert outcomes == [STARTED, QUEUED, QUEUED]
+        assert runs.started == [0]
+        await runs.finish(0)
+        assert runs.started == [0, 1]
+        await runs.finish(1)
+        assert runs.started == [0, 1, 2]
+        assert queue.metrics()["parked"] == 0
+
+    async def test_slow_key_does_not_hold_back_other_keys(self):
+        runs = _Runs()
+        queue = _queue(runs, concurrency=4, max_depth=10)
+
+        await queue.submit("t", {"n": 0}, ordering_key="slow")
+        await queue.submit("t", {"n": 1}, ordering_key="slow")
+        for n, key in ((2, "b"), (3, "c"), (4, None)):
+            assert await queue.submit("t", {"n": n}, ordering_key=key) == STARTED
+
+        assert runs.started == [0, 2, 3, 4]
+        assert queue.depth == 1
+
+    async def test_queued_run_parks_behind_its_running_key(self):
+        runs = _Runs()
+        queue = _queue(runs, concurrency=2, max_depth=10)
+        for n, key in enumerate("acbbd"):
+            await queue.submit("t", {"n": n}, ordering_key=key)
+
+        await runs.finish(0)
+        await runs.finish(1)
+        # 3 waits behind 2 (same key) and lets 4 take the free slot
+        assert runs.started == [0, 1, 2, 4]
+        assert queue.metrics()["parked"] == 1
+        await runs.finish(2)
+        assert runs.started == [0, 1, 2, 4, 3]
+
+    async def test_parked_run_that_fails_to_start_passes_the_key_on(self):
+        runs = _Runs(failing={1})
+        queue = _queue(runs, concurrency=2, max_depth=10)
+        for n in range(3):
+            await queue.submit("t", {"n": n}, ordering_key="a")
+
+        await runs.finish(0)
+
+        assert runs.started == [0, 2]
+        assert queue.metrics()["ordering_keys_running"] == 1
+        await runs.finish(2)
+        assert queue.metrics()["running"] == 0
+        assert queue.metrics()["ordering_keys_running"] == 0
+
+    async def test_many_parked_runs_failing_to_start_do_not_recurse(self):
+        runs = _Runs(failing=set(range(1, 3000)))
+        queue = _queue(runs, concurrency=1, max_depth=5000)
+        for n in range(3001):
+            await queue.submit("t", {"n": n}, ordering_key="a")
+
+        await runs.finish(0)
+
+        assert runs.started == [0, 3000]
+        assert queue.metrics()["failed_to_start"] == 2999
+        assert queue.metrics()["parked"] == 0
+        await runs.finish(3000)
+
+    async def test_parked_runs_count_towards_depth(self):
+        runs = _Runs()
+        queue = _queue(runs, concurrency=2, max_depth=2, overflow="drop_oldest")
+        for n in range(4):
+            await queue.submit("t", {"n": n}, ordering_key="a")
+
+        assert queue.depth == 2
+        assert queue.metrics()["dropped"] == 1
+        await runs.finish(0)
+        await runs.finish(2)
+        assert runs.started == [0, 2, 3]
+
+
+class TestSpill:
+    @pytest.mark.parametrize("backend", ["memory", "redis"])
+    async def test_spilled_runs_resume_in_order(self, backend):
+        cache = _memory_cache() if backend == "memory" else make_redis_cache_service()
+        runs = _Runs()
+        queue = _queue(runs, concurrency=1, max_depth=1, overflow="spill",
+                       spill=RunSpillStore(cache, "deployment:run_spill:wf"))
+
+        outcomes = [await queue.submit("t", {"n": n}) for n in range(4)]
+
+        assert outcomes == [STARTED, QUEUED, SPILLED, SPILLED]
+        for n in range(3):
+            await runs.finish(n)
+        assert runs.started == [0, 1, 2, 3]
+        assert queue.metrics()["spilled_pending"] == 0
+
+    async def test_spilled_runs_keep_their_ordering_key(self):
+        runs = _Runs()
+        queue = _queue(runs, concurrency=2, max_depth=0, overflow="spill",
+                       spill=RunSpillStore(_memory_cache(), "deployment:run_spill:wf"))
+        await queue.submit("t", {"n": 0}, ordering_key="a")
+        await queue.submit("t", {"n": 1}, ordering_key="b")
+        assert await queue.submit("t", {"n": 2}, ordering_key="a") == SPILLED
+
+        await runs.finish(1)
+        # The freed slot must not start 2 while 0 (same key) still runs
+        assert runs.started == [0, 1]
+        await runs.finish(0)
+        assert runs.started == [0, 1, 2]
+
+    async def test_new_runs_queue_behind_spilled_ones(self):
+        runs = _Runs()
+        queue = _queue(runs, concurrency=1, max_depth=1, overflow="spill",
+                       spill=RunSpillStore(_memory_cache(), "deployment:run_spill:wf"))
+        for n in range(3):
+            await queue.submit("t", {"n": n})
+        await runs.finish(0)
+
+        # 1 started from memory, 2 is still spilled: 3 must not overtake it
+        assert await queue.submit("t", {"n": 3}) == SPILLED
+        await runs.finish(1)
+        await runs.finish(2)
+        assert runs.started == [0, 1, 2, 3]
+
+
+class TestDeploymentSettings:
+    def test_known_keys_are_validated(self):
+        from services.deployment import validate_deployment_settings
+
+        assert validate_deployment_settings({"run_queue_depth": 50, "run_queue_overflow": "spill",
+                                             "event_buffer_overflow": "block", "other": 1}) == {
+            "run_queue_depth": 50, "run_queue_overflow": "spill", "event_buffer_overflow": "block"}
+        for bad in ({"run_queue_overflow": "drop_all"}, {"event_buffer_size": "big"},
+                    {"ordered_runs": "yes"}, {"max_concurrent_runs": -1}):
+            with pytest.raises(ValueError):
+                validate_deployment_settings(bad)
+
+    async def test_saved_settings_reach_the_next_deploy(self, tmp_path):
+        from services.deployment import DeploymentManager
+        from tests.execution.conftest import make_sqlite_database
+
+        db = await make_sqlite_database(tmp_path / "settings.db")
+        assert await db.get_deployment_settings() is None
+        await db.save_deployment_settings({"run_queue_depth": 5, "event_buffer_overflow": "block"})
+        manager = DeploymentManager(db, execute_workflow_fn=None, store_output_fn=None, broadcaster=None)
+
+        await manager._load_settings()
+
+        assert manager._settings["run_queue_depth"] == 5
+        assert manager._settings["event_buffer_overflow"] == "block"
+        assert manager._settings["max_concurrent_runs"] == 100
+        assert manager._create_run_queue("wf").max_depth == 5
+        await db.shutdown()